@@ -0,0 +1,180 @@
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+History page queries and post-processing history lookups against a large history table.
+
+A main db in a temporary folder is filled with --rows history rows of snatches and downloads spread over the
+episodes of --shows shows. The compact history layout is built for all rows and for one page, and compared with the
+list scan that built it before on the first --before-rows rows, because that scan is quadratic. The "already
+processed" lookup of post-processing is timed as a file name suffix match on resource and as an indexed lookup on
+resource_name.
+
+usage: python benchmarks/history.py [--rows 500000] [--shows 200] [--before-rows 5000]
+"""
+
+import argparse
+import datetime
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+
+PROG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, PROG_DIR)
+sys.path.insert(1, os.path.join(PROG_DIR, 'lib'))
+
+warnings.filterwarnings('ignore', message='Using slow pure-python SequenceMatcher')
+
+import sickgear
+from sickgear import db, helpers
+from sickgear.common import Quality, DOWNLOADED, SNATCHED
+from sickgear.databases import mainDB
+from sickgear.history import resource_name
+
+QUALITIES = [Quality.HDTV, Quality.HDWEBDL, Quality.FULLHDWEBDL, Quality.HDBLURAY]
+
+
+def setup_db(data_dir, rows, shows, seasons=10, episodes=25):
+    # type: (str, int, int, int, int) -> list
+    """
+    :return: names of the video files that were downloaded
+    """
+    sickgear.DATA_DIR = sickgear.CACHE_DIR = data_dir
+    mainDB.sickgear.save_config = lambda *args, **kwargs: True
+    my_db = db.DBConnection()
+    db.migration_code(my_db)
+
+    my_db.mass_action([
+        ['INSERT INTO tv_shows (indexer, indexer_id, show_name) VALUES (1, ?, ?)', [n, 'Show %s' % n]]
+        for n in range(1, 1 + shows)])
+    my_db.mass_action([
+        ['INSERT INTO tv_episodes (indexer, showid, season, episode, status) VALUES (1, ?, ?, ?, ?)',
+         [show_id, season, episode, Quality.composite_status(DOWNLOADED, Quality.HDTV)]]
+        for show_id in range(1, 1 + shows) for season in range(1, 1 + seasons)
+        for episode in range(1, 1 + episodes)])
+
+    start_date = datetime.datetime(2015, 1, 1)
+    history_rows, video_files = [], []
+    for n in range(rows):
+        # a snatch then a download of each episode quality
+        show_id, rest = 1 + (n // 2) % shows, n // 2 // shows
+        season, episode = 1 + rest % seasons, 1 + (rest // seasons) % episodes
+        quality = QUALITIES[(rest // (seasons * episodes)) % len(QUALITIES)]
+        name = 'Show.%s.S%02dE%02d.%s.x264-GRP%s' % (show_id, season, episode, Quality.qualityStrings[quality]
+                                                     .replace(' ', '.'), n % 7)
+        if not n % 2:
+            action, resource = Quality.composite_status(SNATCHED, quality), name
+        else:
+            action = Quality.composite_status(DOWNLOADED, quality)
+            resource = '/tv/Show %s/Season %s/%s.mkv' % (show_id, season, name)
+            video_files.append('%s.mkv' % name)
+        date = (start_date + datetime.timedelta(minutes=n)).strftime('%Y%m%d%H%M%S')
+        history_rows.append([action, date, show_id, season, episode, quality, resource, resource_name(resource),
+                             'provider', -1, 1, 0])
+    my_db.connection.executemany(
+        'INSERT INTO history (action, date, showid, season, episode, quality, resource, resource_name, provider,'
+        ' version, indexer, hide) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)', history_rows)
+    my_db.connection.commit()
+    return video_files
+
+
+def compact_before(sql_result):
+    # the compact layout as query_history built it before, scanning the compact list for each row
+    compact = []
+    for cur_result in sql_result:
+        action = dict(time=cur_result['date'], action=cur_result['action'],
+                      provider=cur_result['provider'], resource=cur_result['resource'])
+        if not any([(record['show_id'] == cur_result['showid']
+                     and record['indexer'] == cur_result['indexer']
+                     and record['season'] == cur_result['season']
+                     and record['episode'] == cur_result['episode']
+                     and record['quality'] == cur_result['quality']) for record in compact]):
+            helpers.find_show_by_id({cur_result['indexer']: cur_result['showid']}, no_mapped_ids=False,
+                                    no_exceptions=True)
+            cur_res = dict(show_id=cur_result['showid'], indexer=cur_result['indexer'],
+                           season=cur_result['season'], episode=cur_result['episode'],
+                           quality=cur_result['quality'], resource=cur_result['resource'], actions=[action])
+            compact.append(cur_res)
+        else:
+            index = [i for i, record in enumerate(compact)
+                     if record['show_id'] == cur_result['showid']
+                     and record['season'] == cur_result['season']
+                     and record['episode'] == cur_result['episode']
+                     and record['quality'] == cur_result['quality']][0]
+            compact[index]['actions'].append(action)
+            compact[index]['actions'].sort(key=lambda _x: _x['time'], reverse=True)
+    return compact
+
+
+def timed(label, func, repeat):
+    best = result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = (elapsed, best)[None is not best and best < elapsed]
+    print('%-44s %10.1f ms  %s' % (label, best * 1000, result))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='History page and history lookup times')
+    arg_parser.add_argument('--rows', type=int, default=500000, help='number of history rows')
+    arg_parser.add_argument('--shows', type=int, default=200, help='number of shows')
+    arg_parser.add_argument('--before-rows', type=int, default=5000,
+                            help='number of rows to build the compact layout for with the list scan')
+    arg_parser.add_argument('--lookups', type=int, default=50, help='number of post-processing lookups')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='report the best of this many runs')
+    args = arg_parser.parse_args()
+
+    data_dir = tempfile.mkdtemp()
+    try:
+        start = time.perf_counter()
+        video_files = setup_db(data_dir, args.rows, args.shows)
+        print('%s history rows created in %.1fs' % (args.rows, time.perf_counter() - start))
+
+        from sickgear.webserve import History
+        my_db = db.DBConnection(row_type='dict')
+
+        timed('compact, all rows', lambda: len(History.query_history(my_db, '0')[1]), args.repeat)
+        timed('compact, page 10 of 100 rows', lambda: len(History.query_history(my_db, 100, 10)[1]), args.repeat)
+        timed('count rows for paging', lambda: History.count_history(my_db), args.repeat)
+
+        sql_result = History.query_history(my_db, args.before_rows)[0]
+        timed('compact, %s rows' % args.before_rows, lambda: len(History.query_history(
+            my_db, args.before_rows)[1]), args.repeat)
+        timed('compact before, %s rows' % args.before_rows, lambda: len(compact_before(sql_result)), 1)
+
+        lookup_files = video_files[::max(1, len(video_files) // args.lookups)][:args.lookups]
+        lookup_sql = 'SELECT tv_episodes.indexerid, history.resource' \
+                     ' FROM tv_episodes INNER JOIN history' \
+                     ' ON history.showid=tv_episodes.showid AND history.indexer=tv_episodes.indexer' \
+                     ' WHERE history.season=tv_episodes.season and history.episode=tv_episodes.episode' \
+                     ' and tv_episodes.status IN (%s)' % ','.join([str(x) for x in Quality.DOWNLOADED])
+        timed('%s lookups, resource LIKE %%file' % len(lookup_files), lambda: sum(
+            [len(my_db.select(lookup_sql + ' and history.resource LIKE ?', ['%' + f])) for f in lookup_files]), 1)
+        timed('%s lookups, resource_name = file' % len(lookup_files), lambda: sum(
+            [len(my_db.select(lookup_sql + ' and history.resource_name = ?', [resource_name(f)]))
+             for f in lookup_files]), args.repeat)
+    finally:
+        db.DBConnection().close()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if '__main__' == __name__:
+    main()
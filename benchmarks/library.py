@@ -0,0 +1,259 @@
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Synthetic show library for the benchmarks.
+
+A main db is filled with --shows shows of varied season and episode counts, imdb info and the snatch and download
+history of their downloaded episodes. A cache db is filled with --cache-rows provider_cache releases of random
+episodes, and the first --media-shows show folders are created under --media-dir with a sparse dummy file of each
+downloaded episode. The same --seed builds the same library.
+
+usage: python benchmarks/library.py --data-dir path/to/folder [--shows 2000] [--cache-rows 100000]
+       [--history-rows 200000] [--media-dir path/to/shows] [--media-shows 100]
+"""
+
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+import warnings
+
+PROG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, PROG_DIR)
+sys.path.insert(1, os.path.join(PROG_DIR, 'lib'))
+
+warnings.filterwarnings('ignore', message='Using slow pure-python SequenceMatcher')
+
+import sickgear
+from sickgear import db
+from sickgear.common import Quality, ARCHIVED, DOWNLOADED, IGNORED, SKIPPED, SNATCHED, UNAIRED, WANTED
+from sickgear.databases import cache_db, failed_db, mainDB
+from sickgear.history import resource_name
+
+WORDS = ['Blue', 'City', 'Night', 'House', 'River', 'Doctor', 'Line', 'Empire', 'Code', 'Station', 'Harbor', 'Iron',
+         'Garden', 'Signal', 'Crown', 'Frontier', 'Shadow', 'Island', 'Mountain', 'Court', 'Agents', 'Family', 'Quest',
+         'Summer', 'Winter', 'North', 'Point', 'Bridge', 'Legacy', 'Office']
+NETWORKS = ['ABC', 'BBC One', 'CBS', 'FOX', 'HBO', 'NBC', 'Netflix', 'AMC', 'Channel 4', 'Prime Video', 'ITV1', 'FX']
+GENRES = ['Drama', 'Comedy', 'Crime', 'Science-Fiction', 'Documentary', 'Animation', 'Reality', 'Thriller']
+GROUPS = ['LOL', 'DIMENSION', 'KILLERS', 'NTb', 'FLEET', 'SVA', 'NTG', 'AVS', 'MiNX', 'CasStudio']
+RELEASE_QUALITIES = [('720p.HDTV.x264', Quality.HDTV), ('HDTV.x264', Quality.SDTV),
+                     ('1080p.WEB.h264', Quality.FULLHDWEBDL), ('720p.WEB-DL.DD5.1.H.264', Quality.HDWEBDL),
+                     ('1080p.BluRay.x264', Quality.FULLHDBLURAY), ('2160p.WEB-DL.DDP5.1.HEVC', Quality.UHD4KWEB)]
+SHOW_QUALITIES = [Quality.combine_qualities([Quality.HDTV, Quality.HDWEBDL, Quality.HDBLURAY], []),
+                  Quality.combine_qualities([Quality.SDTV, Quality.HDTV], [Quality.FULLHDWEBDL]),
+                  Quality.combine_qualities([Quality.FULLHDWEBDL, Quality.FULLHDBLURAY], []),
+                  Quality.combine_qualities([Quality.HDTV], [Quality.HDWEBDL, Quality.FULLHDWEBDL])]
+PROVIDER_IDS = ['benchprovider1', 'benchprovider2', 'benchprovider3']
+
+
+class Library(object):
+    """
+    what was generated, for the benchmarks to pick inputs from
+    """
+    def __init__(self):
+        self.shows = []  # type: list
+        self.episodes = 0
+        self.history_rows = 0
+        self.cache_rows = 0
+        self.media_files = []  # type: list
+        self.release_names = []  # type: list
+        self.downloaded = []  # type: list
+
+
+def release_name(show_name, season, episode, quality_tag, group):
+    return '%s.S%02dE%02d.%s-%s' % (show_name.replace(' ', '.'), season, episode, quality_tag, group)
+
+
+def make_shows(rnd, shows, media_dir):
+    result = []
+    for n in range(1, 1 + shows):
+        name = '%s %s %s' % (rnd.choice(WORDS), rnd.choice(WORDS), n)
+        anime = 0 == n % 20
+        seasons = (rnd.randint(1, 12), 1)[anime]
+        episodes = [(rnd.randint(6, 24), rnd.randint(50, 200))[anime] for _ in range(seasons)]
+        result.append(dict(
+            prodid=100000 + n, name=name, anime=int(anime), seasons=episodes, ended=0 == n % 3,
+            network=rnd.choice(NETWORKS), genre='|%s|' % '|'.join(rnd.sample(GENRES, 2)),
+            quality=rnd.choice(SHOW_QUALITIES), paused=int(0 == n % 30), startyear=rnd.randint(1990, 2020),
+            location=os.path.join(media_dir or os.path.join(os.sep, 'tv'), name)))
+    return result
+
+
+def episode_status(rnd, airdate, today):
+    if airdate > today:
+        return UNAIRED, (None, Quality.NONE)
+    if airdate > today - datetime.timedelta(days=14):
+        return rnd.choice([WANTED, WANTED, SNATCHED, DOWNLOADED]), rnd.choice(RELEASE_QUALITIES)
+    return rnd.choice([DOWNLOADED] * 12 + [ARCHIVED, SKIPPED, IGNORED, WANTED]), rnd.choice(RELEASE_QUALITIES)
+
+
+def generate(data_dir, shows=2000, cache_rows=100000, history_rows=200000, media_dir=None, media_shows=100, seed=1):
+    # type: (str, int, int, int, str, int, int) -> Library
+    """
+    create the library dbs in data_dir and the dummy media files in media_dir
+    """
+    rnd = random.Random(seed)
+    library = Library()
+    sickgear.DATA_DIR = sickgear.CACHE_DIR = data_dir
+    mainDB.sickgear.save_config = lambda *args, **kwargs: True
+    my_db = db.DBConnection()
+    db.migration_code(my_db)
+    db.upgrade_database(db.DBConnection('cache.db'), cache_db.InitialSchema)
+    db.upgrade_database(db.DBConnection('failed.db'), failed_db.InitialSchema)
+
+    today = datetime.date.today()
+    show_rows, imdb_rows, episode_rows, snatched = [], [], [], []
+    library.shows = make_shows(rnd, shows, media_dir)
+    for num, cur_show in enumerate(library.shows):
+        show_rows.append([
+            1, cur_show['prodid'], cur_show['name'], cur_show['location'], cur_show['network'], cur_show['genre'],
+            45, cur_show['quality'], 'Monday 21:00', ('Continuing', 'Ended')[cur_show['ended']], 0,
+            cur_show['paused'], cur_show['startyear'], 0, 'en', 0, '', 'tt%07d' % cur_show['prodid'],
+            today.toordinal(), 0, 0, 0, cur_show['anime'], 0, 'Overview of %s' % cur_show['name'], 'Show List', 0])
+        if num % 5:
+            imdb_rows.append([1, cur_show['prodid'], 'tt%07d' % cur_show['prodid'], cur_show['name'],
+                              cur_show['startyear'], '', '45', cur_show['genre'].strip('|').replace('|', ','),
+                              'United States', 'us', 'TV-14', '7.5', 1000 + num, today.toordinal(), 0,
+                              sum(cur_show['seasons'])])
+
+        total = sum(cur_show['seasons'])
+        # weekly episodes that end in the past for an ended show, and run into the next weeks otherwise
+        airdate = today - datetime.timedelta(weeks=total + (-3, 100)[cur_show['ended']])
+        absolute = 0
+        for season, ep_count in enumerate(cur_show['seasons'], 1):
+            for episode in range(1, 1 + ep_count):
+                absolute += 1
+                airdate += datetime.timedelta(weeks=1)
+                status, (quality_tag, quality) = episode_status(rnd, airdate, today)
+                location, file_size, release = '', 0, ''
+                if DOWNLOADED == status:
+                    release = release_name(cur_show['name'], season, episode, quality_tag, rnd.choice(GROUPS))
+                    location = os.path.join(cur_show['location'], 'Season %02d' % season, release + '.mkv')
+                    file_size = rnd.randint(200, 4000) * 1024 * 1024
+                    library.downloaded.append((cur_show, season, episode, quality, release, location, file_size))
+                elif SNATCHED == status:
+                    snatched.append((cur_show, season, episode, quality, release_name(
+                        cur_show['name'], season, episode, quality_tag, rnd.choice(GROUPS))))
+                composite = (status, Quality.composite_status(status, quality))[status in (DOWNLOADED, SNATCHED)]
+                episode_rows.append([
+                    cur_show['prodid'], cur_show['prodid'] * 1000 + absolute, 1, 'Episode %s' % episode, season,
+                    episode, 'Description of episode %s' % episode, airdate.toordinal(), composite, location,
+                    file_size, release, (0, absolute)[cur_show['anime']], 0, 0, '', 0, '0001-01-01 00:00:00', 0,
+                    0, 0, 0, -1, ''])
+    library.episodes = len(episode_rows)
+
+    my_db.connection.executemany(
+        'INSERT INTO tv_shows (indexer, indexer_id, show_name, location, network, genre, runtime, quality, airs,'
+        ' status, flatten_folders, paused, startyear, air_by_date, lang, subtitles, notify_list, imdb_id,'
+        ' last_update_indexer, dvdorder, archive_firstmatch, sports, anime, scene, overview, tag, prune)'
+        ' VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)', show_rows)
+    my_db.connection.executemany(
+        'INSERT INTO imdb_info (indexer, indexer_id, imdb_id, title, year, akas, runtimes, genres, countries,'
+        ' country_codes, certificates, rating, votes, last_update, is_mini_series, episode_count)'
+        ' VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)', imdb_rows)
+    my_db.connection.executemany(
+        'INSERT INTO tv_episodes (showid, indexerid, indexer, name, season, episode, description, airdate, status,'
+        ' location, file_size, release_name, absolute_number, hasnfo, hastbn, subtitles, subtitles_searchcount,'
+        ' subtitles_lastsearch, is_proper, scene_season, scene_episode, scene_absolute_number, version, release_group)'
+        ' VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)', episode_rows)
+
+    # a snatch then a download of downloaded episodes, oldest first, until there are history_rows rows
+    history_list = []
+    start_date = datetime.datetime.now() - datetime.timedelta(minutes=history_rows)
+    for n, (cur_show, season, episode, quality, release, location, _) in enumerate(
+            library.downloaded[-(history_rows // 2):]):
+        for offset, action, resource in ((0, SNATCHED, release), (1, DOWNLOADED, location)):
+            history_list.append([
+                Quality.composite_status(action, quality),
+                (start_date + datetime.timedelta(minutes=2 * n + offset)).strftime('%Y%m%d%H%M%S'),
+                cur_show['prodid'], season, episode, quality, resource, resource_name(resource),
+                rnd.choice(PROVIDER_IDS), -1, 1, 0])
+    my_db.connection.executemany(
+        'INSERT INTO history (action, date, showid, season, episode, quality, resource, resource_name, provider,'
+        ' version, indexer, hide) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)', history_list)
+    my_db.connection.commit()
+    library.history_rows = len(history_list)
+
+    # releases of random episodes, and a quarter of them for the snatched episodes of the last weeks
+    cache_db_conn = db.DBConnection('cache.db')
+    cache_list, cache_episodes = [], []
+    now = int(time.time())
+    for n in range(cache_rows):
+        if snatched and not n % 4:
+            cur_show, season, episode = snatched[n % len(snatched)][0:3]
+        else:
+            cur_show = rnd.choice(library.shows)
+            season = rnd.randint(1, len(cur_show['seasons']))
+            episode = rnd.randint(1, cur_show['seasons'][season - 1])
+        quality_tag, quality = rnd.choice(RELEASE_QUALITIES)
+        name = release_name(cur_show['name'], season, episode, quality_tag, GROUPS[n % len(GROUPS)])
+        cache_list.append([n + 1, PROVIDER_IDS[n % len(PROVIDER_IDS)], name, season, '|%s|' % episode,
+                           cur_show['prodid'], 'https://bench.invalid/get/%s' % n, now - n, str(quality),
+                           GROUPS[n % len(GROUPS)], -1, 1])
+        cache_episodes.append([n + 1, 1, cur_show['prodid'], season, episode])
+        library.release_names.append(name)
+    cache_db_conn.connection.executemany(
+        'INSERT INTO provider_cache (cache_id, provider, name, season, episodes, indexerid, url, time, quality,'
+        ' release_group, version, indexer) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)', cache_list)
+    cache_db_conn.connection.executemany(
+        'INSERT INTO provider_cache_episodes (cache_id, indexer, indexerid, season, episode) VALUES (?,?,?,?,?)',
+        cache_episodes)
+    cache_db_conn.connection.commit()
+    library.cache_rows = len(cache_list)
+
+    if media_dir:
+        media_ids = set([cur_show['prodid'] for cur_show in library.shows[:media_shows]])
+        for cur_show, season, episode, quality, release, location, file_size in library.downloaded:
+            if cur_show['prodid'] in media_ids:
+                os.path.isdir(os.path.dirname(location)) or os.makedirs(os.path.dirname(location))
+                with open(location, 'wb') as fh:
+                    # sparse, so that the size is real but the disk space is not used
+                    fh.truncate(file_size)
+                with open(location[:-3] + 'nfo', 'w') as fh:
+                    fh.write(release)
+                library.media_files.append(location)
+
+    return library
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Create a synthetic show library')
+    arg_parser.add_argument('--data-dir', required=True, help='folder for the sickbeard.db and cache.db files')
+    arg_parser.add_argument('--shows', type=int, default=2000, help='number of shows')
+    arg_parser.add_argument('--cache-rows', type=int, default=100000, help='number of provider_cache rows')
+    arg_parser.add_argument('--history-rows', type=int, default=200000, help='number of history rows')
+    arg_parser.add_argument('--media-dir', help='create the show folders with dummy media files in this folder')
+    arg_parser.add_argument('--media-shows', type=int, default=100, help='number of show folders to create')
+    arg_parser.add_argument('--seed', type=int, default=1, help='random seed')
+    args = arg_parser.parse_args()
+
+    if os.path.isfile(os.path.join(args.data_dir, 'sickbeard.db')):
+        arg_parser.error('%s already has a sickbeard.db' % args.data_dir)
+    os.path.isdir(args.data_dir) or os.makedirs(args.data_dir)
+    start = time.perf_counter()
+    library = generate(args.data_dir, args.shows, args.cache_rows, args.history_rows, args.media_dir,
+                       args.media_shows, args.seed)
+    db.DBConnection().close()
+    print('%s shows, %s episodes, %s history rows, %s cache rows and %s media files created in %.1fs' % (
+        len(library.shows), library.episodes, library.history_rows, library.cache_rows, len(library.media_files),
+        time.perf_counter() - start))
+
+
+if '__main__' == __name__:
+    main()
@@ -0,0 +1,147 @@
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Release name parsing throughput in names/sec.
+
+The corpus is the release names of tests/name_parser_tests.py, names found in the provider_cache table of a cache.db
+given with --cache-db, or a text file with one name per line given with --names. Scene style names are added from
+real show names, numbering styles, qualities and groups up to --size names.
+
+usage: python benchmarks/name_parser.py [--size 20000] [--cache-db path/to/cache.db] [--names names.txt]
+"""
+
+import argparse
+import ast
+import itertools
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import warnings
+
+PROG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, PROG_DIR)
+sys.path.insert(1, os.path.join(PROG_DIR, 'lib'))
+
+warnings.filterwarnings('ignore', message='Using slow pure-python SequenceMatcher')
+
+import sickgear
+from sickgear.common import Quality
+from sickgear.name_parser.parser import NameParser, InvalidNameException, InvalidShowException
+
+SHOW_NAMES = ['The.Big.Bang.Theory', 'Game.of.Thrones', 'Doctor.Who.2005', 'The.Walking.Dead', 'Mr.Robot',
+              'Better.Call.Saul', 'Brooklyn.Nine-Nine', 'Marvels.Agents.of.S.H.I.E.L.D', 'The.Daily.Show',
+              'Last.Week.Tonight.with.John.Oliver', 'QI', 'Top.Gear', 'Stranger.Things', 'The.X-Files']
+ANIME_NAMES = ['One Piece', 'Naruto Shippuuden', 'Boku no Hero Academia', 'Shingeki no Kyojin', 'Detective Conan']
+QUALITIES = ['720p.HDTV.x264', '1080p.WEB.h264', '1080p.AMZN.WEB-DL.DDP5.1.H.264', 'HDTV.x264', 'WEBRip.x264',
+             '720p.BluRay.x264', '2160p.NF.WEB-DL.DDP5.1.HDR.HEVC', 'DVDRip.XviD', '1080i.HDTV.MPEG2.DD5.1']
+GROUPS = ['LOL', 'DIMENSION', 'KILLERS', 'NTb', 'FLEET', 'SVA', 'NTG', 'AVS', 'MiNX', 'CasStudio']
+
+
+def test_names():
+    """
+    :return: release names used by the name parser tests
+    """
+    with open(os.path.join(PROG_DIR, 'tests', 'name_parser_tests.py'), encoding='utf8') as fh:
+        tree = ast.parse(fh.read())
+    names = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and 'simple_test_cases' == getattr(node.targets[0], 'id', None):
+            for cur_cases in node.value.values:
+                names += [k.value for k in cur_cases.keys]
+    return names
+
+
+def scene_names():
+    """
+    :return: generator of scene style names of every numbering style
+    """
+    for show, quality, group in itertools.product(SHOW_NAMES, QUALITIES, GROUPS):
+        season, episode = 1 + len(group) % 9, 1 + len(quality) % 24
+        yield '%s.S%02dE%02d.%s-%s' % (show, season, episode, quality, group)
+        yield '%s.S%02dE%02dE%02d.%s-%s' % (show, season, episode, episode + 1, quality, group)
+        yield '%s.%sx%02d.%s-%s' % (show, season, episode, quality, group)
+        yield '%s.S%02d.%s-%s' % (show, season, quality, group)
+        yield '%s.2019.%02d.%02d.%s-%s' % (show, season, episode, quality, group)
+        yield '%s.Part.%s.%s-%s' % (show, episode, quality, group)
+    for show, group, episode in itertools.product(ANIME_NAMES, GROUPS, range(1, 30)):
+        yield '[%s] %s - %03d [1080p].mkv' % (group, show, episode)
+        yield '[%s]_%s_-_%02d_[720p][ABCD1234].mkv' % (group, show.replace(' ', '_'), episode)
+
+
+def load_corpus(size, cache_db=None, names_file=None):
+    names = test_names()
+    if cache_db:
+        with sqlite3.connect(cache_db) as conn:
+            names += [r[0] for r in conn.execute('SELECT name FROM provider_cache')]
+    if names_file:
+        with open(names_file, encoding='utf8') as fh:
+            names += [line.strip() for line in fh if line.strip()]
+    if len(names) < size:
+        names += list(itertools.islice(itertools.cycle(scene_names()), size - len(names)))
+    return names
+
+
+def parse_all(names):
+    parsed = 0
+    for cur_name in names:
+        try:
+            NameParser(testing=True).parse(cur_name, cache_result=False)
+            parsed += 1
+        except (InvalidNameException, InvalidShowException):
+            pass
+    return parsed
+
+
+def quality_all(names):
+    for cur_name in names:
+        Quality.name_quality(cur_name)
+
+
+def run(label, func, names, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(names)
+        elapsed = time.perf_counter() - start
+        best = (elapsed, best)[None is not best and best < elapsed]
+    print('%-12s %8d names  %8.3fs  %10.0f names/sec%s' % (
+        label, len(names), best, len(names) / best, ('', '  (%s parsed)' % result)[None is not result]))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Release name parsing throughput')
+    arg_parser.add_argument('--size', type=int, default=20000, help='minimum number of names to parse')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='report the best of this many runs')
+    arg_parser.add_argument('--cache-db', help='add the names of provider_cache in this cache.db')
+    arg_parser.add_argument('--names', help='add the names in this file, one per line')
+    args = arg_parser.parse_args()
+
+    sickgear.DATA_DIR = sickgear.CACHE_DIR = tempfile.mkdtemp(prefix='sg-bench-')
+    names = load_corpus(args.size, args.cache_db, args.names)
+
+    try:
+        run('parse', parse_all, names, args.repeat)
+        run('quality', quality_all, names, args.repeat)
+    finally:
+        shutil.rmtree(sickgear.DATA_DIR, ignore_errors=True)
+
+
+if '__main__' == __name__:
+    main()
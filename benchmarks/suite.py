@@ -0,0 +1,339 @@
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Times of the core paths against a synthetic library, written as JSON to compare releases.
+
+A library is made with benchmarks/library.py in a temporary folder that is removed at the end. The shows are loaded
+with load_shows_from_db of sickgear.py and the show list page is rendered with Home.view_shows. Release names of the
+provider cache are parsed with NameParser, the episodes wanted by recent search and by backlog search are listed
+with wanted_episodes, and cached releases for the recent search episodes are found with
+TVCache.find_needed_episodes. The iCal feed is built and served from its cache, the compact history is built with
+History.query_history, and the history lookups of post-processing are made for downloaded release names.
+
+Each benchmark reports the best, first and median of --repeat runs. The results, the library size and the version are
+written to --output, and --compare prints the change from the results of an earlier run.
+
+usage: python benchmarks/suite.py [--shows 2000] [--output results.json] [--compare old.json] [--only name_parser]
+"""
+
+import argparse
+import datetime
+import importlib.util
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+import warnings
+
+PROG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, PROG_DIR)
+sys.path.insert(1, os.path.join(PROG_DIR, 'lib'))
+
+warnings.filterwarnings('ignore', message='Using slow pure-python SequenceMatcher')
+
+import library
+
+import sickgear
+from sickgear import db, name_cache
+from sickgear.name_parser.parser import NameParser, InvalidNameException, InvalidShowException
+
+
+class Suite(object):
+
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.results = []
+
+    def timed(self, name, func, items=None, repeat=None):
+        """
+        :param name: benchmark name
+        :param func: function to time, the return value is reported
+        :param items: number of items handled by one run, to report the time per item
+        :param repeat: number of runs, or None for the suite default
+        """
+        runs, result = [], None  # the first run also fills the caches of the app, so it is reported on its own
+        for _ in range(repeat or self.repeat):
+            start = time.perf_counter()
+            result = func()
+            runs.append(time.perf_counter() - start)
+        entry = dict(name=name, best_ms=round(min(runs) * 1000, 3), first_ms=round(runs[0] * 1000, 3),
+                     median_ms=round(statistics.median(runs) * 1000, 3), runs=len(runs), items=items,
+                     result=result if isinstance(result, (int, float, str, type(None))) else str(result))
+        if items:
+            entry['per_item_us'] = round(min(runs) * 1000000 / items, 3)
+        self.results.append(entry)
+        print('%-40s %10.1f ms  (first %.1f ms, median %.1f ms)%s  %s' % (
+            name, entry['best_ms'], entry['first_ms'], entry['median_ms'],
+            ('', '  %.1f us/item' % entry.get('per_item_us', 0))[bool(items)], entry['result']))
+        return result
+
+
+def load_app_module():
+    """
+    :return: sickgear.py, loaded without the cleanup of old files that it does when the app starts
+    """
+    sys.modules.setdefault('_cleaner', types.ModuleType('_cleaner'))
+    spec = importlib.util.spec_from_file_location('sickgear_app', os.path.join(PROG_DIR, 'sickgear.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def version_info():
+    with io.open(os.path.join(PROG_DIR, 'CHANGES.md'), encoding='utf-8-sig') as fh:
+        version = fh.readline().strip('# \n').split(' ')[0]
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROG_DIR,
+                                         stderr=subprocess.DEVNULL).decode().strip()
+    except (BaseException, Exception):
+        commit = None
+    return version, commit
+
+
+def setup_app(data_dir):
+    """
+    load the config defaults as the app does at start, without starting any of its threads
+    """
+    from lib.configobj import ConfigObj
+    sickgear.PROG_DIR = PROG_DIR
+    sickgear.CONFIG_FILE = os.path.join(data_dir, 'config.ini')
+    sickgear.CFG = ConfigObj(sickgear.CONFIG_FILE)
+    sickgear.initialize(console_logging=False)
+    sickgear.DATA_DIR = sickgear.CACHE_DIR = data_dir
+    sickgear.initialize(console_logging=False)
+
+
+def bench_load_shows(suite, app):
+    def load():
+        app.SickGear.load_shows_from_db()
+        return len(sickgear.showList)
+
+    suite.timed('load_shows_from_db', load, repeat=max(1, suite.repeat // 2))
+    name_cache.build_name_cache()
+
+
+def bench_view_shows(suite):
+    from tornado.httputil import HTTPHeaders, HTTPServerRequest
+    from tornado.web import Application
+    from sickgear.webserve import Home
+
+    class Connection(object):
+        def set_close_callback(self, callback):
+            pass
+
+    app = Application(cookie_secret='benchmark')
+    app.is_loading_handler = False
+
+    def render():
+        request = HTTPServerRequest(method='GET', uri='/view-shows/', headers=HTTPHeaders({'Host': 'localhost'}),
+                                    connection=Connection())
+        return len(Home(app, request).view_shows())
+
+    for layout in ('poster', 'simple'):
+        sickgear.HOME_LAYOUT = layout
+        suite.timed('Home.view_shows %s layout' % layout, render, items=len(sickgear.showList))
+
+
+def bench_name_parser(suite, lib, count):
+    names = lib.release_names[:count]
+
+    def parse_all():
+        parsed = 0
+        for cur_name in names:
+            try:
+                NameParser().parse(cur_name, cache_result=False)
+                parsed += 1
+            except (InvalidNameException, InvalidShowException):
+                pass
+        return parsed
+
+    suite.timed('NameParser.parse', parse_all, items=len(names))
+
+
+def bench_wanted(suite, backlog_shows):
+    from sickgear.search import wanted_episodes
+    recent_from = datetime.date.today() - datetime.timedelta(days=14)
+    wanted = []
+
+    def recent():
+        del wanted[:]
+        for cur_show_obj in sickgear.showList:
+            wanted.extend(wanted_episodes(cur_show_obj, recent_from))
+        return len(wanted)
+
+    def backlog():
+        return sum([len(wanted_episodes(cur_show_obj, datetime.date.fromordinal(1)))
+                    for cur_show_obj in sickgear.showList[:backlog_shows]])
+
+    suite.timed('wanted_episodes recent', recent, items=len(sickgear.showList))
+    suite.timed('wanted_episodes backlog', backlog, items=backlog_shows)
+    return list(wanted)
+
+
+def bench_find_needed(suite, wanted):
+    from sickgear.providers.generic import TorrentProvider
+    from sickgear.tvcache import TVCache
+
+    bench_providers = [TorrentProvider('BenchProvider%s' % n) for n in range(1, 1 + len(library.PROVIDER_IDS))]
+
+    def find_needed():
+        cached = TVCache.find_cached_releases(wanted, [p.get_id() for p in bench_providers])
+        return sum([len(TVCache(p).find_needed_episodes(wanted, cached_results=cached)) for p in bench_providers])
+
+    suite.timed('TVCache.find_needed_episodes', find_needed, items=len(wanted))
+
+
+def bench_calendar(suite):
+    from sickgear import ical
+
+    def build():
+        ical._cache.clear()
+        return ical.CalendarFeed().body().count('BEGIN:VEVENT')
+
+    suite.timed('iCal feed build', build)
+    suite.timed('iCal feed cached', lambda: ical.CalendarFeed().body().count('BEGIN:VEVENT'))
+
+
+def bench_history(suite):
+    from sickgear.webserve import History
+    my_db = db.DBConnection(row_type='dict')
+    suite.timed('History.query_history page', lambda: len(History.query_history(my_db, 100, 1)[1]))
+    suite.timed('History.query_history all', lambda: len(History.query_history(my_db, '0')[1]),
+                repeat=max(1, suite.repeat // 2))
+
+
+def bench_post_processing(suite, lib, count):
+    from sickgear.postProcessor import PostProcessor
+    from sickgear.processTV import ProcessTVShow
+    downloaded = lib.downloaded[-count:]
+
+    def history_lookup():
+        found = 0
+        for cur_show, season, episode, quality, release, location, _ in downloaded:
+            pp = PostProcessor(os.path.join(tempfile.gettempdir(), release, release + '.mkv'), nzb_name=release)
+            found += bool(pp._history_lookup()[0])
+        return found
+
+    def already_processed():
+        found = 0
+        process_tv = ProcessTVShow()
+        process_tv.files_passed = 1
+        for cur_show, season, episode, quality, release, location, _ in downloaded:
+            found += process_tv._already_postprocessed(release + '.proper', os.path.basename(location), False)
+        return found
+
+    suite.timed('PostProcessor._history_lookup', history_lookup, items=len(downloaded))
+    suite.timed('ProcessTVShow._already_postprocessed', already_processed, items=len(downloaded))
+
+
+def compare(results, library_size, old_file):
+    with io.open(old_file, encoding='utf-8') as fh:
+        old = json.load(fh)
+    old_results = dict([(r['name'], r) for r in old.get('results', [])])
+    print('\nchange from %s %s' % (old.get('version'), old.get('commit') or ''))
+    if library_size != old.get('library'):
+        print('warning: the library size differs from %s, so the times are not comparable' % old.get('library'))
+    for cur_result in results:
+        before = old_results.get(cur_result['name'])
+        if before and before['best_ms']:
+            print('%-40s %10.1f ms -> %10.1f ms  %+7.1f%%' % (
+                cur_result['name'], before['best_ms'], cur_result['best_ms'],
+                (cur_result['best_ms'] - before['best_ms']) * 100 / before['best_ms']))
+
+
+BENCHMARKS = ['load_shows', 'view_shows', 'name_parser', 'wanted', 'find_needed', 'calendar', 'history',
+              'post_processing']
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Times of the core paths against a synthetic library')
+    arg_parser.add_argument('--shows', type=int, default=2000, help='number of shows')
+    arg_parser.add_argument('--cache-rows', type=int, default=100000, help='number of provider_cache rows')
+    arg_parser.add_argument('--history-rows', type=int, default=200000, help='number of history rows')
+    arg_parser.add_argument('--media-shows', type=int, default=100, help='number of show folders with media files')
+    arg_parser.add_argument('--parse-names', type=int, default=5000, help='number of release names to parse')
+    arg_parser.add_argument('--backlog-shows', type=int, default=200, help='number of shows for backlog search')
+    arg_parser.add_argument('--lookups', type=int, default=200, help='number of post-processing lookups')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='number of runs of each benchmark')
+    arg_parser.add_argument('--seed', type=int, default=1, help='random seed of the library')
+    arg_parser.add_argument('--only', action='append', choices=BENCHMARKS, help='run only this benchmark')
+    arg_parser.add_argument('--output', help='JSON results file, default is bench-<version>-<date>.json')
+    arg_parser.add_argument('--compare', help='print the change from the results in this JSON file')
+    args = arg_parser.parse_args()
+
+    version, commit = version_info()
+    work_dir = tempfile.mkdtemp(prefix='sg-bench-')
+    try:
+        start = time.perf_counter()
+        data_dir = os.path.join(work_dir, 'data')
+        os.makedirs(data_dir)
+        lib = library.generate(data_dir, args.shows, args.cache_rows, args.history_rows,
+                               os.path.join(work_dir, 'tv'), args.media_shows, args.seed)
+        print('library of %s shows, %s episodes, %s history rows, %s cache rows and %s media files in %.1fs' % (
+            len(lib.shows), lib.episodes, lib.history_rows, lib.cache_rows, len(lib.media_files),
+            time.perf_counter() - start))
+
+        setup_app(data_dir)
+        app = load_app_module()
+        suite = Suite(args.repeat)
+        only = set(args.only or BENCHMARKS)
+
+        # the shows are needed by every other benchmark
+        bench_load_shows(suite, app)
+        wanted = []
+        if 'view_shows' in only:
+            bench_view_shows(suite)
+        if 'name_parser' in only:
+            bench_name_parser(suite, lib, args.parse_names)
+        if only & {'wanted', 'find_needed'}:
+            wanted = bench_wanted(suite, args.backlog_shows)
+        if 'find_needed' in only:
+            bench_find_needed(suite, wanted)
+        if 'calendar' in only:
+            bench_calendar(suite)
+        if 'history' in only:
+            bench_history(suite)
+        if 'post_processing' in only:
+            bench_post_processing(suite, lib, args.lookups)
+
+        output = args.output or 'bench-%s-%s.json' % (version, datetime.datetime.now().strftime('%Y%m%d-%H%M%S'))
+        library_size = dict(shows=len(lib.shows), episodes=lib.episodes, history_rows=lib.history_rows,
+                            cache_rows=lib.cache_rows, media_files=len(lib.media_files))
+        with io.open(output, 'w', encoding='utf-8') as fh:
+            json.dump(dict(
+                version=version, commit=commit, date=datetime.datetime.now().isoformat(timespec='seconds'),
+                python=platform.python_version(), platform=platform.platform(), library=library_size,
+                options=vars(args), results=suite.results), fh, indent=2)
+        print('results written to %s' % output)
+        if args.compare:
+            compare(suite.results, library_size, args.compare)
+    finally:
+        if sickgear.config_events:
+            sickgear.config_events.stopit()
+        db.close_all()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if '__main__' == __name__:
+    main()
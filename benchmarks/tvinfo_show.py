@@ -0,0 +1,120 @@
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Time and memory to hand a cached TVInfoShow to a caller.
+
+A synthetic show with --episodes episodes, each with guest cast, crew and writers, is copied with copy.deepcopy as
+show lookups did before, and with TVInfoShow.cow_copy. Each copy is measured alone and with a caller that reads every
+episode, which is what a show update does.
+
+usage: python benchmarks/tvinfo_show.py [--episodes 5000]
+"""
+
+import argparse
+import copy
+import os
+import sys
+import time
+import tracemalloc
+
+PROG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, PROG_DIR)
+sys.path.insert(1, os.path.join(PROG_DIR, 'lib'))
+
+from tvinfo_base import CastList, CrewList, RoleTypes, TVInfoCharacter, TVInfoEpisode, TVInfoPerson, TVInfoSeason, \
+    TVInfoShow
+
+
+def make_show(episodes, per_season=100):
+    # type: (int, int) -> TVInfoShow
+    show = TVInfoShow()
+    show.id, show.seriesname = 1, 'Synthetic Show'
+    show.aliases = ['Synthetic %s' % n for n in range(5)]
+    for n in range(episodes):
+        season_num, ep_num = 1 + n // per_season, 1 + n % per_season
+        if season_num not in show:
+            show[season_num] = TVInfoSeason(show=show, number=season_num)
+        ep = TVInfoEpisode(season=show[season_num], show=show)
+        ep.id, ep.seasonnumber, ep.episodenumber = n + 1, season_num, ep_num
+        ep.episodename, ep.overview = 'Episode %s' % ep_num, 'Overview of episode %s. ' % n * 5
+        ep.firstaired = '2000-01-%02d' % (1 + n % 28)
+        ep.writers = ['Writer %s' % w for w in range(3)]
+        ep.directors = ['Director %s' % (n % 7)]
+        ep.gueststars_list = ['Guest %s' % g for g in range(4)]
+        ep.cast = CastList()
+        ep.cast[RoleTypes.ActorGuest] = [
+            TVInfoCharacter(name='Character %s' % g, person=[TVInfoPerson(p_id=g, name='Guest %s' % g)])
+            for g in range(4)]
+        ep.crew = CrewList()
+        for k in ('id', 'seasonnumber', 'episodenumber', 'episodename', 'overview', 'firstaired'):
+            ep[k] = getattr(ep, k)
+        show[season_num][ep_num] = ep
+    return show
+
+
+def read_all(show):
+    # type: (TVInfoShow) -> int
+    count = 0
+    for cur_season in show.values():
+        for cur_ep in cur_season.values():
+            count += len(cur_ep.episodename)
+    return count
+
+
+def measure(label, func, show, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(show)
+        elapsed = time.perf_counter() - start
+        best = (elapsed, best)[None is not best and best < elapsed]
+
+    tracemalloc.start()
+    result = func(show)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    print('%-22s %10.2f ms  %10.2f MB' % (label, best * 1000, size / 1024.0 / 1024))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Cached TVInfoShow handoff cost')
+    arg_parser.add_argument('--episodes', type=int, default=5000, help='number of episodes of the synthetic show')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='report the best of this many runs')
+    args = arg_parser.parse_args()
+
+    show = make_show(args.episodes)
+    print('%s episodes in %s seasons' % (args.episodes, len(show)))
+    measure('deepcopy', copy.deepcopy, show, args.repeat)
+    measure('cow_copy', lambda s: s.cow_copy(), show, args.repeat)
+
+    def deepcopy_read(s):
+        s_copy = copy.deepcopy(s)
+        read_all(s_copy)
+        return s_copy
+
+    def cow_copy_read(s):
+        s_copy = s.cow_copy()
+        read_all(s_copy)
+        return s_copy
+
+    measure('deepcopy + read all', deepcopy_read, show, args.repeat)
+    measure('cow_copy + read all', cow_copy_read, show, args.repeat)
+
+
+if '__main__' == __name__:
+    main()
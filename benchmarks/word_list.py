@@ -0,0 +1,111 @@
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Ignore and require word filtering throughput in names/sec.
+
+Release names are checked with show_name_helpers.pass_wordlist_checks against the default ignore words, a require
+word list and per show ignore and require words. The same names are also checked by compiling each word list on
+every call, which is how filtering worked before compiled word lists were cached.
+
+usage: python benchmarks/word_list.py [--size 100000]
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import time
+import warnings
+
+PROG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, PROG_DIR)
+sys.path.insert(1, os.path.join(PROG_DIR, 'lib'))
+
+warnings.filterwarnings('ignore', message='Using slow pure-python SequenceMatcher')
+
+import sickgear
+from sickgear import show_name_helpers
+
+from name_parser import scene_names
+
+REQUIRE_WORDS = {r'(720|1080|2160)p'}
+SHOW_IGNORE_WORDS = {'hardcoded', 'sample', 'proof', 'nuked', 'cam', 'ts'}
+SHOW_REQUIRE_WORDS = {r'(amzn|nf|web(rip)?)'}
+
+
+class FakeShow(object):
+    def __init__(self):
+        self.rls_ignore_words = SHOW_IGNORE_WORDS
+        self.rls_ignore_words_regex = False
+        self.rls_require_words = SHOW_REQUIRE_WORDS
+        self.rls_require_words_regex = True
+        self.rls_global_exclude_ignore = set()
+        self.rls_global_exclude_require = set()
+
+
+def uncached_contains_any(subject, lookup_words, invert=False, rx=None, **kwargs):
+    # contains_any as it was before compiled word lists were cached
+    compiled_words = show_name_helpers.compile_word_list(lookup_words, rx=rx, **kwargs)
+    if subject and compiled_words:
+        for rc_filter in compiled_words:
+            match = rc_filter.search(subject)
+            if (match and not invert) or (not match and invert):
+                return True
+        return False
+    return None
+
+
+def filter_all(names, show_obj):
+    passed = 0
+    for cur_name in names:
+        if show_name_helpers.pass_wordlist_checks(cur_name, parse=False, show_obj=show_obj):
+            passed += 1
+    return passed
+
+
+def run(label, names, show_obj, repeat):
+    best = result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = filter_all(names, show_obj)
+        elapsed = time.perf_counter() - start
+        best = (elapsed, best)[None is not best and best < elapsed]
+    print('%-10s %8d names  %8.3fs  %10.0f names/sec  (%s passed)' % (
+        label, len(names), best, len(names) / best, result))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Ignore and require word filtering throughput')
+    arg_parser.add_argument('--size', type=int, default=100000, help='number of names to filter')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='report the best of this many runs')
+    args = arg_parser.parse_args()
+
+    sickgear.REQUIRE_WORDS, sickgear.REQUIRE_WORDS_REGEX = REQUIRE_WORDS, True
+    names = list(itertools.islice(itertools.cycle(scene_names()), args.size))
+    show_obj = FakeShow()
+
+    contains_any = show_name_helpers.contains_any
+    show_name_helpers.contains_any = uncached_contains_any
+    try:
+        run('uncached', names, show_obj, args.repeat)
+    finally:
+        show_name_helpers.contains_any = contains_any
+    run('cached', names, show_obj, args.repeat)
+
+
+if '__main__' == __name__:
+    main()
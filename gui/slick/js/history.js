@@ -133,6 +133,10 @@ $(document).ready(function() {
 		window.location.href = $.SickGear.Root + '/history/?limit=' + $(this).val()
 	});
 
+	$('#page').change(function(){
+		window.location.href = $.SickGear.Root + '/history/?limit=' + $('#limit').val() + '&page=' + $(this).val()
+	});
+
 	$('#show-watched-help').click(function () {
 		$('#watched-help').fadeToggle('fast', 'linear');
 		$.get($.SickGear.Root + '/history/toggle-help');
@@ -0,0 +1,75 @@
+$(document).ready(function() {
+
+	$('#pickShow').change(function(){
+		var id = $(this).val();
+		if (id) {
+			$('html,body').animate({scrollTop: $('tr[id="show-' + id + '"').offset().top -25},'slow');
+		}
+	});
+
+	function make_row(tvid_prodid, ep) {
+		return '<tr class="seasonstyle ep-' + tvid_prodid + ' ' + ep.overview + '">'
+			+ '<td>' + ep.sxe + '</td>'
+			+ '<td class="text-left">' + $('<div>').text(ep.name).html() + '</td>'
+			+ '<td class="text-nowrap"><div class="airdate">' + ep.airdate + '</div></td>'
+			+ '</tr>';
+	}
+
+	function show_episodes(btnElement) {
+		var match = btnElement.attr('id').match(/(.*)[-](.*)/);
+		if (null == match)
+			return false;
+
+		var tvid_prodid = match[1], expand = 'more' === match[2],
+			colsRow$ = $('tr[id="cols-' + tvid_prodid + '"]'),
+			episodeRows$ = $('tr.ep-' + tvid_prodid.replace(':', '\\:'));
+
+		function toggle() {
+			colsRow$.toggle(expand);
+			$('tr.ep-' + tvid_prodid.replace(':', '\\:')).toggle(expand);
+			btnElement.val(expand ? 'Expand' : 'Collapse').hide();
+			$('input[id="' + tvid_prodid + '-' + (expand ? 'less' : 'more') + '"]').show();
+		}
+
+		if (expand && 0 === episodeRows$.length) {
+			btnElement.val('Expanding...');
+			$.getJSON(sbRoot + '/manage/get-backlog-episodes', {tvid_prodid: tvid_prodid}, function (data) {
+				var rows = '';
+				$.each(data, function(i, ep) {
+					rows += make_row(tvid_prodid, ep);
+				});
+				colsRow$.after(rows);
+				if ('undefined' !== typeof(fuzzyConfig)) {
+					fuzzyMoment($.extend({}, fuzzyConfig,
+						{containerClass: 'tr.ep-' + tvid_prodid.replace(':', '\\:') + ' .airdate'}));
+				}
+				toggle();
+			});
+		} else {
+			toggle();
+		}
+	}
+
+	$('.get_more_eps,.get_less_eps').on('click', function(){
+		show_episodes($(this));
+		var btnExpandAll$ = $('.expand-all');
+		(0 === $('.get_more_eps:visible').length ? btnExpandAll$.hide() : btnExpandAll$.show());
+	});
+
+	$('.expand-all').on('click', function(){
+		$(this).hide();
+		$('.collapse-all').show();
+		$('.get_more_eps:visible').each(function() {
+			show_episodes($(this));
+		});
+	});
+
+	$('.collapse-all').on('click', function(){
+		$(this).hide();
+		$('.expand-all').show();
+		$('.get_less_eps:visible').each(function() {
+			show_episodes($(this));
+		});
+	});
+
+});
@@ -27,7 +27,8 @@ from html.parser import HTMLParser
 
 from exceptions_helper import ex, ConnectionSkipException
 from json_helper import json_loads
-from cachecontrol import CacheControl, caches
+from cachecontrol import caches
+from cachecontrol.adapter import CacheControlAdapter
 from lib.dateutil.parser import parser
 # from lib.tmdbsimple.configuration import Configuration
 # from lib.tmdbsimple.genres import Genres
@@ -37,6 +38,7 @@ from send2trash import send2trash
 # noinspection PyPep8Naming
 from encodingKludge import SYS_ENCODING
 import requests
+from requests.adapters import HTTPAdapter
 
 from _23 import decode_bytes, html_unescape, list_range, \
     Popen, scandir, urlparse, urlsplit, urlunparse
@@ -73,7 +75,7 @@ if False:
     # sickgear is strictly used here for resolution, this is only possible because
     # this section is not used at runtime which would create circular reference issues
     # noinspection PyPep8Naming
-    from sickgear import db, notifiers as NOTIFIERS
+    from sickgear import db, metrics as METRICS, notifiers as NOTIFIERS
     # noinspection PyUnresolvedReferences
     from typing import Any, AnyStr, Dict, Generator, NoReturn, integer_types, Iterable, Iterator, List, Optional, \
         Tuple, Type, Union
@@ -138,6 +140,8 @@ FLARESOLVERR_HOST = None
 db = None
 # noinspection PyRedeclaration
 NOTIFIERS = None
+# noinspection PyRedeclaration
+METRICS = None
 
 
 class ConnectionFailTypes(object):
@@ -770,6 +774,128 @@ def proxy_setting(setting, request_url, force=False):
     return (False, proxy_address)[request_url_match], True
 
 
+class SessionRegistry(object):
+    """
+    Process wide registry of keep-alive connection pools keyed by domain, proxy, cache use and retry settings.
+
+    Each get_url session mounts the pooled transport adapter for the requested domain, so sockets and TLS sessions
+    are reused between calls instead of a new handshake per request. Adapters are thread safe and are shared between
+    concurrent sessions, while per request state (headers, cookies, params) remains with each session.
+    """
+    def __init__(self, pool_connections=10, pool_maxsize=10):
+        # type: (int, int) -> None
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.lock = threading.Lock()
+        self.adapters = {}  # type: Dict[Tuple, HTTPAdapter]
+        self.file_cache = None
+        self.requests = 0
+        self.bytes_fetched = 0
+
+    def _cache(self):
+        if None is self.file_cache:
+            self.file_cache = caches.FileCache(os.path.join(CACHE_DIR or get_system_temp_dir(), 'sessions'))
+        return self.file_cache
+
+    def get_adapter(self, url, proxy=None, cached=True, max_retries=None):
+        # type: (AnyStr, Optional[AnyStr], bool, Optional) -> HTTPAdapter
+        """
+        :param url: url to get a pooled adapter for
+        :param proxy: proxy address used for the url
+        :param cached: True for an adapter that uses the http cache
+        :param max_retries: retry settings of the adapter
+        """
+        parsed = urlsplit(url)
+        key = (parsed.scheme.lower(), (parsed.hostname or '').lower(), parsed.port, proxy, cached,
+               repr(max_retries) if max_retries else None)
+        with self.lock:
+            adapter = self.adapters.get(key)
+            if None is adapter:
+                params = dict(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+                if max_retries:
+                    params['max_retries'] = max_retries
+                if cached:
+                    adapter = CacheControlAdapter(self._cache(), **params)
+                else:
+                    adapter = HTTPAdapter(**params)
+                adapter.sg_pooled = True
+                self.adapters[key] = adapter
+        return adapter
+
+    def mount(self, session, url, cached=True):
+        # type: (requests.Session, AnyStr, bool) -> None
+        """
+        mount the pooled adapter for url to a session, retry settings of a plain adapter set by the caller are kept,
+        and an adapter of another class set by the caller (e.g. with a default timeout) is left mounted
+        """
+        scheme = urlsplit(url).scheme.lower()
+        max_retries = None
+        try:
+            current = session.get_adapter(url)
+        except (BaseException, Exception):
+            current = None
+        if self._is_plain(current) and current.max_retries.total:
+            max_retries = current.max_retries
+        adapter = self.get_adapter(url, proxy=(session.proxies or {}).get(scheme), cached=cached,
+                                   max_retries=max_retries)
+        for prefix in ('http://', 'https://'):
+            current = session.adapters.get(prefix)
+            if None is current or getattr(current, 'sg_pooled', False) or self._is_plain(current):
+                session.mount(prefix, adapter)
+
+    @staticmethod
+    def _is_plain(adapter):
+        # type: (Any) -> bool
+        """
+        :return: True if adapter is a requests HTTPAdapter mounted by a session or caller, and not a subclass
+        """
+        # requests is imported both as requests and lib.requests, so either HTTPAdapter class is a plain adapter
+        return not getattr(adapter, 'sg_pooled', False) and 'HTTPAdapter' == type(adapter).__name__ \
+            and type(adapter).__module__ in ('requests.adapters', 'lib.requests.adapters')
+
+    def add_fetched(self, size):
+        # type: (int) -> None
+        with self.lock:
+            self.requests += 1
+            self.bytes_fetched += size
+
+    def stats(self):
+        # type: (...) -> Dict[AnyStr, int]
+        """
+        :return: counts of new and reused connections, TLS handshakes saved by reuse, and bytes fetched
+        """
+        new = reused = tls_saved = 0
+        with self.lock:
+            adapters = list(self.adapters.values())
+            result = dict(adapters=len(adapters), requests=self.requests, bytes_fetched=self.bytes_fetched)
+        for adapter in adapters:
+            managers = [adapter.poolmanager] + list(getattr(adapter, 'proxy_manager', {}).values())
+            for manager in managers:
+                for pool_key in manager.pools.keys():
+                    pool = manager.pools.get(pool_key)
+                    if None is pool:
+                        continue
+                    new += pool.num_connections
+                    cur_reused = max(0, pool.num_requests - pool.num_connections)
+                    reused += cur_reused
+                    if 'https' == pool.scheme:
+                        tls_saved += cur_reused
+        result.update(dict(connections_new=new, connections_reused=reused, tls_handshakes_saved=tls_saved))
+        return result
+
+    def clear(self):
+        with self.lock:
+            for adapter in self.adapters.values():
+                try:
+                    adapter.close()
+                except (BaseException, Exception):
+                    pass
+            self.adapters = {}
+
+
+SESSIONS = SessionRegistry()
+
+
 def get_url(url,  # type: AnyStr
             post_data=None,  # type: Optional
             params=None,  # type: Optional
@@ -864,9 +990,7 @@ def get_url(url,  # type: AnyStr
         # session streaming
         session.stream = True
 
-    if not kwargs.pop('nocache', False):
-        cache_dir = CACHE_DIR or get_system_temp_dir()
-        session = CacheControl(sess=session, cache=caches.FileCache(os.path.join(cache_dir, 'sessions')))
+    use_cache = not kwargs.pop('nocache', False)
 
     provider = kwargs.pop('provider', None)
 
@@ -894,6 +1018,7 @@ def get_url(url,  # type: AnyStr
     session.trust_env = False
 
     result = response = raised = connection_fail_params = log_failure_url = None
+    started = time.time()
     try:
         # sanitise url
         parsed = list(urlparse(url))
@@ -911,6 +1036,9 @@ def get_url(url,  # type: AnyStr
                 logger.debug('Using %s' % msg)
                 session.proxies = {'http': proxy_address, 'https': proxy_address}
 
+        # reuse pooled keep-alive connections for the domain
+        SESSIONS.mount(session, url, cached=use_cache)
+
         if None is not use_method:
 
             method = getattr(session, use_method.strip().lower())
@@ -1007,6 +1135,7 @@ def get_url(url,  # type: AnyStr
             connection_fail_params = dict(fail_type=ConnectionFailTypes.other)
             log_failure_url = True
     finally:
+        _observe_request(url, time.time() - started, response, raised)
         if None is not connection_fail_params:
             DOMAIN_FAILURES.inc_failure_count(url, ConnectionFail(**connection_fail_params))
             save_failure(url, domain, log_failure_url, post_data, post_json)
@@ -1021,6 +1150,12 @@ def get_url(url,  # type: AnyStr
             raise raised
         return
 
+    try:
+        SESSIONS.add_fetched(try_int(response.headers.get('Content-Length')) if savename or return_response
+                             else len(response.content or b''))
+    except (BaseException, Exception):
+        pass
+
     if return_response:
         result = response
     elif None is result and None is not response and response.ok:
@@ -1074,6 +1209,31 @@ def get_url(url,  # type: AnyStr
     return result
 
 
+def _observe_request(url, elapsed, response, raised):
+    # type: (AnyStr, float, Optional[requests.Response], Optional[BaseException]) -> None
+    """
+    add the time and result of a request to the app metrics, when get_url is used by the app
+    """
+    if None is METRICS:
+        return
+    if isinstance(raised, (requests.exceptions.Timeout, socket.timeout)):
+        result = ('timeout', 'connection_timeout')[isinstance(raised, requests.exceptions.ConnectTimeout)]
+    elif isinstance(raised, requests.exceptions.ConnectionError):
+        result = 'connection'
+    elif isinstance(raised, requests.exceptions.HTTPError) or (None is raised and None is not response
+                                                              and not response.ok):
+        result = 'http'
+    elif None is not raised or None is response:
+        result = 'other'
+    else:
+        result = 'ok'
+    domain = (urlparse(url).hostname or '').lower()
+    METRICS.counter('http_requests_total', 'Web requests by domain and result',
+                    ('domain', 'result')).inc(domain=domain, result=result)
+    METRICS.histogram('http_request_seconds', 'Time of web requests by domain', ('domain',),
+                      buckets=(.05, .1, .25, .5, 1, 2.5, 5, 10, 20, 30, 60)).observe(elapsed, domain=domain)
+
+
 def save_failure(url, domain, log_failure_url, post_data, post_json):
     DOMAIN_FAILURES.domain_list[domain].save_list()
     if log_failure_url:
@@ -22,6 +22,7 @@ from .utils import get_keywords
 from .videos import Episode, Movie, scan
 from .language import Language
 from collections import defaultdict
+from contextlib import contextmanager
 from itertools import groupby
 import bs4
 import guessit
@@ -37,6 +38,16 @@ SERVICES = ['opensubtitles', 'thesubdb', 'addic7ed', 'tvsubtitles']
 LANGUAGE_INDEX, SERVICE_INDEX, SERVICE_CONFIDENCE, MATCHING_CONFIDENCE = range(4)
 
 
+@contextmanager
+def no_service_guard(service_name):
+    yield
+
+
+#: callable that takes a service name and returns a context manager that is held while the service lists or
+#: downloads, an application can set it to limit the use of each service
+service_guard = no_service_guard
+
+
 def create_list_tasks(paths, languages, services, force, multi, cache_dir, max_depth, scan_filter):
     """Create a list of :class:`~subliminal.tasks.ListTask` from one or more paths using the given criteria
 
@@ -129,12 +140,14 @@ def consume_task(task, services=None, os_auth=None):
     result = None
     if isinstance(task, ListTask):
         service = get_service(services, task.service, config=task.config, os_auth=os_auth)
-        result = service.list(task.video, task.languages)
+        with service_guard(task.service):
+            result = service.list(task.video, task.languages)
     elif isinstance(task, DownloadTask):
         for subtitle in task.subtitles:
             service = get_service(services, subtitle.service)
             try:
-                service.download(subtitle)
+                with service_guard(subtitle.service):
+                    service.download(subtitle)
                 result = [subtitle]
                 break
             except DownloadFailedError:
@@ -100,6 +100,23 @@ log.addHandler(logging.NullHandler())
 TVInfoShowContainer = {}  # type: Union[ShowContainer, Dict]
 
 
+def _cow_value(value):
+    """
+    :param value: attribute value of a cached show, season or episode
+    :return: value, with lists and dicts copied one level deep so that a caller can change them without changing the
+             cache, other objects are shared and are read only
+    """
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, dict) and not isinstance(value, (TVInfoShow, TVInfoSeason, TVInfoEpisode)):
+        result = copy.copy(value)
+        for k, v in iteritems(result):
+            if isinstance(v, list):
+                dict.__setitem__(result, k, list(v))
+        return result
+    return value
+
+
 class ShowContainer(dict):
     """Simple dict that holds a series of Show instances
     """
@@ -378,6 +395,8 @@ class TVInfoNetwork(object):
 class TVInfoShow(dict):
     """Holds a dict of seasons, and show data.
     """
+    # seasons of a cow_copy() that are still shared with the cached show
+    cow_keys = frozenset()
 
     def __init__(self, show_loaded=True):
         dict.__init__(self)
@@ -493,7 +512,7 @@ class TVInfoShow(dict):
 
         if key in self:
             # Key is an episode, return it
-            return dict.__getitem__(self, key)
+            return self._cow_get(key)
 
         if key in self.data:
             # Non-numeric request is for show-data
@@ -515,6 +534,70 @@ class TVInfoShow(dict):
             if 0 != len(args):
                 return args[0]
 
+    def _cow_get(self, key):
+        # type: (integer_types) -> Union[TVInfoSeason, Dict[integer_types, TVInfoEpisode]]
+        value = dict.__getitem__(self, key)
+        if key in self.cow_keys:
+            if isinstance(value, TVInfoSeason):
+                value = value.cow_copy(show=self)
+            else:
+                # alternative numbering seasons are a dict of episodes
+                value = dict([(k, v.cow_copy(season=v.season, show=self) if isinstance(v, TVInfoEpisode) else v)
+                              for k, v in iteritems(value)])
+            dict.__setitem__(self, key, value)
+            self.cow_keys.discard(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key in self.cow_keys:
+            self.cow_keys.discard(key)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        if key in self.cow_keys:
+            self.cow_keys.discard(key)
+        dict.__delitem__(self, key)
+
+    def values(self):
+        for k in list(self.cow_keys):
+            self._cow_get(k)
+        return dict.values(self)
+
+    def items(self):
+        for k in list(self.cow_keys):
+            self._cow_get(k)
+        return dict.items(self)
+
+    def share_season(self, key, season):
+        # type: (integer_types, Union[TVInfoSeason, Dict]) -> None
+        """
+        add a season of a cached show to a cow_copy(), it is copied when first accessed
+
+        :param key: season number
+        :param season: season or dict of episodes
+        """
+        dict.__setitem__(self, key, season)
+        self.cow_keys.add(key)
+
+    def cow_copy(self):
+        # type: (...) -> TVInfoShow
+        """
+        copy-on-write copy of a cached show
+
+        the copy shares seasons and episodes with the cached show until they are accessed, then each is replaced with
+        a shallow copy of its own. Changes to the copy, its seasons and episodes do not change the cached show, while
+        a caller only pays for the parts it reads instead of a deep copy of every season, episode, person and image.
+        """
+        cls = self.__class__
+        result = cls.__new__(cls)
+        for k, v in iteritems(self.__dict__):
+            result.__dict__[k] = _cow_value(v)
+        result.lock = threading.RLock()
+        result.load_method = None
+        dict.update(result, self)
+        result.cow_keys = set(self)
+        return result
+
     def __deepcopy__(self, memo):
         cls = self.__class__
         result = cls.__new__(cls)
@@ -524,6 +607,8 @@ class TVInfoShow(dict):
                 setattr(result, k, threading.RLock())
             elif 'load_method' == k:
                 setattr(result, k, None)
+            elif 'cow_keys' == k:
+                setattr(result, k, set())
             else:
                 setattr(result, k, copy.deepcopy(v, memo))
         for k, v in self.items():
@@ -580,6 +665,9 @@ class TVInfoShow(dict):
 
 
 class TVInfoSeason(dict):
+    # episodes of a cow_copy() that are still shared with the cached season
+    cow_keys = frozenset()
+
     def __init__(self, show=None, number=None, **kwargs):
         """The show attribute points to the parent show
         """
@@ -617,7 +705,57 @@ class TVInfoSeason(dict):
         if episode_number not in self:
             raise BaseTVinfoEpisodenotfound('Could not find episode %s' % (repr(episode_number)))
         else:
-            return dict.__getitem__(self, episode_number)
+            return self._cow_get(episode_number)
+
+    def _cow_get(self, key):
+        # type: (integer_types) -> TVInfoEpisode
+        value = dict.__getitem__(self, key)
+        if key in self.cow_keys:
+            value = value.cow_copy(season=self, show=self.show)
+            dict.__setitem__(self, key, value)
+            self.cow_keys.discard(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key in self.cow_keys:
+            self.cow_keys.discard(key)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        if key in self.cow_keys:
+            self.cow_keys.discard(key)
+        dict.__delitem__(self, key)
+
+    def values(self):
+        for k in list(self.cow_keys):
+            self._cow_get(k)
+        return dict.values(self)
+
+    def items(self):
+        for k in list(self.cow_keys):
+            self._cow_get(k)
+        return dict.items(self)
+
+    def get(self, key, default=None):
+        if key in self:
+            return self._cow_get(key)
+        return default
+
+    def cow_copy(self, show=None):
+        # type: (TVInfoShow) -> TVInfoSeason
+        """
+        copy-on-write copy of a cached season, see TVInfoShow.cow_copy()
+
+        :param show: show that holds the copy
+        """
+        cls = self.__class__
+        result = cls.__new__(cls)
+        for k, v in iteritems(self.__dict__):
+            result.__dict__[k] = _cow_value(v)
+        result.show = show
+        dict.update(result, self)
+        result.cow_keys = set(self)
+        return result
 
     def __deepcopy__(self, memo):
         cls = self.__class__
@@ -625,7 +763,7 @@ class TVInfoSeason(dict):
         memo[id(self)] = result
         for k, v in self.__dict__.items():
             # noinspection PyArgumentList
-            setattr(result, k, copy.deepcopy(v, memo))
+            setattr(result, k, (copy.deepcopy(v, memo), set())['cow_keys' == k])
         for k, v in self.items():
             result[k] = copy.deepcopy(v, memo)
             if isinstance(k, integer_types):
@@ -722,6 +860,23 @@ class TVInfoEpisode(dict):
         except KeyError:
             raise BaseTVinfoAttributenotfound('Cannot find attribute %s' % (repr(key)))
 
+    def cow_copy(self, season=None, show=None):
+        # type: (TVInfoSeason, TVInfoShow) -> TVInfoEpisode
+        """
+        shallow copy of a cached episode, see TVInfoShow.cow_copy()
+
+        :param season: season that holds the copy
+        :param show: show that holds the copy
+        """
+        cls = self.__class__
+        result = cls.__new__(cls)
+        for k, v in iteritems(self.__dict__):
+            result.__dict__[k] = _cow_value(v)
+        result.season, result.show = season, show
+        for k, v in iteritems(self):
+            dict.__setitem__(result, k, _cow_value(v))
+        return result
+
     def __deepcopy__(self, memo):
         cls = self.__class__
         result = cls.__new__(cls)
@@ -1313,7 +1468,7 @@ class TVInfoBase(object):
                     if show_id not in self.ti_shows:
                         return None
                     else:
-                        show_copy = copy.deepcopy(self.ti_shows[show_id])  # type: TVInfoShow
+                        show_copy = self.ti_shows[show_id].cow_copy()  # type: TVInfoShow
                         # provide old call compatibility for dvd order
                         if self.config.get('dvdorder') and TVInfoSeasonTypes.dvd in show_copy.alt_ep_numbering:
                             org_seasons, dvd_seasons = list(show_copy), \
@@ -1324,7 +1479,8 @@ class TVInfoBase(object):
                                 except (BaseException, Exception):
                                     continue
                             for ti_season in dvd_seasons:
-                                show_copy[ti_season] = show_copy.alt_ep_numbering[TVInfoSeasonTypes.dvd][ti_season]
+                                show_copy.share_season(
+                                    ti_season, show_copy.alt_ep_numbering[TVInfoSeasonTypes.dvd][ti_season])
                         return show_copy
                 finally:
                     try:
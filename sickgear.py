@@ -522,6 +522,9 @@ class SickGear(object):
                                                    if sickgear.TVInfoAPI(i).config.get('show_url')
                                                    and True is not sickgear.TVInfoAPI(i).config.get('people_only')]
             self.load_shows_from_db()
+            if sickgear.NAME_PARSER_CACHE_PERSIST:
+                sickgear.classes.loading_msg.message = 'Loading name parser cache'
+                sickgear.name_parser.parser.name_parser_cache.load()
             sickgear.MEMCACHE['history_tab'] = sickgear.webserve.History.menu_tab(
                 sickgear.MEMCACHE['history_tab_limit'])
             if not db.DBConnection().has_flag('ignore_require_cleaned'):
@@ -749,6 +752,19 @@ class SickGear(object):
     @staticmethod
     def restore(src_dir, dst_dir):
         try:
+            # write the WAL of each db that is replaced into its file and release the pooled connections opened by
+            # initialize(), so that a stale WAL is not replayed over a restored db and no file is locked by a move
+            db_names = [cur_name for cur_name in os.listdir(src_dir) if cur_name.endswith('.db')
+                        and os.path.isfile(os.path.join(dst_dir, cur_name))]
+            for cur_name in db_names:
+                db.DBConnection(cur_name).checkpoint()
+            db.close_all()
+            for cur_name in db_names:
+                for cur_suffix in ('-wal', '-shm'):
+                    sidecar_file = os.path.join(dst_dir, cur_name + cur_suffix)
+                    if os.path.isfile(sidecar_file):
+                        os.remove(sidecar_file)
+
             for filename in os.listdir(src_dir):
                 src_file = os.path.join(src_dir, filename)
                 dst_file = os.path.join(dst_dir, filename)
@@ -779,6 +795,9 @@ class SickGear(object):
                 except (BaseException, Exception):
                     pass
 
+            # checkpoint and release pooled db connections
+            db.close_all()
+
             # if run as daemon delete the pidfile
             if self.run_as_daemon and self.create_pid:
                 self.remove_pid_file(self.pid_file)
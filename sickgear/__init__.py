@@ -33,9 +33,10 @@ import threading
 import uuid
 import zlib
 
-from . import classes, db, helpers, image_cache, indexermapper, logger, metadata, naming, people_queue, providers, \
-    scene_exceptions, scene_numbering, scheduler, search_backlog, search_propers, search_queue, search_recent, \
-    show_queue, show_updater, subtitles, trakt_helpers, version_checker, watchedstate_queue
+from . import classes, db, download_watcher, failed_history, helpers, image_cache, indexermapper, logger, metadata, \
+    metrics, naming, people_queue, providers, scene_exceptions, scene_numbering, scheduler, search_backlog, \
+    search_propers, search_queue, search_recent, show_queue, show_updater, subtitles, trakt_helpers, version_checker, \
+    watchedstate_queue
 from . import auto_media_process, properFinder  # must come after the above imports
 from .common import SD, SKIPPED, USER_AGENT
 from .config import check_section, check_setting_int, check_setting_str, ConfigMigrator, minimax
@@ -43,6 +44,7 @@ from .databases import cache_db, failed_db, mainDB
 from .event_queue import ConfigEvents
 from .indexers.indexer_api import TVInfoAPI
 from .indexers.indexer_config import TVINFO_IMDB, TVINFO_TVDB, TmdbIndexer
+from .name_parser.parser import name_parser_cache
 from .providers.generic import GenericProvider
 from .providers.newznab import NewznabConstants
 from .tv import TVidProdid
@@ -107,6 +109,7 @@ search_subtitles_scheduler = None  # type: Optional[scheduler.Scheduler]
 emby_watched_state_scheduler = None  # type: Optional[scheduler.Scheduler]
 plex_watched_state_scheduler = None  # type: Optional[scheduler.Scheduler]
 process_media_scheduler = None  # type: Optional[scheduler.Scheduler]
+download_watcher_thread = None  # type: Optional[download_watcher.DownloadWatcher]
 # noinspection PyTypeChecker
 background_mapping_task = None  # type: threading.Thread
 # deprecated
@@ -160,6 +163,7 @@ started = False
 ACTUAL_LOG_DIR = None
 LOG_DIR = None
 FILE_LOGGING_PRESET = 'DEBUG'
+FILE_LOGGING_ASYNC = False
 
 SOCKET_TIMEOUT = None
 
@@ -181,6 +185,10 @@ PROXY_INDEXERS = True
 
 CPU_PRESET = 'DISABLED'
 
+NAME_PARSER_CACHE_MB = 8
+NAME_PARSER_CACHE_PERSIST = False
+SHOW_QUEUE_WORKERS = 1
+
 ANON_REDIRECT = None
 
 USE_API = False
@@ -294,6 +302,7 @@ RENAME_TBA_EPISODES = True
 RENAME_NAME_CHANGED_EPISODES = False
 AIRDATE_EPISODES = False
 PROCESS_AUTOMATICALLY = False
+MEDIAPROCESS_WATCH = False
 KEEP_PROCESSED_DIR = False
 PROCESS_LAST_DIR = None
 PROCESS_LAST_METHOD = None
@@ -634,6 +643,7 @@ __INIT_STAGE__ = 0
 MEMCACHE = {}
 sg_helpers.MEMCACHE = MEMCACHE
 scene_exceptions.MEMCACHE = MEMCACHE
+sg_helpers.METRICS = metrics
 MEMCACHE_FLAG_IMAGES = {}
 
 
@@ -698,7 +708,8 @@ def init_stage_1(console_logging):
         SEND_SECURITY_HEADERS, ALLOWED_HOSTS, ALLOW_ANYIP
     # Gen Config/Advanced
     global BRANCH, CUR_COMMIT_BRANCH, GIT_REMOTE, CUR_COMMIT_HASH, GIT_PATH, CPU_PRESET, ANON_REDIRECT, \
-        ENCRYPTION_VERSION, PROXY_SETTING, PROXY_INDEXERS, FILE_LOGGING_PRESET
+        ENCRYPTION_VERSION, PROXY_SETTING, PROXY_INDEXERS, FILE_LOGGING_PRESET, FILE_LOGGING_ASYNC, \
+        NAME_PARSER_CACHE_MB, NAME_PARSER_CACHE_PERSIST, SHOW_QUEUE_WORKERS
     # Search Settings/Episode
     global DOWNLOAD_PROPERS, PROPERS_WEBDL_ONEGRP, WEBDL_TYPES, RECENTSEARCH_INTERVAL, \
         BACKLOG_LIMITED_PERIOD, BACKLOG_NOFULL, BACKLOG_PERIOD, USENET_RETENTION, IGNORE_WORDS, REQUIRE_WORDS, \
@@ -718,7 +729,7 @@ def init_stage_1(console_logging):
     global USE_SUBTITLES, SUBTITLES_LANGUAGES, SUBTITLES_DIR, SUBTITLES_FINDER_INTERVAL, SUBTITLES_OS_HASH, \
         SUBTITLES_HISTORY, SUBTITLES_SERVICES_LIST, SUBTITLES_SERVICES_ENABLED, SUBTITLES_SERVICES_AUTH
     # Media Process/Post-Processing
-    global TV_DOWNLOAD_DIR, PROCESS_METHOD, PROCESS_AUTOMATICALLY, MEDIAPROCESS_INTERVAL, \
+    global TV_DOWNLOAD_DIR, PROCESS_METHOD, PROCESS_AUTOMATICALLY, MEDIAPROCESS_INTERVAL, MEDIAPROCESS_WATCH, \
         POSTPONE_IF_SYNC_FILES, PROCESS_POSITIVE_LOG, EXTRA_SCRIPTS, SG_EXTRA_SCRIPTS, \
         DEFAULT_MEDIAPROCESS_INTERVAL, MIN_MEDIAPROCESS_INTERVAL, \
         UNPACK, SKIP_REMOVED_FILES, MOVE_ASSOCIATED_FILES, NFO_RENAME, \
@@ -855,6 +866,7 @@ def init_stage_1(console_logging):
         FILE_LOGGING_PRESET = 'DB'
     elif 'DB' == FILE_LOGGING_PRESET:
         FILE_LOGGING_PRESET = 'DEBUG'
+    FILE_LOGGING_ASYNC = bool(check_setting_int(CFG, 'General', 'file_logging_async', 0))
 
     SOCKET_TIMEOUT = check_setting_int(CFG, 'General', 'socket_timeout', 30)
     socket.setdefaulttimeout(SOCKET_TIMEOUT)
@@ -872,6 +884,11 @@ def init_stage_1(console_logging):
 
     CPU_PRESET = check_setting_str(CFG, 'General', 'cpu_preset', 'DISABLED')
 
+    NAME_PARSER_CACHE_MB = minimax(check_setting_int(CFG, 'General', 'name_parser_cache_mb', 8), 8, 1, 1024)
+    NAME_PARSER_CACHE_PERSIST = bool(check_setting_int(CFG, 'General', 'name_parser_cache_persist', 0))
+    name_parser_cache.budget = NAME_PARSER_CACHE_MB * 1024 * 1024
+    SHOW_QUEUE_WORKERS = minimax(check_setting_int(CFG, 'General', 'show_queue_workers', 1), 1, 1, 8)
+
     ANON_REDIRECT = check_setting_str(CFG, 'General', 'anon_redirect', '')
     PROXY_SETTING = check_setting_str(CFG, 'General', 'proxy_setting', '')
     sg_helpers.PROXY_SETTING = PROXY_SETTING
@@ -1014,6 +1031,7 @@ def init_stage_1(console_logging):
 
     TV_DOWNLOAD_DIR = check_setting_str(CFG, 'General', 'tv_download_dir', '')
     PROCESS_AUTOMATICALLY = bool(check_setting_int(CFG, 'General', 'process_automatically', 0))
+    MEDIAPROCESS_WATCH = bool(check_setting_int(CFG, 'General', 'mediaprocess_watch', 0))
     UNPACK = bool(check_setting_int(CFG, 'General', 'unpack', 0))
     RENAME_EPISODES = bool(check_setting_int(CFG, 'General', 'rename_episodes', 1))
     RENAME_TBA_EPISODES = bool(check_setting_int(CFG, 'General', 'rename_tba_episodes', 1))
@@ -1532,7 +1550,7 @@ def init_stage_2():
         search_recent_scheduler, search_subtitles_scheduler, \
         search_queue_scheduler, show_queue_scheduler, people_queue_scheduler, \
         watched_state_queue_scheduler, emby_watched_state_scheduler, plex_watched_state_scheduler, \
-        process_media_scheduler, background_mapping_task, config_events
+        process_media_scheduler, download_watcher_thread, background_mapping_task, config_events
 
     # Gen Config/Misc
     global SHOW_UPDATE_HOUR, UPDATE_INTERVAL, UPDATE_PACKAGES_INTERVAL
@@ -1559,6 +1577,7 @@ def init_stage_2():
     # initialize the failed downloads database
     my_db = db.DBConnection('failed.db')
     db.upgrade_database(my_db, failed_db.InitialSchema)
+    failed_history.load_failed_names()
 
     # fix up any db problems
     my_db = db.DBConnection()
@@ -1582,26 +1601,26 @@ def init_stage_2():
 
     # initialize schedulers
     # /
-    # queues must be first
+    # queues must be first, a queue is woken when an item is added or done, so its cycle_time is only a fallback
     show_queue_scheduler = scheduler.Scheduler(
-        show_queue.ShowQueue(),
-        cycle_time=datetime.timedelta(seconds=3),
+        show_queue.ShowQueue(workers=SHOW_QUEUE_WORKERS),
+        cycle_time=datetime.timedelta(minutes=1),
         thread_name='SHOWQUEUE')
 
     search_queue_scheduler = scheduler.Scheduler(
         search_queue.SearchQueue(),
-        cycle_time=datetime.timedelta(seconds=3),
+        cycle_time=datetime.timedelta(minutes=1),
         thread_name='SEARCHQUEUE')
 
     people_queue_scheduler = scheduler.Scheduler(
-        people_queue.PeopleQueue(),
-        cycle_time=datetime.timedelta(seconds=3),
+        people_queue.PeopleQueue(workers=SHOW_QUEUE_WORKERS),
+        cycle_time=datetime.timedelta(minutes=1),
         thread_name='PEOPLEQUEUE'
     )
 
     watched_state_queue_scheduler = scheduler.Scheduler(
         watchedstate_queue.WatchedStateQueue(),
-        cycle_time=datetime.timedelta(seconds=3),
+        cycle_time=datetime.timedelta(minutes=1),
         thread_name='WATCHEDSTATEQUEUE')
 
     # /
@@ -1709,6 +1728,9 @@ def init_stage_2():
         thread_name='PROCESSMEDIA',
         silent=not PROCESS_AUTOMATICALLY)
 
+    download_watcher_thread = download_watcher.DownloadWatcher(
+        snapshot_file=os.path.join(CACHE_DIR, 'download_watcher.json'))
+
     background_mapping_task = threading.Thread(name='MAPPINGUPDATES', target=indexermapper.load_mapped_ids,
                                                kwargs={'load_all': True})
 
@@ -1740,7 +1762,7 @@ def enabled_schedulers(is_init=False):
                    show_queue_scheduler, search_queue_scheduler,
                    people_queue_scheduler, watched_state_queue_scheduler,
                    emby_watched_state_scheduler, plex_watched_state_scheduler,
-                   process_media_scheduler
+                   process_media_scheduler, download_watcher_thread
                    ]
               )[not MEMCACHE.get('update_restart')] \
            + ([events], [])[is_init]
@@ -1875,6 +1897,10 @@ def save_all():
         for show_obj in showList:  # type: tv.TVShow
             show_obj.save_to_db()
 
+        if NAME_PARSER_CACHE_PERSIST:
+            logger.log('Saving name parser cache')
+            name_parser_cache.save()
+
     # save config
     logger.log('Saving config file to disk')
     _save_config(force=True)
@@ -1920,6 +1946,7 @@ def _save_config(force=False, **kwargs):
     new_config['General']['file_logging_preset'] = FILE_LOGGING_PRESET \
         if FILE_LOGGING_PRESET and 'DB' != FILE_LOGGING_PRESET else 'DEBUG'
     new_config['General']['file_logging_db'] = 0
+    new_config['General']['file_logging_async'] = int(FILE_LOGGING_ASYNC)
     new_config['General']['socket_timeout'] = SOCKET_TIMEOUT
     new_config['General']['web_host'] = WEB_HOST
     new_config['General']['web_port'] = WEB_PORT
@@ -1930,6 +1957,9 @@ def _save_config(force=False, **kwargs):
     new_config['General']['web_username'] = WEB_USERNAME
     new_config['General']['web_password'] = helpers.encrypt(WEB_PASSWORD, ENCRYPTION_VERSION)
     new_config['General']['cpu_preset'] = CPU_PRESET
+    new_config['General']['name_parser_cache_mb'] = int(NAME_PARSER_CACHE_MB)
+    new_config['General']['name_parser_cache_persist'] = int(NAME_PARSER_CACHE_PERSIST)
+    new_config['General']['show_queue_workers'] = int(SHOW_QUEUE_WORKERS)
     new_config['General']['anon_redirect'] = ANON_REDIRECT
     new_config['General']['use_api'] = int(USE_API)
     new_config['General']['api_keys'] = '|||'.join([':::'.join(a) for a in API_KEYS])
@@ -2030,6 +2060,7 @@ def _save_config(force=False, **kwargs):
     new_config['General']['process_positive_log'] = int(PROCESS_POSITIVE_LOG)
     new_config['General']['nfo_rename'] = int(NFO_RENAME)
     new_config['General']['process_automatically'] = int(PROCESS_AUTOMATICALLY)
+    new_config['General']['mediaprocess_watch'] = int(MEDIAPROCESS_WATCH)
     new_config['General']['unpack'] = int(UNPACK)
     new_config['General']['rename_episodes'] = int(RENAME_EPISODES)
     new_config['General']['rename_tba_episodes'] = int(RENAME_TBA_EPISODES)
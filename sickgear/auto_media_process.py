@@ -20,6 +20,10 @@ import sickgear
 from . import logger, processTV
 from .scheduler import Job
 
+# noinspection PyUnreachableCode
+if False:
+    from . import download_watcher
+
 
 class MediaProcess(Job):
     def __init__(self):
@@ -33,8 +37,7 @@ class MediaProcess(Job):
         if self.is_enabled():
             self._main()
 
-    @staticmethod
-    def _main():
+    def _main(self):
 
         if not os.path.isdir(sickgear.TV_DOWNLOAD_DIR):
             logger.error('Automatic media processing attempted but dir %s doesn\'t exist' % sickgear.TV_DOWNLOAD_DIR)
@@ -45,4 +48,35 @@ class MediaProcess(Job):
                          '(and probably not what you really want to process)' % sickgear.TV_DOWNLOAD_DIR)
             return
 
+        watcher = sickgear.download_watcher_thread
+        if None is not watcher and watcher.watching and not (self.scheduler and self.scheduler.force):
+            self._process_watched(watcher)
+            return
+
         processTV.process_dir(sickgear.TV_DOWNLOAD_DIR, is_basedir=True)
+        if None is not watcher:
+            watcher.processed()
+
+    @staticmethod
+    def _process_watched(watcher):
+        # type: (download_watcher.DownloadWatcher) -> None
+        """
+        process only the entries of the completed TV downloads folder that the watcher queued
+
+        a release folder is processed like a folder passed by a download client script, while files at the top
+        level of the folder are processed by one run over the completed TV downloads folder
+        """
+        names = watcher.take()
+        if not names:
+            return
+
+        folders = [cur_name for cur_name in names
+                   if os.path.isdir(os.path.join(sickgear.TV_DOWNLOAD_DIR, cur_name))]
+        if len(folders) < len(names):
+            processTV.process_dir(sickgear.TV_DOWNLOAD_DIR, is_basedir=True)
+            watcher.processed()
+            return
+
+        for cur_name in folders:
+            processTV.process_dir(os.path.join(sickgear.TV_DOWNLOAD_DIR, cur_name), is_basedir=False)
+        watcher.processed(folders)
@@ -14,8 +14,11 @@
 # You should have received a copy of the GNU General Public License
 # along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
 
+import threading
+
 # noinspection PyUnresolvedReferences
 from sg_helpers import http_error_code
+import sickgear
 
 __all__ = ['deluge', 'download_station', 'qbittorrent', 'rtorrent', 'transmission', 'utorrent']
 
@@ -32,3 +35,25 @@ def get_client_instance(name):
 
     module = __import__('sickgear.clients.%s' % name.lower(), fromlist=__all__)
     return getattr(module, module.api.__class__.__name__)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(name):
+    """
+    Get the shared client instance of the configured torrent client
+
+    The instance keeps its authenticated session and fetched task state between snatches, and it is replaced when the
+    client config changes.
+
+    :param name: client module name
+    :return: client instance
+    """
+    key = (name.lower(), sickgear.TORRENT_HOST, sickgear.TORRENT_USERNAME, sickgear.TORRENT_PASSWORD)
+    with _clients_lock:
+        if key not in _clients:
+            _clients.clear()
+            _clients[key] = get_client_instance(name)()
+        return _clients[key]
@@ -31,6 +31,7 @@ class DelugeAPI(GenericClient):
         super(DelugeAPI, self).__init__('Deluge', host, username, password)
 
         self.url = '%s/json' % self.host.rstrip('/')
+        self.labels = None
 
     def _post_json(self, data, process=True):
         result = self.session.post(self.url, json=data, timeout=10, verify=sickgear.TORRENT_VERIFY_CERT)
@@ -44,6 +45,7 @@ class DelugeAPI(GenericClient):
 
     def _get_auth(self):
 
+        self.labels = None
         try:
             self.auth = self._post_json({'method': 'auth.login', 'params': [self.password], 'id': 1})
 
@@ -99,18 +101,20 @@ class DelugeAPI(GenericClient):
 
         if label:
             # check if label already exists and create it if not
-            labels = self._request_json({
-                'method': 'label.get_labels',
-                'params': [],
-                'id': 3}, True)
-
-            if None is not labels:
-                if label not in labels:
+            if None is self.labels or label not in self.labels:
+                self.labels = self._request_json({
+                    'method': 'label.get_labels',
+                    'params': [],
+                    'id': 3}, True)
+
+            if None is not self.labels:
+                if label not in self.labels:
                     logger.debug('%s: %s label does not exist in Deluge we must add it' % (self.name, label))
                     self._request_json({
                         'method': 'label.add',
                         'params': [label],
                         'id': 4})
+                    self.labels.append(label)
                     logger.debug('%s: %s label added to Deluge' % (self.name, label))
 
                 # add label to torrent
@@ -132,29 +136,27 @@ class DelugeAPI(GenericClient):
             ratio = result.ratio
 
         if ratio:
-            self._request_json({
-                'method': 'core.set_torrent_stop_at_ratio',
-                'params': [result.hash, True],
-                'id': 5})
-
-            self._request_json({
-                'method': 'core.set_torrent_stop_ratio',
-                'params': [result.hash, float(ratio)],
-                'id': 6})
+            self._set_torrent_options(result, {'stop_at_ratio': True, 'stop_ratio': float(ratio)})
         return True
 
     def _set_torrent_path(self, result):
 
         if sickgear.TORRENT_PATH:
-            self._request_json({
-                'method': 'core.set_torrent_move_completed',
-                'params': [result.hash, True],
-                'id': 7})
+            self._set_torrent_options(
+                result, {'move_completed': True, 'move_completed_path': sickgear.TORRENT_PATH})
+        return True
 
-            self._request_json({
-                'method': 'core.set_torrent_move_completed_path',
-                'params': [result.hash, sickgear.TORRENT_PATH],
-                'id': 8})
+    def _set_torrent_options(self, result, options):
+
+        if not self._set_torrent_batch(options):
+            self._send_torrent_batch(result, options)
+
+    def _send_torrent_batch(self, result, arguments):
+
+        self._request_json({
+            'method': 'core.set_torrent_options',
+            'params': [[result.hash], arguments],
+            'id': 6})
         return True
 
     def _set_torrent_pause(self, result):
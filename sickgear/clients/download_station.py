@@ -341,22 +341,30 @@ class DownloadStationAPI(GenericClient):
         if self._testmode:
             return True
 
-        params = dict(method=method, api='SYNO.DownloadStation.Task', version='1', _sid=self.auth)
-        if t_id:
-            params['id'] = t_id
-        if t_params:
-            params.update(t_params)
-
         self._errmsg = None
         response = {}
-        kw_args = (dict(method='get', params=params), dict(method='post', data=params))[method in ('create',)]
-        kw_args.update(dict(files=files))
-        try:
-            response = self._request(**kw_args).json()
-            if not response.get('success'):
-                raise ValueError
-        except (BaseException, Exception):
-            return self._error_task(response)
+        for attempt in (1, 2):
+            self._ensure_auth()
+            params = dict(method=method, api='SYNO.DownloadStation.Task', version='1', _sid=self.auth)
+            if t_id:
+                params['id'] = t_id
+            if t_params:
+                params.update(t_params)
+
+            response = {}
+            kw_args = (dict(method='get', params=params), dict(method='post', data=params))[method in ('create',)]
+            kw_args.update(dict(files=files))
+            try:
+                response = self._request(**kw_args).json()
+                if not response.get('success'):
+                    raise ValueError
+            except (BaseException, Exception):
+                if 1 == attempt and response.get('error', {}).get('code') in (106, 107, 119):
+                    # the session timed out or was ended, authenticate again and resend the request once
+                    self.auth = None
+                    continue
+                return self._error_task(response)
+            break
 
         if None is not t_id and None is t_params and 'create' != method:
             return list(filter(lambda r: r.get('error'), response.get('data', {}))) or True
@@ -1,5 +1,6 @@
 from hashlib import sha1
 import re
+import threading
 import time
 
 from . import http_error_code
@@ -12,8 +13,17 @@ from lib import requests
 from _23 import make_btih
 from six import string_types
 
+# noinspection PyUnreachableCode
+if False:
+    from typing import Dict, Optional, Tuple
+
 
 class GenericClient(object):
+    # seconds that an authenticated session is reused before authenticating again
+    auth_expiry = 1800
+    # seconds that one fetch of all client tasks serves lookups of single tasks
+    state_expiry = 10
+
     def __init__(self, name, host=None, username=None, password=None):
 
         self.name = name
@@ -27,6 +37,10 @@ class GenericClient(object):
         self.session = requests.session()
         self.session.auth = (self.username, self.password)
         self.created_id = None
+        self.lock = threading.RLock()
+        self._in_auth = False
+        self._state = None  # type: Optional[Tuple[float, Dict]]
+        self._pending_set = None  # type: Optional[Dict]
 
     def _log_request_details(self, method, params=None, data=None, files=None, **kwargs):
 
@@ -57,18 +71,24 @@ class GenericClient(object):
 
         params = params or {}
 
-        if time.time() > self.last_time + 1800 or not self.auth:
-            self.last_time = time.time()
-
-            if not self._get_auth():
-                logger.error('%s: Authentication failed' % self.name)
-                return False
+        if not self._ensure_auth():
+            logger.error('%s: Authentication failed' % self.name)
+            return False
 
         # self._log_request_details(method, params, data, files, **kwargs)
 
+        timeout = kwargs.pop('timeout', 120)
         try:
             response = self.session.__getattribute__(method)(self.url, params=params, data=data, files=files,
-                                                             timeout=kwargs.pop('timeout', 120), verify=False, **kwargs)
+                                                             timeout=timeout, verify=False, **kwargs)
+            if not self._in_auth and self._auth_expired(response):
+                # the client ended the session, authenticate again and resend the request once
+                self.auth = None
+                if not self._ensure_auth():
+                    logger.error('%s: Authentication failed' % self.name)
+                    return False
+                response = self.session.__getattribute__(method)(self.url, params=params, data=data, files=files,
+                                                                 timeout=timeout, verify=False, **kwargs)
         except requests.exceptions.ConnectionError as e:
             logger.error('%s: Unable to connect %s' % (self.name, ex(e)))
             return False
@@ -97,6 +117,77 @@ class GenericClient(object):
 
         return response
 
+    def _ensure_auth(self):
+        """
+        Reuse the authenticated session until it expires
+
+        :return: auth result of the client
+        """
+        if not self.auth or time.time() > self.last_time + self.auth_expiry:
+            self.last_time = time.time()
+            self.auth = None
+            self._in_auth = True
+            try:
+                return self._get_auth()
+            finally:
+                self._in_auth = False
+        return self.auth
+
+    def _auth_expired(self, response):
+        """
+        This may be overridden to detect a response that asks for a new session
+        """
+        return 401 == response.status_code and bool(self.auth)
+
+    def _fetch_state(self):
+        """
+        This should be overridden to fetch all client tasks with one request
+
+        :return: Task object(s) keyed by id, or None if failure
+        :rtype: dict or None
+        """
+        return None
+
+    def _task_state(self):
+        """
+        Client tasks from one bulk fetch that is shared by lookups until it is expired
+
+        :return: Task object(s) keyed by id, or None if failure
+        :rtype: dict or None
+        """
+        if None is self._state or time.time() > self._state[0] + self.state_expiry:
+            tasks = self._fetch_state()
+            if None is tasks:
+                return None
+            self._state = (time.time(), tasks)
+        return self._state[1]
+
+    def _expire_state(self):
+        """
+        Drop the fetched tasks, e.g. after a request that changes them
+        """
+        self._state = None
+
+    def _set_torrent_batch(self, arguments):
+        """
+        Collect the arguments of a set request while properties of a new torrent are set
+
+        :param arguments: arguments to merge
+        :type arguments: dict
+        :return: True if the arguments are collected, False to send them at once
+        :rtype: bool
+        """
+        if None is self._pending_set:
+            return False
+        self._pending_set.update(arguments)
+        return True
+
+    def _send_torrent_batch(self, result, arguments):
+        """
+        This should be overridden to send the collected arguments of set requests in one request
+        """
+        return True
+
     def _tinf(self, ids=None):
         """
         This should be overridden and return client fetched task information
@@ -214,9 +305,16 @@ class GenericClient(object):
 
         logger.debug('Calling %s client' % self.name)
 
-        if not self._get_auth():
-            logger.error('%s: Authentication failed' % self.name)
-            return r_code
+        with self.lock:
+            if not self._ensure_auth():
+                logger.error('%s: Authentication failed' % self.name)
+                return r_code
+
+            return self._send_torrent(result)
+
+    def _send_torrent(self, result):
+
+        r_code = False
 
         try:
             # Sets per provider seed ratio
@@ -242,6 +340,9 @@ class GenericClient(object):
             if not self._set_torrent_pause(result):
                 logger.error('%s: Unable to set the pause for torrent' % self.name)
 
+            # clients that set many properties with one request collect them until all are known
+            self._pending_set = {}
+
             if not self._set_torrent_label(result):
                 logger.error('%s: Unable to set the label for torrent' % self.name)
 
@@ -257,7 +358,12 @@ class GenericClient(object):
             if 0 != result.priority and not self._set_torrent_priority(result):
                 logger.error('%s: Unable to set priority for torrent' % self.name)
 
+            arguments, self._pending_set = self._pending_set, None
+            if arguments and not self._send_torrent_batch(result, arguments):
+                logger.error('%s: Unable to set the properties for torrent' % self.name)
+
         except (BaseException, Exception) as e:
+            self._pending_set = None
             logger.error('%s: Failed sending torrent: %s - %s' % (self.name, result.name, result.hash))
             logger.debug('%s: Exception raised when sending torrent: %s' % (self.name, ex(e)))
 
@@ -63,9 +63,15 @@ class QbittorrentAPI(GenericClient):
             tally_up=gp.get('total_uploaded'),
             state='done' if 'pausedUP' == t.get('state') else ('down', 'seed')['up' in t.get('state').lower()]
         ))
-        file_list = (lambda ti: self._client_request(
-            ('torrents/files', 'query/propertiesFiles/%s' % ti['hash'])[not self.api_ns],
-            params=({'hash': ti['hash']}, {})[not self.api_ns], json=True) or {})
+        files = {}
+
+        def file_list(ti):
+            if ti['hash'] not in files:
+                files[ti['hash']] = self._client_request(
+                    ('torrents/files', 'query/propertiesFiles/%s' % ti['hash'])[not self.api_ns],
+                    params=({'hash': ti['hash']}, {})[not self.api_ns], json=True) or {}
+            return files[ti['hash']]
+
         valid_stat = (lambda ti: not self._ignore_state(ti)
                       and sum(list(map(lambda tf: wanted(tf) and downloaded(tf) or 0, file_list(ti)))))
         result = list(map(lambda t: base_state(t, self._tinf(t['hash'])[0], file_list(t)),
@@ -86,33 +92,48 @@ class QbittorrentAPI(GenericClient):
         result = []
         rids = (ids if isinstance(ids, (list, type(None))) else [x.strip() for x in ids.split(',')]) or [None]
         getinfo = use_props and None is not ids
-        params = {}
-        cmd = ('torrents/info', 'query/torrents')[not self.api_ns]
         if not getinfo:
-            label = sickgear.TORRENT_LABEL.replace(' ', '_')
-            if label and not ids:
-                params['category'] = label
+            # task info of all tasks is fetched once and shared by the lookups of single tasks
+            tasks = self._task_state()
+            if None is tasks:
+                return ([], [{'state': 'error', 'hash': rid} for rid in rids])[err]
+            if not ids:
+                label = sickgear.TORRENT_LABEL.replace(' ', '_')
+                return list(filter(lambda t: not label or label == t.get('category'), tasks.values()))
+            for rid in rids:
+                task = tasks.get(rid.lower())
+                result += ([task], ([], [{'state': 'error', 'hash': rid}])[err])[None is task]
+            return result
+
+        params = {}
         for rid in rids:
-            if getinfo:
-                if self.api_ns:
-                    cmd = 'torrents/properties'
-                    params['hash'] = rid
-                else:
-                    cmd = 'query/propertiesGeneral/%s' % rid
-            elif rid:
-                params['hashes'] = rid
+            if self.api_ns:
+                cmd = 'torrents/properties'
+                params['hash'] = rid
+            else:
+                cmd = 'query/propertiesGeneral/%s' % rid
             try:
                 tasks = self._client_request(cmd, params=params, timeout=60, json=True)
                 result += tasks and (isinstance(tasks, list) and tasks or (isinstance(tasks, dict) and [tasks])) \
                     or ([], [{'state': 'error', 'hash': rid}])[err]
             except (BaseException, Exception):
-                if getinfo:
-                    result += [dict(error=True, id=rid)]
-        for t in filter(lambda d: isinstance(d.get('name'), string_types) and d.get('name'), (result, [])[getinfo]):
-            t['name'] = unquote_plus(t.get('name'))
+                result += [dict(error=True, id=rid)]
 
         return result
 
+    def _fetch_state(self):
+        # type: (...) -> Optional[dict]
+        """
+        Fetch task information of all client tasks (overridden class function)
+        :return: Task object(s) keyed by lowercase hash, or None if failure
+        """
+        tasks = self._client_request(('torrents/info', 'query/torrents')[not self.api_ns], timeout=60, json=True)
+        if not isinstance(tasks, list):
+            return None
+        for t in filter(lambda d: isinstance(d.get('name'), string_types) and d.get('name'), tasks):
+            t['name'] = unquote_plus(t.get('name'))
+        return dict([((t.get('hash') or '').lower(), t) for t in tasks])
+
     def _set_torrent_pause(self, search_result):
         # type: (TorrentSearchResult) -> bool
         """
@@ -224,6 +245,7 @@ class QbittorrentAPI(GenericClient):
         iv = 0.5
         states = []
         for i in range(0, sample_size):
+            self._expire_state()
             states += [self._tinf(ids, False)[0]['state']]
             if 'paused' not in states[-1]:
                 self._action('pause', ids, lambda t: _pause_filter(t))
@@ -235,6 +257,7 @@ class QbittorrentAPI(GenericClient):
         iterations = int((5 + sample_size) * iv * (1 / iv))  # timeout, ought never happen
         while 1 != len(set(states)) and iterations:
             for i in range(0, sample_size):
+                self._expire_state()
                 states += [self._tinf(ids, False)[0]['state']]
                 if 'paused' not in states[-1] and True is not self._action('pause', ids, lambda t: _pause_filter(t)):
                     time.sleep(iv)
@@ -314,6 +337,7 @@ class QbittorrentAPI(GenericClient):
                     logger.debug('%s: retry %s %s item(s) in %ss' % (self.name, act, len(item['fail']), i))
                     time.sleep(i)
                     item['fail'] = []
+                    self._expire_state()
                     for task in filter(filter_func, self._tinf(retry_ids, use_props=False, err=True)):
                         item[('fail', 'ignore')[self._ignore_state(task)]] += [task.get('hash')]
 
@@ -354,7 +378,7 @@ class QbittorrentAPI(GenericClient):
         :param data: A populated search result object
         :return: True if created, else Falsy if nothing created
         """
-        if self._tinf(data.hash):
+        if self._tinf(data.hash, use_props=False):
             logger.error('Could not create task, the hash is already in use')
             return
 
@@ -398,11 +422,18 @@ class QbittorrentAPI(GenericClient):
         :return: JSON decoded response dict, True if success and no response body, Text error or None if failure,
         """
         authless = bool(re.search('(?i)login|version', cmd))
-        if authless or self.auth:
-            if not authless and not self._get_auth():
+        if not authless:
+            if not self._ensure_auth():
                 logger.error('%s: Authentication failed' % self.name)
                 return
-
+            # an ended session is answered with 403 Forbidden
+            kwargs['raise_status_code'] = True
+        if 'post_data' in kwargs or 'files' in kwargs:
+            # a command changes tasks, so the next lookup fetches them again
+            self._expire_state()
+
+        response = None
+        for attempt in (1, 2):
             # self._log_request_details('%s%s' % (self.api_ns, cmd.strip('/')), **kwargs)
             response = None
             try:
@@ -411,14 +442,21 @@ class QbittorrentAPI(GenericClient):
             except HTTPError as e:
                 if e.response.status_code in (409, 403):
                     response = e.response.text
+                if not authless and 1 == attempt and 403 == e.response.status_code \
+                        and 'forbidden' == (response or '').strip().lower():
+                    # authenticate again and resend the request once
+                    self.auth = None
+                    if self._ensure_auth():
+                        continue
             except (BaseException, Exception):
                 pass
-            if isinstance(response, string_types):
-                if response[0:3].lower() in ('', 'ok.'):
-                    return True
-                elif response[0:4].lower() == 'fail':
-                    return False
-            return response
+            break
+        if isinstance(response, string_types):
+            if response[0:3].lower() in ('', 'ok.'):
+                return True
+            elif response[0:4].lower() == 'fail':
+                return False
+        return response
 
     def _get_auth(self):
         """
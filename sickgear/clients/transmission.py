@@ -85,7 +85,7 @@ class TransmissionAPI(GenericClient):
     def _add_torrent(self, t_object):
 
         # populate blanked and download_dir
-        if not self._get_auth():
+        if not self._ensure_auth():
             logger.error('%s: Authentication failed' % self.name)
             return False
 
@@ -105,7 +105,18 @@ class TransmissionAPI(GenericClient):
 
         return 'success' == response.json().get('result', '')
 
+    def _auth_expired(self, response):
+
+        # a new session id is given with 409 Conflict
+        return 409 == response.status_code
+
+    def _send_torrent_batch(self, result, arguments):
+
+        return self._rpc_torrent_set(arguments)
+
     def _rpc_torrent_set(self, arguments):
+        if self._set_torrent_batch(arguments):
+            return True
         try:
             response = self._request(method='post', json={'method': 'torrent-set', 'arguments': arguments})
             return 'success' == response.json().get('result', '')
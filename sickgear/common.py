@@ -110,6 +110,10 @@ class Quality(object):
                       UHD4KWEB: '2160p UHD 4K WEB',
                       UHD4KBLURAY: '2160p UHD BluRay'}
 
+    # exact text of each quality (except N/A and Unknown) as written by SickGear, best quality first
+    name_quality_re = [(_q, re.compile(r'\W' + _s.replace(' ', r'\W') + r'\W', flags=re.I))
+                       for _q, _s in sorted(qualityStrings.items(), reverse=True) if _s not in ('N/A', 'Unknown')]
+
     statusPrefixes = {DOWNLOADED: 'Downloaded',
                       SNATCHED: 'Snatched',
                       SNATCHED_PROPER: 'Snatched (Proper)',
@@ -241,18 +245,12 @@ class Quality(object):
         name = os.path.basename(name)
 
         # if we have our exact text then assume we put it there
-        for _x in sorted(iterkeys(Quality.qualityStrings), reverse=True):
-            if Quality.UNKNOWN == _x:
-                continue
-
-            if Quality.NONE == _x:  # Last chance
-                return Quality.scene_quality(name, anime)
-
-            regex = r'\W' + Quality.qualityStrings[_x].replace(' ', r'\W') + r'\W'
-            regex_match = re.search(regex, name, re.I)
-            if regex_match:
+        for _x, regex in Quality.name_quality_re:
+            if regex.search(name):
                 return _x
 
+        return Quality.scene_quality(name, anime)
+
     @staticmethod
     def scene_quality(name, anime=False):
         """
@@ -267,7 +265,7 @@ class Quality(object):
         from sickgear import logger
         name = os.path.basename(name)
 
-        name_has = (lambda quality_list, func=all: func([re.search(q, name, re.I) for q in quality_list]))
+        name_has = (lambda quality_list, func=all: func(re.search(q, name, re.I) for q in quality_list))
 
         if anime:
             sd_options = name_has(['360p', '480p', '848x480', 'XviD'], any)
@@ -19,7 +19,7 @@ from collections import OrderedDict
 from .. import db
 
 MIN_DB_VERSION = 1
-MAX_DB_VERSION = 7
+MAX_DB_VERSION = 9
 TEST_BASE_VERSION = None  # the base production db version, only needed for TEST db versions (>=100000)
 
 
@@ -92,6 +92,27 @@ class InitialSchema(db.SchemaUpgrade):
                 ' uid NUMERIC NOT NULL)',
                 'CREATE UNIQUE INDEX idx_show_queue_uid ON show_queue(uid)',
                 'CREATE UNIQUE INDEX idx_show_queue ON show_queue(tvid, prodid, action_id)'
+            ]),
+            ('provider_cache_episodes', [
+                'DROP TABLE [provider_cache]',
+                'CREATE TABLE provider_cache(cache_id INTEGER PRIMARY KEY, provider TEXT, name TEXT, season NUMERIC,'
+                ' episodes TEXT, indexerid NUMERIC, url TEXT UNIQUE, time NUMERIC, quality TEXT, release_group TEXT,'
+                ' version NUMERIC, indexer NUMERIC)',
+                'CREATE INDEX idx_provider_cache_show ON provider_cache(provider, indexer, indexerid, season)',
+                'CREATE TABLE provider_cache_episodes(cache_id INTEGER NOT NULL, indexer NUMERIC NOT NULL,'
+                ' indexerid NUMERIC NOT NULL, season NUMERIC NOT NULL, episode NUMERIC NOT NULL)',
+                'CREATE INDEX idx_provider_cache_episodes'
+                ' ON provider_cache_episodes(indexer, indexerid, season, episode, cache_id)',
+                'CREATE INDEX idx_provider_cache_episodes_id ON provider_cache_episodes(cache_id)',
+                'CREATE TRIGGER provider_cache_delete AFTER DELETE ON provider_cache'
+                ' BEGIN DELETE FROM provider_cache_episodes WHERE cache_id = OLD.cache_id; END'
+            ]),
+            ('media_index', [
+                'CREATE TABLE media_dirs(path TEXT PRIMARY KEY, parent TEXT, size NUMERIC NOT NULL,'
+                ' mtime NUMERIC NOT NULL)',
+                'CREATE INDEX idx_media_dirs_parent ON media_dirs(parent)',
+                'CREATE TABLE media_files(dir TEXT NOT NULL, name TEXT NOT NULL, size NUMERIC NOT NULL,'
+                ' mtime NUMERIC NOT NULL, media INTEGER NOT NULL, PRIMARY KEY (dir, name))'
             ])
         ])
 
@@ -163,3 +184,22 @@ class AddSaveQueues(AddGenericFailureHandling):
     def execute(self):
         self.do_query(self.queries['save_queues'])
         self.finish()
+
+
+class AddProviderCacheEpisodes(AddSaveQueues):
+    def test(self):
+        return 7 < self.call_check_db_version()
+
+    def execute(self):
+        # the provider cache is transient, so it is recreated rather than migrated
+        self.do_query(self.queries['provider_cache_episodes'])
+        self.finish(True)
+
+
+class AddMediaIndex(AddProviderCacheEpisodes):
+    def test(self):
+        return 8 < self.call_check_db_version()
+
+    def execute(self):
+        self.do_query(self.queries['media_index'])
+        self.finish()
@@ -21,7 +21,7 @@ from ..common import Quality
 from six import iteritems
 
 MIN_DB_VERSION = 1
-MAX_DB_VERSION = 2
+MAX_DB_VERSION = 3
 TEST_BASE_VERSION = None  # the base production db version, only needed for TEST db versions (>=100000)
 
 
@@ -103,3 +103,18 @@ class AddIndexerToTables(HistoryStatus):
         self.connection.action('VACUUM')
 
         self.set_db_version(2, check_db_version=False)
+
+
+class AddReleaseIndexes(AddIndexerToTables):
+    """Index the release lookups made for every search result and snatch"""
+
+    def test(self):
+        return 2 < self.call_check_db_version()
+
+    def execute(self):
+        for cur_query in (
+                'CREATE INDEX IF NOT EXISTS idx_failed_release ON failed (`release`, size, provider)',
+                'CREATE INDEX IF NOT EXISTS idx_history_release ON history (`release`, size, provider)',
+                'CREATE INDEX IF NOT EXISTS idx_history_episode ON history (indexer, showid, season, episode)'):
+            self.connection.action(cur_query)
+        self.set_db_version(3, check_db_version=False)
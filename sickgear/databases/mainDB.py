@@ -29,7 +29,7 @@ if False:
     from _23 import DirEntry
 
 MIN_DB_VERSION = 9  # oldest db version we support migrating from
-MAX_DB_VERSION = 20016
+MAX_DB_VERSION = 20020
 TEST_BASE_VERSION = None  # the base production db version, only needed for TEST db versions (>=100000)
 
 
@@ -46,6 +46,13 @@ class MainSanityCheck(db.DBSanityCheck):
         self.fix_indexer_mapping_tvdb()
         self.fix_episode_subtitles()
         self.fix_genre_separator()
+        self.fix_show_stats()
+
+    def fix_show_stats(self):
+        if self.connection.has_table('show_stats'):
+            from .. import show_stats
+            if not show_stats.check_show_stats(fix=True):
+                logger.log('No show stats out of sync, check passed')
 
     def fix_episode_subtitles(self):
         if not self.connection.has_flag('fix_episode_subtitles'):
@@ -2088,3 +2095,103 @@ class ChangeTmdbID(db.SchemaUpgrade):
 
         return self.set_db_version(20016)
 
+
+# 20016 -> 20017
+class AddShowStats(db.SchemaUpgrade):
+    def execute(self):
+        db.backup_database(self.connection, 'sickbeard.db', self.call_check_db_version())
+
+        self.upgrade_log('Adding show_stats table and triggers')
+        keys = 'indexer = %(row)s.indexer AND showid = %(row)s.showid'
+        changed = ' OR '.join(['OLD.%s IS NOT NEW.%s' % (c, c)
+                               for c in ('indexer', 'showid', 'season', 'episode', 'status', 'airdate')])
+        self.connection.mass_action([
+            ['DROP TABLE IF EXISTS show_stats'],
+            ['CREATE TABLE show_stats (indexer NUMERIC NOT NULL, showid NUMERIC NOT NULL, stats_date NUMERIC NOT NULL,'
+             ' ep_snatched NUMERIC, ep_downloaded NUMERIC, ep_total NUMERIC, ep_airs_next NUMERIC,'
+             ' ep_airs_last NUMERIC, ep_next_wanted NUMERIC, ep_downloaded_aired NUMERIC, ep_total_aired NUMERIC,'
+             ' PRIMARY KEY (indexer, showid))'],
+            ['CREATE TRIGGER IF NOT EXISTS show_stats_ep_insert AFTER INSERT ON tv_episodes'
+             ' BEGIN DELETE FROM show_stats WHERE %s; END' % (keys % dict(row='NEW'))],
+            ['CREATE TRIGGER IF NOT EXISTS show_stats_ep_update AFTER UPDATE ON tv_episodes WHEN %s'
+             ' BEGIN DELETE FROM show_stats WHERE %s; DELETE FROM show_stats WHERE %s; END'
+             % (changed, keys % dict(row='OLD'), keys % dict(row='NEW'))],
+            ['CREATE TRIGGER IF NOT EXISTS show_stats_ep_delete AFTER DELETE ON tv_episodes'
+             ' BEGIN DELETE FROM show_stats WHERE %s; END' % (keys % dict(row='OLD'))],
+        ])
+
+        return self.set_db_version(20017)
+
+
+# 20017 -> 20018
+class AddHistoryIndexes(db.SchemaUpgrade):
+    def execute(self):
+        db.backup_database(self.connection, 'sickbeard.db', self.call_check_db_version())
+
+        from ..history import resource_name
+        if not self.has_column('history', 'resource_name'):
+            self.upgrade_log('Adding resource_name column to history')
+            self.add_column('history', 'resource_name', 'TEXT', default='')
+            self.connection.mass_action([
+                ['UPDATE history SET resource_name = ? WHERE rowid = ?', [resource_name(cur_row['resource']),
+                                                                         cur_row['rowid']]]
+                for cur_row in self.connection.select('SELECT rowid, resource FROM history')])
+
+        self.upgrade_log('Adding history indexes')
+        self.connection.mass_action([
+            ['CREATE INDEX IF NOT EXISTS idx_history_episode ON history (indexer, showid, season, episode)'],
+            ['CREATE INDEX IF NOT EXISTS idx_history_hide_date ON history (hide, date)'],
+            ['CREATE INDEX IF NOT EXISTS idx_history_resource ON history (resource COLLATE NOCASE)'],
+            ['CREATE INDEX IF NOT EXISTS idx_history_resource_name ON history (resource_name)'],
+        ])
+
+        return self.set_db_version(20018)
+
+
+# 20018 -> 20019
+class AddDataVersion(db.SchemaUpgrade):
+    def execute(self):
+        db.backup_database(self.connection, 'sickbeard.db', self.call_check_db_version())
+
+        self.upgrade_log('Adding data_version table and triggers')
+        now = 'CAST(strftime(\'%s\', \'now\') AS INTEGER)'
+        bump = 'UPDATE data_version SET version = version + 1, changed = %s WHERE name = \'episodes\';' % now
+        columns = dict(
+            tv_episodes=('indexer', 'showid', 'season', 'episode', 'name', 'description', 'airdate'),
+            tv_shows=('indexer', 'indexer_id', 'show_name', 'network', 'airs', 'runtime', 'status', 'paused'))
+        sql = [
+            ['CREATE TABLE IF NOT EXISTS data_version (name TEXT PRIMARY KEY, version NUMERIC NOT NULL,'
+             ' changed NUMERIC NOT NULL)'],
+            ['INSERT OR IGNORE INTO data_version (name, version, changed) VALUES (\'episodes\', 1, %s)' % now]]
+        for cur_table in ('tv_episodes', 'tv_shows'):
+            changed = ' OR '.join(['OLD.%s IS NOT NEW.%s' % (c, c) for c in columns[cur_table]])
+            sql += [
+                ['CREATE TRIGGER IF NOT EXISTS data_version_%s_insert AFTER INSERT ON %s BEGIN %s END'
+                 % (cur_table, cur_table, bump)],
+                ['CREATE TRIGGER IF NOT EXISTS data_version_%s_update AFTER UPDATE ON %s WHEN %s BEGIN %s END'
+                 % (cur_table, cur_table, changed, bump)],
+                ['CREATE TRIGGER IF NOT EXISTS data_version_%s_delete AFTER DELETE ON %s BEGIN %s END'
+                 % (cur_table, cur_table, bump)]]
+        self.connection.mass_action(sql)
+
+        return self.set_db_version(20019)
+
+
+# 20019 -> 20020
+class AddEpisodeStatusVersion(db.SchemaUpgrade):
+    def execute(self):
+        db.backup_database(self.connection, 'sickbeard.db', self.call_check_db_version())
+
+        self.upgrade_log('Adding episode status data version triggers')
+        now = 'CAST(strftime(\'%s\', \'now\') AS INTEGER)'
+        bump = 'UPDATE data_version SET version = version + 1, changed = %s WHERE name = \'episode_status\';' % now
+        changed = ' OR '.join(['OLD.%s IS NOT NEW.%s' % (c, c) for c in ('indexer', 'showid', 'status', 'airdate')])
+        self.connection.mass_action([
+            ['INSERT OR IGNORE INTO data_version (name, version, changed) VALUES (\'episode_status\', 1, %s)' % now],
+            ['CREATE TRIGGER IF NOT EXISTS data_version_status_insert AFTER INSERT ON tv_episodes BEGIN %s END' % bump],
+            ['CREATE TRIGGER IF NOT EXISTS data_version_status_update AFTER UPDATE ON tv_episodes WHEN %s BEGIN %s END'
+             % (changed, bump)],
+            ['CREATE TRIGGER IF NOT EXISTS data_version_status_delete AFTER DELETE ON tv_episodes BEGIN %s END' % bump],
+        ])
+
+        return self.set_db_version(20020)
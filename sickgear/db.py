@@ -14,6 +14,7 @@
 # You should have received a copy of the GNU General Public License
 # along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
 
+import contextlib
 import datetime
 import itertools
 import os.path
@@ -21,11 +22,12 @@ import re
 import sqlite3
 import threading
 import time
+import weakref
 
 from exceptions_helper import ex
 
 import sickgear
-from . import logger, sgdatetime
+from . import logger, metrics, sgdatetime
 from .sgdatetime import SGDatetime
 
 from sg_helpers import make_path, compress_file, remove_file_perm, scantree
@@ -39,7 +41,7 @@ if False:
     from typing import Any, AnyStr, Dict, List, Optional, Tuple, Union
 
 
-db_lock = threading.Lock()
+db_lock = threading.Lock()  # guards the connection pool registry and the per file writer locks
 db_support_multiple_insert = (3, 7, 11) <= sqlite3.sqlite_version_info  # type: bool
 db_support_partial_index = (3, 8, 0) <= sqlite3.sqlite_version_info  # type: bool
 db_support_column_rename = (3, 25, 0) <= sqlite3.sqlite_version_info  # type: bool
@@ -47,6 +49,198 @@ db_support_upsert = (3, 25, 0) <= sqlite3.sqlite_version_info  # type: bool
 db_supports_backup = hasattr(sqlite3.Connection, 'backup') and (3, 6, 11) <= sqlite3.sqlite_version_info  # type: bool
 db_supports_setconfig_dqs = (hasattr(sqlite3.Connection, 'setconfig') and hasattr(sqlite3, 'SQLITE_DBCONFIG_DQS_DDL')
                              and hasattr(sqlite3, 'SQLITE_DBCONFIG_DQS_DML'))  # type: bool
+db_support_wal = (3, 7, 0) <= sqlite3.sqlite_version_info  # type: bool
+
+# journal settings applied to every pooled connection, WAL allows readers to run alongside a single writer
+db_journal_mode = ('DELETE', 'WAL')[db_support_wal]  # type: AnyStr
+db_synchronous = 'NORMAL'  # type: AnyStr
+
+# statements that never write to a db, these run without taking a writer lock
+re_read_only = re.compile(r'(?is)^\s*(?:SELECT\b|EXPLAIN\b|PRAGMA\s+[\w.]+\s*(?:\([^)]*\))?\s*;?\s*$)')
+
+_pool = {}  # type: Dict[Tuple[int, AnyStr, Optional[AnyStr]], Tuple[sqlite3.Connection, Tuple[int, int]]]
+_pool_owner = threading.local()
+_pool_owner_ids = itertools.count()
+_write_locks = {}  # type: Dict[AnyStr, threading.RLock]
+
+
+class DBStats(object):
+    """
+    counters for the connection pool, the writer locks and time spent executing queries
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pool_hits = 0
+        self.pool_misses = 0
+        self.reads = 0
+        self.writes = 0
+        self.lock_wait = 0.0
+        self.lock_wait_max = 0.0
+        self.query_time = 0.0
+
+    def add_pool(self, hit):
+        # type: (bool) -> None
+        with self.lock:
+            if hit:
+                self.pool_hits += 1
+            else:
+                self.pool_misses += 1
+
+    def add_query(self, elapsed, write=False, wait=0.0):
+        # type: (float, bool, float) -> None
+        with self.lock:
+            if write:
+                self.writes += 1
+                self.lock_wait += wait
+                self.lock_wait_max = max(self.lock_wait_max, wait)
+            else:
+                self.reads += 1
+            self.query_time += elapsed
+
+    def as_dict(self):
+        # type: (...) -> Dict[AnyStr, Union[int, float]]
+        with self.lock:
+            return dict(pool_hits=self.pool_hits, pool_misses=self.pool_misses,
+                        pool_size=len(_pool), reads=self.reads, writes=self.writes,
+                        lock_wait=round(self.lock_wait, 4), lock_wait_max=round(self.lock_wait_max, 4),
+                        query_time=round(self.query_time, 4))
+
+    def reset(self):
+        with self.lock:
+            self.pool_hits = self.pool_misses = self.reads = self.writes = 0
+            self.lock_wait = self.lock_wait_max = self.query_time = 0.0
+
+
+db_stats = DBStats()
+
+query_seconds = metrics.histogram(
+    'db_query_seconds', 'Time to run db queries, for writes this is the time the writer lock of the db is held',
+    ('db', 'kind'), buckets=metrics.FAST_BUCKETS)
+lock_wait_seconds = metrics.histogram(
+    'db_lock_wait_seconds', 'Time waited for the writer lock of a db', ('db',), buckets=metrics.FAST_BUCKETS)
+metrics.gauge('db_pool_connections', 'Open pooled db connections').set_function(lambda: [((), len(_pool))])
+
+
+def _add_query(filename, elapsed, write, wait):
+    # type: (AnyStr, float, bool, float) -> None
+    db_stats.add_query(elapsed, write, wait)
+    filename = os.path.basename(filename)
+    query_seconds.observe(elapsed, db=filename, kind=('read', 'write')[write])
+    if write:
+        lock_wait_seconds.observe(wait, db=filename)
+
+
+def _file_id(db_src):
+    # type: (AnyStr) -> Optional[Tuple[int, int]]
+    try:
+        s = os.stat(db_src)
+        return s.st_dev, s.st_ino
+    except OSError:
+        return None
+
+
+def _new_connection(db_src, row_type=None):
+    # type: (AnyStr, Optional[AnyStr]) -> sqlite3.Connection
+    # a pooled connection is only ever used by the thread that created it, check_same_thread=False
+    # is required to allow close_all() to release connections owned by other threads
+    connection = sqlite3.connect(db_src, timeout=20, check_same_thread=False)
+    # enable legacy double quote support
+    if db_supports_setconfig_dqs:
+        connection.setconfig(sqlite3.SQLITE_DBCONFIG_DQS_DDL, True)
+        connection.setconfig(sqlite3.SQLITE_DBCONFIG_DQS_DML, True)
+
+    try:
+        connection.execute('PRAGMA journal_mode = %s' % db_journal_mode)
+        connection.execute('PRAGMA synchronous = %s' % db_synchronous)
+    except sqlite3.DatabaseError as e:
+        logger.warning(f'Failed to set journal mode for {db_src}: {ex(e)}')
+
+    if 'dict' == row_type:
+        connection.row_factory = DBConnection._dict_factory
+    else:
+        connection.row_factory = sqlite3.Row
+    return connection
+
+
+class _PoolOwner(object):
+    """
+    one per thread, the pooled connections of a thread are closed when its owner is released at thread exit
+    """
+    def __init__(self):
+        # ids are never reused, unlike the ident of a thread that has ended
+        self.id = next(_pool_owner_ids)  # type: int
+        weakref.finalize(self, _release_owner, self.id)
+
+
+def _release_owner(owner_id):
+    # type: (int) -> None
+    with db_lock:
+        for key in [k for k in _pool if owner_id == k[0]]:
+            _close_connection(_pool.pop(key)[0])
+
+
+def get_connection(db_src, row_type=None):
+    # type: (AnyStr, Optional[AnyStr]) -> sqlite3.Connection
+    """
+    get a pooled connection for the current thread, a connection is reused until its db file is replaced,
+    and it is shared by every DBConnection of the thread until the thread ends or close_all() is called
+
+    :param db_src: full path to db file
+    :param row_type: 'dict' or None for sqlite3.Row
+    :return: connection
+    """
+    owner = getattr(_pool_owner, 'owner', None)
+    if None is owner:
+        owner = _pool_owner.owner = _PoolOwner()
+    key = (owner.id, db_src, row_type)
+    file_id = _file_id(db_src)
+    with db_lock:
+        cached = _pool.get(key)
+    if cached:
+        if None is not file_id and cached[1] == file_id:
+            db_stats.add_pool(True)
+            return cached[0]
+        _close_connection(cached[0])
+
+    db_stats.add_pool(False)
+    connection = _new_connection(db_src, row_type)
+    with db_lock:
+        _pool[key] = (connection, _file_id(db_src))
+    return connection
+
+
+def _close_connection(connection):
+    # type: (sqlite3.Connection) -> None
+    try:
+        connection.close()
+    except (BaseException, Exception):
+        pass
+
+
+def close_all():
+    """
+    close every pooled connection of all threads, used at shutdown or before replacing db files
+    """
+    with db_lock:
+        for key in list(_pool):
+            _close_connection(_pool.pop(key)[0])
+
+
+def get_write_lock(db_src):
+    # type: (AnyStr) -> threading.RLock
+    """
+    writes to a db file are serialised through one lock per file, reads never take this lock
+    """
+    with db_lock:
+        lock = _write_locks.get(db_src)
+        if None is lock:
+            lock = _write_locks[db_src] = threading.RLock()
+    return lock
+
+
+def is_read_only(query):
+    # type: (AnyStr) -> bool
+    return bool(re_read_only.match(query))
 
 
 def db_filename(filename='sickbeard.db', suffix=None):
@@ -100,6 +294,23 @@ def mass_upsert_sql(table_name, value_dict, key_dict, sanitise=True):
     return cl
 
 
+def data_version(name, my_db=None):
+    # type: (AnyStr, Optional[DBConnection]) -> Tuple[int, int]
+    """
+    triggers on the main db tables raise the version of a kind of data when it changes, so that results built from
+    that data can be kept until the version changes
+
+    :param name: kind of data, `episodes` for the episode and show data of the iCal feed, `episode_status` for episode
+    statuses and airdates
+    :param my_db: main db connection
+    :return: version of the data and the timestamp of its last change
+    """
+    sql_result = (my_db or DBConnection()).select('SELECT version, changed FROM data_version WHERE name = ?', [name])
+    if not sql_result:
+        return 0, 0
+    return int(sql_result[0]['version']), int(sql_result[0]['changed'])
+
+
 class DBConnection(object):
     def __init__(self, filename='sickbeard.db', row_type=None, **kwargs):
         # type: (AnyStr, Optional[AnyStr], Dict) -> None
@@ -113,16 +324,9 @@ class DBConnection(object):
                 helpers.copy_file(db_alt, db_src)
 
         self.filename = filename
-        self.connection = sqlite3.connect(db_src, timeout=20)
-        # enable legacy double quote support
-        if db_supports_setconfig_dqs:
-            self.connection.setconfig(sqlite3.SQLITE_DBCONFIG_DQS_DDL, True)
-            self.connection.setconfig(sqlite3.SQLITE_DBCONFIG_DQS_DML, True)
-
-        if 'dict' == row_type:
-            self.connection.row_factory = self._dict_factory
-        else:
-            self.connection.row_factory = sqlite3.Row
+        self.db_src = db_src
+        self.write_lock = get_write_lock(db_src)
+        self.connection = get_connection(db_src, row_type)
 
     def backup_db(self, target, backup_filename=None):
         # type: (AnyStr, AnyStr) -> Tuple[bool, AnyStr]
@@ -159,7 +363,7 @@ class DBConnection(object):
             # copy into this DB
             backup_con = sqlite3.connect(target_db, timeout=20)
             with backup_con:
-                with db_lock:
+                with self.write_lock:
                     self.connection.backup(backup_con, progress=progress)
             logger.debug('%s backup successful' % self.filename)
         except sqlite3.Error as error:
@@ -203,13 +407,17 @@ class DBConnection(object):
         # type: (List[Union[List[AnyStr], Tuple[AnyStr, List], Tuple[AnyStr]]], bool) -> Optional[List, sqlite3.Cursor]
 
         from . import helpers
-        with db_lock:
 
-            if None is queries:
-                return
+        if None is queries:
+            return
+
+        if not queries:
+            return []
 
-            if not queries:
-                return []
+        write = not all(is_read_only(cur_query[0]) for cur_query in queries)
+        wait_start = time.time()
+        with (contextlib.nullcontext(), self.write_lock)[write]:
+            started = time.time()
 
             attempt = 0
 
@@ -229,13 +437,16 @@ class DBConnection(object):
                             sql_result.append(cursor.execute(*tuple(cur_query)).fetchall())
                             affected += abs(cursor.rowcount)
 
-                    self.connection.commit()
+                    if write:
+                        self.connection.commit()
                     if 0 < affected:
                         logger.debug(f'Transaction with {len(queries)} queries executed affected at least {affected:d}'
                                      f' row{helpers.maybe_plural(affected)}')
+                    _add_query(self.filename, time.time() - started, write, started - wait_start)
                     return sql_result
                 except sqlite3.OperationalError as e:
                     sql_result = []
+                    affected = 0
                     if self.connection:
                         self.connection.rollback()
                     if not self.action_error(e):
@@ -261,10 +472,13 @@ class DBConnection(object):
     def action(self, query, args=None):
         # type: (AnyStr, Optional[List, Tuple]) -> Optional[Union[List, sqlite3.Cursor]]
 
-        with db_lock:
+        if None is query:
+            return
 
-            if None is query:
-                return
+        write = not is_read_only(query)
+        wait_start = time.time()
+        with (contextlib.nullcontext(), self.write_lock)[write]:
+            started = time.time()
 
             sql_result = None
             attempt = 0
@@ -272,12 +486,13 @@ class DBConnection(object):
             while 5 > attempt:
                 try:
                     if None is args:
-                        logger.log('%s: %s' % (self.filename, query), logger.DB)
+                        logger.log(lambda: '%s: %s' % (self.filename, query), logger.DB)
                         sql_result = self.connection.execute(query)
                     else:
-                        logger.log('%s: %s with args %s' % (self.filename, query, str(args)), logger.DB)
+                        logger.log(lambda: '%s: %s with args %s' % (self.filename, query, str(args)), logger.DB)
                         sql_result = self.connection.execute(query, args)
-                    self.connection.commit()
+                    if write:
+                        self.connection.commit()
                     # get out of the connection attempt loop since we were successful
                     break
                 except sqlite3.OperationalError as e:
@@ -288,6 +503,7 @@ class DBConnection(object):
                     logger.error(f'Fatal error executing query: {ex(e)}')
                     raise
 
+            _add_query(self.filename, time.time() - started, write, started - wait_start)
             return sql_result
 
     def select(self, query, args=None):
@@ -303,23 +519,25 @@ class DBConnection(object):
     def upsert(self, table_name, value_dict, key_dict):
         # type: (AnyStr, Dict, Dict) -> None
 
-        changes_before = self.connection.total_changes
-
-        gen_params = (lambda my_dict: [x + ' = ?' for x in iterkeys(my_dict)])
-
-        # noinspection SqlResolve
-        query = 'UPDATE [%s] SET %s WHERE %s' % (
-            table_name, ', '.join(gen_params(value_dict)), ' AND '.join(gen_params(key_dict)))
+        # hold the writer lock so that no other write can land between the update and the insert
+        with self.write_lock:
+            changes_before = self.connection.total_changes
 
-        self.action(query, list(value_dict.values()) + list(key_dict.values()))
+            gen_params = (lambda my_dict: [x + ' = ?' for x in iterkeys(my_dict)])
 
-        if self.connection.total_changes == changes_before:
             # noinspection SqlResolve
-            query = 'INSERT INTO [' + table_name + ']' \
-                    + ' (%s)' % ', '.join(itertools.chain(iterkeys(value_dict), iterkeys(key_dict))) \
-                    + ' VALUES (%s)' % ', '.join(['?'] * (len(value_dict) + len(key_dict)))
+            query = 'UPDATE [%s] SET %s WHERE %s' % (
+                table_name, ', '.join(gen_params(value_dict)), ' AND '.join(gen_params(key_dict)))
+
             self.action(query, list(value_dict.values()) + list(key_dict.values()))
 
+            if self.connection.total_changes == changes_before:
+                # noinspection SqlResolve
+                query = 'INSERT INTO [' + table_name + ']' \
+                        + ' (%s)' % ', '.join(itertools.chain(iterkeys(value_dict), iterkeys(key_dict))) \
+                        + ' VALUES (%s)' % ', '.join(['?'] * (len(value_dict) + len(key_dict)))
+                self.action(query, list(value_dict.values()) + list(key_dict.values()))
+
     def table_info(self, table_name):
         # type: (AnyStr) -> Dict[AnyStr, Dict[AnyStr, AnyStr]]
 
@@ -405,10 +623,20 @@ class DBConnection(object):
         """
         return (self.add_flag, self.remove_flag)[not bool(state)](flag_name)
 
+    def checkpoint(self):
+        # type: (...) -> None
+        """
+        write all WAL content back into the db file so that the file can be copied as a whole
+        """
+        if 'WAL' == db_journal_mode:
+            with self.write_lock:
+                try:
+                    self.connection.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchall()
+                except sqlite3.DatabaseError as e:
+                    logger.warning(f'Failed WAL checkpoint for {self.filename}: {ex(e)}')
+
     def close(self):
-        """Close database connection"""
-        if None is not getattr(self, 'connection', None):
-            self.connection.close()
+        """Release database connection, the pooled connection stays open for other users on the current thread"""
         self.connection = None
 
     def upgrade_log(self, to_log, log_level=logger.MESSAGE):
@@ -444,6 +672,7 @@ def _pretty_name(class_name):
 
 def _restore_database(filename, version):
     logger.log('Restoring database before trying upgrade again')
+    close_all()
     if not sickgear.helpers.restore_versioned_file(db_filename(filename=filename, suffix='v%s' % version), version):
         logger.log_error_and_exit('Database restore failed, abort upgrading database')
         return False
@@ -710,6 +939,10 @@ def migration_code(my_db):
         20013: sickgear.mainDB.AddHistoryHideColumn,
         20014: sickgear.mainDB.ChangeShowData,
         20015: sickgear.mainDB.ChangeTmdbID,
+        20016: sickgear.mainDB.AddShowStats,
+        20017: sickgear.mainDB.AddHistoryIndexes,
+        20018: sickgear.mainDB.AddDataVersion,
+        20019: sickgear.mainDB.AddEpisodeStatusVersion,
         # 20002: sickgear.mainDB.AddCoolSickGearFeature3,
     }
 
@@ -771,6 +1004,7 @@ def backup_database(db_connection, filename, version):
         return
 
     logger.log('Backing up database before upgrade')
+    db_connection.checkpoint()
     if not sickgear.helpers.backup_versioned_file(db_filename(filename), version):
         logger.log_error_and_exit('Database backup failed, abort upgrading database')
     else:
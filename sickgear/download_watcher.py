@@ -0,0 +1,341 @@
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Watch the completed TV downloads folder for new or changed releases to media process
+
+Only the top level of the folder is watched. On Linux, inotify wakes the watcher when an entry is created, moved in
+or written, elsewhere the mtime of the folder is polled, so an idle folder costs one stat per poll instead of a walk
+of the tree. A new or changed entry is queued once its tree is unchanged for a quiet time, so that files still being
+written or unpacked are left alone, and the media process job is woken to process the queued entries.
+
+The mtimes of processed entries are kept in a snapshot file, so unchanged entries are not queued again after a restart.
+"""
+
+from collections import OrderedDict
+import ctypes
+import ctypes.util
+import io
+import os
+import select
+import sys
+import threading
+import time
+
+from exceptions_helper import ex
+from json_helper import json_dumps, json_load
+from sg_helpers import write_file
+
+import sickgear
+from . import logger
+
+# noinspection PyUnreachableCode
+if False:
+    from typing import AnyStr, Dict, List, Optional, Tuple
+
+POLL_SECONDS = 10  # time between polls of the folder mtime without inotify
+RESCAN_SECONDS = 300  # time between scans with inotify, in case an event is missed
+CHECK_SECONDS = 5  # time between checks of entries that are not yet quiet
+QUIET_SECONDS = 30  # time an entry must be unchanged before it is queued
+MAX_QUEUED = 20  # entries queued at once, more are held back until the queue is taken
+
+
+class Inotify(object):
+    # IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+    # | IN_MOVE_SELF
+    mask = 0x002 | 0x004 | 0x008 | 0x040 | 0x080 | 0x100 | 0x200 | 0x400 | 0x800
+
+    def __init__(self, path):
+        # type: (AnyStr) -> None
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)  # type: int
+        if 0 > self.fd:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        if 0 > libc.inotify_add_watch(self.fd, os.fsencode(path), self.mask):
+            errno = ctypes.get_errno()
+            self.close()
+            raise OSError(errno, 'inotify_add_watch failed')
+
+    def wait(self, timeout):
+        # type: (float) -> bool
+        """
+        :param timeout: seconds to wait for an event
+        :return: True if there were events, they are read and discarded
+        """
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return False
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        if None is not self.fd:
+            os.close(self.fd)
+            self.fd = None
+
+
+def tree_signature(path):
+    # type: (AnyStr) -> Tuple[int, int, float]
+    """
+    :param path: file or folder
+    :return: count, total size and latest mtime of the files under path
+    """
+    count, size, mtime = 0, 0, 0
+    try:
+        if not os.path.isdir(path):
+            stat = os.stat(path)
+            return 1, stat.st_size, stat.st_mtime
+        for cur_path, cur_dirs, cur_files in os.walk(path):
+            mtime = max(mtime, os.stat(cur_path).st_mtime)
+            for cur_file in cur_files:
+                try:
+                    stat = os.stat(os.path.join(cur_path, cur_file))
+                except OSError:
+                    continue
+                count, size, mtime = count + 1, size + stat.st_size, max(mtime, stat.st_mtime)
+    except OSError:
+        pass
+    return count, size, mtime
+
+
+class DownloadWatcher(threading.Thread):
+    def __init__(self, snapshot_file=None, quiet_time=QUIET_SECONDS, max_queued=MAX_QUEUED, use_inotify=True):
+        # type: (Optional[AnyStr], int, int, bool) -> None
+        """
+        :param snapshot_file: file to keep the mtimes of processed entries in
+        :param quiet_time: seconds an entry must be unchanged before it is queued
+        :param max_queued: entries queued at once
+        :param use_inotify: use inotify where available, otherwise poll the folder mtime
+        """
+        super(DownloadWatcher, self).__init__()
+        self.name = 'WATCHDOWNLOADS'
+        self.snapshot_file = snapshot_file
+        self.quiet_time = quiet_time
+        self.max_queued = max_queued
+        self.use_inotify = use_inotify
+        self.lock = threading.Lock()
+        self._stopper = threading.Event()
+        self._inotify = None  # type: Optional[Inotify]
+        self._path = None  # type: Optional[AnyStr]
+        self._path_mtime = None  # type: Optional[float]
+        self._last_scan = 0  # type: float
+        self._changed = False
+        self._entries = {}  # type: Dict[AnyStr, float]
+        self._pending = {}  # type: Dict[AnyStr, Tuple[Optional[Tuple[int, int, float]], float]]
+        self._queued = OrderedDict()  # type: OrderedDict[AnyStr, None]
+
+    @staticmethod
+    def is_enabled():
+        # type: (...) -> bool
+        return bool(sickgear.PROCESS_AUTOMATICALLY and sickgear.MEDIAPROCESS_WATCH and sickgear.TV_DOWNLOAD_DIR
+                    and os.path.isabs(sickgear.TV_DOWNLOAD_DIR) and os.path.isdir(sickgear.TV_DOWNLOAD_DIR))
+
+    @property
+    def watching(self):
+        # type: (...) -> bool
+        """
+        :return: True if entries of the completed TV downloads folder are queued by this watcher
+        """
+        return self.is_alive() and self.is_enabled() and self._path == sickgear.TV_DOWNLOAD_DIR
+
+    def stopit(self):
+        self._stopper.set()
+
+    def run(self):
+        while not self._stopper.is_set():
+            if not self.is_enabled():
+                self._close()
+                self._path = None
+                # a disabled watcher is only rechecked every 30 seconds until enabled
+                self._stopper.wait(30)
+                continue
+
+            try:
+                self.check()
+            except (BaseException, Exception) as e:
+                logger.error(f'Failed to check {sickgear.TV_DOWNLOAD_DIR} for changes: {ex(e)}')
+
+            timeout = (POLL_SECONDS, RESCAN_SECONDS)[None is not self._inotify]
+            if self._pending:
+                timeout = min(timeout, CHECK_SECONDS)
+            if None is self._inotify:
+                self._stopper.wait(timeout)
+            else:
+                # wait in short steps so that stopit is noticed
+                end = time.time() + timeout
+                while not self._stopper.is_set() and time.time() < end:
+                    try:
+                        if self._inotify.wait(min(5, end - time.time())):
+                            self._changed = True
+                            break
+                    except (BaseException, Exception):
+                        self._close()
+                        break
+
+        with self.lock:
+            self.save_snapshot()
+        self._close()
+        # exiting thread
+        self._stopper.clear()
+
+    def _close(self):
+        if None is not self._inotify:
+            self._inotify.close()
+            self._inotify = None
+
+    def _set_path(self, path):
+        # type: (AnyStr) -> None
+        self._close()
+        self._path, self._path_mtime, self._changed = path, None, True
+        self._entries, self._pending = {}, {}
+        self._queued.clear()
+        self.load_snapshot()
+        if self.use_inotify and sys.platform.startswith('linux'):
+            try:
+                self._inotify = Inotify(path)
+            except (BaseException, Exception) as e:
+                logger.debug(f'Polling {path} for changes, inotify is not available: {ex(e)}')
+
+    def check(self, now=None):
+        # type: (Optional[float]) -> None
+        """
+        scan the folder if it changed, and queue entries that are quiet
+
+        :param now: time of the check
+        """
+        now = now or time.time()
+        with self.lock:
+            if self._path != sickgear.TV_DOWNLOAD_DIR:
+                self._set_path(sickgear.TV_DOWNLOAD_DIR)
+
+            if None is self._inotify:
+                try:
+                    path_mtime = os.stat(self._path).st_mtime
+                except OSError:
+                    return
+                if path_mtime != self._path_mtime:
+                    self._path_mtime, self._changed = path_mtime, True
+
+            if self._changed or RESCAN_SECONDS <= now - self._last_scan:
+                self._changed, self._last_scan = False, now
+                self._scan(now)
+
+            queued = self._pending and self._settle(now)
+
+        if queued and sickgear.process_media_scheduler:
+            sickgear.process_media_scheduler.action.wake()
+
+    def _scan(self, now):
+        # type: (float) -> None
+        names = set()
+        with os.scandir(self._path) as s_d:
+            for cur_entry in s_d:
+                names.add(cur_entry.name)
+                try:
+                    mtime = cur_entry.stat().st_mtime
+                except OSError:
+                    continue
+                if self._entries.get(cur_entry.name) != mtime and cur_entry.name not in self._pending \
+                        and cur_entry.name not in self._queued:
+                    self._pending[cur_entry.name] = (None, now)
+
+        for cur_name in set(self._entries) - names:
+            del self._entries[cur_name]
+        for cur_name in set(self._pending) - names:
+            del self._pending[cur_name]
+        for cur_name in set(self._queued) - names:
+            del self._queued[cur_name]
+
+    def _settle(self, now):
+        # type: (float) -> bool
+        queued = False
+        for cur_name, (cur_signature, cur_since) in list(self._pending.items()):
+            path = os.path.join(self._path, cur_name)
+            try:
+                if self._entries.get(cur_name) == os.stat(path).st_mtime:
+                    # changed back, or changed while it was processed
+                    del self._pending[cur_name]
+                    continue
+            except OSError:
+                del self._pending[cur_name]
+                continue
+            signature = tree_signature(path)
+            if signature != cur_signature:
+                self._pending[cur_name] = (signature, now)
+            elif self.quiet_time <= now - cur_since:
+                if self.max_queued <= len(self._queued):
+                    # held back until the queue is taken
+                    break
+                self._queued[cur_name] = None
+                del self._pending[cur_name]
+                queued = True
+
+        if queued:
+            logger.debug(f'Queued {len(self._queued)} changed entries of {self._path} to media process')
+        return queued
+
+    def take(self):
+        # type: (...) -> List[AnyStr]
+        """
+        :return: names of the queued entries, the queue is cleared
+        """
+        with self.lock:
+            names = list(self._queued)
+            self._queued.clear()
+        return names
+
+    def processed(self, names=None):
+        # type: (Optional[List[AnyStr]]) -> None
+        """
+        record the current mtime of processed entries, so that they are only queued again once changed
+
+        :param names: names of the processed entries, None for all entries of the folder
+        """
+        with self.lock:
+            path = self._path
+            if None is path:
+                return
+            if None is names:
+                try:
+                    with os.scandir(path) as s_d:
+                        names = [cur_entry.name for cur_entry in s_d]
+                except OSError:
+                    return
+                self._pending = {}
+                self._queued.clear()
+            for cur_name in names:
+                try:
+                    self._entries[cur_name] = os.stat(os.path.join(path, cur_name)).st_mtime
+                except OSError:
+                    self._entries.pop(cur_name, None)
+            self.save_snapshot()
+
+    def load_snapshot(self):
+        if self.snapshot_file and os.path.isfile(self.snapshot_file):
+            try:
+                with io.open(self.snapshot_file) as fh:
+                    data = json_load(fh)
+                if self._path == data.get('path'):
+                    self._entries = dict(data.get('entries') or {})
+            except (BaseException, Exception) as e:
+                logger.warning(f'Failed to load download watcher snapshot {self.snapshot_file}: {ex(e)}')
+
+    def save_snapshot(self):
+        if self.snapshot_file and self._path:
+            write_file(self.snapshot_file, json_dumps({'path': self._path, 'entries': self._entries}))
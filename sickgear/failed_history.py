@@ -18,6 +18,7 @@
 from sqlite3 import Cursor
 import datetime
 import re
+import threading
 
 from . import db, logger
 from .common import FAILED, WANTED, Quality, statusStrings
@@ -29,7 +30,13 @@ from _23 import unquote
 # noinspection PyUnresolvedReferences
 # noinspection PyUnreachableCode
 if False:
-    from typing import AnyStr, List, Optional, Tuple, Union
+    from typing import AnyStr, List, Optional, Set, Tuple, Union
+
+# prepared names of the releases in the failed table, a release not in this set has not failed, so the common answer
+# to has_failed does not need a query. Names are only added while running, a name left from a removed release costs
+# a query that finds nothing
+_failed_names = None  # type: Optional[Set[AnyStr]]
+_failed_names_lock = threading.Lock()
 
 
 def db_cmd(sql, params, select=True):
@@ -85,6 +92,19 @@ def prepare_failed_name(release):
     return fixed
 
 
+def load_failed_names():
+    # type: (...) -> Set[AnyStr]
+    """
+    (re)load the names of failed releases from the failed db
+
+    :return: set of prepared release names
+    """
+    global _failed_names
+    with _failed_names_lock:
+        _failed_names = set([cur_row['release'] for cur_row in db_select('SELECT `release` FROM failed', [])])
+    return _failed_names
+
+
 def add_failed(release):
     """
 
@@ -125,6 +145,7 @@ def add_failed(release):
 
     if not has_failed(release, size, provider):
         db_action('INSERT INTO failed (`release`, `size`, `provider`) VALUES (?, ?, ?)', [release, size, provider])
+        (_failed_names if None is not _failed_names else load_failed_names()).add(release)
 
     remove_snatched(release, size, provider)
 
@@ -207,8 +228,11 @@ def has_failed(release, size, provider='%'):
     :return: has failed
     :rtype: bool
     """
-    return any(db_select('SELECT * FROM failed t WHERE t.release=? AND t.size=? AND t.provider LIKE ?',
-                         [prepare_failed_name(release), size, provider]))
+    release = prepare_failed_name(release)
+    if release not in (_failed_names if None is not _failed_names else load_failed_names()):
+        return False
+    return any(db_select('SELECT * FROM failed t WHERE t.release=? AND t.size=? AND t.provider LIKE ? LIMIT 1',
+                         [release, size, provider]))
 
 
 def revert_episode(ep_obj):
@@ -16,16 +16,20 @@
 
 import copy
 import datetime
+import heapq
+import itertools
 import threading
+import time
+import weakref
 
-from . import db, logger
+from . import db, logger, metrics
 from .scheduler import Job
 from exceptions_helper import ex
 from six import integer_types
 
 # noinspection PyUnreachableCode
 if False:
-    from typing import AnyStr, Callable, Dict, List, Optional, Tuple, Union
+    from typing import AnyStr, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
     from .search_queue import BaseSearchQueueItem
     from .show_queue import ShowQueueItem
     from .people_queue import CastQueueItem
@@ -38,14 +42,161 @@ class QueuePriorities(object):
     VERYHIGH = 40
 
 
+def item_show_key(item):
+    # type: (QueueItem) -> Optional[AnyStr]
+    """
+    :param item: queue item
+    :return: tvid_prodid of the show of item, or None if item is not for a known show
+    """
+    show_obj = getattr(item, 'show_obj', None)
+    return show_obj and show_obj.tvid_prodid or None
+
+
+class PriorityItems(object):
+    """
+    items waiting in a queue, kept in a heap ordered by highest priority then oldest added
+
+    push and pop are O(log n), membership and the items of a show are found with O(1) lookups.
+    Iteration is in heap order, use ordered() to iterate in run order.
+    """
+    def __init__(self, items=None):
+        # type: (Optional[Iterable[QueueItem]]) -> None
+        self._heap = []  # type: List[Tuple[int, datetime.datetime, int, QueueItem]]
+        self._counter = itertools.count()
+        # the show key of an item is kept as indexed, so that a show key that changes while queued is still removed
+        self._items = {}  # type: Dict[QueueItem, Optional[AnyStr]]
+        self._by_show = {}  # type: Dict[AnyStr, List[QueueItem]]
+        for cur_item in items or []:
+            self._heap.append(self._entry(cur_item))
+            self._index(cur_item)
+        heapq.heapify(self._heap)
+
+    def _entry(self, item):
+        # type: (QueueItem) -> Tuple[int, datetime.datetime, int, QueueItem]
+        return -item.priority, item.added or datetime.datetime.min, next(self._counter), item
+
+    def _index(self, item):
+        # type: (QueueItem) -> None
+        show_key = self._items[item] = item_show_key(item)
+        if show_key:
+            self._by_show.setdefault(show_key, []).append(item)
+
+    def _unindex(self, item):
+        # type: (QueueItem) -> None
+        show_key = self._items.pop(item, None)
+        if show_key in self._by_show:
+            show_items = [i for i in self._by_show[show_key] if i is not item]
+            if show_items:
+                self._by_show[show_key] = show_items
+            else:
+                del self._by_show[show_key]
+
+    def push(self, item):
+        # type: (QueueItem) -> None
+        heapq.heappush(self._heap, self._entry(item))
+        self._index(item)
+
+    def peek(self):
+        # type: (...) -> Optional[QueueItem]
+        return self._heap and self._heap[0][-1] or None
+
+    def pop(self, can_run=None):
+        # type: (Optional[Callable[[QueueItem], bool]]) -> Optional[QueueItem]
+        """
+        remove and return the first item in run order
+
+        :param can_run: optional test, items that fail it are kept in the queue and the next item is tried
+        """
+        skipped, result = [], None
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            if not can_run or can_run(entry[-1]):
+                result = entry[-1]
+                self._unindex(result)
+                break
+            skipped.append(entry)
+        for cur_entry in skipped:
+            heapq.heappush(self._heap, cur_entry)
+        return result
+
+    def remove(self, item):
+        # type: (QueueItem) -> None
+        if item in self._items:
+            self._heap = [e for e in self._heap if e[-1] is not item]
+            heapq.heapify(self._heap)
+            self._unindex(item)
+
+    def for_show(self, show_key):
+        # type: (AnyStr) -> List[QueueItem]
+        """
+        :param show_key: tvid_prodid
+        :return: queued items of a show
+        """
+        return list(self._by_show.get(show_key, []))
+
+    def ordered(self):
+        # type: (...) -> List[QueueItem]
+        """
+        :return: items in the order they will run
+        """
+        return [e[-1] for e in sorted(self._heap)]
+
+    def __iter__(self):
+        # type: (...) -> Iterator[QueueItem]
+        return iter([e[-1] for e in self._heap])
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __bool__(self):
+        return 0 < len(self._heap)
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def __add__(self, other):
+        # type: (List) -> List
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        # type: (List) -> List
+        return list(other) + list(self)
+
+
+_queues = weakref.WeakSet()  # type: weakref.WeakSet[GenericQueue]
+
+
+def _queue_sizes(running=False):
+    # type: (bool) -> List[Tuple[Tuple[AnyStr], int]]
+    return [((cur_queue.queue_name,), len((cur_queue.queue, cur_queue.running)[running]))
+            for cur_queue in list(_queues)]
+
+
+metrics.gauge('queue_depth', 'Items waiting in a queue', ('queue',)).set_function(_queue_sizes)
+metrics.gauge('queue_running', 'Items running in a queue', ('queue',)).set_function(lambda: _queue_sizes(True))
+item_wait_seconds = metrics.histogram(
+    'queue_item_wait_seconds', 'Time from adding a queue item to its start', ('queue', 'item'),
+    buckets=metrics.SLOW_BUCKETS)
+item_run_seconds = metrics.histogram(
+    'queue_item_run_seconds', 'Run time of queue items', ('queue', 'item'), buckets=metrics.SLOW_BUCKETS)
+
+
 class GenericQueue(Job):
-    def __init__(self, cache_db_tables=None, main_db_tables=None):
-        # type: (List[AnyStr], List[AnyStr]) -> None
+    def __init__(self, cache_db_tables=None, main_db_tables=None, workers=1):
+        # type: (List[AnyStr], List[AnyStr], int) -> None
+        """
+
+        :param cache_db_tables: cache.db tables that hold the queue
+        :param main_db_tables: main db tables that hold the queue
+        :param workers: number of items to run at the same time, items of the same show never run together
+        """
         super(GenericQueue, self).__init__(self.job_run, silent=True, kwargs={}, reentrant_lock=True)
 
-        self.currentItem = None  # type: QueueItem or None
+        self.running = []  # type: List[Union[QueueItem, BaseSearchQueueItem, ShowQueueItem]]
+
+        self._queue = PriorityItems()  # type: PriorityItems
 
-        self.queue = []  # type: List[Union[QueueItem, BaseSearchQueueItem, ShowQueueItem]]
+        self.workers = max(1, workers)  # type: int
 
         self.queue_name = 'QUEUE'  # type: AnyStr
 
@@ -58,35 +209,94 @@ class GenericQueue(Job):
 
         self._id_counter = self._load_init_id()  # type: integer_types
 
-    def job_run(self):
+        _queues.add(self)
 
-        # only start a new task if one isn't already going
-        with self.lock:
-            if None is self.currentItem or not self.currentItem.is_alive():
+    @property
+    def queue(self):
+        # type: (...) -> PriorityItems
+        return self._queue
+
+    @queue.setter
+    def queue(self, items):
+        # type: (Iterable[QueueItem]) -> None
+        self._queue = PriorityItems(items)
 
-                # if the thread is dead then the current item should be finished
-                if self.currentItem:
-                    self.currentItem.finish()
-                    try:
-                        self.delete_item(self.currentItem, finished_run=True)
-                    except (BaseException, Exception):
-                        pass
-                    self.currentItem = None
+    @property
+    def currentItem(self):
+        # type: (...) -> Optional[Union[QueueItem, BaseSearchQueueItem, ShowQueueItem]]
+        """
+        first running item, a queue with more than one worker should use self.running
+        """
+        return self.running and self.running[0] or None
+
+    @currentItem.setter
+    def currentItem(self, item):
+        self.running = item and [item] or []
+
+    def _can_run(self, item):
+        # type: (QueueItem) -> bool
+        """
+        :return: True if item can start beside the running items
+        """
+        if item.priority < self.min_priority:
+            return False
+        if not self.running:
+            return True
+        # an item that is not for a known show runs alone
+        show_key = item_show_key(item)
+        running_keys = [item_show_key(i) for i in self.running]
+        return None is not show_key and None not in running_keys and show_key not in running_keys
 
-                # if there's something in the queue then run it in a thread and take it out of the queue
-                if 0 < len(self.queue):
+    def job_run(self):
 
-                    self.queue.sort(key=lambda y: (-y.priority, y.added))
-                    if self.queue[0].priority < self.min_priority:
-                        return
+        with self.lock:
+            # items that have run are finished and removed
+            for cur_item in [i for i in self.running if i.run_done or not i.is_alive()]:
+                cur_item.finish()
+                try:
+                    self.delete_item(cur_item, finished_run=True)
+                except (BaseException, Exception):
+                    pass
+                self.running.remove(cur_item)
+
+            # launch queue items in threads while there are free workers
+            while len(self.running) < self.workers and self.queue:
+                next_item = self.queue.peek()
+                # an item that runs alone waits for the running items, later items must not overtake it
+                if next_item.priority < self.min_priority or (self.running and None is item_show_key(next_item)):
+                    break
+                item = self.queue.pop(self._can_run)
+                if not item:
+                    break
+
+                if 'SEARCHQUEUE' != self.queue_name:
+                    item.name = self.queue_name + '-' + item.name
+                self.running.append(item)
+                self._start_item(item)
+
+            self.check_events()
+
+    def _start_item(self, item):
+        # type: (QueueItem) -> None
+        """
+        run item in its thread, and wake the queue when the item is done to start the next item without delay
+        """
+        item_run = item.run
+        labels = dict(queue=self.queue_name, item=item.__class__.__name__)
 
-                    # launch the queue item in a thread
-                    self.currentItem = self.queue.pop(0)
-                    if 'SEARCHQUEUE' != self.queue_name:
-                        self.currentItem.name = self.queue_name + '-' + self.currentItem.name
-                    self.currentItem.start()
+        def _run():
+            start = time.time()
+            if item.added:
+                item_wait_seconds.observe(max(0.0, (datetime.datetime.now() - item.added).total_seconds()), **labels)
+            try:
+                item_run()
+            finally:
+                item_run_seconds.observe(time.time() - start, **labels)
+                item.run_done = True
+                self.wake()
 
-                self.check_events()
+        item.run = _run
+        item.start()
 
     def _load_init_id(self):
         # type: (...) -> integer_types
@@ -112,7 +322,7 @@ class GenericQueue(Job):
         cl = self._clear_sql()
         try:
             with self.lock:
-                for item in ((self.currentItem and [self.currentItem]) or []) + self.queue:
+                for item in self.running + self.queue.ordered():
                     cl.extend(self._get_item_sql(item))
 
             if cl:
@@ -249,6 +459,7 @@ class GenericQueue(Job):
         logger.log('Un-pausing queue')
         with self.lock:
             self.min_priority = 0
+        self.wake()
 
     def add_item(self, item, add_to_db=True):
         """
@@ -262,11 +473,12 @@ class GenericQueue(Job):
         with self.lock:
             item.added = datetime.datetime.now()
             item.uid = item.uid or self._get_new_id()
-            self.queue.append(item)
+            self.queue.push(item)
             if add_to_db:
                 self.save_item(item)
 
-            return item
+        self.wake()
+        return item
 
     def check_events(self):
         pass
@@ -318,6 +530,7 @@ class QueueItem(threading.Thread):
         self.stop = threading.Event()
         self.added = None  # type: Optional[datetime.datetime]
         self.uid = uid  # type: integer_types
+        self.run_done = False  # type: bool
 
     def copy(self, deepcopy_obj=None):
         """
@@ -99,6 +99,16 @@ def is_parsable_date(text):
     return result
 
 
+RE_NON_RELEASE_GROUPS = [[re.compile(r'(?i)' + v) for v in [
+    r'([\s\.\-_\[\{\(]*(no-rar|nzbgeek|ripsalot|siklopentan)[\s\.\-_\]\}\)]*)$',
+    r'([\s\.\-_\[\{\(]rp[\s\.\-_\]\}\)]*)$',
+    r'(?<=\w)([\s\.\-_]*[\[\{\(][\s\.\-_]*(www\.\w+.\w+)[\s\.\-_]*[\]\}\)][\s\.\-_]*)$',
+    r'(?<=\w)([\s\.\-_]*[\[\{\(]\s*(rar(bg|tv)|((e[tz]|v)tv))[\s\.\-_]*[\]\}\)][\s\.\-_]*)$'] +
+    ([r'(?<=\w)([\s\.\-_]*[\[\{\(][\s\.\-_]*[\w\s\.\-\_]+[\s\.\-_]*[\]\}\)][\s\.\-_]*)$',
+      r'^([\s\.\-_]*[\[\{\(][\s\.\-_]*[\w\s\.\-\_]+[\s\.\-_]*[\]\}\)][\s\.\-_]*)(?=\w)'], [])[is_anime]]
+    for is_anime in (False, True)]
+
+
 def remove_non_release_groups(name, is_anime=False):
     """
     Remove non release groups from name
@@ -112,13 +122,7 @@ def remove_non_release_groups(name, is_anime=False):
     """
 
     if name:
-        rc = [re.compile(r'(?i)' + v) for v in [
-              r'([\s\.\-_\[\{\(]*(no-rar|nzbgeek|ripsalot|siklopentan)[\s\.\-_\]\}\)]*)$',
-              r'([\s\.\-_\[\{\(]rp[\s\.\-_\]\}\)]*)$',
-              r'(?<=\w)([\s\.\-_]*[\[\{\(][\s\.\-_]*(www\.\w+.\w+)[\s\.\-_]*[\]\}\)][\s\.\-_]*)$',
-              r'(?<=\w)([\s\.\-_]*[\[\{\(]\s*(rar(bg|tv)|((e[tz]|v)tv))[\s\.\-_]*[\]\}\)][\s\.\-_]*)$'] +
-              ([r'(?<=\w)([\s\.\-_]*[\[\{\(][\s\.\-_]*[\w\s\.\-\_]+[\s\.\-_]*[\]\}\)][\s\.\-_]*)$',
-                r'^([\s\.\-_]*[\[\{\(][\s\.\-_]*[\w\s\.\-\_]+[\s\.\-_]*[\]\}\)][\s\.\-_]*)(?=\w)'], [])[is_anime]]
+        rc = RE_NON_RELEASE_GROUPS[bool(is_anime)]
         rename = name = remove_extension(name)
         while rename:
             for regex in rc:
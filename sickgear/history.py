@@ -16,6 +16,7 @@
 
 from . import db
 import datetime
+import re
 
 from . import helpers, logger
 from .common import FAILED, SNATCHED, SNATCHED_PROPER, SUBTITLED, Quality
@@ -30,6 +31,15 @@ if False:
 dateFormat = '%Y%m%d%H%M%S'
 
 
+def resource_name(resource):
+    # type: (AnyStr) -> AnyStr
+    """
+    :param resource: history resource, a release name or a file path
+    :return: lower case file name of the resource, that history rows are looked up by
+    """
+    return re.split(r'[\\/]', resource or '')[-1].lower()
+
+
 def _log_history_item(action, tvid, prodid, season, episode, quality, resource, provider, version=-1):
     # type: (int, int, int, int, int, int, AnyStr, AnyStr, int) -> None
     """
@@ -48,9 +58,10 @@ def _log_history_item(action, tvid, prodid, season, episode, quality, resource,
     my_db = db.DBConnection()
     my_db.action(
         'INSERT INTO history'
-        ' (action, date, showid, season, episode, quality, resource, provider, version, indexer, hide)'
-        ' VALUES (?,?,?,?,?,?,?,?,?,?,?)',
-        [action, log_date, int(prodid), int(season), int(episode), quality, resource, provider, version, int(tvid), 0])
+        ' (action, date, showid, season, episode, quality, resource, resource_name, provider, version, indexer, hide)'
+        ' VALUES (?,?,?,?,?,?,?,?,?,?,?,?)',
+        [action, log_date, int(prodid), int(season), int(episode), quality, resource, resource_name(resource),
+         provider, version, int(tvid), 0])
 
 
 def log_snatch(search_result):
@@ -0,0 +1,137 @@
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+iCalendar (iCal) feed of the episodes of continuing shows, RFC 5546 <https://datatracker.ietf.org/doc/html/rfc5546>
+
+Triggers on tv_shows and tv_episodes raise the episodes version in the main db table data_version when data shown in
+the feed changes. A feed body is built with one query and kept in memory for the version, the day and the filters of a
+request, so calendar apps that poll the feed get the kept body, or a not modified response to a conditional request.
+"""
+
+from collections import OrderedDict
+import datetime
+import hashlib
+import threading
+import time
+
+from . import db, helpers, network_timezones
+
+from lib.dateutil import tz
+
+# noinspection PyUnreachableCode
+if False:
+    from typing import AnyStr, Dict, Iterator, List, Optional, Set, Tuple
+
+APP_NAME = 'SickGear'
+PAST_WEEKS = 52
+FUTURE_DAYS = 364
+CACHE_SIZE = 8
+
+CRLF = '\r\n'
+
+_cache = OrderedDict()  # type: OrderedDict[Tuple, AnyStr]
+_cache_lock = threading.Lock()
+
+
+class CalendarFeed(object):
+    def __init__(self, days=None, shows=None):
+        # type: (Optional[int], Optional[List[Tuple[int, int]]]) -> None
+        """
+        :param days: number of days ahead to list episodes for, at most FUTURE_DAYS
+        :param shows: list of (tvid, prodid) to limit the feed to
+        """
+        self.today = datetime.date.today()  # type: datetime.date
+        self.days = FUTURE_DAYS if None is days else min(max(1, days), FUTURE_DAYS)  # type: int
+        self.shows = shows and set(shows) or None  # type: Optional[Set[Tuple[int, int]]]
+        version, changed = db.data_version('episodes')
+        self.key = (version, self.today.toordinal(), self.days,
+                    self.shows and tuple(sorted(self.shows)))  # type: Tuple
+        # the body also changes at the start of a day
+        self.last_modified = max(changed, int(time.mktime(self.today.timetuple())))  # type: int
+
+    @property
+    def etag(self):
+        # type: (...) -> AnyStr
+        return '"%s"' % hashlib.md5(repr(self.key).encode('utf-8')).hexdigest()
+
+    def body(self):
+        # type: (...) -> AnyStr
+        """
+        :return: iCal text of the feed, built once per key
+        """
+        with _cache_lock:
+            body = _cache.get(self.key)
+            if None is body:
+                body = ''.join(self._lines())
+                _cache[self.key] = body
+                while CACHE_SIZE < len(_cache):
+                    _cache.popitem(last=False)
+            else:
+                _cache.move_to_end(self.key)
+        return body
+
+    def _episodes(self):
+        # type: (...) -> List[Dict]
+        return db.DBConnection().select(
+            'SELECT s.show_name, s.indexer AS tv_id, s.indexer_id AS prod_id, s.network, s.airs, s.runtime,'
+            ' ep.name, ep.season, ep.episode, ep.description, ep.airdate'
+            ' FROM tv_shows s'
+            ' JOIN tv_episodes ep ON ep.indexer = s.indexer AND ep.showid = s.indexer_id'
+            ' WHERE (s.status = \'Continuing\' OR s.status = \'Returning Series\') AND s.paused != \'1\''
+            ' AND ep.airdate >= ? AND ep.airdate < ?'
+            ' ORDER BY ep.airdate, s.show_name, ep.season, ep.episode',
+            [(self.today + datetime.timedelta(weeks=-PAST_WEEKS)).toordinal(),
+             (self.today + datetime.timedelta(days=self.days)).toordinal()])
+
+    def _lines(self):
+        # type: (...) -> Iterator[AnyStr]
+        utc = tz.gettz('GMT', zoneinfo_priority=True)
+        nl = '\\n\\n'
+        today = self.today.isoformat()
+
+        yield 'BEGIN:VCALENDAR%sVERSION:2.0%sX-WR-CALNAME:%s%sX-WR-CALDESC:%s%sPRODID://%s Upcoming Episodes//%s' \
+              % (CRLF, CRLF, APP_NAME, CRLF, APP_NAME, CRLF, APP_NAME, CRLF)
+
+        # air time, timezone and runtime only change per show
+        show_times = {}
+        for cur_row in self._episodes():
+            show_key = (cur_row['tv_id'], cur_row['prod_id'])
+            if self.shows and show_key not in self.shows:
+                continue
+            if show_key not in show_times:
+                network_tz = network_timezones.get_network_timezone(cur_row['network'])
+                show_times[show_key] = (network_timezones.parse_time(cur_row['airs'] or ''),
+                                        network_tz or cur_row['network'],
+                                        datetime.timedelta(minutes=helpers.try_int(cur_row['runtime'], 60)))
+            airs, network, runtime = show_times[show_key]
+
+            air_date_time = network_timezones.parse_date_time(cur_row['airdate'], airs, network).astimezone(utc)
+            air_date_time_end = air_date_time + runtime
+
+            desc = '' if not cur_row['description'] else f'{nl}{cur_row["description"].splitlines()[0]}'
+            yield (f'BEGIN:VEVENT{CRLF}'
+                   f'DTSTART:{air_date_time.strftime("%Y%m%dT%H%M%S")}Z{CRLF}'
+                   f'DTEND:{air_date_time_end.strftime("%Y%m%dT%H%M%S")}Z{CRLF}'
+                   f'SUMMARY:{cur_row["show_name"]} - {cur_row["season"]}x{cur_row["episode"]}'
+                   f' - {cur_row["name"]}{CRLF}'
+                   f'UID:{APP_NAME}-{today}-{cur_row["show_name"].replace(" ", "-")}'
+                   f'-E{cur_row["episode"]}S{cur_row["season"]}{CRLF}'
+                   f'DESCRIPTION:{(cur_row["airs"] or "(Unknown airs)")} on {(cur_row["network"] or "Unknown network")}'
+                   f'{desc}{CRLF}'
+                   f'END:VEVENT{CRLF}')
+
+        yield 'END:VCALENDAR'
@@ -19,22 +19,23 @@ import datetime
 import logging
 import glob
 import os
+import queue
 import re
 import sys
 import threading
 import time
 import zipfile
 
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 
 import sickgear
 from . import classes
 from .sgdatetime import SGDatetime
-from sg_helpers import md5_for_text, remove_file_perm
+from sg_helpers import remove_file_perm
 
 # noinspection PyUnreachableCode
 if False:
-    from typing import AnyStr, Union
+    from typing import Any, AnyStr, Callable, Union
 
 try:
     # noinspection PyUnresolvedReferences
@@ -58,6 +59,37 @@ class NullHandler(logging.Handler):
         pass
 
 
+class AsyncHandler(QueueHandler):
+    """
+    hand log records to a thread that writes them with a target handler, so that a slow disk never blocks the thread
+    that logs
+    """
+    def __init__(self, target):
+        # type: (logging.Handler) -> None
+        super(AsyncHandler, self).__init__(queue.SimpleQueue())
+        self.target = target
+        self.setLevel(target.level)
+        self.listener = QueueListener(self.queue, target, respect_handler_level=True)
+        self.listener.start()
+
+    def setLevel(self, level):
+        super(AsyncHandler, self).setLevel(level)
+        if getattr(self, 'target', None):
+            self.target.setLevel(level)
+
+    def close(self):
+        if threading.current_thread() is self.listener._thread:
+            # the listener can not join itself, so it stops once it has handled the current record
+            self.listener.enqueue_sentinel()
+            self.listener._thread = None
+        elif self.listener._thread:
+            # write the records that are waiting before the file is closed
+            self.listener.stop()
+        self.target.flush()
+        self.target.close()
+        super(AsyncHandler, self).close()
+
+
 class SBRotatingLogHandler(object):
     def __init__(self, log_file):
         """
@@ -71,6 +103,8 @@ class SBRotatingLogHandler(object):
         self.h_console = None
 
         self.console_logging = False  # type: bool
+        # lowest level that a handler writes, messages below it are dropped before they are formatted
+        self.min_level = 0  # type: int
         self.log_lock = threading.Lock()
         self.log_types = ['sickgear', 'tornado.application', 'tornado.general', 'subliminal', 'adba', 'encodingKludge',
                           'tvdb.api', 'TVInfo', 'tvdb_v4.api']
@@ -140,6 +174,8 @@ class SBRotatingLogHandler(object):
         h_file = TimedCompressedRotatingFileHandler(self.log_file_path, logger=self)
         h_file.setLevel(reverseNames[sickgear.FILE_LOGGING_PRESET])
         h_file.setFormatter(DispatchingFormatter(self._formatters(False), logging.Formatter('%(message)s'), ))
+        if sickgear.FILE_LOGGING_ASYNC:
+            h_file = AsyncHandler(h_file)
         self.h_file = h_file
 
         for logger_name in self.external_loggers:
@@ -159,6 +195,11 @@ class SBRotatingLogHandler(object):
             self.close_log(old_h_file)
         if old_h_console:
             self.close_log(old_h_console)
+        self.set_min_level()
+
+    def set_min_level(self):
+        levels = [h.level for h in (self.h_file, self.h_console) if h]
+        self.min_level = levels and min(levels) or 0
 
     def _formatters(self, log_simple=True):
         """
@@ -194,23 +235,18 @@ class SBRotatingLogHandler(object):
         :param log_level: log level
         """
         mem_key = 'logger'
+        sb_logger = logging.getLogger('sickgear')
         for to_log in log_list:
-            log_id = md5_for_text(to_log)
+            # drop a repeat of the last message within 2 seconds
+            log_id = str(to_log)
             now = SGDatetime.timestamp_near()
             expired = now > sickgear.MEMCACHE.get(mem_key, {}).get(log_id, 0)
-            sickgear.MEMCACHE[mem_key] = {}
-            sickgear.MEMCACHE[mem_key][log_id] = 2 + now
+            sickgear.MEMCACHE[mem_key] = {log_id: 2 + now}
             if not expired:
                 continue
 
             out_line = '%s :: %s' % (threading.current_thread().name, to_log)
 
-            sb_logger = logging.getLogger('sickgear')
-            setattr(sb_logger, 'db', lambda *args: sb_logger.log(DB, *args))
-
-            # sub_logger = logging.getLogger('subliminal')
-            # tornado_logger = logging.getLogger('tornado')
-
             try:
                 if DEBUG == log_level:
                     sb_logger.debug(out_line)
@@ -223,7 +259,7 @@ class SBRotatingLogHandler(object):
                     # add errors to the UI logger
                     classes.ErrorViewer.add(classes.UIError(out_line))
                 elif DB == log_level:
-                    sb_logger.db(out_line)
+                    sb_logger.log(DB, out_line)
                 else:
                     sb_logger.log(log_level, out_line)
             except ValueError:
@@ -327,8 +363,12 @@ class TimedCompressedRotatingFileHandler(TimedRotatingFileHandler):
         dfn = '%s_%s.log' % (file_name, time.strftime(self.suffix, start_time))
         self.delete_logfile(dfn)
 
-        self.logger_instance.close_log()
-        self.logger_instance.h_file = self.logger_instance.h_console = None
+        # with async logging the rollover runs in the listener thread, so only the file of this handler is swapped
+        h_file = self.logger_instance.h_file
+        swap_file = isinstance(h_file, AsyncHandler) and self is h_file.target
+        if not swap_file:
+            self.logger_instance.close_log()
+            self.logger_instance.h_file = self.logger_instance.h_console = None
 
         try:
             self.stream.close()
@@ -340,7 +380,8 @@ class TimedCompressedRotatingFileHandler(TimedRotatingFileHandler):
         except (BaseException, Exception):
             pass
 
-        self.logger_instance.init_logging()
+        if not swap_file:
+            self.logger_instance.init_logging()
 
         if self.encoding:
             self.stream = codecs.open(self.baseFilename, 'w', self.encoding)
@@ -385,37 +426,63 @@ class TimedCompressedRotatingFileHandler(TimedRotatingFileHandler):
 sb_log_instance = SBRotatingLogHandler('sickgear.log')
 
 
-def debug(to_log):
-    # type: (AnyStr) -> None
+def is_enabled(log_level):
+    # type: (int) -> bool
+    """
+    :param log_level: log level
+    :return: True if messages of log_level are written, use it to skip work that only builds a log message
+    """
+    return log_level >= sb_log_instance.min_level
+
+
+def _message(to_log, args):
+    # type: (Union[AnyStr, Callable[[], AnyStr]], tuple) -> AnyStr
+    if callable(to_log):
+        to_log = to_log()
+    return args and to_log % args or to_log
+
+
+def debug(to_log, *args):
+    # type: (Union[AnyStr, Callable[[], AnyStr]], Any) -> None
     """ log message flagged as debug
-    :param to_log: log message
+
+    the message is only formatted when debug messages are written, so pass values as args of a % format string
+    or pass a function that returns the message, e.g. debug('Found %s in %s', name, path)
+
+    :param to_log: log message, a % format string for args, or a function that returns the message
+    :param args: values for the format string
     """
-    sb_log_instance.log(to_log, DEBUG)
+    if DEBUG >= sb_log_instance.min_level:
+        sb_log_instance.log(_message(to_log, args), DEBUG)
 
 
-def warning(to_log):
-    # type: (AnyStr) -> None
+def warning(to_log, *args):
+    # type: (Union[AnyStr, Callable[[], AnyStr]], Any) -> None
     """ log message flagged as warning
-    :param to_log: log message
+    :param to_log: log message, a % format string for args, or a function that returns the message
+    :param args: values for the format string
     """
-    sb_log_instance.log(to_log, WARNING)
+    if WARNING >= sb_log_instance.min_level:
+        sb_log_instance.log(_message(to_log, args), WARNING)
 
 
-def error(to_log):
-    # type: (AnyStr) -> None
+def error(to_log, *args):
+    # type: (Union[AnyStr, Callable[[], AnyStr]], Any) -> None
     """ log message flagged as error
-    :param to_log: log message
+    :param to_log: log message, a % format string for args, or a function that returns the message
+    :param args: values for the format string
     """
-    sb_log_instance.log(to_log, ERROR)
+    sb_log_instance.log(_message(to_log, args), ERROR)
 
 
 def log(to_log, log_level=MESSAGE):
-    # type: (Union[AnyStr, list], int) -> None
+    # type: (Union[AnyStr, list, Callable[[], AnyStr]], int) -> None
     """
-    :param to_log: log message
+    :param to_log: log message, list of log messages, or a function that returns the message
     :param log_level: log level
     """
-    sb_log_instance.log(to_log, log_level)
+    if log_level >= sb_log_instance.min_level:
+        sb_log_instance.log(_message(to_log, ()), log_level)
 
 
 def log_error_and_exit(error_msg):
@@ -446,6 +513,7 @@ def close():
 def log_set_level():
     if sb_log_instance.h_file:
         sb_log_instance.h_file.setLevel(reverseNames[sickgear.FILE_LOGGING_PRESET])
+        sb_log_instance.set_min_level()
 
 
 def current_log_file():
@@ -0,0 +1,217 @@
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Index of the folders and files of show folders
+
+The media_dirs and media_files tables of the cache db hold the size and modify time of each folder and file under a
+show folder. A refresh stats each indexed folder and only lists the folders whose modify time changed, so that the
+size and media stats of a show folder on a network share are answered without a stat of every file. Post-processing
+and deletes update single files, so changes that keep a folder modify time are also seen.
+"""
+
+import os
+import threading
+import time
+
+from exceptions_helper import ex
+
+from . import db, logger
+from .helpers import has_media_ext
+
+# noinspection PyUnreachableCode
+if False:
+    from typing import AnyStr, Dict, List, Optional, Tuple
+
+# a folder modified this close to a scan may change again within its modify time resolution, so rescan it next time
+RACY_SECONDS = 2
+
+_refresh_lock = threading.Lock()
+
+
+def _subtree_sql(column):
+    # type: (AnyStr) -> AnyStr
+    # a range on the path column instead of LIKE keeps the lookup on the index
+    return '(%s = ? OR (%s >= ? AND %s < ?))' % (column, column, column)
+
+
+def _subtree_args(path):
+    # type: (AnyStr) -> List[AnyStr]
+    return [path, path + os.sep, path + chr(ord(os.sep) + 1)]
+
+
+def refresh(path):
+    # type: (AnyStr) -> bool
+    """
+    bring the index of a folder tree up to date
+
+    :param path: show folder
+    :return: True if the folder exists
+    """
+    path = os.path.normpath(path)
+    with _refresh_lock:
+        my_db = db.DBConnection('cache.db')
+        known = {}  # type: Dict[AnyStr, float]
+        children = {}  # type: Dict[AnyStr, List[AnyStr]]
+        for cur_row in my_db.select('SELECT path, parent, mtime FROM media_dirs WHERE %s' % _subtree_sql('path'),
+                                    _subtree_args(path)):
+            known[cur_row['path']] = cur_row['mtime']
+            children.setdefault(cur_row['parent'], []).append(cur_row['path'])
+
+        cl = []
+        seen = set()
+        now = time.time()
+        pending = [(path, None)]
+        while pending:
+            cur_path, parent = pending.pop()
+            try:
+                dir_stat = os.stat(cur_path)
+            except OSError:
+                continue
+            seen.add(cur_path)
+            mtime = dir_stat.st_mtime
+            if mtime and known.get(cur_path) == mtime:
+                # no file or folder added, removed or renamed in this folder
+                pending += [(cur_child, cur_path) for cur_child in children.get(cur_path, [])]
+                continue
+
+            files = []
+            try:
+                with os.scandir(cur_path) as s_d:
+                    for cur_entry in s_d:
+                        if cur_entry.is_dir(follow_symlinks=False):
+                            pending.append((cur_entry.path, cur_path))
+                        else:
+                            entry_stat = cur_entry.stat(follow_symlinks=False)
+                            files.append([cur_path, cur_entry.name, entry_stat.st_size, entry_stat.st_mtime,
+                                          int(has_media_ext(cur_entry.name))])
+            except OSError as e:
+                logger.warning(f'Unable to list folder {cur_path}: {ex(e)}')
+                continue
+
+            cl += [['DELETE FROM media_files WHERE dir = ?', [cur_path]]]
+            cl += [['INSERT INTO media_files (dir, name, size, mtime, media) VALUES (?,?,?,?,?)', cur_file]
+                   for cur_file in files]
+            cl += [['REPLACE INTO media_dirs (path, parent, size, mtime) VALUES (?,?,?,?)',
+                    [cur_path, parent, dir_stat.st_size, (mtime, 0)[RACY_SECONDS > now - mtime]]]]
+
+        for cur_path in set(known) - seen:
+            cl += [['DELETE FROM media_dirs WHERE path = ?', [cur_path]],
+                   ['DELETE FROM media_files WHERE dir = ?', [cur_path]]]
+
+        if cl:
+            my_db.mass_action(cl)
+    return path in seen
+
+
+def update_path(path):
+    # type: (AnyStr) -> None
+    """
+    update the index entry of a file that was created, changed, moved or deleted
+
+    :param path: file path
+    """
+    path = os.path.normpath(path)
+    folder, name = os.path.split(path)
+    my_db = db.DBConnection('cache.db')
+    if not my_db.select('SELECT 1 FROM media_dirs WHERE path = ?', [folder]):
+        # an unindexed folder, e.g. a new season folder, is listed by the next refresh of its show folder
+        return
+    try:
+        file_stat = os.stat(path, follow_symlinks=False)
+    except OSError:
+        my_db.action('DELETE FROM media_files WHERE dir = ? AND name = ?', [folder, name])
+        return
+    if not os.path.isdir(path):
+        my_db.action('REPLACE INTO media_files (dir, name, size, mtime, media) VALUES (?,?,?,?,?)',
+                     [folder, name, file_stat.st_size, file_stat.st_mtime, int(has_media_ext(name))])
+
+
+def remove_tree(path):
+    # type: (AnyStr) -> None
+    """
+    drop the index of a folder tree, e.g. a deleted show folder
+
+    :param path: folder
+    """
+    path = os.path.normpath(path)
+    db.DBConnection('cache.db').mass_action([
+        ['DELETE FROM media_dirs WHERE %s' % _subtree_sql('path'), _subtree_args(path)],
+        ['DELETE FROM media_files WHERE %s' % _subtree_sql('dir'), _subtree_args(path)]])
+
+
+def _size(path):
+    # type: (AnyStr) -> int
+    my_db = db.DBConnection('cache.db')
+    files = my_db.select('SELECT SUM(size) AS size FROM media_files WHERE %s' % _subtree_sql('dir'),
+                         _subtree_args(path))
+    dirs = my_db.select('SELECT SUM(size) AS size FROM media_dirs WHERE path != ? AND %s' % _subtree_sql('path'),
+                        [path] + _subtree_args(path))
+    return int((files[0]['size'] or 0) + (dirs[0]['size'] or 0))
+
+
+def _media_stats(path):
+    # type: (AnyStr) -> Tuple[int, int, int, int]
+    sql_result = db.DBConnection('cache.db').select(
+        'SELECT COUNT(*) AS num_files, MIN(size) AS smallest, MAX(size) AS largest, SUM(size) AS total'
+        ' FROM media_files WHERE media = 1 AND %s' % _subtree_sql('dir'), _subtree_args(path))
+    num_files = sql_result[0]['num_files']
+    if not num_files:
+        return 0, 0, 0, 0
+    return num_files, int(sql_result[0]['smallest']), int(sql_result[0]['largest']), \
+        int(sql_result[0]['total'] / num_files)
+
+
+def get_size(path):
+    # type: (AnyStr) -> int
+    """
+    indexed version of helpers.get_size for a folder
+
+    :param path: folder
+    :return: combined size of the files and folders in the folder tree
+    """
+    path = os.path.normpath(path)
+    if not refresh(path):
+        return 0
+    return _size(path)
+
+
+def get_media_stats(path):
+    # type: (AnyStr) -> Tuple[int, int, int, int]
+    """
+    indexed version of helpers.get_media_stats for a folder
+
+    :param path: folder
+    :return: number of media files, smallest size in bytes, largest size in bytes, average size in bytes
+    """
+    path = os.path.normpath(path)
+    if not refresh(path):
+        return 0, 0, 0, 0
+    return _media_stats(path)
+
+
+def get_size_and_media_stats(path):
+    # type: (AnyStr) -> Tuple[int, Tuple[int, int, int, int]]
+    """
+    get_size and get_media_stats of a folder with one refresh of the index
+
+    :param path: folder
+    :return: combined size of the folder tree, and its media stats as get_media_stats returns them
+    """
+    path = os.path.normpath(path)
+    if not refresh(path):
+        return 0, (0, 0, 0, 0)
+    return _size(path), _media_stats(path)
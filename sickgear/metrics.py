@@ -0,0 +1,301 @@
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Counters, gauges and histograms of the running app
+
+A metric is registered once by name with the names of its labels, and each set of label values is a separate series.
+Values are only held in memory, so they start from zero when the app starts. The registry is rendered in the
+Prometheus text format for the /metrics endpoint, and as a summary dict for the UI.
+"""
+
+import bisect
+import contextlib
+import threading
+import time
+
+# noinspection PyUnreachableCode
+if False:
+    from typing import Any, AnyStr, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+PREFIX = 'sickgear_'
+
+# upper bounds in seconds of the buckets of a histogram
+DEFAULT_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60)
+FAST_BUCKETS = (.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+SLOW_BUCKETS = (.01, .1, .5, 1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+started = time.time()
+
+
+def _escape(value):
+    # type: (Any) -> AnyStr
+    return ('%s' % value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _number(value):
+    # type: (Union[int, float]) -> AnyStr
+    if float('inf') == value:
+        return '+Inf'
+    return ('%s' % value, '%d' % value)[isinstance(value, float) and value.is_integer()]
+
+
+class Metric(object):
+    kind = 'untyped'
+
+    def __init__(self, name, description, label_names=()):
+        # type: (AnyStr, AnyStr, Iterable[AnyStr]) -> None
+        """
+        :param name: metric name without the app prefix
+        :param description: help text
+        :param label_names: names of the labels of each series
+        """
+        self.name = PREFIX + name  # type: AnyStr
+        self.description = description  # type: AnyStr
+        self.label_names = tuple(label_names)  # type: Tuple[AnyStr, ...]
+        self.lock = threading.Lock()
+        self._series = {}  # type: Dict[Tuple[AnyStr, ...], Any]
+        self._function = None  # type: Optional[Callable[[], Iterable[Tuple[Tuple, Any]]]]
+
+    def _key(self, labels):
+        # type: (Dict) -> Tuple[AnyStr, ...]
+        return tuple(['%s' % labels.get(cur_name, '') for cur_name in self.label_names])
+
+    def set_function(self, func):
+        # type: (Callable[[], Iterable[Tuple[Tuple, Any]]]) -> None
+        """
+        read the series from a function when the metric is collected instead of updating them as they change
+
+        :param func: function that returns (label values, value) pairs
+        """
+        self._function = func
+
+    def series(self):
+        # type: (...) -> List[Tuple[Tuple[AnyStr, ...], Any]]
+        """
+        :return: (label values, value) pairs sorted by label values
+        """
+        if self._function:
+            try:
+                return sorted([(tuple(['%s' % v for v in k]), v) for k, v in self._function()])
+            except (BaseException, Exception):
+                return []
+        with self.lock:
+            return sorted([(k, self._copy(v)) for k, v in self._series.items()])
+
+    @staticmethod
+    def _copy(value):
+        return value
+
+    def clear(self):
+        with self.lock:
+            self._series = {}
+
+    def _labels(self, key, extra=None):
+        # type: (Tuple[AnyStr, ...], Optional[Tuple[AnyStr, AnyStr]]) -> AnyStr
+        pairs = list(zip(self.label_names, key)) + ([], [extra])[None is not extra]
+        if not pairs:
+            return ''
+        return '{%s}' % ','.join(['%s="%s"' % (n, _escape(v)) for n, v in pairs])
+
+    def samples(self):
+        # type: (...) -> Iterator[AnyStr]
+        for key, value in self.series():
+            yield '%s%s %s' % (self.name, self._labels(key), _number(value))
+
+    def summary(self):
+        # type: (...) -> List[Dict]
+        return [dict(labels=dict(zip(self.label_names, k)), value=v) for k, v in self.series()]
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        # type: (Union[int, float], Any) -> None
+        key = self._key(labels)
+        with self.lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels):
+        # type: (Any) -> Union[int, float]
+        with self.lock:
+            return self._series.get(self._key(labels), 0)
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        # type: (Union[int, float], Any) -> None
+        with self.lock:
+            self._series[self._key(labels)] = value
+
+    def dec(self, amount=1, **labels):
+        # type: (Union[int, float], Any) -> None
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, description, label_names=(), buckets=DEFAULT_BUCKETS):
+        # type: (AnyStr, AnyStr, Iterable[AnyStr], Iterable[float]) -> None
+        """
+        :param buckets: upper bounds of the buckets, a +Inf bucket is added
+        """
+        super(Histogram, self).__init__(name, description, label_names)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)  # type: Tuple[float, ...]
+
+    def observe(self, value, **labels):
+        # type: (float, Any) -> None
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self._series.get(key)
+            if None is series:
+                # bucket counts, sum, count, max
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0, 0.0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+            series[3] = max(series[3], value)
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        """
+        observe the run time of a with block
+        """
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.observe(time.time() - start, **labels)
+
+    @staticmethod
+    def _copy(value):
+        return [list(value[0])] + value[1:]
+
+    def value(self, **labels):
+        # type: (Any) -> Dict[AnyStr, Union[int, float]]
+        """
+        :return: count and sum of the observed values of a series
+        """
+        with self.lock:
+            series = self._series.get(self._key(labels))
+            return dict(count=series and series[2] or 0, sum=series and series[1] or 0.0)
+
+    def samples(self):
+        # type: (...) -> Iterator[AnyStr]
+        for key, (counts, total, count, _) in self.series():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield '%s_bucket%s %s' % (self.name, self._labels(key, ('le', _number(float(bound)))), cumulative)
+            yield '%s_sum%s %s' % (self.name, self._labels(key), _number(round(total, 6)))
+            yield '%s_count%s %s' % (self.name, self._labels(key), count)
+
+    def _quantile(self, counts, count, q):
+        # type: (List[int], int, float) -> Optional[float]
+        # upper bound of the bucket that holds the quantile
+        rank, cumulative = q * count, 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                return bound
+        return None
+
+    def summary(self):
+        # type: (...) -> List[Dict]
+        result = []
+        for key, (counts, total, count, maximum) in self.series():
+            p95 = self._quantile(counts, count, .95)
+            result.append(dict(labels=dict(zip(self.label_names, key)), count=count, sum=round(total, 6),
+                               avg=count and round(total / count, 6) or 0, max=round(maximum, 6),
+                               p95=(p95, round(maximum, 6))[float('inf') == p95]))
+        return result
+
+
+class Registry(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}  # type: Dict[AnyStr, Metric]
+
+    def _register(self, cls, name, description, label_names, **kwargs):
+        # type: (type, AnyStr, AnyStr, Iterable[AnyStr], Any) -> Union[Counter, Gauge, Histogram]
+        with self.lock:
+            metric = self.metrics.get(name)
+            if None is metric:
+                metric = self.metrics[name] = cls(name, description, label_names, **kwargs)
+            elif not isinstance(metric, cls) or metric.label_names != tuple(label_names):
+                raise ValueError('metric %s is already registered as a different type or with other labels' % name)
+            return metric
+
+    def counter(self, name, description, label_names=()):
+        # type: (AnyStr, AnyStr, Iterable[AnyStr]) -> Counter
+        return self._register(Counter, name, description, label_names)
+
+    def gauge(self, name, description, label_names=()):
+        # type: (AnyStr, AnyStr, Iterable[AnyStr]) -> Gauge
+        return self._register(Gauge, name, description, label_names)
+
+    def histogram(self, name, description, label_names=(), buckets=DEFAULT_BUCKETS):
+        # type: (AnyStr, AnyStr, Iterable[AnyStr], Iterable[float]) -> Histogram
+        return self._register(Histogram, name, description, label_names, buckets=buckets)
+
+    def _sorted(self):
+        # type: (...) -> List[Metric]
+        with self.lock:
+            return [self.metrics[k] for k in sorted(self.metrics)]
+
+    def render(self):
+        # type: (...) -> AnyStr
+        """
+        :return: all metrics in the Prometheus text exposition format
+        """
+        lines = []
+        for cur_metric in self._sorted():
+            lines += ['# HELP %s %s' % (cur_metric.name, _escape(cur_metric.description)),
+                      '# TYPE %s %s' % (cur_metric.name, cur_metric.kind)]
+            lines += list(cur_metric.samples())
+        return '\n'.join(lines) + '\n'
+
+    def summary(self):
+        # type: (...) -> Dict[AnyStr, Dict]
+        """
+        :return: metric name without the app prefix mapped to its kind, help text and series
+        """
+        return dict([(cur_metric.name[len(PREFIX):], dict(
+            kind=cur_metric.kind, help=cur_metric.description, series=cur_metric.summary()))
+            for cur_metric in self._sorted()])
+
+    def clear(self):
+        """
+        reset the values of all metrics, the metrics stay registered
+        """
+        for cur_metric in self._sorted():
+            cur_metric.clear()
+
+
+REGISTRY = Registry()
+
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+render = REGISTRY.render
+summary = REGISTRY.summary
+
+gauge('uptime_seconds', 'Seconds since the app started').set_function(lambda: [((), round(time.time() - started, 3))])
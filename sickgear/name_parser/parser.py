@@ -21,6 +21,7 @@ import os.path
 import re
 import time
 import threading
+from collections import OrderedDict
 
 try:
     import regex
@@ -34,16 +35,16 @@ from exceptions_helper import ex
 import sickgear
 from .. import common, db, helpers, logger, scene_exceptions, scene_numbering
 from lib.tvinfo_base.exceptions import *
-from ..classes import OrderedDefaultdict
 
 from .._legacy_classes import LegacyParseResult
 from _23 import decode_str, list_range
+from json_helper import json_dumps, json_loads
 from six import iteritems, iterkeys, itervalues, string_types, text_type
 
 # noinspection PyUnreachableCode
 if False:
     # noinspection PyUnresolvedReferences
-    from typing import Any, AnyStr, Dict, List, Optional
+    from typing import Any, AnyStr, Dict, List, Optional, Set, Tuple
     from ..tv import TVShow
 
 
@@ -98,7 +99,9 @@ class NameParser(object):
                 except re.error as errormsg:
                     logger.log(f'WARNING: Invalid episode_pattern, {errormsg}. {cur_pattern}')
                 else:
-                    cls.compiled_regexes[index].append([cur_pattern_num, cur_pattern_name, cur_regex])
+                    cur_hint = regexes.pattern_hints.get(cur_pattern_name)
+                    cls.compiled_regexes[index].append([cur_pattern_num, cur_pattern_name, cur_regex,
+                                                        cur_hint and re.compile(cur_hint, re.IGNORECASE)])
             index += 1
 
         return cls.compiled_regexes
@@ -149,9 +152,23 @@ class NameParser(object):
 
         matches = []
         initial_best_result = None
+        # the name is cleaned once per anime state, and a hint that rules out patterns is searched once per name
+        clean_names = {}
+        hint_found = {}
         for reg_ex in self.compiled_regexes:
-            for (cur_regex_num, cur_regex_name, cur_regex) in self.compiled_regexes[reg_ex]:
-                new_name = helpers.remove_non_release_groups(name, 'anime' in cur_regex_name)
+            for (cur_regex_num, cur_regex_name, cur_regex, cur_hint) in self.compiled_regexes[reg_ex]:
+                is_anime = 'anime' in cur_regex_name
+                new_name = clean_names.get(is_anime)
+                if None is new_name:
+                    new_name = clean_names[is_anime] = helpers.remove_non_release_groups(name, is_anime)
+
+                if cur_hint:
+                    found = hint_found.get((is_anime, cur_hint.pattern))
+                    if None is found:
+                        found = hint_found[(is_anime, cur_hint.pattern)] = bool(cur_hint.search(new_name))
+                    if not found:
+                        continue
+
                 match = cur_regex.match(new_name)
 
                 if not match:
@@ -325,7 +342,9 @@ class NameParser(object):
                     return best_result
 
                 # get quality
-                new_name = helpers.remove_non_release_groups(name, show_obj.is_anime)
+                new_name = clean_names.get(show_obj.is_anime)
+                if None is new_name:
+                    new_name = helpers.remove_non_release_groups(name, show_obj.is_anime)
                 best_result.quality = common.Quality.name_quality(new_name, show_obj.is_anime)
 
                 new_episode_numbers = []
@@ -469,8 +488,8 @@ class NameParser(object):
                     best_result.season_number = new_season_numbers[0]
 
                 if self.convert and show_obj.is_scene:
-                    logger.debug(f'Converted parsed result {best_result.original_name}'
-                                 f' into {decode_str(best_result, errors="xmlcharrefreplace")}')
+                    logger.debug(lambda: 'Converted parsed result %s into %s' % (
+                        best_result.original_name, decode_str(best_result, errors='xmlcharrefreplace')))
 
                 helpers.cpu_sleep()
 
@@ -569,7 +588,7 @@ class NameParser(object):
         if self.naming_pattern:
             cache_result = False
 
-        cached = name_parser_cache.get(name)
+        cached = name_parser_cache.get(name, self.convert)
         show_obj_given = bool(self.show_obj)
         if cached and ((not show_obj_given and not cached.show_obj_match)
                        or (show_obj_given and self.show_obj == cached.show_obj)):
@@ -644,9 +663,9 @@ class NameParser(object):
 
         if cache_result and final_result.show_obj \
                 and any('anime' in wr for wr in final_result.which_regex) == bool(final_result.show_obj.is_anime):
-            name_parser_cache.add(name, final_result)
+            name_parser_cache.add(name, final_result, self.convert)
 
-        logger.debug(f'Parsed {name} into {final_result}')
+        logger.debug('Parsed %s into %s', name, final_result)
         return final_result
 
 
@@ -837,48 +856,104 @@ class ParseResult(LegacyParseResult):
         return False
 
 
-class NameParserCache(object):
+class _CacheStripe(object):
     def __init__(self):
-        super(NameParserCache, self).__init__()
-        self._previous_parsed = OrderedDefaultdict()  # type: Dict[AnyStr, ParseResult]
-        self._cache_size = 1000
         self.lock = threading.Lock()
+        self.entries = OrderedDict()  # type: OrderedDict[Tuple[AnyStr, bool], List]
+        self.by_show = {}  # type: Dict[AnyStr, Set[Tuple[AnyStr, bool]]]
+        self.used = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def remove(self, key):
+        # type: (Tuple[AnyStr, bool]) -> Optional[List]
+        entry = self.entries.pop(key, None)
+        if entry:
+            self.used -= entry[1]
+            keys = self.by_show.get(entry[0].show_obj.tvid_prodid)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self.by_show[entry[0].show_obj.tvid_prodid]
+        return entry
+
+
+class NameParserCache(object):
+    """
+    Parse results of names that matched a show, least recently used entries are evicted to keep within a memory budget
+
+    Entries are spread over lock stripes by name, each stripe with an equal share of the budget and an index of its
+    entries by show, so that a flush of a show only touches the entries of that show.
+    """
+    stripe_count = 16
+    entry_overhead = 1024  # approximate bytes of a ParseResult and its attributes, excluding strings
+    persist_count = 1000  # most hit entries saved by save()
+    persist_file = 'name_parser_cache.json'
+    persist_attrs = ('original_name', 'series_name', 'season_number', 'episode_numbers', 'extra_info',
+                     'release_group', 'ab_episode_numbers', 'score', 'quality', 'version', 'show_obj_match')
+
+    def __init__(self, budget=8 * 1024 * 1024):
+        # type: (int) -> None
+        """
+        :param budget: approximate memory limit in bytes
+        """
+        super(NameParserCache, self).__init__()
+        self.budget = budget
+        self._stripes = [_CacheStripe() for _ in range(self.stripe_count)]
+
+    def _stripe(self, key):
+        # type: (Tuple[AnyStr, bool]) -> _CacheStripe
+        return self._stripes[hash(key) % self.stripe_count]
 
-    def add(self, name, parse_result):
-        # type: (AnyStr, ParseResult) -> None
+    def _entry_size(self, name, parse_result):
+        # type: (AnyStr, ParseResult) -> int
+        return self.entry_overhead + sum([len(v or '') for v in (
+            name, parse_result.original_name, parse_result.series_name, parse_result.extra_info,
+            parse_result.release_group)])
+
+    def add(self, name, parse_result, convert=False):
+        # type: (AnyStr, ParseResult, bool) -> None
         """
 
         :param name: name
         :type name: AnyStr
         :param parse_result:
         :type parse_result: ParseResult
+        :param convert: result has scene numbering converted
         """
-        with self.lock:
-            self._previous_parsed[name] = parse_result
-            _current_cache_size = len(self._previous_parsed)
-            if _current_cache_size > self._cache_size:
-                key = None
-                for i in range(_current_cache_size - self._cache_size):
-                    try:
-                        key = self._previous_parsed.first_key()
-                        del self._previous_parsed[key]
-                    except KeyError:
-                        logger.debug('Could not remove old NameParserCache entry: %s' % key)
-
-    def get(self, name):
-        # type: (AnyStr) -> ParseResult
+        key = (name, bool(convert))
+        size = self._entry_size(name, parse_result)
+        stripe = self._stripe(key)
+        stripe_budget = self.budget // self.stripe_count
+        with stripe.lock:
+            stripe.remove(key)
+            stripe.entries[key] = [parse_result, size, 0]
+            stripe.by_show.setdefault(parse_result.show_obj.tvid_prodid, set()).add(key)
+            stripe.used += size
+            while stripe_budget < stripe.used and 1 < len(stripe.entries):
+                stripe.remove(next(iter(stripe.entries)))
+                stripe.evictions += 1
+
+    def get(self, name, convert=False):
+        # type: (AnyStr, bool) -> Optional[ParseResult]
         """
 
         :param name:
         :type name: AnyStr
+        :param convert: result has scene numbering converted
         :return:
         :rtype: ParseResult
         """
-        with self.lock:
-            if name in self._previous_parsed:
-                logger.debug('Using cached parse result for: ' + name)
-                self._previous_parsed.move_to_end(name)
-                return self._previous_parsed[name]
+        key = (name, bool(convert))
+        stripe = self._stripe(key)
+        with stripe.lock:
+            entry = stripe.entries.get(key)
+            if not entry:
+                stripe.misses += 1
+                return
+            stripe.entries.move_to_end(key)
+            entry[2] += 1
+            stripe.hits += 1
+            return entry[0]
 
     def flush(self, show_obj):
         # type: (TVShow) -> None
@@ -887,9 +962,94 @@ class NameParserCache(object):
 
         :param show_obj: TVShow object
         """
-        with self.lock:
-            self._previous_parsed = OrderedDefaultdict(None, [(k, v) for k, v in iteritems(self._previous_parsed)
-                                                       if v.show_obj != show_obj])
+        for stripe in self._stripes:
+            with stripe.lock:
+                for key in list(stripe.by_show.get(show_obj.tvid_prodid, [])):
+                    stripe.remove(key)
+
+    def clear(self):
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe.entries.clear()
+                stripe.by_show.clear()
+                stripe.used = stripe.hits = stripe.misses = stripe.evictions = 0
+
+    def stats(self):
+        # type: (...) -> Dict[AnyStr, int]
+        """
+        :return: entries, approximate bytes used, budget, and hit, miss and eviction counts
+        """
+        result = dict(entries=0, used=0, budget=self.budget, hits=0, misses=0, evictions=0)
+        for stripe in self._stripes:
+            with stripe.lock:
+                result['entries'] += len(stripe.entries)
+                for cur_stat in ('used', 'hits', 'misses', 'evictions'):
+                    result[cur_stat] += getattr(stripe, cur_stat)
+        return result
+
+    def save(self, path=None):
+        # type: (Optional[AnyStr]) -> int
+        """
+        save the most hit entries to a file in the cache dir
+
+        :param path: file to save to
+        :return: number of entries saved
+        """
+        entries = []
+        for stripe in self._stripes:
+            with stripe.lock:
+                entries += [(entry[2], key, entry[0]) for key, entry in iteritems(stripe.entries) if entry[2]]
+        entries = sorted(entries, key=lambda x: x[0], reverse=True)[0:self.persist_count]
+
+        data = []
+        for _, (name, convert), parse_result in entries:
+            data.append(dict(
+                name=name, convert=convert, tvid_prodid=parse_result.show_obj.tvid_prodid,
+                result=dict([(k, getattr(parse_result, k)) for k in self.persist_attrs],
+                            which_regex=parse_result.which_regex,
+                            air_date=parse_result.air_date and parse_result.air_date.toordinal())))
+        try:
+            with open(path or os.path.join(sickgear.CACHE_DIR, self.persist_file), 'w') as fh:
+                fh.write(json_dumps(data))
+        except (BaseException, Exception) as e:
+            logger.warning('Failed to save name parser cache: %s' % ex(e))
+            return 0
+        return len(data)
+
+    def load(self, path=None):
+        # type: (Optional[AnyStr]) -> int
+        """
+        load entries saved by save() for shows that exist
+
+        :param path: file to load from
+        :return: number of entries loaded
+        """
+        path = path or os.path.join(sickgear.CACHE_DIR, self.persist_file)
+        if not os.path.isfile(path):
+            return 0
+        try:
+            with open(path, 'r') as fh:
+                data = json_loads(fh.read())
+        except (BaseException, Exception) as e:
+            logger.warning('Failed to load name parser cache: %s' % ex(e))
+            return 0
+
+        loaded = 0
+        for cur_entry in data:
+            try:
+                show_obj = helpers.find_show_by_id(cur_entry['tvid_prodid'])
+                if not show_obj:
+                    continue
+                result = cur_entry['result']
+                parse_result = ParseResult(**dict(
+                    [(k, result.get(k)) for k in self.persist_attrs], show_obj=show_obj,
+                    air_date=result.get('air_date') and datetime.date.fromordinal(result['air_date'])))
+                parse_result.which_regex = result.get('which_regex')
+            except (BaseException, Exception):
+                continue
+            self.add(cur_entry['name'], parse_result, cur_entry['convert'])
+            loaded += 1
+        return loaded
 
 
 name_parser_cache = NameParserCache()
@@ -487,3 +487,37 @@ anime_regexes = [
      '''
      ),
 ]
+
+# a cheap search that must find something in a name for the named pattern above to be able to match,
+# used to skip the full match of patterns that can not apply, a pattern not listed here is always tried
+pattern_hints = {
+    'standard_repeat': r's\d+[. _-]*e\d+[. _-]+s\d+[. _-]*e\d',
+    'fov_repeat': r'\d+x\d+[. _-]+\d+x\d',
+    'non_standard_multi_ep': r's\d+[. _-]*e\d+(?:[. _-]*and|&|to)\d',
+    'standard': r's\d+[. _-]*e\d',
+    'fov_non_standard_multi_ep': r'\d+x\d+(?:[. _-]*and|&|to)\d',
+    'fov': r'\d+x\d',
+    'scene_date_format': r'\d{4}[. _-]+\d{2}[. _-]+\d{2}',
+    'uk_date_format': r'\d{2}[. _-]+(?:\d{2}|jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)',
+    'stupid': r'\d{3}$',
+    'verbose': r'season[. _-]+\d+[. _-]+episode[. _-]+\d',
+    'season_only': r's(?:eason[. _-])?\d',
+    'no_season_multi_ep': r'(?:e(?:p(?:isode)?)?|part|pt)[. _-]?[\divx]',
+    'no_season_general': r'(?:e(?:p(?:isode)?)?|part|pt)[. _-]?[\divx]',
+    'bare': r'[. _-]\d{3}',
+    'no_season': r'\d',
+    'anime_ultimate': r'^\[',
+    'anime_standard': r'[ ._-]\[\d{3}',
+    'anime_standard_round': r'[ ._-]\((?:cx[ ._-]?)?\d{3}',
+    'anime_ep_quality': r'[ ._-][sh]d',
+    'anime_quality_ep': r'[ ._-][sh]d',
+    'anime_slash': r'[ ._-]\[\d{3,4}p',
+    'anime_standard_codec': r'\[',
+    'anime_and_normal': r's\d+[. _-]*e\d',
+    'anime_and_normal_x': r'\d[. _-]*x\d',
+    'anime_and_normal_reverse': r's\d+[. _-]*e\d',
+    'anime_and_normal_front': r'^\d',
+    'anime_ep_name': r'^\[',
+    'anime_bare_ep': r'[ ._-]{3}\d',
+    'anime_bare': r'[ ._-]\d{3}',
+}
@@ -14,8 +14,13 @@
 # You should have received a copy of the GNU General Public License
 # along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
 
+import functools
+import io
 import os
 import re
+import shutil
+import tempfile
+import time
 
 from lxml_etree import etree
 
@@ -32,10 +37,15 @@ from six import string_types
 # noinspection PyUnreachableCode
 if False:
     # noinspection PyUnresolvedReferences
-    from typing import Any, AnyStr, Dict, List, Tuple
+    from typing import Any, AnyStr, Dict, List, Optional, Tuple
 
 SUBJECT_FN_MATCHER = re.compile(r'"([^"]*)"')
 RE_NORMAL_NAME = re.compile(r'\.\w{1,5}$')
+RE_FILE_TAG = re.compile(r'[{](https?://[A-Za-z0-9_./]+/nzb)[}]file')
+SPLIT_DIR_MAX_AGE = 86400  # seconds to keep the episode nzb files of a split that are not read
+
+RE_NOT_EPISODE_EXT = re.compile(r'^\.(nzb|r\d{2}|rar|7z|zip|par2|vol\d+|nfo|srt|txt|bat|sh|mkv|mp4|avi|wmv)$',
+                                flags=re.I)
 
 
 def _platform_encode(p):
@@ -56,28 +66,15 @@ def _name_extractor(subject):
     return _platform_encode(result)
 
 
-def _get_season_nzbs(name, url_data, season):
+def _season_file_regex(name, season):
+    # type: (AnyStr, int) -> Optional[AnyStr]
     """
-
-    :param name: name
-    :type name: AnyStr
-    :param url_data: url data
-    :type url_data: Any
-    :param season: season
-    :type season: int
-    :return:
-    :rtype: Tuple[Dict, AnyStr]
+    :param name: season pack name
+    :param season: season number
+    :return: regex that finds the episode name in the subject of a file element, or None if name is not valid
     """
-    try:
-        show_xml = etree.ElementTree(etree.XML(url_data))
-    except SyntaxError:
-        logger.error(f'Unable to parse the XML of {name}, not splitting it')
-        return {}, ''
-
     filename = name.replace('.nzb', '')
 
-    nzb_element = show_xml.getroot()
-
     regex = r'([\w\._\ ]+)[\._ ]S%02d[\._ ]([\w\._\-\ ]+)' % season
 
     scene_name_match = re.search(regex, filename, re.I)
@@ -85,43 +82,166 @@ def _get_season_nzbs(name, url_data, season):
         show_name, quality_section = scene_name_match.groups()
     else:
         logger.error('%s - Not a valid season pack scene name. If it\'s a valid one, log a bug.' % name)
-        return {}, ''
+        return None
 
     regex = r'(%s[\._]S%02d(?:[E0-9]+)\.[\w\._]+)' % (re.escape(show_name), season)
-    regex = regex.replace(' ', '.')
+    return regex.replace(' ', '.')
 
-    ep_files = {}
-    xmlns = None
 
-    for cur_file in list(nzb_element):
-        if not isinstance(cur_file.tag, string_types):
-            continue
-        xmlns_match = re.match(r'[{](https?://[A-Za-z0-9_./]+/nzb)[}]file', cur_file.tag)
+def _file_episode(subject, regex):
+    # type: (AnyStr, AnyStr) -> Tuple[Optional[AnyStr], bool]
+    """
+    :param subject: subject of a file element
+    :param regex: regex from _season_file_regex()
+    :return: episode name of the file, or None if the file is not part of an episode, and
+             False if the season pack can not be split by episode
+    """
+    match = re.search(regex, subject, re.I)
+    if not match:
+        return None, True
+    cur_ep = match.group(1)
+    fn = _name_extractor(subject)
+    if cur_ep == re.sub(r'\+\d+\.par2$', '', fn, flags=re.I):
+        bn, ext = os.path.splitext(fn)
+        cur_ep = re.sub(r'\.(part\d+|vol\d+(\+\d+)?)$', '', bn, flags=re.I)
+    bn, ext = os.path.splitext(cur_ep)
+    if isinstance(ext, string_types) and RE_NOT_EPISODE_EXT.search(ext):
+        return cur_ep, False
+    return cur_ep, True
+
+
+def _split_season_nzb(name, nzb_file, season, save_dir):
+    # type: (AnyStr, AnyStr, int, AnyStr) -> Tuple[Dict[AnyStr, AnyStr], Optional[AnyStr]]
+    """
+    split a season pack nzb file into a file per episode
+
+    file elements are parsed incrementally and written to the episode file as soon as they are complete, then dropped,
+    so that memory use does not grow with the size of the season pack. An episode file is the same as
+    _create_nzb_string() makes from the file elements of the episode.
+
+    :param name: season pack name
+    :param nzb_file: season pack nzb file
+    :param season: season number
+    :param save_dir: folder to save the episode nzb files in
+    :return: dict of episode name to episode nzb file, and the nzb xmlns
+    """
+    regex = _season_file_regex(name, season)
+    if not regex:
+        return {}, ''
+
+    ep_files = {}  # type: Dict[AnyStr, AnyStr]
+    ep_fhs = {}
+    state = dict(xmlns=None, can_split=True)
+
+    def _write_element(element):
+        if not isinstance(element.tag, string_types):
+            return
+        xmlns_match = RE_FILE_TAG.match(element.tag)
         if not xmlns_match:
-            continue
+            return
+        state['xmlns'] = xmlns = xmlns_match.group(1)
+        cur_ep, state['can_split'] = _file_episode(element.get('subject') or '', regex)
+        if not cur_ep or not state['can_split']:
+            return
+        # serialise the element inside an nzb element, exactly as _create_nzb_string() does for a group of elements
+        nzb_string = _create_nzb_string([element], xmlns)
+        content_start = nzb_string.index(b'>', nzb_string.index(b'<nzb')) + 1
+        content_end = nzb_string.rindex(b'</nzb>')
+        if cur_ep not in ep_fhs:
+            ep_files[cur_ep] = os.path.join(save_dir, '%s.nzb' % helpers.sanitize_filename(cur_ep))
+            ep_fhs[cur_ep] = io.open(ep_files[cur_ep], 'wb')
+            ep_fhs[cur_ep].write(nzb_string[:content_end])
         else:
-            xmlns = xmlns_match.group(1)
-        match = re.search(regex, cur_file.get("subject"), re.I)
-        if not match:
-            # print curFile.get("subject"), "doesn't match", regex
-            continue
-        cur_ep = match.group(1)
-        fn = _name_extractor(cur_file.get('subject', ''))
-        if cur_ep == re.sub(r'\+\d+\.par2$', '', fn, flags=re.I):
-            bn, ext = os.path.splitext(fn)
-            cur_ep = re.sub(r'\.(part\d+|vol\d+(\+\d+)?)$', '', bn, flags=re.I)
-        bn, ext = os.path.splitext(cur_ep)
-        if isinstance(ext, string_types) \
-                and re.search(r'^\.(nzb|r\d{2}|rar|7z|zip|par2|vol\d+|nfo|srt|txt|bat|sh|mkv|mp4|avi|wmv)$', ext,
-                              flags=re.I):
+            ep_fhs[cur_ep].write(nzb_string[content_start:content_end])
+
+    root = pending = None
+    depth = 0
+    try:
+        # a child of the root is written when the next child starts or the root ends, once its tail is parsed
+        for event, cur_element in etree.iterparse(nzb_file, events=('start', 'end')):
+            if 'start' == event:
+                depth += 1
+                if 1 == depth:
+                    root = cur_element
+                if 2 != depth or None is pending:
+                    continue
+            else:
+                depth -= 1
+                if 1 == depth:
+                    pending = cur_element
+                if 0 != depth:
+                    continue
+            root.remove(pending)
+            _write_element(pending)
+            pending = None
+            if not state['can_split']:
+                break
+        for cur_fh in ep_fhs.values():
+            cur_fh.write(b'</nzb>')
+    except SyntaxError:
+        logger.error(f'Unable to parse the XML of {name}, not splitting it')
+        state['can_split'] = False
+    except EnvironmentError as e:
+        logger.error(f'Unable to save NZB: {ex(e)}')
+        state['can_split'] = False
+    finally:
+        for cur_fh in ep_fhs.values():
+            cur_fh.close()
+
+    if not state['can_split']:
+        if None is not root:
             logger.warning('Unable to split %s into episode nzb\'s' % name)
-            return {}, ''
-        if cur_ep not in ep_files:
-            ep_files[cur_ep] = [cur_file]
-        else:
-            ep_files[cur_ep].append(cur_file)
+        for cur_file in ep_files.values():
+            helpers.remove_file_perm(cur_file)
+        return {}, ''
+
+    return ep_files, state['xmlns']
+
+
+def _read_nzb(nzb_result, nzb_file, *args):
+    # type: (sickgear.classes.NZBDataSearchResult, AnyStr, Any) -> Optional[bytes]
+    """
+    get_data_func of a split episode result
+
+    the data is kept in the extraInfo of the result once it is read, so that it is still there if sending the result
+    to a client fails and is retried, and the episode nzb file is removed
 
-    return ep_files, xmlns
+    :param nzb_result: split episode result
+    :param nzb_file: episode nzb file
+    :return: nzb data
+    """
+    try:
+        with io.open(nzb_file, 'rb') as fh:
+            data = fh.read()
+    except EnvironmentError as e:
+        logger.error(f'Unable to read NZB: {ex(e)}')
+        return
+    nzb_result.extraInfo = [data]
+    nzb_result.get_data_func = None
+    helpers.remove_file_perm(nzb_file)
+    try:
+        # the split folder is removed with its last episode nzb file
+        os.rmdir(os.path.dirname(nzb_file))
+    except OSError:
+        pass
+    return data
+
+
+def _remove_old_split_dirs(parent_dir):
+    # type: (AnyStr) -> None
+    """
+    remove split folders with episode nzb files that were never read
+
+    :param parent_dir: folder of the split folders
+    """
+    min_time = time.time() - SPLIT_DIR_MAX_AGE
+    try:
+        with os.scandir(parent_dir) as s_d:
+            for cur_entry in s_d:
+                if cur_entry.is_dir(follow_symlinks=False) and cur_entry.stat().st_mtime < min_time:
+                    shutil.rmtree(cur_entry.path, ignore_errors=True)
+    except OSError:
+        pass
 
 
 def _create_nzb_string(file_elements, xmlns):
@@ -172,8 +292,42 @@ def split_result(result):
 
     :param result: search result
     """
-    resp = helpers.get_url(result.url, failure_monitor=False, as_binary=True)
-    if None is resp:
+    parent_dir = os.path.join(sickgear.CACHE_DIR, 'nzb_split')
+    try:
+        os.makedirs(parent_dir, exist_ok=True)
+        # a folder per split, so that a concurrent split of the same release keeps its own files
+        split_dir = tempfile.mkdtemp(prefix='%s.' % helpers.sanitize_filename(result.name), dir=parent_dir)
+    except EnvironmentError as e:
+        logger.error(f'Unable to create folder in {parent_dir}, can\'t split season NZB: {ex(e)}')
+        return []
+    _remove_old_split_dirs(parent_dir)
+
+    result_list = []
+    season_file = os.path.join(split_dir, 'season.nzb')
+    try:
+        result_list = _split_result(result, season_file, split_dir)
+    finally:
+        helpers.remove_file_perm(season_file)
+        # episode nzb files are removed when read, remove those that have no result
+        if not result_list:
+            shutil.rmtree(split_dir, ignore_errors=True)
+        else:
+            used_files = set([cur_result.get_data_func.args[1] for cur_result in result_list])
+            for cur_file in os.listdir(split_dir):
+                if os.path.join(split_dir, cur_file) not in used_files:
+                    helpers.remove_file_perm(os.path.join(split_dir, cur_file))
+    return result_list
+
+
+def _split_result(result, season_file, split_dir):
+    # type: (sickgear.classes.SearchResult, AnyStr, AnyStr) -> List[sickgear.classes.SearchResult]
+    """
+
+    :param result: search result
+    :param season_file: file to download the season nzb to
+    :param split_dir: folder to save the episode nzb files in
+    """
+    if not helpers.download_file(result.url, season_file, failure_monitor=False):
         logger.error(f'Unable to load url {result.url}, can\'t download season NZB')
         return []
 
@@ -191,7 +345,7 @@ def split_result(result):
     # bust it up
     season = parse_result.season_number if None is not parse_result.season_number else 1
 
-    separate_nzbs, xmlns = _get_season_nzbs(result.name, resp, season)
+    separate_nzbs, xmlns = _split_season_nzb(result.name, season_file, season, split_dir)
 
     result_list = []
 
@@ -242,7 +396,7 @@ def split_result(result):
         nzb_result.provider = result.provider
         nzb_result.quality = result.quality
         nzb_result.show_obj = result.show_obj
-        nzb_result.extraInfo = [_create_nzb_string(separate_nzbs[new_nzb], xmlns)]
+        nzb_result.get_data_func = functools.partial(_read_nzb, nzb_result, separate_nzbs[new_nzb])
 
         result_list.append(nzb_result)
 
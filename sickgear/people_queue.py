@@ -30,8 +30,9 @@ if False:
 
 
 class PeopleQueue(generic_queue.GenericQueue):
-    def __init__(self):
-        generic_queue.GenericQueue.__init__(self, cache_db_tables=['people_queue'])
+    def __init__(self, workers=1):
+        # type: (int) -> None
+        generic_queue.GenericQueue.__init__(self, cache_db_tables=['people_queue'], workers=workers)
         self.queue_name = 'PEOPLEQUEUE'  # type: AnyStr
 
     def load_queue(self):
@@ -84,8 +85,8 @@ class PeopleQueue(generic_queue.GenericQueue):
         # type: (...) -> Dict[AnyStr, List[AnyStr, Dict]]
         data = {'main_cast': []}
         with self.lock:
-            for cur_item in [self.currentItem] + self.queue:  # type: PeopleQueueItem
-                if not cur_item or not cur_item.show_obj:
+            for cur_item in self.running + self.queue.ordered():  # type: PeopleQueueItem
+                if not cur_item.show_obj:
                     continue
                 result_item = {'name': cur_item.show_obj.name, 'tvid_prodid': cur_item.show_obj.tvid_prodid,
                                'uid': cur_item.uid, 'forced': cur_item.force}
@@ -96,7 +97,7 @@ class PeopleQueue(generic_queue.GenericQueue):
     def show_in_queue(self, show_obj, check_inprogress=False):
         # type: (TVShow, Optional[bool]) -> bool
         with self.lock:
-            return any(1 for q in ((self.currentItem and [self.currentItem]) or []) + self.queue
+            return any(1 for q in self.running + self.queue.for_show(show_obj.tvid_prodid)
                        if show_obj == q.show_obj and (True, q.inProgress)[check_inprogress])
 
     def abort_cast_update(self, show_obj):
@@ -104,7 +105,7 @@ class PeopleQueue(generic_queue.GenericQueue):
         if show_obj:
             with self.lock:
                 to_remove = []
-                for c in ((self.currentItem and [self.currentItem]) or []) + self.queue:
+                for c in self.running + self.queue.for_show(show_obj.tvid_prodid):
                     if show_obj == c.show_obj:
                         try:
                             to_remove.append(c.uid)
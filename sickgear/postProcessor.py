@@ -24,7 +24,7 @@ import exceptions_helper
 from exceptions_helper import ex
 
 import sickgear
-from . import common, db, failed_history, helpers, history, logger, notifiers, show_name_helpers
+from . import common, db, failed_history, helpers, history, logger, media_index, notifiers, show_name_helpers
 
 from .anime import push_anidb_mylist
 from .indexers.indexer_config import TVINFO_TVDB
@@ -239,6 +239,7 @@ class PostProcessor(object):
 
                 if True is not os.path.isfile(cur_file):
                     self._log(f'{removal_type} file {cur_file}', logger.DEBUG)
+                media_index.update_path(cur_file)
 
                 # do the library update for synoindex
                 notifiers.NotifierFactory().get('SYNOINDEX').deleteFile(cur_file)
@@ -323,6 +324,8 @@ class PostProcessor(object):
                 action(cur_file_path, new_file_path)
             else:
                 action(cur_file_path, new_file_path, action_tmpl)
+            media_index.update_path(cur_file_path)
+            media_index.update_path(new_file_path)
 
     def _move(self, file_path, new_path, new_base_name, associated_files=False, subtitles=False, action_tmpl=None):
         """
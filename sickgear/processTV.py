@@ -29,7 +29,7 @@ from json_helper import json_dumps, json_loads
 import sickgear
 from . import common, db, failedProcessor, helpers, logger, notifiers, postProcessor
 from .common import SNATCHED_ANY
-from .history import reset_status
+from .history import reset_status, resource_name
 from .name_parser.parser import InvalidNameException, InvalidShowException, NameParser
 from .sgdatetime import SGDatetime
 
@@ -923,13 +923,13 @@ class ProcessTVShow(object):
 
         parse_result = None
         try:
-            parse_result = NameParser(convert=True).parse(videofile, cache_result=False)
+            parse_result = NameParser(convert=True).parse(videofile)
         except (InvalidNameException, InvalidShowException):
             # Does not parse, move on to directory check
             pass
         if None is parse_result:
             try:
-                parse_result = NameParser(convert=True).parse(dir_name, cache_result=False)
+                parse_result = NameParser(convert=True).parse(dir_name)
             except (InvalidNameException, InvalidShowException):
                 # If the filename doesn't parse, then return false as last
                 # resort. We can assume that unparseable filenames are not
@@ -984,9 +984,9 @@ class ProcessTVShow(object):
                          + ' WHERE history.season=tv_episodes.season and history.episode=tv_episodes.episode'\
                          + ep_detail_sql\
                          + ' and tv_episodes.status IN (%s)' % ','.join([str(x) for x in common.Quality.DOWNLOADED])\
-                         + ' and history.resource LIKE ?'
+                         + ' and history.resource_name = ?'
 
-            sql_result = my_db.select(search_sql, [f'%{videofile}'])
+            sql_result = my_db.select(search_sql, [resource_name(videofile)])
             if sql_result:
                 self._log_helper(f'Found a video, but the episode {showlink} is already processed,<br>'
                                  f'.. skipping: {videofile}')
@@ -30,7 +30,7 @@ import zlib
 from exceptions_helper import SickGearException, AuthException, ex
 
 import sickgear
-from .. import classes, db, helpers, logger, tvcache
+from .. import classes, db, helpers, logger, metrics, tvcache
 from ..classes import NZBSearchResult, TorrentSearchResult, SearchResult
 from ..common import Quality, MULTI_EP_RESULT, SEASON_RESULT, USER_AGENT
 from ..helpers import maybe_plural, remove_file_perm
@@ -60,6 +60,12 @@ class HaltParseException(SickGearException):
     """Something requires the current processing to abort"""
 
 
+provider_requests = metrics.counter('provider_requests_total', 'Provider requests by result', ('provider', 'result'))
+provider_request_seconds = metrics.histogram('provider_request_seconds', 'Time of provider requests', ('provider',),
+                                             buckets=(.1, .25, .5, 1, 2.5, 5, 10, 20, 30, 60, 120))
+provider_failures = metrics.counter('provider_failures_total', 'Provider failures by type', ('provider', 'type'))
+
+
 class ProviderFailTypes(object):
     http = 1
     connection = 2
@@ -541,6 +547,8 @@ class GenericProvider(object):
             self.failure_time = datetime.datetime.now()
             self._last_fail_type = fail_type
             self.fails.add_fail(*args, **kwargs)
+            provider_failures.inc(provider=self.get_id(), type=ProviderFailTypes.names.get(
+                fail_type, ProviderFailTypes.names[ProviderFailTypes.other]))
         else:
             logger.debug('%s: Not logging same failure within 3 seconds' % self.name)
 
@@ -564,6 +572,7 @@ class GenericProvider(object):
         if (not skip_auth and not (self.is_public_access()
                                    and type(self).__name__ not in ['TorrentRssProvider']) and not self._authorised()) \
                 or self.should_skip(use_tmr_limit=use_tmr_limit):
+            provider_requests.inc(provider=self.get_id(), result='skipped')
             return
 
         kwargs['raise_exceptions'] = True
@@ -585,6 +594,7 @@ class GenericProvider(object):
 
         # noinspection PyUnusedLocal
         log_failure_url = False
+        started, result = time.time(), 'ok'
         try:
             data = helpers.get_url(url, *args, **kwargs)
             if data and not isinstance(data, tuple) \
@@ -594,10 +604,13 @@ class GenericProvider(object):
                 self.failure_count = 0
                 self.failure_time = None
             else:
+                result = 'nodata'
                 use_failure_counter and self.inc_failure_count(ProviderFail(fail_type=ProviderFailTypes.nodata))
                 log_failure_url = True and use_failure_counter
         except requests.exceptions.HTTPError as e:
+            result = 'http'
             if 429 == e.response.status_code:
+                result = 'limit'
                 r_headers = getattr(e.response, 'headers', {})
                 retry_time = None
                 unit = None
@@ -617,15 +630,21 @@ class GenericProvider(object):
                 (use_failure_counter and
                  self.inc_failure_count(ProviderFail(fail_type=ProviderFailTypes.http, code=e.response.status_code)))
         except requests.exceptions.ConnectionError:
+            result = 'connection'
             use_failure_counter and self.inc_failure_count(ProviderFail(fail_type=ProviderFailTypes.connection))
         except requests.exceptions.ReadTimeout:
+            result = 'timeout'
             use_failure_counter and self.inc_failure_count(ProviderFail(fail_type=ProviderFailTypes.timeout))
         except (requests.exceptions.Timeout, socket.timeout):
+            result = 'connection_timeout'
             use_failure_counter and self.inc_failure_count(ProviderFail(fail_type=ProviderFailTypes.connection_timeout))
         except (BaseException, Exception):
+            result = 'other'
             log_failure_url = True and use_failure_counter
             use_failure_counter and self.inc_failure_count(ProviderFail(fail_type=ProviderFailTypes.other))
 
+        provider_requests.inc(provider=self.get_id(), result=result)
+        provider_request_seconds.observe(time.time() - started, provider=self.get_id())
         self.fails.save_list()
         if log_failure_url:
             self.log_failure_url(url, post_data, post_json)
@@ -935,9 +954,9 @@ class GenericProvider(object):
 
         return result
 
-    def search_rss(self, ep_obj_list):
-        # type: (List[TVEpisode]) -> Dict[TVEpisode, SearchResult]
-        return self.cache.find_needed_episodes(ep_obj_list)
+    def search_rss(self, ep_obj_list, cached_results=None):
+        # type: (List[TVEpisode], Optional[Dict[AnyStr, List[Dict]]]) -> Dict[TVEpisode, SearchResult]
+        return self.cache.find_needed_episodes(ep_obj_list, cached_results=cached_results)
 
     def get_quality(self, item, anime=False):
         # type: (etree.Element, bool) -> int
@@ -1202,10 +1221,10 @@ class GenericProvider(object):
             try:
                 parse_result = parser.parse(title, release_group=self.get_id())
             except InvalidNameException:
-                logger.debug(f'Unable to parse the filename {title} into a valid episode')
+                logger.debug('Unable to parse the filename %s into a valid episode', title)
                 continue
             except InvalidShowException:
-                logger.debug(f'No match for search criteria in the parsed filename {title}')
+                logger.debug('No match for search criteria in the parsed filename %s', title)
                 continue
 
             if parse_result.show_obj.is_anime:
@@ -1217,8 +1236,8 @@ class GenericProvider(object):
                     continue
 
             if not (parse_result.show_obj.tvid == show_obj.tvid and parse_result.show_obj.prodid == show_obj.prodid):
-                logger.debug(f'Parsed show [{parse_result.show_obj.unique_name}] is not show [{show_obj.unique_name}]'
-                             f' we are searching for')
+                logger.debug('Parsed show [%s] is not show [%s] we are searching for',
+                             parse_result.show_obj.unique_name, show_obj.unique_name)
                 continue
 
             parsed_show_obj = parse_result.show_obj
@@ -1232,15 +1251,15 @@ class GenericProvider(object):
             if not (parsed_show_obj.air_by_date or parsed_show_obj.is_sports):
                 if 'sponly' == search_mode:
                     if len(parse_result.episode_numbers):
-                        logger.debug(f'This is supposed to be a season pack search but the result {title}'
-                                     f' is not a valid season pack, skipping it')
+                        logger.debug('This is supposed to be a season pack search but the result %s'
+                                     ' is not a valid season pack, skipping it', title)
                         add_cache_entry = True
                     if len(parse_result.episode_numbers) \
                             and (parse_result.season_number not in set([ep_obj.season for ep_obj in ep_obj_list])
                                  or not [ep_obj for ep_obj in ep_obj_list
                                          if ep_obj.scene_episode in parse_result.episode_numbers]):
-                        logger.debug(f'The result {title} doesn\'t seem to be a valid episode that we are trying'
-                                     f' to snatch, ignoring')
+                        logger.debug('The result %s doesn\'t seem to be a valid episode that we are trying'
+                                     ' to snatch, ignoring', title)
                         add_cache_entry = True
                 else:
                     if not len(parse_result.episode_numbers)\
@@ -1248,14 +1267,14 @@ class GenericProvider(object):
                             and not [ep_obj for ep_obj in ep_obj_list
                                      if ep_obj.season == parse_result.season_number and
                                      ep_obj.episode in parse_result.episode_numbers]:
-                        logger.debug(f'The result {title} doesn\'t seem to be a valid season that we are trying'
-                                     f' to snatch, ignoring')
+                        logger.debug('The result %s doesn\'t seem to be a valid season that we are trying'
+                                     ' to snatch, ignoring', title)
                         add_cache_entry = True
                     elif len(parse_result.episode_numbers) and not [
                         ep_obj for ep_obj in ep_obj_list if ep_obj.season == parse_result.season_number
                             and ep_obj.episode in parse_result.episode_numbers]:
-                        logger.debug(f'The result {title} doesn\'t seem to be a valid episode that we are trying'
-                                     f' to snatch, ignoring')
+                        logger.debug('The result %s doesn\'t seem to be a valid episode that we are trying'
+                                     ' to snatch, ignoring', title)
                         add_cache_entry = True
 
                 if not add_cache_entry:
@@ -1264,8 +1283,8 @@ class GenericProvider(object):
                     episode_numbers = parse_result.episode_numbers
             else:
                 if not parse_result.is_air_by_date:
-                    logger.debug(f'This is supposed to be a date search but the result {title}'
-                                 f' didn\'t parse as one, skipping it')
+                    logger.debug('This is supposed to be a date search but the result %s'
+                                 ' didn\'t parse as one, skipping it', title)
                     add_cache_entry = True
                 else:
                     season_number = parse_result.season_number
@@ -1274,16 +1293,16 @@ class GenericProvider(object):
                     if not episode_numbers or \
                             not [ep_obj for ep_obj in ep_obj_list
                                  if ep_obj.season == season_number and ep_obj.episode in episode_numbers]:
-                        logger.debug(f'The result {title} doesn\'t seem to be a valid episode that we are trying'
-                                     f' to snatch, ignoring')
+                        logger.debug('The result %s doesn\'t seem to be a valid episode that we are trying'
+                                     ' to snatch, ignoring', title)
                         add_cache_entry = True
 
             # add parsed result to cache for usage later on
             if add_cache_entry:
-                logger.debug(f'Adding item from search to cache: {title}')
+                logger.debug('Adding item from search to cache: %s', title)
                 ci = self.cache.add_cache_entry(title, url, parse_result=parse_result)
                 if None is not ci:
-                    cl.append(ci)
+                    cl.extend(ci)
                 continue
 
             # make sure we want the episode
@@ -1297,11 +1316,11 @@ class GenericProvider(object):
                 multi_ep = 1 < len(episode_numbers)
 
             if not want_ep:
-                logger.debug(f'Ignoring result {title} because we don\'t want an episode that is'
-                             f' {Quality.qualityStrings[quality]}')
+                logger.debug('Ignoring result %s because we don\'t want an episode that is %s',
+                             title, Quality.qualityStrings[quality])
                 continue
 
-            logger.debug(f'Found result {title} at {url}')
+            logger.debug('Found result %s at %s', title, url)
 
             # make a result object
             ep_obj_results = []  # type: List[TVEpisode]
@@ -1329,8 +1348,8 @@ class GenericProvider(object):
                 logger.debug('Single episode result.')
             elif 1 < len(ep_obj_results):
                 ep_num = MULTI_EP_RESULT
-                logger.debug(f'Separating multi-episode result to check for later - result contains episodes:'
-                             f' {parse_result.episode_numbers}')
+                logger.debug('Separating multi-episode result to check for later - result contains episodes: %s',
+                             parse_result.episode_numbers)
             elif 0 == len(ep_obj_results):
                 ep_num = SEASON_RESULT
                 logger.debug('Separating full season result to check for later')
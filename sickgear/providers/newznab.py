@@ -46,7 +46,7 @@ from _23 import urlencode
 
 # noinspection PyUnreachableCode
 if False:
-    from typing import Any, AnyStr, Dict, List, Tuple, Union
+    from typing import Any, AnyStr, Callable, Dict, List, Optional, Tuple, Union
 
 
 class NewznabConstants(object):
@@ -1193,11 +1193,13 @@ class NewznabCache(tvcache.TVCache):
 
     def update_cache(self,
                      needed=NeededQualities(need_all=True),  # type: NeededQualities
+                     can_write=None,  # type: Optional[Callable[[], bool]]
                      **kwargs
                      ):
         """
 
         :param needed: needed qualites class
+        :param can_write: called once data is fetched, the cache is left as is if the caller no longer wants it written
         :param kwargs:
         """
         if 4489 != sickgear.RECENTSEARCH_INTERVAL or self.should_update():
@@ -1212,6 +1214,9 @@ class NewznabCache(tvcache.TVCache):
                 logger.error('Error updating Cache: %s' % ex(e))
                 items = None
 
+            if None is not can_write and not can_write():
+                return
+
             if items:
                 self.clear_cache()
 
@@ -1220,7 +1225,7 @@ class NewznabCache(tvcache.TVCache):
                 for item in items:
                     ci = self.parse_item(n_spaces, item)
                     if None is not ci:
-                        cl.append(ci)
+                        cl.extend(ci)
 
                 if 0 < len(cl):
                     my_db = self.get_db()
@@ -1251,7 +1256,7 @@ class NewznabCache(tvcache.TVCache):
     def parse_item(self,
                    ns,  # type: Dict
                    item  # type: etree.Element
-                   ):  # type: (...) -> Union[List[AnyStr, List[Any]], None]
+                   ):  # type: (...) -> Union[List[List[AnyStr, List[Any]]], None]
         """
 
         :param ns:
@@ -15,26 +15,47 @@
 # along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
 
 import datetime
-import time
 import threading
+import time
 import traceback
 
-from . import logger
+from . import logger, metrics
 from exceptions_helper import ex
 
 import sickgear
 
+# noinspection PyUnreachableCode
+if False:
+    from typing import Optional
+
+
+run_seconds = metrics.histogram('scheduler_run_seconds', 'Run time of scheduled jobs', ('job',),
+                                buckets=metrics.SLOW_BUCKETS)
+runs_total = metrics.counter('scheduler_runs_total', 'Runs of scheduled jobs by result', ('job', 'result'))
+last_run_time = metrics.gauge('scheduler_last_run_timestamp_seconds', 'Unix time of the last run of a job', ('job',))
+
 
 class Scheduler(threading.Thread):
+    # longest sleep between checks, so that a change of the wall clock is noticed
+    max_sleep = 300  # type: int
+
     def __init__(self, action, cycle_time=datetime.timedelta(minutes=10), run_delay=datetime.timedelta(minutes=0),
                  start_time=None, thread_name='ScheduledThread', silent=True, prevent_cycle_run=None, paused=False):
         super(Scheduler, self).__init__()
 
+        self._wakeup = threading.Event()
+        self._force = False
+        self._action_due = False
+        self._action_due_lock = threading.Lock()
         self.last_run = datetime.datetime.now() + run_delay - cycle_time
         self.action = action
         self.cycle_time = cycle_time
         self.start_time = start_time
         self.prevent_cycle_run = prevent_cycle_run
+        try:
+            self.action.scheduler = self
+        except AttributeError:
+            pass
 
         self.name = thread_name
         self.silent = silent
@@ -43,7 +64,41 @@ class Scheduler(threading.Thread):
         if not paused:
             self.unpause()
         self.lock = threading.Lock()
-        self.force = False
+
+    @property
+    def cycle_time(self):
+        # type: (...) -> datetime.timedelta
+        return self._cycle_time
+
+    @cycle_time.setter
+    def cycle_time(self, value):
+        # type: (datetime.timedelta) -> None
+        self._cycle_time = value
+        self.wake()
+
+    @property
+    def force(self):
+        # type: (...) -> bool
+        return self._force
+
+    @force.setter
+    def force(self, value):
+        # type: (bool) -> None
+        self._force = value
+        if value:
+            self.wake()
+
+    def wake(self, run_action=False):
+        # type: (bool) -> None
+        """
+        wake the thread to check for a due run now instead of at the next deadline
+
+        :param run_action: run the action once woken, even if cycle_time has not passed
+        """
+        if run_action:
+            with self._action_due_lock:
+                self._action_due = True
+        self._wakeup.set()
 
     @property
     def is_running_job(self):
@@ -58,6 +113,7 @@ class Scheduler(threading.Thread):
 
     def unpause(self):
         self._unpause.set()
+        self.wake()
 
     def stopit(self):
         """ Stop the thread's activity.
@@ -76,6 +132,13 @@ class Scheduler(threading.Thread):
     def time_left(self):
         return self.cycle_time - (datetime.datetime.now() - self.last_run)
 
+    def _sleep_time(self):
+        # type: (...) -> float
+        """
+        :return: seconds until the next run is due, limited to max_sleep
+        """
+        return min(self.max_sleep, max(0, self.time_left().total_seconds()))
+
     def force_run(self):
         if not self.is_running_job:
             self.force = True
@@ -113,12 +176,16 @@ class Scheduler(threading.Thread):
                         else:
                             should_run = True
 
-                    if self.force:
+                    # take the flag in one step, so that a wake between reading and clearing it is not lost
+                    with self._action_due_lock:
+                        action_due, self._action_due = self._action_due, False
+                    if self.force or action_due:
                         should_run = True
 
                     if should_run and ((self.prevent_cycle_run is not None and self.prevent_cycle_run()) or
                                        getattr(self.action, 'prevent_run', False)):
                         logger.warning(f'{self.name} skipping this cycle_time')
+                        runs_total.inc(job=self.name, result='skipped')
                         # set last_run to only check start_time after another cycle_time
                         self.last_run = current_time
                         should_run = False
@@ -126,23 +193,32 @@ class Scheduler(threading.Thread):
                     if should_run:
                         self.last_run = current_time
 
+                        start, result = time.time(), 'ok'
                         try:
                             if not self.silent:
                                 logger.debug(f'Starting new thread: {self.name}')
 
                             self.action.run()
                         except (BaseException, Exception) as e:
+                            result = 'error'
                             logger.error(f'Exception generated in thread {self.name}: {ex(e)}')
                             logger.error(repr(traceback.format_exc()))
+                        finally:
+                            run_seconds.observe(time.time() - start, job=self.name)
+                            runs_total.inc(job=self.name, result=result)
+                            last_run_time.set(start, job=self.name)
 
                 finally:
                     if self.force:
-                        self.force = False
+                        self._force = False
+                sleep_time = self._sleep_time()
             else:
                 # disabled schedulers will only be rechecked every 30 seconds until enabled
-                time.sleep(30)
+                sleep_time = 30
 
-            time.sleep(1)
+            # sleep until the next run is due, or until woken by force_run, unpause, stopit or the action
+            self._wakeup.wait(sleep_time)
+            self._wakeup.clear()
 
         # exiting thread
         self._stopper.clear()
@@ -185,6 +261,7 @@ class Job(object):
     def __init__(self, func, silent=False, thread_lock=False, reentrant_lock=False, args=(), kwargs=None):
 
         self.amActive = False
+        self.scheduler = None  # type: Optional[Scheduler]
 
         self._func = func
         self._silent = silent
@@ -196,6 +273,13 @@ class Job(object):
         elif reentrant_lock:
             self.lock = threading.RLock()
 
+    def wake(self):
+        """
+        wake the scheduler of this job to run it without waiting for its next deadline
+        """
+        if self.scheduler:
+            self.scheduler.wake(run_action=True)
+
     def run(self):
 
         if self.amActive and self.__class__.__name__ in ('BacklogSearcher', 'MediaProcess'):
@@ -30,6 +30,7 @@ from . import clients, common, db, failed_history, helpers, history, logger, \
 from .common import DOWNLOADED, SNATCHED, SNATCHED_BEST, SNATCHED_PROPER, MULTI_EP_RESULT, SEASON_RESULT, Quality
 from .providers.generic import GenericProvider
 from .tv import TVEpisode, TVShow
+from .tvcache import TVCache
 
 from six import iteritems, itervalues, string_types
 
@@ -140,7 +141,7 @@ def snatch_episode(result, end_status=SNATCHED):
                     logger.error(f'Torrent content failed to download from {result.url}')
                     return False
             # Snatches torrent with client
-            dl_result = clients.get_client_instance(sickgear.TORRENT_METHOD)().send_torrent(result)
+            dl_result = clients.get_client(sickgear.TORRENT_METHOD).send_torrent(result)
 
             if result.cache_filepath:
                 helpers.remove_file_perm(result.cache_filepath)
@@ -225,7 +226,7 @@ def pick_best_result(
     :return: best search result
     """
     msg = ('Picking the best result out of %s', 'Checking the best result %s')[1 == len(results)]
-    logger.debug(msg % [x.name for x in results])
+    logger.debug(lambda: msg % [x.name for x in results])
 
     # find the best result for the current episode
     best_result = None
@@ -251,8 +252,8 @@ def pick_best_result(
             continue
 
         if quality_list and cur_result.quality not in quality_list:
-            logger.debug(f'Rejecting unwanted quality {Quality.qualityStrings[cur_result.quality]}'
-                         f' for [{cur_result.name}]')
+            logger.debug('Rejecting unwanted quality %s for [%s]',
+                         Quality.qualityStrings[cur_result.quality], cur_result.name)
             continue
 
         if not pass_show_wordlist_checks(cur_result.name, show_obj):
@@ -276,7 +277,7 @@ def pick_best_result(
                         scene_contains = True
 
                 if scene_contains and not scene_rej_nuked:
-                    logger.debug(f'Considering title match to \'or contain\' [{cur_result.name}]')
+                    logger.debug('Considering title match to \'or contain\' [%s]', cur_result.name)
                     reject = False
                 else:
                     reject, url = can_reject(cur_result.name)
@@ -292,7 +293,7 @@ def pick_best_result(
                         elif scene_contains or non_scene_fallback:
                             best_fallback_result = best_candidate(best_fallback_result, cur_result)
                         else:
-                            logger.debug(f'Rejecting as not scene release listed at any [{url}]')
+                            logger.debug('Rejecting as not scene release listed at any [%s]', url)
 
                 if reject:
                     continue
@@ -355,7 +356,7 @@ def is_final_result(result):
              returns True, if not then it's False
     """
 
-    logger.debug(f'Checking if searching should continue after finding {result.name}')
+    logger.debug('Checking if searching should continue after finding %s', result.name)
 
     show_obj = result.ep_obj_list[0].show_obj
 
@@ -396,7 +397,7 @@ def is_first_best_match(ep_status, result):
     :return:
     """
 
-    logger.debug(f'Checking if the first best quality match should be archived for episode {result.name}')
+    logger.debug('Checking if the first best quality match should be archived for episode %s', result.name)
 
     show_obj = result.ep_obj_list[0].show_obj
     cur_status, cur_quality = Quality.split_composite_status(ep_status)
@@ -528,17 +529,15 @@ def wanted_episodes(show_obj,  # type: TVShow
 
     total_wanted = total_replacing = total_unaired = 0
 
-    if 0 < len(sql_result) and 2 < len(sql_result) - len(show_obj.sxe_ep_obj):
-        my_db = db.DBConnection()
-        ep_sql_result = my_db.select(
-            'SELECT * FROM tv_episodes'
-            ' WHERE indexer = ? AND showid = ?',
-            [show_obj.tvid, show_obj.prodid])
-    else:
-        ep_sql_result = None
+    # load episode objects that do not exist yet with one query instead of a query per episode
+    ep_rows = None
+    scene_rows = show_obj.get_scene_rows([(int(s['season']), int(s['episode'])) for s in sql_result])
+    if None is not scene_rows:
+        ep_rows = show_obj.get_episode_rows()
 
     for result in sql_result:
-        ep_obj = show_obj.get_episode(int(result['season']), int(result['episode']), ep_result=ep_sql_result)
+        ep_obj = show_obj.get_episode(int(result['season']), int(result['episode']), ep_result=ep_rows,
+                                      scene_result=scene_rows)
         cur_status, cur_quality = common.Quality.split_composite_status(ep_obj.status)
         ep_obj.wanted_quality = get_wanted_qualities(ep_obj, cur_status, cur_quality, unaired=unaired)
         if not ep_obj.wanted_quality:
@@ -576,6 +575,9 @@ def search_for_needed_episodes(ep_obj_list):
     """
     search for episodes in list
 
+    the caches of providers are updated beforehand by RecentSearchQueueItem.update_providers, here they are
+    only looked up, so providers are searched and merged in order
+
     :param ep_obj_list: list of episode objects
     :return: list of found search results
     """
@@ -587,10 +589,17 @@ def search_for_needed_episodes(ep_obj_list):
 
     providers = list(filter(lambda x: x.is_active() and x.enable_recentsearch, sickgear.providers.sorted_sources()))
 
+    # one lookup of the cache for all providers
+    cached_results = providers and TVCache.find_cached_releases(ep_obj_list, [p.get_id() for p in providers]) or {}
+
     for cur_provider in providers:
         threading.current_thread().name = '%s :: [%s]' % (orig_thread_name, cur_provider.name)
 
-        ep_obj_search_result_list = cur_provider.search_rss(ep_obj_list)
+        try:
+            ep_obj_search_result_list = cur_provider.search_rss(ep_obj_list, cached_results=cached_results)
+        except (BaseException, Exception):
+            logger.error(f'Failed recent search of {cur_provider.name}: {traceback.format_exc()}')
+            continue
 
         search_done = True
 
@@ -14,10 +14,12 @@
 # You should have received a copy of the GNU General Public License
 # along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
 
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import copy
 import datetime
 import re
 import threading
+import time
 import traceback
 
 # noinspection PyPep8Naming
@@ -25,14 +27,16 @@ from exceptions_helper import ex
 
 import sickgear
 from . import common, db, failed_history, generic_queue, helpers, \
-    history, logger, network_timezones, properFinder, search, ui
+    history, logger, metrics, network_timezones, properFinder, search, ui
 from .classes import Proper, SimpleNamespace
 from .search import wanted_episodes, get_aired_in_season, set_wanted_aired
 from .tv import TVEpisode
 
 # noinspection PyUnreachableCode
 if False:
+    from concurrent.futures import Future
     from typing import Any, AnyStr, Dict, List, Optional, Union
+    from .providers.generic import GenericProvider
     from .tv import TVShow
 
 
@@ -47,6 +51,24 @@ PROPER_SEARCH = 50
 MANUAL_SEARCH_HISTORY = []
 MANUAL_SEARCH_HISTORY_SIZE = 100
 
+RECENT_SEARCH_MAX_WORKERS = 8  # type: int
+RECENT_SEARCH_PROVIDER_TIMEOUT = 300  # type: int
+recent_search_stats = {}  # type: Dict[AnyStr, Dict]
+# provider id to the cache update that a previous recent search stopped waiting for
+_left_running = {}  # type: Dict[AnyStr, Future]
+
+cache_update_seconds = metrics.histogram('provider_cache_update_seconds', 'Time of provider cache updates',
+                                         ('provider',), buckets=(.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300))
+
+
+def recent_search_provider_stats():
+    # type: (...) -> List[Dict]
+    """
+    per provider state and time taken of the cache update in the last recent search, ordered as sorted sources
+    """
+    return [dict(recent_search_stats[cur_id], id=cur_id) for cur_id in [
+        cur_provider.get_id() for cur_provider in sickgear.providers.sorted_sources()] if cur_id in recent_search_stats]
+
 
 class SearchQueue(generic_queue.GenericQueue):
     def __init__(self):
@@ -132,7 +154,7 @@ class SearchQueue(generic_queue.GenericQueue):
     def is_in_queue(self, show_obj, segment):
         # type: (sickgear.tv.TVShow, List[sickgear.tv.TVEpisode]) -> bool
         with self.lock:
-            return any(1 for cur_item in self.queue
+            return any(1 for cur_item in self.queue.for_show(show_obj.tvid_prodid)
                        if isinstance(cur_item, BacklogQueueItem) and show_obj == cur_item.show_obj
                        and segment == cur_item.segment)
 
@@ -146,9 +168,8 @@ class SearchQueue(generic_queue.GenericQueue):
     def is_show_in_queue(self, tvid_prodid):
         # type: (AnyStr) -> bool
         with self.lock:
-            return any(1 for cur_item in self.queue
-                       if isinstance(cur_item, (ManualSearchQueueItem, FailedQueueItem))
-                       and tvid_prodid == cur_item.show_obj.tvid_prodid)
+            return any(1 for cur_item in self.queue.for_show(tvid_prodid)
+                       if isinstance(cur_item, (ManualSearchQueueItem, FailedQueueItem)))
 
     def pause_backlog(self):
         # type: (...) -> None
@@ -159,6 +180,7 @@ class SearchQueue(generic_queue.GenericQueue):
         # type: (...) -> None
         with self.lock:
             self.min_priority = 0
+        self.wake()
 
     def is_backlog_paused(self):
         # type: (...) -> bool
@@ -248,9 +270,7 @@ class SearchQueue(generic_queue.GenericQueue):
         # type: (...) -> Dict[List]
         length = dict(backlog=[], recent=0, manual=[], failed=[], proper=[])
         with self.lock:
-            for cur_item in [self.currentItem] + self.queue:
-                if not cur_item:
-                    continue
+            for cur_item in self.running + self.queue.ordered():
                 if isinstance(cur_item, RecentSearchQueueItem):
                     length['recent'] += 1
                 elif isinstance(cur_item, ProperSearchQueueItem):
@@ -504,43 +524,131 @@ class RecentSearchQueueItem(generic_queue.QueueItem):
             if wanted:
                 logger.log('Found new episodes marked wanted')
 
+    @staticmethod
+    def _update_provider_cache(provider, needed, thread_name, stats, lock):
+        # type: (GenericProvider, common.NeededQualities, AnyStr, Dict, threading.Lock) -> None
+        """
+        update the cache of a provider and record the time taken
+
+        :param provider: provider to update
+        :param needed: needed qualities
+        :param thread_name: name to give the worker thread for logging
+        :param stats: stats of the provider in the current run, changed under lock
+        :param lock: lock of the run
+        """
+        threading.current_thread().name = thread_name
+        with lock:
+            stats.update(dict(state='updating', started=time.time()))
+
+        def can_write():
+            # claim the write of the fetched data, unless the caller stopped waiting for it
+            with lock:
+                if 'updating' != stats['state']:
+                    return False
+                stats['state'] = 'writing'
+                return True
+
+        state = 'failed'
+        try:
+            provider.cache.update_cache(needed=needed, can_write=can_write)
+            state = 'done'
+        finally:
+            elapsed = time.time() - stats['started']
+            cache_update_seconds.observe(elapsed, provider=provider.get_id())
+            with lock:
+                # a timed out update keeps the state and time given when it timed out
+                if 'timed out' != stats['state']:
+                    stats.update(dict(state=state, elapsed=round(elapsed, 2)))
+
     @staticmethod
     def update_providers(needed=common.NeededQualities(need_all=True)):
-        # type: (sickgear.common.NeededQualities) -> None
         """
+        update the caches of providers in a bounded pool of workers, each with a timeout from when it starts
+
+        a provider that times out is not waited for, the data it fetches afterwards is not written to its cache,
+        and it is not updated again until the update left running has ended
 
-        :param needed: needed class
-        :type needed: common.NeededQualities
+        :param needed: needed qualities
         """
+        global recent_search_stats
         orig_thread_name = threading.current_thread().name
-        threads = []
-
         providers = list(filter(lambda x: x.is_active() and x.enable_recentsearch,
                                 sickgear.providers.sorted_sources()))
-        for cur_provider in providers:
-            if not cur_provider.cache.should_update():
-                continue
-
-            if not threads:
-                logger.log('Updating provider caches with recent upload data')
-
-            # spawn a thread for each provider to save time waiting for slow response providers
-            threads.append(threading.Thread(target=cur_provider.cache.update_cache,
-                                            kwargs={'needed': needed},
-                                            name='%s :: [%s]' % (orig_thread_name, cur_provider.name)))
-            # start the thread we just created
-            threads[-1].start()
-
         if not len(providers):
             logger.warning('No NZB/Torrent providers in Media Providers/Options are enabled to match recent episodes')
 
-        if threads:
-            # wait for all threads to finish
-            for t in threads:
-                t.join()
+        # a run has its own stats and lock, so that an update left running by a previous run can not change them
+        run_stats, lock = {}, threading.Lock()
+        stale_providers = []
+        for cur_provider in providers:
+            left_running = _left_running.get(cur_provider.get_id())
+            if left_running and not left_running.done():
+                run_stats[cur_provider.get_id()] = dict(name=cur_provider.name, state='still updating', elapsed=None)
+                logger.warning(f'Skipping {cur_provider.name}, its cache update from a previous recent search is'
+                               f' still running')
+                continue
+            _left_running.pop(cur_provider.get_id(), None)
+            if not cur_provider.cache.should_update():
+                continue
+            run_stats[cur_provider.get_id()] = dict(name=cur_provider.name, state='queued', elapsed=None,
+                                                    started=None)
+            stale_providers.append(cur_provider)
+
+        if stale_providers:
+            logger.log('Updating provider caches with recent upload data')
+            max_workers = max(1, min(RECENT_SEARCH_MAX_WORKERS, len(stale_providers)))
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='RECENTSEARCH')
+            futures = {executor.submit(RecentSearchQueueItem._update_provider_cache, cur_provider, needed,
+                                       '%s :: [%s]' % (orig_thread_name, cur_provider.name),
+                                       run_stats[cur_provider.get_id()], lock): cur_provider
+                       for cur_provider in stale_providers}
+            done, not_done, timed_out = set(), set(futures), set()
+            while not_done:
+                # each provider has its own timeout, counted from when a worker starts to update it
+                now = time.time()
+                deadlines = []
+                with lock:
+                    for cur_future in list(not_done):
+                        stats = run_stats[futures[cur_future].get_id()]
+                        # an update that is writing its fetched data is waited for
+                        if None is stats['started'] or 'updating' != stats['state']:
+                            continue
+                        if RECENT_SEARCH_PROVIDER_TIMEOUT <= now - stats['started']:
+                            stats.update(dict(state='timed out', elapsed=round(now - stats['started'], 2)))
+                            not_done.discard(cur_future)
+                            timed_out.add(cur_future)
+                        else:
+                            deadlines.append(stats['started'] + RECENT_SEARCH_PROVIDER_TIMEOUT)
+
+                if not deadlines and not_done and max_workers <= len([f for f in timed_out if not f.done()]):
+                    # every worker is held by a timed out provider, so the queued providers are not updated
+                    for cur_future in not_done:
+                        cur_future.cancel()
+                        run_stats[futures[cur_future].get_id()]['state'] = 'cancelled'
+                        logger.warning(f'Cache update of {futures[cur_future].name} cancelled, no worker was free')
+                    break
 
+                cur_done, not_done = wait(not_done, return_when=FIRST_COMPLETED, timeout=max(0.0, min(
+                    deadlines or [now + RECENT_SEARCH_PROVIDER_TIMEOUT]) - now))
+                done |= cur_done
+            executor.shutdown(wait=False, cancel_futures=True)
+
+            for cur_future in timed_out:
+                cur_provider = futures[cur_future]
+                if not cur_future.done():
+                    _left_running[cur_provider.get_id()] = cur_future
+                logger.warning(f'Cache update of {cur_provider.name} timed out after'
+                               f' {RECENT_SEARCH_PROVIDER_TIMEOUT} seconds')
+            for cur_future in done:
+                cur_provider = futures[cur_future]
+                try:
+                    cur_future.result()
+                except (BaseException, Exception):
+                    logger.error(f'Failed cache update of {cur_provider.name}: {traceback.format_exc()}')
             logger.log('Finished updating provider caches')
 
+        recent_search_stats = run_stats
+
 
 class ProperSearchQueueItem(generic_queue.QueueItem):
     def __init__(self, provider_proper_obj=None):
@@ -29,11 +29,11 @@ from .scene_exceptions import ReleaseMap
 from sg_helpers import scantree
 
 from _23 import quote_plus
-from six import iterkeys, itervalues
+from six import iterkeys, itervalues, string_types
 
 # noinspection PyUnreachableCode
 if False:
-    from typing import AnyStr, List, Optional, Set, Union
+    from typing import AnyStr, Dict, List, Optional, Set, Union
     from .tv import TVShow
     # noinspection PyUnresolvedReferences
     from re import Pattern
@@ -153,25 +153,141 @@ def contains_any(subject,  # type: AnyStr
              then True for first pattern that does not match, or False
     :rtype: Union(NoneType, bool)
     """
-    compiled_words = compile_word_list(lookup_words, rx=rx, **kwargs)
-    if subject and compiled_words:
-        for rc_filter in compiled_words:
-            match = rc_filter.search(subject)
-            if (match and not invert) or (not match and invert):
-                msg = match and not invert and 'Found match' or ''
-                msg = not match and invert and 'No match found' or msg
-                logger.debug(f'{msg} from pattern: {rc_filter.pattern} in text: {subject} ')
-                return True
+    matcher = word_list_matcher(lookup_words, rx=rx, **kwargs)
+    if subject and matcher:
+        rc_filter = (matcher.search, matcher.search_missing)[invert](subject)
+        if rc_filter:
+            msg = ('Found match', 'No match found')[invert]
+            logger.debug(f'{msg} from pattern: {rc_filter.pattern} in text: {subject} ')
+            return True
         return False
     return None
 
 
-def compile_word_list(lookup_words,  # type: Union[AnyStr, Set[AnyStr]]
+class WordListMatcher(object):
+    """
+    word list compiled once into a set of plain words and one alternation regex of the other words
+
+    a plain word is letters and digits between the default boundaries, it is found by splitting a name at the same
+    boundaries, so that names are checked against any number of plain words in one pass over the name
+    """
+    re_plain = re.compile(r'^[^\W_]+$')
+    re_boundary = re.compile(r'[\W_]+')
+
+    def __init__(self, patterns, subjects, re_prefix, re_suffix):
+        # type: (List[Pattern[AnyStr]], List[AnyStr], AnyStr, AnyStr) -> None
+        """
+        :param patterns: compiled regex of each word
+        :param subjects: regex source of each word in patterns
+        """
+        self.patterns = patterns
+        self.words = {}  # type: Dict[AnyStr, Pattern[AnyStr]]
+        self.rx_patterns = []  # type: List[Pattern[AnyStr]]
+        rx_subjects = []
+        plain = (r'(^|[\W_])', r'($|[\W_])') == (re_prefix, re_suffix)
+        for rc_filter, subject in zip(patterns, subjects):
+            if plain and self.re_plain.search(subject):
+                self.words.setdefault(subject.lower(), rc_filter)
+            else:
+                self.rx_patterns.append(rc_filter)
+                rx_subjects.append(subject)
+
+        self.combined = None  # type: Optional[Pattern[AnyStr]]
+        # back references are numbered by position, and would point at the wrong group once joined
+        if 1 < len(rx_subjects) and not any(re.search(r'\\[1-9]|\(\?P=', x) for x in rx_subjects):
+            try:
+                self.combined = re.compile('(?i)%s' % '|'.join(
+                    '(?:%s%s%s)' % (re_prefix, x, re_suffix) for x in rx_subjects))
+            except re.error:
+                pass
+
+    def _tokens(self, subject):
+        # type: (AnyStr) -> Set[AnyStr]
+        return set(self.re_boundary.split(subject.lower()))
+
+    def search(self, subject):
+        # type: (AnyStr) -> Optional[Pattern[AnyStr]]
+        """
+        :return: pattern of a word found in subject, or None if no word is found
+        """
+        if self.words:
+            found = self._tokens(subject).intersection(self.words)
+            if found:
+                return self.words[min(found)]
+        if self.combined and not self.combined.search(subject):
+            return None
+        return next((rc_filter for rc_filter in self.rx_patterns if rc_filter.search(subject)), None)
+
+    def search_missing(self, subject):
+        # type: (AnyStr) -> Optional[Pattern[AnyStr]]
+        """
+        :return: pattern of a word not found in subject, or None if all words are found
+        """
+        if self.words:
+            missing = set(self.words).difference(self._tokens(subject))
+            if missing:
+                return self.words[min(missing)]
+        return next((rc_filter for rc_filter in self.rx_patterns if not rc_filter.search(subject)), None)
+
+    def __bool__(self):
+        return 0 < len(self.patterns)
+
+    __nonzero__ = __bool__
+
+
+# compiled word lists keyed by list content and compile options, dropped when word lists are edited
+word_list_cache = {}
+word_list_cache_size = 500
+
+
+def word_list_matcher(lookup_words,  # type: Union[AnyStr, List[AnyStr], Set[AnyStr]]
                       re_prefix=r'(^|[\W_])',  # type: AnyStr
                       re_suffix=r'($|[\W_])',  # type: AnyStr
                       rx=None
-                      ):  # type: (...) -> List[Pattern[AnyStr]]
+                      ):  # type: (...) -> Optional[WordListMatcher]
+    """
+    get a cached compiled word list, a list is compiled at first use of its content with these options
+
+    :param lookup_words: List, Set or comma separated string of words to search
+    :param re_prefix: insert string to all lookup words
+    :param re_suffix: append string to all lookup words
+    :param rx: lookup_words are regex
+    :return: matcher, or None if there are no words
+    """
+    if not lookup_words:
+        return None
+    words_key = isinstance(lookup_words, string_types) and lookup_words or frozenset(lookup_words)
+    key = (words_key, isinstance(lookup_words, list), re_prefix, re_suffix, rx)
+    matcher = word_list_cache.get(key)
+    if None is matcher:
+        if isinstance(lookup_words, (set, frozenset)):
+            lookup_words = sorted(lookup_words)
+        subjects = []
+        patterns = compile_word_list(lookup_words, re_prefix=re_prefix, re_suffix=re_suffix, rx=rx,
+                                     subjects=subjects)
+        matcher = WordListMatcher(patterns, subjects, re_prefix, re_suffix)
+        if word_list_cache_size <= len(word_list_cache):
+            word_list_cache.clear()
+        word_list_cache[key] = matcher
+    return matcher
+
+
+def clear_word_list_cache():
+    """
+    drop all compiled word lists, called when ignore or require words are changed
+    """
+    word_list_cache.clear()
+
 
+def compile_word_list(lookup_words,  # type: Union[AnyStr, Set[AnyStr]]
+                      re_prefix=r'(^|[\W_])',  # type: AnyStr
+                      re_suffix=r'($|[\W_])',  # type: AnyStr
+                      rx=None,
+                      subjects=None  # type: Optional[List[AnyStr]]
+                      ):  # type: (...) -> List[Pattern[AnyStr]]
+    """
+    :param subjects: optional list to fill with the regex source of each compiled word
+    """
     result = []
     if lookup_words:
         if None is rx:
@@ -189,6 +305,8 @@ def compile_word_list(lookup_words,  # type: Union[AnyStr, Set[AnyStr]]
                 # !0 == regex and subject = s / 'what\'s the "time"' / what\'s\ the\ \"time\"
                 subject = search_raw and re.escape(word) or re.sub(r'([\" \'])', r'\\\1', word)
                 result.append(re.compile('(?i)%s%s%s' % (re_prefix, subject, re_suffix)))
+                if None is not subjects:
+                    subjects.append(subject)
             except re.error as e:
                 logger.debug(f'Failure to compile filter expression: {word} ... Reason: {ex(e)}')
 
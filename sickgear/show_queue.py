@@ -59,8 +59,10 @@ def bool_none(val):
 
 
 class ShowQueue(generic_queue.GenericQueue):
-    def __init__(self):
-        generic_queue.GenericQueue.__init__(self, cache_db_tables=['show_queue'], main_db_tables=['tv_src_switch'])
+    def __init__(self, workers=1):
+        # type: (int) -> None
+        generic_queue.GenericQueue.__init__(self, cache_db_tables=['show_queue'], main_db_tables=['tv_src_switch'],
+                                            workers=workers)
         self.queue_name = 'SHOWQUEUE'
         self.daily_update_running = False
         if not db.DBConnection().has_flag('kodi_nfo_uid'):
@@ -248,7 +250,7 @@ class ShowQueue(generic_queue.GenericQueue):
         :return:
         """
         with self.lock:
-            return any(1 for x in self.queue if x.action_id in actions and show_obj == x.show_obj)
+            return any(1 for x in self.queue.for_show(show_obj.tvid_prodid) if x.action_id in actions)
 
     def _is_being_somethinged(self, show_obj, actions):
         # type: (TVShow, Tuple[integer_types, ...]) -> bool
@@ -261,9 +263,7 @@ class ShowQueue(generic_queue.GenericQueue):
         :rtype: bool
         """
         with self.lock:
-            return None is not self.currentItem \
-                   and show_obj == self.currentItem.show_obj \
-                   and self.currentItem.action_id in actions
+            return any(1 for x in self.running if show_obj == x.show_obj and x.action_id in actions)
 
     def is_in_update_queue(self, show_obj):
         # type: (TVShow) -> bool
@@ -373,7 +373,7 @@ class ShowQueue(generic_queue.GenericQueue):
         :rtype: bool
         """
         with self.lock:
-            return any(1 for x in self.queue + [self.currentItem]
+            return any(1 for x in self.running + self.queue
                        if isinstance(x, ShowQueueItem) and x.scheduled_update)
 
     def is_show_being_switched(self, show_obj):
@@ -397,7 +397,7 @@ class ShowQueue(generic_queue.GenericQueue):
     def is_switch_running(self):
         # type: (...) -> bool
         with self.lock:
-            return any(1 for x in self.queue + [self.currentItem] if isinstance(x, QueueItemSwitchSource))
+            return any(1 for x in self.running + self.queue if isinstance(x, QueueItemSwitchSource))
 
     def _get_loading_showlist(self):
         """
@@ -406,7 +406,7 @@ class ShowQueue(generic_queue.GenericQueue):
         :rtype: List
         """
         with self.lock:
-            return [x for x in self.queue + [self.currentItem] if None is not x and x.is_loading]
+            return [x for x in self.running + self.queue.ordered() if x.is_loading]
 
     def queue_length(self):
         # type: (...) -> Dict[AnyStr, List[AnyStr, Dict]]
@@ -417,9 +417,7 @@ class ShowQueue(generic_queue.GenericQueue):
         length = {'add': [], 'update': [], 'forceupdate': [], 'forceupdateweb': [], 'refresh': [], 'rename': [],
                   'subtitle': [], 'switch': []}
         with self.lock:
-            for cur_item in [self.currentItem] + self.queue:  # type: ShowQueueItem
-                if not cur_item:
-                    continue
+            for cur_item in self.running + self.queue.ordered():  # type: ShowQueueItem
                 result_item = {'name': cur_item.show_name, 'scheduled_update': cur_item.scheduled_update,
                                'uid': cur_item.uid}
                 if isinstance(cur_item, QueueItemAdd):
@@ -635,7 +633,7 @@ class ShowQueue(generic_queue.GenericQueue):
         # type: (TVShow) -> None
         if show_obj:
             with self.lock:
-                for c in ((self.currentItem and [self.currentItem]) or []) + self.queue:
+                for c in self.running + self.queue.for_show(show_obj.tvid_prodid):
                     if show_obj == getattr(c, 'show_obj', None):
                         try:
                             self.remove_from_queue([c.uid])
@@ -759,8 +757,8 @@ class ShowQueueItem(generic_queue.QueueItem):
         """
         :rtype: bool
         """
-        return self in sickgear.show_queue_scheduler.action.queue + [
-            sickgear.show_queue_scheduler.action.currentItem]
+        return self in sickgear.show_queue_scheduler.action.queue \
+            or self in sickgear.show_queue_scheduler.action.running
 
     def _get_name(self):
         """
@@ -0,0 +1,226 @@
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Per show episode statistics kept in the main db table show_stats.
+
+A row holds the counts and airdates of a show for the day in stats_date. Triggers on tv_episodes delete the row of a
+show when an episode is added or removed, or its status, airdate or numbering changes. Readers recompute only the
+missing rows, so a page that lists shows reads one precomputed row per show.
+
+Backlog counts are made from the number of episodes of each show per status, which is kept in memory until the
+episode_status data version of the main db changes.
+"""
+
+import datetime
+import threading
+
+import sickgear
+from . import db, logger
+from .common import FAILED, IGNORED, SKIPPED, UNAIRED, WANTED, Overview, Quality
+from .tv import TVidProdid
+
+# noinspection PyUnreachableCode
+if False:
+    from typing import AnyStr, Dict, List, Optional, Tuple
+    from .tv import TVShow
+
+STATS_COLUMNS = ('ep_snatched', 'ep_downloaded', 'ep_total', 'ep_airs_next', 'ep_airs_last', 'ep_next_wanted',
+                 'ep_downloaded_aired', 'ep_total_aired')
+
+BACKLOG_CATEGORIES = (Overview.UNAIRED, Overview.GOOD, Overview.SKIPPED, Overview.WANTED, Overview.QUAL,
+                      Overview.SNATCHED)
+
+_status_counts_lock = threading.Lock()
+_status_counts = (None, {})  # type: Tuple[Optional[int], Dict[AnyStr, List[Tuple[int, bool, int]]]]
+
+
+def _statuses(statuses):
+    # type: (List[int]) -> str
+    return ','.join([str(x) for x in statuses])
+
+
+def _stats_select(today):
+    # type: (int) -> str
+    """
+    :param today: date ordinal to calculate the stats for
+    :return: select of the stats columns for the tv_shows rows of a where clause, with placeholders for the where
+    """
+    status_snatched = _statuses(Quality.SNATCHED_ANY)
+    status_download = _statuses(Quality.DOWNLOADED + Quality.ARCHIVED)
+    status_have = _statuses(Quality.SNATCHED_ANY + Quality.DOWNLOADED + Quality.ARCHIVED)
+    regular = 'ep.season > 0 AND ep.episode > 0 AND ep.airdate > 1'
+    return (
+        'SELECT s.indexer AS indexer, s.indexer_id AS showid, %(today)s AS stats_date,'
+        ' COUNT(CASE WHEN %(regular)s AND ep.status IN (%(snatched)s) THEN 1 END) AS ep_snatched,'
+        ' COUNT(CASE WHEN %(regular)s AND ep.status IN (%(download)s) THEN 1 END) AS ep_downloaded,'
+        ' COUNT(CASE WHEN %(regular)s AND ((ep.airdate <= %(today)s AND ep.status IN (%(total)s))'
+        ' OR ep.status IN (%(snatched)s) OR ep.status IN (%(download)s)) THEN 1 END) AS ep_total,'
+        ' MIN(CASE WHEN ep.airdate >= %(today)s AND ep.status IN (%(unaired)s, %(wanted)s)'
+        ' THEN ep.airdate END) AS ep_airs_next,'
+        ' MAX(CASE WHEN ep.airdate <= %(today)s AND ep.season > 0 THEN ep.airdate END) AS ep_airs_last,'
+        ' MIN(CASE WHEN ep.airdate >= %(today)s AND ep.status IN (%(unaired)s, %(wanted)s, %(failed)s)'
+        ' THEN ep.airdate END) AS ep_next_wanted,'
+        ' COUNT(CASE WHEN ep.season != 0 AND ep.episode != 0 AND ep.airdate <= %(today)s'
+        ' AND ep.status IN (%(download)s) THEN 1 END) AS ep_downloaded_aired,'
+        ' COUNT(CASE WHEN ep.season != 0 AND ep.episode != 0 AND ep.airdate <= %(today)s'
+        ' AND (ep.airdate != 1 OR ep.status IN (%(have)s)) AND ep.status != %(ignored)s'
+        ' THEN 1 END) AS ep_total_aired'
+        ' FROM tv_shows s LEFT JOIN tv_episodes ep ON ep.indexer = s.indexer AND ep.showid = s.indexer_id'
+        ' WHERE %%s GROUP BY s.indexer, s.indexer_id'
+        % dict(today=int(today), regular=regular, snatched=status_snatched, download=status_download,
+               have=status_have, total=_statuses([SKIPPED, WANTED, FAILED]), unaired=UNAIRED, wanted=WANTED,
+               failed=FAILED, ignored=IGNORED))
+
+
+def _refresh_sql(shows, today):
+    # type: (List[Tuple[int, int]], int) -> List[List]
+    """
+    :param shows: list of (tvid, prodid) to recompute
+    :param today: date ordinal to calculate the stats for
+    :return: queries that replace the stats rows of shows
+    """
+    sql = 'INSERT OR REPLACE INTO show_stats (indexer, showid, stats_date, %s) %s' % (
+        ', '.join(STATS_COLUMNS), _stats_select(today) % 's.indexer = ? AND s.indexer_id = ?')
+    return [[sql, [tvid, prodid]] for tvid, prodid in shows]
+
+
+def get_show_stats(today=None):
+    # type: (Optional[int]) -> Dict[str, Dict]
+    """
+    get the stats of all shows, rows that are missing or were calculated for another day are recomputed first
+
+    :param today: date ordinal, default is today
+    :return: dict of stats keyed by tvid_prodid
+    """
+    today = today or datetime.date.today().toordinal()
+    my_db = db.DBConnection()
+    stale = my_db.select(
+        """
+        SELECT s.indexer AS indexer, s.indexer_id AS showid
+        FROM tv_shows s
+        LEFT JOIN show_stats st ON st.indexer = s.indexer AND st.showid = s.indexer_id AND st.stats_date = ?
+        WHERE st.showid IS NULL
+        """, [today])
+    if stale:
+        logger.debug('Updating episode stats for %s show%s' % (len(stale), ('s', '')[1 == len(stale)]))
+        my_db.mass_action(_refresh_sql([(r['indexer'], r['showid']) for r in stale], today))
+
+    sql_result = my_db.select('SELECT * FROM show_stats WHERE stats_date = ?', [today])
+    return dict([(TVidProdid({r['indexer']: r['showid']})(), dict(r)) for r in sql_result])
+
+
+def rebuild_show_stats(today=None):
+    # type: (Optional[int]) -> None
+    """
+    drop all stats and compute them from scratch
+    """
+    today = today or datetime.date.today().toordinal()
+    my_db = db.DBConnection()
+    shows = [(r['indexer'], r['indexer_id']) for r in my_db.select('SELECT indexer, indexer_id FROM tv_shows')]
+    my_db.mass_action([['DELETE FROM show_stats']] + _refresh_sql(shows, today))
+
+
+def check_show_stats(fix=True, today=None):
+    # type: (bool, Optional[int]) -> List[str]
+    """
+    compare the stored stats with stats computed from tv_episodes
+
+    :param fix: rebuild the stats table from scratch if a difference is found
+    :param today: date ordinal, default is today
+    :return: list of tvid_prodid where the stored stats differ
+    """
+    today = today or datetime.date.today().toordinal()
+    my_db = db.DBConnection()
+    stored = dict([((r['indexer'], r['showid']), r) for r in
+                   my_db.select('SELECT * FROM show_stats WHERE stats_date = ?', [today])])
+    mismatch = []
+    for cur_row in my_db.select(_stats_select(today) % '1 = 1'):
+        cur_stored = stored.get((cur_row['indexer'], cur_row['showid']))
+        if cur_stored and any(cur_stored[c] != cur_row[c] for c in STATS_COLUMNS):
+            mismatch.append(TVidProdid({cur_row['indexer']: cur_row['showid']})())
+
+    if mismatch:
+        logger.warning('Episode stats of %s show%s out of sync%s' % (
+            len(mismatch), ('s are', ' is')[1 == len(mismatch)], ('', ', rebuilding')[fix]))
+        if fix:
+            rebuild_show_stats(today)
+    return mismatch
+
+
+def get_status_counts():
+    # type: (...) -> Dict[AnyStr, List[Tuple[int, bool, int]]]
+    """
+    :return: dict of (composite status, never aired, episode count) lists keyed by tvid_prodid
+    """
+    global _status_counts
+    my_db = db.DBConnection()
+    version = db.data_version('episode_status', my_db)[0]
+    with _status_counts_lock:
+        if version != _status_counts[0]:
+            status_counts = {}
+            for cur_row in my_db.select(
+                    'SELECT indexer, showid, status, 1 = airdate AS never_aired, COUNT(*) AS ep_count'
+                    ' FROM tv_episodes GROUP BY indexer, showid, status, never_aired'):
+                status_counts.setdefault(TVidProdid({cur_row['indexer']: cur_row['showid']})(), []).append(
+                    (int(cur_row['status']), bool(cur_row['never_aired']), int(cur_row['ep_count'])))
+            _status_counts = (version, status_counts)
+        return _status_counts[1]
+
+
+def backlog_category(show_obj, status):
+    # type: (TVShow, int) -> Tuple[int, bool]
+    """
+    :param show_obj: show object
+    :param status: composite episode status
+    :return: overview category of an episode, and True if the episode is listed for backlog
+    """
+    ep_cat = show_obj.get_overview(status, split_snatch=True)
+    return ((ep_cat, Overview.SNATCHED)[Overview.SNATCHED_QUAL == ep_cat],
+            ep_cat in (Overview.WANTED, Overview.QUAL, Overview.SNATCHED_QUAL))
+
+
+def backlog_statuses(show_obj):
+    # type: (TVShow) -> List[int]
+    """
+    :param show_obj: show object
+    :return: composite statuses of the episodes of a show that are listed for backlog
+    """
+    return sorted(set([cur_status for cur_status, _, _ in get_status_counts().get(show_obj.tvid_prodid, [])
+                       if backlog_category(show_obj, cur_status)[1]]))
+
+
+def get_backlog_counts(show_list=None):
+    # type: (Optional[List[TVShow]]) -> Dict[AnyStr, Dict[int, int]]
+    """
+    count the episodes of each show per overview category, the category of a status depends on the quality settings
+    of a show, so the grouped status counts are classed per show
+
+    :param show_list: shows to count, default is all shows
+    :return: dict of episode counts per overview category keyed by tvid_prodid
+    """
+    status_counts = get_status_counts()
+    result = {}
+    for cur_show_obj in (sickgear.showList, show_list)[None is not show_list]:
+        ep_counts = dict([(cur_cat, 0) for cur_cat in BACKLOG_CATEGORIES])
+        for cur_status, cur_never_aired, cur_count in status_counts.get(cur_show_obj.tvid_prodid, []):
+            if cur_never_aired and not sickgear.SEARCH_UNAIRED:
+                continue
+            ep_cat = backlog_category(cur_show_obj, cur_status)[0]
+            if ep_cat:
+                ep_counts[ep_cat] += cur_count
+        result[cur_show_obj.tvid_prodid] = ep_counts
+    return result
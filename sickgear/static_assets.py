@@ -0,0 +1,187 @@
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Versioned static files of the web ui
+
+At startup, each file under the css, images and js folders is hashed and text files are compressed into the cache
+folder. Templates link a file by a path that contains its hash, so that it can be cached by a browser or proxy for a
+year, and a request for it is served from a compressed file when the client accepts one.
+"""
+
+import gzip
+import hashlib
+import io
+import os
+import re
+
+try:
+    # noinspection PyUnresolvedReferences
+    import brotli
+except ImportError:
+    brotli = None
+
+from exceptions_helper import ex
+
+from . import logger
+
+from sg_helpers import remove_file_perm
+
+# noinspection PyUnreachableCode
+if False:
+    from typing import AnyStr, Dict, Optional, Tuple
+
+STATIC_FOLDERS = ('css', 'images', 'js')
+COMPRESS_EXT = ('.css', '.js', '.svg', '.json', '.map', '.xml', '.txt', '.ico', '.eot', '.ttf', '.otf')
+COMPRESS_MIN_SIZE = 1024
+MAX_AGE = 365 * 24 * 60 * 60
+RE_VERSIONED = re.compile(r'^(.+)\.([0-9a-f]{10})(\.[^./\\]+)$')
+
+# relative path of a static file -> content hash
+asset_versions = {}  # type: Dict[AnyStr, AnyStr]
+data_root = None  # type: Optional[AnyStr]
+compressed_root = None  # type: Optional[AnyStr]
+
+
+def _encodings():
+    # type: (...) -> Tuple[Tuple[AnyStr, AnyStr], ...]
+    """
+    :return: pairs of content encoding and file extension of the compressed files, in order of preference
+    """
+    return ((('br', '.br'),), ())[None is brotli] + (('gzip', '.gz'),)
+
+
+def _file_hash(file_path):
+    # type: (AnyStr) -> AnyStr
+    file_hash = hashlib.md5()
+    with io.open(file_path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(65536), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()[:10]
+
+
+def _compress(data, encoding):
+    # type: (bytes, AnyStr) -> bytes
+    if 'br' == encoding:
+        return brotli.compress(data)
+    # mtime=0 keeps the compressed file the same for the same content
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def versioned_path(rel_path):
+    # type: (AnyStr) -> AnyStr
+    """
+    :param rel_path: path of a static file relative to the gui data root, e.g. css/style.css
+    :return: path that contains the hash of the file, e.g. css/style.0123456789.css, or rel_path if not a static file
+    """
+    version = asset_versions.get(rel_path)
+    if not version:
+        return rel_path
+    base, ext = os.path.splitext(rel_path)
+    return '%s.%s%s' % (base, version, ext)
+
+
+def unversioned_path(root, url_path):
+    # type: (AnyStr, AnyStr) -> Tuple[AnyStr, bool]
+    """
+    :param root: folder that a static file handler serves from
+    :param url_path: path relative to root that may contain the hash of the file
+    :return: path relative to root without the hash, and True if the hash is that of the current file
+    """
+    match = RE_VERSIONED.search(url_path)
+    if match and data_root:
+        path = match.group(1) + match.group(3)
+        rel_path = os.path.relpath(os.path.join(root, path), data_root).replace(os.sep, '/')
+        version = asset_versions.get(rel_path)
+        if version:
+            return path, version == match.group(2)
+    return url_path, False
+
+
+def compressed_file(absolute_path, accept_encoding):
+    # type: (AnyStr, AnyStr) -> Tuple[Optional[AnyStr], Optional[AnyStr]]
+    """
+    :param absolute_path: static file to serve
+    :param accept_encoding: Accept-Encoding request header
+    :return: compressed file and its content encoding, or None, None if there is none the client accepts
+    """
+    if compressed_root and data_root:
+        rel_path = os.path.relpath(absolute_path, data_root).replace(os.sep, '/')
+        if rel_path in asset_versions:
+            accepted = set([enc.split(';')[0].strip() for enc in (accept_encoding or '').lower().split(',')])
+            for encoding, ext in _encodings():
+                if encoding in accepted:
+                    file_path = os.path.join(compressed_root, *versioned_path(rel_path).split('/')) + ext
+                    if os.path.isfile(file_path):
+                        return file_path, encoding
+    return None, None
+
+
+def build(gui_root, cache_dir):
+    # type: (AnyStr, AnyStr) -> None
+    """
+    hash the static files of the web ui, and create the compressed files that are missing
+
+    :param gui_root: folder that holds the css, images and js folders
+    :param cache_dir: cache folder
+    """
+    global data_root, compressed_root
+
+    versions = {}
+    wanted = set()
+    target_root = os.path.join(cache_dir, 'static')
+    for cur_folder in STATIC_FOLDERS:
+        for cur_dir, _, files in os.walk(os.path.join(gui_root, cur_folder)):
+            for cur_file in files:
+                file_path = os.path.join(cur_dir, cur_file)
+                rel_path = os.path.relpath(file_path, gui_root).replace(os.sep, '/')
+                try:
+                    versions[rel_path] = _file_hash(file_path)
+                except EnvironmentError as e:
+                    logger.warning(f'Unable to hash static file {file_path}: {ex(e)}')
+                    continue
+                if not cur_file.lower().endswith(COMPRESS_EXT) or COMPRESS_MIN_SIZE > os.path.getsize(file_path):
+                    continue
+                base, ext = os.path.splitext(rel_path)
+                target_base = os.path.join(target_root, *('%s.%s%s' % (base, versions[rel_path], ext)).split('/'))
+                data = None
+                for encoding, compressed_ext in _encodings():
+                    target = target_base + compressed_ext
+                    wanted.add(target)
+                    if os.path.isfile(target):
+                        continue
+                    try:
+                        if None is data:
+                            with io.open(file_path, 'rb') as fh:
+                                data = fh.read()
+                        os.path.isdir(os.path.dirname(target)) or os.makedirs(os.path.dirname(target))
+                        with io.open(target, 'wb') as fh:
+                            fh.write(_compress(data, encoding))
+                    except (BaseException, Exception) as e:
+                        logger.warning(f'Unable to compress static file {file_path}: {ex(e)}')
+                        remove_file_perm(target)
+
+    # remove the compressed files of old versions
+    for cur_dir, _, files in os.walk(target_root):
+        for cur_file in files:
+            file_path = os.path.join(cur_dir, cur_file)
+            if file_path not in wanted:
+                remove_file_perm(file_path)
+
+    asset_versions.clear()
+    asset_versions.update(versions)
+    data_root, compressed_root = gui_root, target_root
+    logger.debug(f'Versioned {len(versions)} static files')
@@ -15,7 +15,14 @@
 # You should have received a copy of the GNU General Public License
 # along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
 
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import datetime
+import threading
+import time
+import traceback
+
+from exceptions_helper import ex
 
 from . import db, helpers, logger
 from .common import *
@@ -25,8 +32,17 @@ import sickgear
 
 from lib import subliminal
 
+# noinspection PyUnreachableCode
+if False:
+    from typing import AnyStr, Dict, Iterator, List, Optional, Tuple
+
 SINGLE = 'und'
 
+SUBTITLES_MAX_WORKERS = 4  # type: int
+# uses at once, and seconds between the start of uses, of a subtitle service
+DEFAULT_SERVICE_LIMIT = (2, 1.0)  # type: Tuple[int, float]
+SERVICE_LIMITS = {'addic7ed': (1, 5.0)}  # type: Dict[AnyStr, Tuple[int, float]]
+
 
 def sorted_service_list():
     services_mapping = dict([(x.lower(), x) for x in subliminal.core.SERVICES])
@@ -104,6 +120,47 @@ def subtitle_language_filter():
     return [language for language in subliminal.language.LANGUAGES if language[2] != ""]
 
 
+class ServiceLimiter(object):
+    def __init__(self, limits=None, default=DEFAULT_SERVICE_LIMIT):
+        # type: (Optional[Dict[AnyStr, Tuple[int, float]]], Tuple[int, float]) -> None
+        """
+        :param limits: uses at once and seconds between the start of uses, by service name
+        :param default: limit of a service not in limits
+        """
+        self.limits = dict(SERVICE_LIMITS if None is limits else limits)
+        self.default = default
+        self.lock = threading.Lock()
+        self._semaphores = {}  # type: Dict[AnyStr, threading.BoundedSemaphore]
+        self._next_start = {}  # type: Dict[AnyStr, float]
+
+    def _semaphore(self, service_name):
+        # type: (AnyStr) -> threading.BoundedSemaphore
+        with self.lock:
+            if service_name not in self._semaphores:
+                self._semaphores[service_name] = threading.BoundedSemaphore(
+                    self.limits.get(service_name, self.default)[0])
+            return self._semaphores[service_name]
+
+    @contextmanager
+    def guard(self, service_name):
+        # type: (AnyStr) -> Iterator[None]
+        """
+        hold a use of a service, waiting for a free use and for the time between the start of uses
+        """
+        with self._semaphore(service_name):
+            with self.lock:
+                now = time.time()
+                start = max(now, self._next_start.get(service_name, 0))
+                self._next_start[service_name] = start + self.limits.get(service_name, self.default)[1]
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+service_limiter = ServiceLimiter()
+subliminal.core.service_guard = service_limiter.guard
+
+
 class SubtitlesFinder(Job):
     """
     The SubtitlesFinder will be executed every hour but will not necessarily search
@@ -122,25 +179,55 @@ class SubtitlesFinder(Job):
             self._main()
 
     def _main(self):
-        if 1 > len(sickgear.subtitles.get_enabled_service_list()):
+        if 1 > len(get_enabled_service_list()):
             logger.error('Not enough services selected. At least 1 service is required to'
                          ' search subtitles in the background')
             return
 
         logger.log('Checking for subtitles')
 
-        # get episodes on which we want subtitles
-        # criteria is:
-        #  - show subtitles = 1
-        #  - episode subtitles != config wanted languages or SINGLE (depends on config multi)
-        #  - search count < 2 and diff(airdate, now) > 1 week : now -> 1d
-        #  - search count < 7 and diff(airdate, now) <= 1 week : now -> 4h -> 8h -> 16h -> 1d -> 1d -> 1d
+        sql_result = self._due_episodes()
+        if 0 == len(sql_result):
+            logger.log('No subtitles to download', logger.MESSAGE)
+            return
 
-        today = datetime.date.today().toordinal()
+        # episodes are searched by a pool of workers, and each use of a service is held by service_limiter
+        executor = ThreadPoolExecutor(max_workers=max(1, min(SUBTITLES_MAX_WORKERS, len(sql_result))),
+                                      thread_name_prefix='SUBTITLES')
+        try:
+            searched = sum(executor.map(self._download, sql_result))
+        finally:
+            executor.shutdown(wait=True)
+        logger.log(f'Searched subtitles for {searched} of {len(sql_result)} episodes')
+
+    def _due_episodes(self, now=None):
+        # type: (Optional[datetime.datetime]) -> List[Dict]
+        """
+        get episodes on which we want subtitles
+        criteria is:
+         - show subtitles = 1
+         - episode subtitles != config wanted languages or SINGLE (depends on config multi)
+         - search count < 2 and diff(airdate, now) > 1 week : now -> 1d
+         - search count < 7 and diff(airdate, now) <= 1 week : now -> 4h -> 8h -> 4h -> 16h -> 1d -> 1d
+
+        :param now: time to apply the rules at
+        :return: episodes that are due a search
+        """
+        now = now or datetime.datetime.now()
+        today = now.date().toordinal()
+
+        # the last search must be earlier than the hours of the rule for the count of searches, a time as text
+        # compares in order, a missing count or time is due
+        rules_sql, rules_args = [], []
+        for cur_rule, cur_compare in (('old', '>'), ('new', '<=')):
+            hours = self._get_rules()[cur_rule]
+            rules_sql += ['((? - e.airdate) %s 7 AND IFNULL(e.subtitles_searchcount, 0) < %s'
+                          ' AND IFNULL(e.subtitles_lastsearch, \'\') < CASE IFNULL(e.subtitles_searchcount, 0) %s END)'
+                          % (cur_compare, len(hours), ' '.join(['WHEN %s THEN ?' % n for n in range(len(hours))]))]
+            rules_args += [today] + [(now - datetime.timedelta(hours=h)).strftime('%Y-%m-%d %H:%M:%S') for h in hours]
 
-        # you have 5 minutes to understand that one. Good luck
         my_db = db.DBConnection()
-        sql_result = my_db.select(
+        return my_db.select(
             'SELECT s.show_name, e.indexer AS tv_id, e.showid AS prod_id,'
             ' e.season, e.episode, e.status, e.subtitles,'
             ' e.subtitles_searchcount AS searchcount, e.subtitles_lastsearch AS lastsearch,'
@@ -149,55 +236,43 @@ class SubtitlesFinder(Job):
             ' INNER JOIN tv_shows AS s'
             ' ON (e.indexer = s.indexer AND e.showid = s.indexer_id)'
             ' WHERE s.subtitles = 1 AND e.subtitles NOT LIKE (?)'
-            ' AND ((e.subtitles_searchcount <= 2 AND (? - e.airdate) > 7)'
-            ' OR (e.subtitles_searchcount <= 7 AND (? - e.airdate) <= 7))'
-            ' AND (e.status IN (%s)' % ','.join([str(x) for x in Quality.DOWNLOADED])
+            ' AND (%s)' % ' OR '.join(rules_sql)
+            + ' AND (e.status IN (%s)' % ','.join([str(x) for x in Quality.DOWNLOADED])
             + ' OR (e.status IN (%s)' % ','.join([str(x) for x in Quality.SNATCHED + Quality.SNATCHED_PROPER])
-            + ' AND e.location != \'\'))', [today, wanted_languages(True), today, today])
-        if 0 == len(sql_result):
-            logger.log('No subtitles to download', logger.MESSAGE)
-            return
+            + ' AND e.location != \'\'))', [today, wanted_languages(True)] + rules_args)
 
-        rules = self._get_rules()
-        now = datetime.datetime.now()
-        for cur_result in sql_result:
-
-            if not os.path.isfile(cur_result['location']):
-                logger.debug(f'Episode file does not exist, cannot download subtitles for episode'
-                             f' {cur_result["season"]:d}x{cur_result["episode"]:d} of show {cur_result["show_name"]}')
-                continue
-
-            # Old shows rule
-            _ = datetime.datetime.strptime('20110101', '%Y%m%d')
-            if ((cur_result['airdate_daydiff'] > 7 and cur_result['searchcount'] < 2
-                 and now - datetime.datetime.strptime(cur_result['lastsearch'], '%Y-%m-%d %H:%M:%S')
-                 > datetime.timedelta(hours=rules['old'][cur_result['searchcount']])) or
-                    # Recent shows rule
-                    (cur_result['airdate_daydiff'] <= 7 and cur_result['searchcount'] < 7
-                     and now - datetime.datetime.strptime(cur_result['lastsearch'], '%Y-%m-%d %H:%M:%S')
-                     > datetime.timedelta(hours=rules['new'][cur_result['searchcount']]))):
-                logger.debug(f'Downloading subtitles for episode {cur_result["season"]:d}x{cur_result["episode"]:d}'
-                             f' of show {cur_result["show_name"]}')
-
-                show_obj = helpers.find_show_by_id({int(cur_result['tv_id']): int(cur_result['prod_id'])})
-                if not show_obj:
-                    logger.debug('Show not found')
-                    return
-
-                ep_obj = show_obj.get_episode(int(cur_result['season']), int(cur_result['episode']))
-                if isinstance(ep_obj, str):
-                    logger.debug('Episode not found')
-                    return
-
-                # noinspection PyUnusedLocal
-                previous_subtitles = ep_obj.subtitles
-
-                try:
-                    # noinspection PyUnusedLocal
-                    subtitles = ep_obj.download_subtitles()
-                except (BaseException, Exception):
-                    logger.debug('Unable to find subtitles')
-                    return
+    @staticmethod
+    def _download(row):
+        # type: (Dict) -> bool
+        """
+        search subtitles for an episode, a failure only ends the search of this episode
+
+        :param row: episode from _due_episodes
+        :return: True if subtitles were searched
+        """
+        ep_name = f'{row["season"]:d}x{row["episode"]:d} of show {row["show_name"]}'
+        try:
+            if not os.path.isfile(row['location']):
+                logger.debug(f'Episode file does not exist, cannot download subtitles for episode {ep_name}')
+                return False
+
+            show_obj = helpers.find_show_by_id({int(row['tv_id']): int(row['prod_id'])})
+            if not show_obj:
+                logger.debug(f'Show not found for episode {ep_name}')
+                return False
+
+            ep_obj = show_obj.get_episode(int(row['season']), int(row['episode']))
+            if not ep_obj or isinstance(ep_obj, str):
+                logger.debug(f'Episode {ep_name} not found')
+                return False
+
+            logger.debug(f'Downloading subtitles for episode {ep_name}')
+            ep_obj.download_subtitles()
+        except (BaseException, Exception) as e:
+            logger.warning(f'Unable to find subtitles for episode {ep_name}: {ex(e)}')
+            logger.debug(traceback.format_exc())
+            return False
+        return True
 
     @staticmethod
     def _get_rules():
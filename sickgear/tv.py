@@ -38,7 +38,7 @@ import exceptions_helper
 from exceptions_helper import ex
 
 import sickgear
-from . import db, helpers, history, image_cache, indexermapper, logger, \
+from . import db, helpers, history, image_cache, indexermapper, logger, media_index, \
     name_cache, network_timezones, notifiers, postProcessor, subtitles
 from .anime import AniGroupList
 from .classes import WeakList
@@ -1682,28 +1682,17 @@ class TVShow(TVShowBase):
                 self.sxe_ep_obj[cur_season_number][cur_ep_number] = None
                 del ep_obj
 
-    def get_all_episodes(self, season=None, has_location=False, check_related_eps=True):
-        # type: (Optional[integer_types], bool, bool) -> List[TVEpisode]
+    def get_episode_rows(self, season=None, has_location=False):
+        # type: (Optional[integer_types], bool) -> Dict[Tuple[int, int], Row]
         """
+        fetch the db rows of show episodes with one query, use the result as ep_result of get_episode to create
+        many episode objects without a query per episode
 
         :param season: None or season number
-        :param has_location:  return only with location
-        :param check_related_eps: get related episodes
-        :return: List of TVEpisode objects
+        :param has_location: return only with location
+        :return: episode rows keyed by (season, episode) in season, episode order
         """
-        sql_selection = 'SELECT *'
-
-        if check_related_eps:
-            # subselection to detect multi-episodes early, share_location > 0
-            sql_selection += """
-            , (SELECT COUNT (*)
-               FROM tv_episodes
-               WHERE showid = tve.showid AND indexer = tve.indexer AND season = tve.season AND location != ''
-               AND location = tve.location AND episode != tve.episode
-            ) AS share_location
-            """
-
-        sql_selection += ' FROM tv_episodes tve WHERE indexer = ? AND showid = ?'
+        sql_selection = 'SELECT * FROM tv_episodes WHERE indexer = ? AND showid = ?'
         sql_parameter = [self.tvid, self.prodid]
 
         if None is not season:
@@ -1713,35 +1702,66 @@ class TVShow(TVShowBase):
         if has_location:
             sql_selection += ' AND location != "" '
 
-        # need ORDER episode ASC to rename multi-episodes in order S01E01-02
         sql_selection += ' ORDER BY season ASC, episode ASC'
 
         my_db = db.DBConnection()
-        sql_result = my_db.select(sql_selection, sql_parameter)
+        return OrderedDict([((int(cur_row['season']), int(cur_row['episode'])), cur_row)
+                            for cur_row in my_db.select(sql_selection, sql_parameter)])
+
+    def get_scene_rows(self, sxe_list=None):
+        # type: (Optional[List[Tuple[int, int]]]) -> Optional[List[Row]]
+        """
+        fetch the scene numbering rows of show, use the result as scene_result of get_episode
+
+        :param sxe_list: list of (season, episode), if all have an episode object then there is nothing to load
+        :return: None if there is nothing to load, otherwise scene numbering rows
+        """
+        if None is not sxe_list and all(None is not self.sxe_ep_obj.get(cur_season, {}).get(cur_episode)
+                                        for cur_season, cur_episode in sxe_list):
+            return
+
+        my_db = db.DBConnection()
+        return my_db.select(
+            """
+            SELECT * 
+            FROM scene_numbering 
+            WHERE indexer == ? AND indexer_id = ?
+            """, [self.tvid, self.prodid])
+
+    def get_all_episodes(self, season=None, has_location=False, check_related_eps=True):
+        # type: (Optional[integer_types], bool, bool) -> List[TVEpisode]
+        """
+
+        :param season: None or season number
+        :param has_location:  return only with location
+        :param check_related_eps: get related episodes
+        :return: List of TVEpisode objects
+        """
+        # need order episode asc to rename multi-episodes in order S01E01-02
+        ep_rows = self.get_episode_rows(season, has_location)
+        scene_rows = self.get_scene_rows(list(ep_rows))
+
+        # detect multi-episodes, episodes of a season that share a location
+        shared_location = {}
+        if check_related_eps:
+            for cur_row in itervalues(ep_rows):
+                if cur_row['location']:
+                    shared_location.setdefault((cur_row['season'], cur_row['location']), []).append(cur_row)
 
         ep_obj_list = []
-        for cur_row in sql_result:
-            ep_obj = self.get_episode(int(cur_row['season']), int(cur_row['episode']), ep_result=[cur_row])
+        for (cur_season, cur_episode), cur_row in iteritems(ep_rows):
+            ep_obj = self.get_episode(cur_season, cur_episode, ep_result=ep_rows, scene_result=scene_rows)
             if ep_obj:
                 ep_obj.related_ep_obj = []
                 if check_related_eps and ep_obj.location:
-                    # if there is a location, check if it's a multi-episode (share_location > 0)
-                    # and put into related_ep_obj
-                    if 0 < cur_row['share_location']:
-                        # noinspection SqlRedundantOrderingDirection
-                        related_ep_sql_result = my_db.select(
-                            """
-                            SELECT * 
-                            FROM tv_episodes
-                            WHERE indexer = ? AND showid = ? AND season = ? AND location = ? AND episode != ? 
-                            ORDER BY episode ASC
-                            """, [self.tvid, self.prodid, ep_obj.season, ep_obj.location, ep_obj.episode])
-                        for cur_ep_row in related_ep_sql_result:
-                            related_ep_obj = self.get_episode(int(cur_ep_row['season']),
-                                                              int(cur_ep_row['episode']),
-                                                              ep_result=[cur_ep_row])
-                            if related_ep_obj not in ep_obj.related_ep_obj:
-                                ep_obj.related_ep_obj.append(related_ep_obj)
+                    # if there is a location, check if it's a multi-episode and put into related_ep_obj
+                    for cur_ep_row in shared_location.get((cur_row['season'], cur_row['location']), []):
+                        if cur_ep_row is cur_row:
+                            continue
+                        related_ep_obj = self.get_episode(int(cur_ep_row['season']), int(cur_ep_row['episode']),
+                                                          ep_result=ep_rows, scene_result=scene_rows)
+                        if related_ep_obj not in ep_obj.related_ep_obj:
+                            ep_obj.related_ep_obj.append(related_ep_obj)
                 ep_obj_list.append(ep_obj)
 
         return ep_obj_list
@@ -1752,8 +1772,9 @@ class TVShow(TVShowBase):
                     path=None,  # type: Optional[AnyStr]
                     no_create=False,  # type: bool
                     absolute_number=None,  # type: Optional[int]
-                    ep_result=None,  # type: Optional[List[Row]]
-                    existing_only=False  # type: bool
+                    ep_result=None,  # type: Optional[Union[List[Row], Dict[Tuple[int, int], Row]]]
+                    existing_only=False,  # type: bool
+                    scene_result=None  # type: Optional[List[Row]]
                     ):  # type: (...) -> Optional[TVEpisode]
         """
         Initialise sxe_ep_obj with db fetched season keys, and then fill the TVShow episode property
@@ -1764,8 +1785,9 @@ class TVShow(TVShowBase):
         :param path: path to file episode
         :param no_create: return None instead of an instantiated TVEpisode object
         :param absolute_number: absolute number
-        :param ep_result:
+        :param ep_result: list of episode rows, or the episode rows of get_episode_rows
         :param existing_only: only return existing episodes
+        :param scene_result: scene numbering rows of get_scene_rows
         :return: TVEpisode object
         """
         # if we get an anime get the real season and episode
@@ -1791,25 +1813,29 @@ class TVShow(TVShowBase):
             episode = int(sql_result[0]['episode'])
             logger.debug('Found episode by absolute_number: %s which is %sx%s' % (absolute_number, season, episode))
 
-        if season not in self.sxe_ep_obj:
-            self.sxe_ep_obj[season] = {}
+        season_eps = self.sxe_ep_obj.setdefault(season, {})
 
-        if episode not in self.sxe_ep_obj[season] or None is self.sxe_ep_obj[season][episode]:
+        if None is season_eps.get(episode):
             if no_create:
                 return
 
             # logger.debug('%s: An object for episode %sx%s did not exist in the cache, trying to create it' %
             #              (self.tvid_prodid, season, episode))
 
-            if path and not existing_only:
-                ep_obj = TVEpisode(self, season, episode, path, show_result=ep_result)
-            else:
-                ep_obj = TVEpisode(self, season, episode, show_result=ep_result, existing_only=existing_only)
+            # concurrent searches must not create more than one object for an episode
+            with self.lock:
+                if None is season_eps.get(episode):
+                    if path and not existing_only:
+                        ep_obj = TVEpisode(self, season, episode, path, show_result=ep_result,
+                                           scene_result=scene_result)
+                    else:
+                        ep_obj = TVEpisode(self, season, episode, show_result=ep_result, existing_only=existing_only,
+                                           scene_result=scene_result)
 
-            if None is not ep_obj:
-                self.sxe_ep_obj[season][episode] = ep_obj
+                    if None is not ep_obj:
+                        season_eps[episode] = ep_obj
 
-        return self.sxe_ep_obj[season][episode]
+        return season_eps[episode]
 
     def _load_cast_from_db(self):
         # type: (...) -> List[Character]
@@ -2229,13 +2255,7 @@ class TVShow(TVShowBase):
         """
         logger.log('Loading all episodes for [%s] from the DB' % self._name)
 
-        my_db = db.DBConnection()
-        sql_result = my_db.select(
-            """
-            SELECT *
-            FROM tv_episodes
-            WHERE indexer = ? AND showid = ?
-            """, [self.tvid, self.prodid])
+        ep_rows = self.get_episode_rows()
 
         scanned_eps = {}
 
@@ -2258,22 +2278,14 @@ class TVShow(TVShowBase):
         if None is cached_show:
             return scanned_eps
 
-        scene_sql_result = my_db.select(
-            """
-            SELECT * 
-            FROM scene_numbering 
-            WHERE indexer == ? AND indexer_id = ?
-            """, [self.tvid, self.prodid])
+        scene_sql_result = self.get_scene_rows()
 
         cached_seasons = {}
         cl = []
-        for cur_row in sql_result:
+        for (season, episode), cur_row in iteritems(ep_rows):
 
             delete_ep = False
 
-            season = int(cur_row['season'])
-            episode = int(cur_row['episode'])
-
             if season not in cached_seasons:
                 try:
                     cached_seasons[season] = cached_show[season]
@@ -2288,7 +2300,8 @@ class TVShow(TVShowBase):
             logger.debug('Loading episode %sx%s for [%s] from the DB' % (season, episode, self.name))
 
             try:
-                ep_obj = self.get_episode(season, episode, ep_result=[cur_row])  # type: TVEpisode
+                ep_obj = self.get_episode(season, episode, ep_result=ep_rows,
+                                          scene_result=scene_sql_result)  # type: TVEpisode
 
                 # if we found out that the ep is no longer on TVDB then delete it from our database too
                 if delete_ep and helpers.should_delete_episode(ep_obj.status):
@@ -2304,6 +2317,7 @@ class TVShow(TVShowBase):
                 continue
 
         if cl:
+            my_db = db.DBConnection()
             my_db.mass_action(cl)
 
         return scanned_eps
@@ -2358,13 +2372,9 @@ class TVShow(TVShowBase):
 
         scanned_eps = {}
 
-        my_db = db.DBConnection()
-        sql_result = my_db.select(
-            """
-            SELECT * 
-            FROM tv_episodes 
-            WHERE indexer = ? AND showid = ?
-            """, [self.tvid, self.prodid])
+        ep_rows = self.get_episode_rows()
+        scene_rows = self.get_scene_rows([(cur_season, cur_episode) for cur_season in show_obj
+                                          for cur_episode in show_obj[cur_season] if 0 != cur_episode])
         sql_l = []
         for cur_season in show_obj:
             scanned_eps[cur_season] = {}
@@ -2373,7 +2383,8 @@ class TVShow(TVShowBase):
                 if 0 == cur_episode:
                     continue
                 try:
-                    ep_obj = self.get_episode(cur_season, cur_episode, ep_result=sql_result)  # type: TVEpisode
+                    ep_obj = self.get_episode(cur_season, cur_episode, ep_result=ep_rows,
+                                              scene_result=scene_rows)  # type: TVEpisode
                 except exceptions_helper.EpisodeNotFoundException:
                     logger.log('%s: %s object for %sx%s from [%s] is incomplete, skipping this episode' %
                                (self.tvid_prodid, sickgear.TVInfoAPI(
@@ -3350,6 +3361,7 @@ class TVShow(TVShowBase):
                 result = helpers.remove_file(self.location, tree=True)
                 if result:
                     logger.log('%s show folder %s' % (result, self._location))
+                    media_index.remove_tree(self._location)
 
             except exceptions_helper.ShowDirNotFoundException:
                 logger.warning('Show folder does not exist, no need to %s %s' % (action, self._location))
@@ -3464,6 +3476,8 @@ class TVShow(TVShowBase):
             my_db = db.DBConnection()
             my_db.mass_action(sql_l)
 
+        media_index.refresh(self._location)
+
     def download_subtitles(self, force=False):
         # type: (bool) -> None
         """
@@ -3712,8 +3726,8 @@ class TVShow(TVShowBase):
         :param multi_ep: multiple episodes
         :return:
         """
-        logger.debug(f'Checking if found {("", "multi-part ")[multi_ep]}episode {season}x{episode}'
-                     f' is wanted at quality {Quality.qualityStrings[quality]}')
+        logger.debug('Checking if found %sepisode %sx%s is wanted at quality %s',
+                     ('', 'multi-part ')[multi_ep], season, episode, Quality.qualityStrings[quality])
 
         if not multi_ep:
             try:
@@ -3743,11 +3757,12 @@ class TVShow(TVShowBase):
         initial_qualities, archive_qualities = Quality.split_quality(self._quality)
         all_qualities = list(set(initial_qualities + archive_qualities))
 
-        initial = '= (%s)' % ','.join([Quality.qualityStrings[cur_qual] for cur_qual in initial_qualities])
-        if 0 < len(archive_qualities):
-            initial = '+ upgrade to %s + (%s)'\
-                      % (initial, ','.join([Quality.qualityStrings[cur_qual] for cur_qual in archive_qualities]))
-        logger.debug('Want initial %s and found %s' % (initial, Quality.qualityStrings[quality]))
+        if logger.is_enabled(logger.DEBUG):
+            initial = '= (%s)' % ','.join([Quality.qualityStrings[cur_qual] for cur_qual in initial_qualities])
+            if 0 < len(archive_qualities):
+                initial = '+ upgrade to %s + (%s)'\
+                          % (initial, ','.join([Quality.qualityStrings[cur_qual] for cur_qual in archive_qualities]))
+            logger.debug('Want initial %s and found %s' % (initial, Quality.qualityStrings[quality]))
 
         if quality not in all_qualities:
             logger.debug('Don\'t want this quality,'
@@ -3769,7 +3784,7 @@ class TVShow(TVShowBase):
 
         cur_status, cur_quality = Quality.split_composite_status(int(sql_result[0]['status']))
 
-        logger.debug(f'Existing episode status: {statusStrings[int(sql_result[0]["status"])]}')
+        logger.debug('Existing episode status: %s', statusStrings[int(sql_result[0]['status'])])
 
         # if we know we don't want it then just say no
         if cur_status in [IGNORED, ARCHIVED] + ([SKIPPED], [])[multi_ep] and not manual_search:
@@ -3836,8 +3851,8 @@ class TVShow(TVShowBase):
 
 class TVEpisode(TVEpisodeBase):
 
-    def __init__(self, show_obj, season, episode, path='', existing_only=False, show_result=None):
-        # type: (TVShow, integer_types, integer_types, AnyStr, bool, List) -> None
+    def __init__(self, show_obj, season, episode, path='', existing_only=False, show_result=None, scene_result=None):
+        # type: (TVShow, integer_types, integer_types, AnyStr, bool, Union[List, Dict], Optional[List]) -> None
         super(TVEpisode, self).__init__(season, episode, int(show_obj.tvid))
 
         self._airtime = None  # type: Optional[datetime.time]
@@ -3860,7 +3875,8 @@ class TVEpisode(TVEpisodeBase):
         self.scene_absolute_number = 0  # type: int
         self.scene_episode = 0  # type: int
         self.scene_season = 0  # type: int
-        self.specify_episode(self._season, self._episode, existing_only=existing_only, show_result=show_result)
+        self.specify_episode(self._season, self._episode, existing_only=existing_only, show_result=show_result,
+                             scene_result=scene_result)
         self.wanted_quality = []  # type: List
 
     @property
@@ -4147,18 +4163,26 @@ class TVEpisode(TVEpisodeBase):
                     'Couldn\'t find episode %sx%s' % (season, episode))
 
     def load_from_db(self, season, episode, show_result=None, **kwargs):
-        # type: (int, int, Optional[List[Row]], Any) -> bool
+        # type: (int, int, Optional[Union[List[Row], Dict[Tuple[int, int], Row]]], Any) -> bool
         """
 
         kwargs['scene_result']: type: Optional[List[Row]] passed thru
 
         :param season: season number
         :param episode: episode number
-        :param show_result:
+        :param show_result: list of episode rows, or the episode rows of TVShow.get_episode_rows where
+         a missing (season, episode) key means the episode is not in the db
         """
         logger.debug(f'{self._show_obj.tvid_prodid}: Loading episode details from DB for episode {season}x{episode}')
 
-        show_result = show_result and next(iter(show_result), None)
+        if isinstance(show_result, dict):
+            show_result = show_result.get((season, episode))
+            if not show_result:
+                logger.debug(f'{self._show_obj.tvid_prodid}: Episode {self._season}x{self._episode}'
+                             f' not found in the database')
+                return False
+        else:
+            show_result = show_result and next(iter(show_result), None)
         if not show_result or episode != show_result['episode'] or season != show_result['season']:
             my_db = db.DBConnection()
             sql_result = my_db.select(
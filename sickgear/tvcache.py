@@ -30,7 +30,7 @@ from .tv import TVEpisode
 
 # noinspection PyUnreachableCode
 if False:
-    from typing import Any, AnyStr, Dict, List, Tuple, Union
+    from typing import Any, AnyStr, Dict, List, Optional, Tuple, Union
     from providers.generic import GenericProvider, NZBProvider, TorrentProvider
 
 
@@ -84,7 +84,13 @@ class TVCache(object):
         # noinspection PyProtectedMember
         return self.provider._check_auth()
 
-    def update_cache(self, **kwargs):
+    def update_cache(self, can_write=None, **kwargs):
+        """
+
+        :param can_write: called once data is fetched, the cache is left as is if the caller no longer wants it written
+        :type can_write: Callable[[], bool] or None
+        :param kwargs:
+        """
         try:
             self.check_auth()
         except AuthException as e:
@@ -94,6 +100,9 @@ class TVCache(object):
         if self.should_update():
             data = self._cache_data(**kwargs)
 
+            if None is not can_write and not can_write():
+                return
+
             # clear cache
             if data:
                 self.clear_cache()
@@ -104,7 +113,7 @@ class TVCache(object):
                 title, url = self._title_and_url(item)
                 ci = self.parse_item(title, url)
                 if None is not ci:
-                    cl.append(ci)
+                    cl.extend(ci)
 
             if 0 < len(cl):
                 my_db = self.get_db()
@@ -148,8 +157,8 @@ class TVCache(object):
         :type title: AnyStr
         :param url: url
         :type url: AnyStr
-        :return:
-        :rtype: None or List[AnyStr, List[Any]]
+        :return: list of queries
+        :rtype: None or List[List[AnyStr, List[Any]]]
         """
         if title and url:
             title = self._translate_title(title)
@@ -249,14 +258,14 @@ class TVCache(object):
                         url,  # type: AnyStr
                         parse_result=None,  # type: ParseResult
                         tvid_prodid=None  # type: Union[AnyStr, None]
-                        ):  # type: (...) -> Union[List[AnyStr, List[Any]], None]
+                        ):  # type: (...) -> Union[List[List[AnyStr, List[Any]]], None]
         """
 
         :param name: name
         :param url: url
         :param parse_result: parse result
         :param tvid_prodid: tvid_prodid
-        :return:
+        :return: list of queries that add the release and one row per episode number
         """
         # check if we passed in a parsed result or should we try and create one
         if not parse_result:
@@ -273,7 +282,7 @@ class TVCache(object):
                 parser = NameParser(show_obj=show_obj, convert=True, indexer_lookup=False)
                 parse_result = parser.parse(name)
             except InvalidNameException:
-                logger.debug('Unable to parse the filename %s into a valid episode' % name)
+                logger.debug('Unable to parse the filename %s into a valid episode', name)
                 return
             except InvalidShowException:
                 return
@@ -309,19 +318,26 @@ class TVCache(object):
             # get version
             version = parse_result.version
 
-            logger.debug('Add to cache: [%s]' % name)
+            logger.debug('Add to cache: [%s]', name)
 
+            tvid, prodid = parse_result.show_obj.tvid, parse_result.show_obj.prodid
             return [
-                'INSERT OR IGNORE INTO provider_cache'
-                ' (provider, name, season, episodes,'
-                ' indexerid,'
-                ' url, time, quality, release_group, version,'
-                ' indexer)'
-                ' VALUES (?,?,?,?,?,?,?,?,?,?,?)',
-                [self.providerID, name, season_number, episode_text,
-                 parse_result.show_obj.prodid,
-                 url, cur_timestamp, quality, release_group, version,
-                 parse_result.show_obj.tvid]]
+                ['INSERT OR IGNORE INTO provider_cache'
+                 ' (provider, name, season, episodes,'
+                 ' indexerid,'
+                 ' url, time, quality, release_group, version,'
+                 ' indexer)'
+                 ' VALUES (?,?,?,?,?,?,?,?,?,?,?)',
+                 [self.providerID, name, season_number, episode_text,
+                  prodid,
+                  url, cur_timestamp, quality, release_group, version,
+                  tvid]],
+                # changes() is 0 when the url is already cached, this prevents duplicate episode rows
+                ['INSERT INTO provider_cache_episodes (cache_id, indexer, indexerid, season, episode)'
+                 ' SELECT c.cache_id, c.indexer, c.indexerid, c.season, e.column1'
+                 ' FROM provider_cache c, (VALUES %s) e'
+                 ' WHERE c.url = ? AND 0 < changes()' % ','.join(['(?)'] * len(episode_numbers)),
+                 list(episode_numbers) + [url]]]
 
     def search_cache(self,
                      episode,  # type: TVEpisode
@@ -347,42 +363,88 @@ class TVCache(object):
         :rtype:
         """
         my_db = self.get_db()
-        sql = "SELECT * FROM provider_cache WHERE name LIKE '%.PROPER.%' OR name LIKE '%.REPACK.%' " \
-              "OR name LIKE '%.REAL.%' AND provider = ?"
+        sql = 'SELECT * FROM provider_cache' \
+              ' WHERE provider = ? AND indexerid != 0' \
+              " AND (name LIKE '%.PROPER.%' OR name LIKE '%.REPACK.%' OR name LIKE '%.REAL.%')"
+        params = [self.providerID]
 
         if date:
-            sql += ' AND time >= ' + str(int(time.mktime(date.timetuple())))
+            sql += ' AND time >= ?'
+            params += [int(time.mktime(date.timetuple()))]
+
+        return my_db.select(sql, params)
+
+    @staticmethod
+    def find_cached_releases(ep_obj_list, provider_ids=None):
+        # type: (List[TVEpisode], Optional[List[AnyStr]]) -> Dict[AnyStr, List[Dict]]
+        """
+        batched lookup of cached releases that match any of the episodes, one query answers all providers
 
-        return list(filter(lambda x: x['indexerid'] != 0, my_db.select(sql, [self.providerID])))
+        a release is returned if its quality is wanted by at least one matched episode
 
-    def find_needed_episodes(self, ep_obj_list, manual_search=False):
-        # type: (Union[TVEpisode, List[TVEpisode]], bool) -> Dict[TVEpisode, SearchResult]
+        :param ep_obj_list: episode objects with wanted_quality
+        :param provider_ids: optional list of provider ids to limit the lookup to, None for all providers
+        :return: dict of provider id with a list of cache rows ordered by the episode list
+        """
+        wanted = {}
+        params = []
+        for pos, ep_obj in enumerate(ep_obj_list):
+            key = (ep_obj.show_obj.tvid, ep_obj.show_obj.prodid, ep_obj.season, ep_obj.episode)
+            if key not in wanted:
+                wanted[key] = set(getattr(ep_obj, 'wanted_quality', None) or [])
+                params.append([pos] + list(key))
+
+        cl = []
+        provider_sql = ''
+        if provider_ids:
+            provider_sql = ' WHERE c.provider IN (%s)' % ','.join(['?'] * len(provider_ids))
+        # limit each query to fewer than 999 bound variables
+        for chunk in [params[i:i + 150] for i in range(0, len(params), 150)]:
+            cl.append([
+                'WITH wanted(pos, indexer, indexerid, season, episode) AS (VALUES %s)'
+                ' SELECT c.*, w.indexer AS w_indexer, w.indexerid AS w_indexerid,'
+                ' w.season AS w_season, w.episode AS w_episode'
+                ' FROM wanted w'
+                ' INNER JOIN provider_cache_episodes e'
+                ' ON e.indexer = w.indexer AND e.indexerid = w.indexerid'
+                ' AND e.season = w.season AND e.episode = w.episode'
+                ' INNER JOIN provider_cache c ON c.cache_id = e.cache_id'
+                '%s'
+                ' ORDER BY w.pos, c.cache_id' % (','.join(['(?,?,?,?,?)'] * len(chunk)), provider_sql),
+                list(itertools.chain(*chunk)) + (provider_ids or [])])
+
+        results = {}
+        seen = set()
+        for cur_result in itertools.chain(*(cl and TVCache.get_db().mass_action(cl) or [])):
+            if cur_result['cache_id'] in seen:
+                continue
+            key = (cur_result['w_indexer'], cur_result['w_indexerid'], cur_result['w_season'], cur_result['w_episode'])
+            if helpers.try_int(cur_result['quality']) not in wanted.get(key, ()):
+                continue
+            seen.add(cur_result['cache_id'])
+            results.setdefault(cur_result['provider'], []).append(cur_result)
+
+        return results
+
+    def find_needed_episodes(self,
+                             ep_obj_list,  # type: Union[TVEpisode, List[TVEpisode]]
+                             manual_search=False,  # type: bool
+                             cached_results=None  # type: Optional[Dict[AnyStr, List[Dict]]]
+                             ):  # type: (...) -> Dict[TVEpisode, SearchResult]
         """
 
         :param ep_obj_list: episode object or list of episode objects
         :param manual_search: manual search
+        :param cached_results: optional result of find_cached_releases for all providers
         """
         needed_eps = {}
-        cl = []
 
-        my_db = self.get_db()
         if type(ep_obj_list) != list:
             ep_obj_list = [ep_obj_list]
 
-        for ep_obj in ep_obj_list:
-            cl.append([
-                'SELECT *'
-                + ' FROM provider_cache'
-                + ' WHERE provider = ?'
-                + ' AND indexer = ? AND indexerid = ?'
-                + ' AND season = ? AND episodes LIKE ?'
-                + ' AND quality IN (%s)' % ','.join([str(x) for x in ep_obj.wanted_quality]),
-                [self.providerID,
-                 ep_obj.show_obj.tvid, ep_obj.show_obj.prodid,
-                 ep_obj.season, '%|' + str(ep_obj.episode) + '|%']])
-        sql_result = my_db.mass_action(cl)
-        if sql_result:
-            sql_result = list(itertools.chain(*sql_result))
+        if None is cached_results:
+            cached_results = self.find_cached_releases(ep_obj_list, [self.providerID])
+        sql_result = cached_results.get(self.providerID)
 
         if not sql_result:
             self._set_last_search()
@@ -403,7 +465,7 @@ class TVCache(object):
 
             # skip if provider is anime only and show is not anime
             if self.provider.anime_only and not show_obj.is_anime:
-                logger.debug(f'{show_obj.unique_name} is not an anime, skipping')
+                logger.debug('%s is not an anime, skipping', show_obj.unique_name)
                 continue
 
             # get season and ep data (ignoring multi-eps for now)
@@ -421,8 +483,8 @@ class TVCache(object):
 
             # if the show says we want that episode then add it to the list
             if not show_obj.want_episode(season, ep_obj_list, quality, manual_search):
-                logger.debug(f"Skipping {cur_result['name']}"
-                             f" because we don't want an episode that's {Quality.qualityStrings[quality]}")
+                logger.debug('Skipping %s because we don\'t want an episode that\'s %s',
+                             cur_result['name'], Quality.qualityStrings[quality])
                 continue
 
             ep_obj = show_obj.get_episode(season, ep_obj_list)
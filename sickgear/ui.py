@@ -164,8 +164,8 @@ class QueueProgressIndicator(object):
         return len([x for x in self.queueItemList if x.is_in_queue()])
 
     def next_name(self):
-        for curItem in [
-                           sickgear.show_queue_scheduler.action.currentItem] + sickgear.show_queue_scheduler.action.queue:
+        show_queue = sickgear.show_queue_scheduler.action
+        for curItem in show_queue.running + show_queue.queue.ordered():
             if curItem in self.queueItemList:
                 return curItem.name
 
@@ -37,7 +37,8 @@ from tornado.concurrent import run_on_executor
 from lib import subliminal
 
 import sickgear
-from . import classes, db, helpers, history, image_cache, logger, network_timezones, processTV, search_queue, ui
+from . import classes, db, helpers, history, image_cache, logger, network_timezones, processTV, search_queue, \
+    show_stats, ui
 from .common import ARCHIVED, DOWNLOADED, FAILED, IGNORED, SKIPPED, SNATCHED, SNATCHED_ANY, SNATCHED_BEST, \
     SNATCHED_PROPER, UNAIRED, UNKNOWN, WANTED, Quality, qualityPresetStrings, statusStrings
 from .name_parser.parser import NameParser
@@ -55,7 +56,7 @@ from .webserve import AddShows
 import dateutil.parser
 
 from _23 import decode_str, unquote_plus
-from six import integer_types, iteritems, iterkeys, string_types, text_type
+from six import integer_types, iteritems, iterkeys, itervalues, string_types, text_type
 
 # noinspection PyUnreachableCode
 if False:
@@ -4519,6 +4520,7 @@ class CMD_SickGearShows(ApiCall):
     def run(self):
         """ display_is_int_multi( self.prodid ) shows in sickgear """
         shows = {}
+        stats = show_stats.get_show_stats()
 
         for cur_show_obj in sickgear.showList:
 
@@ -4578,9 +4580,10 @@ class CMD_SickGearShows(ApiCall):
             timezone, showDict['timezone'] = network_timezones.get_network_timezone(showDict['network'],
                                                                                     return_name=True)
 
-            if cur_show_obj.next_episode():
+            next_airdate = stats.get(cur_show_obj.tvid_prodid, {}).get('ep_next_wanted')
+            if next_airdate:
                 dtEpisodeAirs = SGDatetime.convert_to_setting(
-                    network_timezones.parse_date_time(cur_show_obj.nextaired, cur_show_obj.airs, timezone))
+                    network_timezones.parse_date_time(next_airdate, cur_show_obj.airs, timezone))
                 showDict['next_ep_airdate'] = SGDatetime.sbfdate(dtEpisodeAirs, d_preset=dateFormat)
             else:
                 showDict['next_ep_airdate'] = ''
@@ -4723,10 +4726,6 @@ class CMD_SickGearShowsStats(ApiCall):
         """ get the global shows and episode stats """
         stats = {}
 
-        indexer_limit = ('', ' AND indexer = %s' % TVINFO_TVDB)[self.sickbeard_call]
-        my_db = db.DBConnection()
-        today = str(datetime.date.today().toordinal())
-
         stats["shows_total"] = (len(sickgear.showList),
                                 len([cur_so for cur_so in sickgear.showList
                                      if TVINFO_TVDB == cur_so.tvid]))[self.sickbeard_call]
@@ -4737,15 +4736,10 @@ class CMD_SickGearShowsStats(ApiCall):
              and (not self.sickbeard_call
                   or TVINFO_TVDB == cur_so.tvid)])
 
-        stats["ep_downloaded"] = my_db.select("SELECT COUNT(*) FROM tv_episodes WHERE status IN (" + ",".join(
-            [str(status) for status in
-             Quality.DOWNLOADED + Quality.ARCHIVED]) + ") AND season != 0 and episode != 0 AND airdate <= " + today +
-                                             indexer_limit)[0][0]
-
-        stats["ep_total"] = my_db.select(
-            "SELECT COUNT(*) FROM tv_episodes WHERE season != 0 AND episode != 0 AND (airdate != 1 OR status IN (" +
-            ",".join([str(status) for status in Quality.SNATCHED_ANY + Quality.DOWNLOADED + Quality.ARCHIVED]) +
-            ")) AND airdate <= " + today + " AND status != " + str(IGNORED) + indexer_limit)[0][0]
+        show_stat = [cur_stat for cur_stat in itervalues(show_stats.get_show_stats())
+                     if not self.sickbeard_call or TVINFO_TVDB == cur_stat['indexer']]
+        stats["ep_downloaded"] = sum([cur_stat['ep_downloaded_aired'] for cur_stat in show_stat])
+        stats["ep_total"] = sum([cur_stat['ep_total_aired'] for cur_stat in show_stat])
 
         return _responds(RESULT_SUCCESS, stats)
 
@@ -22,8 +22,10 @@ from urllib.parse import urljoin
 
 import base64
 import copy
+import email.utils
 import glob
 import hashlib
+import hmac
 import io
 import os
 import random
@@ -49,13 +51,14 @@ except ImportError:
         return None
 
 import sickgear
-from . import classes, clients, config, db, helpers, history, image_cache, logger, name_cache, naming, \
-    network_timezones, notifiers, nzbget, processTV, sab, scene_exceptions, search_queue, subtitles, ui
+from . import classes, clients, config, db, failed_history, helpers, history, ical, image_cache, logger, media_index, \
+    metrics, name_cache, naming, network_timezones, notifiers, nzbget, processTV, sab, scene_exceptions, \
+    search_queue, show_stats, static_assets, subtitles, ui
 from .anime import AniGroupList, pull_anidb_groups, short_group_names
 from .browser import folders_at_path
 from .common import ARCHIVED, DOWNLOADED, FAILED, IGNORED, SKIPPED, SNATCHED, SNATCHED_ANY, UNAIRED, UNKNOWN, WANTED, \
     SD, HD720p, HD1080p, UHD2160p, Overview, Quality, qualityPresetStrings, statusStrings
-from .helpers import (get_media_stats, has_image_ext, is_sickgear_dir, real_path, remove_article, remove_file_perm,
+from .helpers import (has_image_ext, is_sickgear_dir, real_path, remove_article, remove_file_perm,
                       starify)
 from .indexermapper import MapStatus, map_indexers_to_show, save_mapping
 from .indexers.indexer_config import TVINFO_IMDB, TVINFO_TMDB, TVINFO_TRAKT, TVINFO_TVDB, TVINFO_TVMAZE, \
@@ -67,7 +70,7 @@ from .scene_numbering import get_scene_absolute_numbering_for_show, get_scene_nu
 from .scheduler import Scheduler
 from .search_backlog import FORCED_BACKLOG
 from .sgdatetime import SGDatetime
-from .show_name_helpers import abbr_showname
+from .show_name_helpers import abbr_showname, clear_word_list_cache
 
 from .show_updater import clean_ignore_require_words
 from .trakt_helpers import build_config, trakt_collection_remove_account
@@ -91,7 +94,7 @@ from lib.requests.adapters import HTTPAdapter
 
 from lib import subliminal
 from lib.cfscrape import CloudflareScraper
-from lib.dateutil import tz, zoneinfo
+from lib.dateutil import zoneinfo
 from lib.dateutil.relativedelta import relativedelta
 try:
     from lib.thefuzz import fuzz
@@ -187,6 +190,15 @@ class PageTemplate(Template):
 
         super(PageTemplate, self).__init__(*args, **kwargs)
 
+    @staticmethod
+    def static_url(path):
+        # type: (AnyStr) -> AnyStr
+        """
+        :param path: path of a static file relative to the gui folder, e.g. js/home.js
+        :return: url of the current version of the file
+        """
+        return '%s/%s' % (sickgear.WEB_ROOT, static_assets.versioned_path(path))
+
     def compile(self, *args, **kwargs):
         if not os.path.exists(os.path.join(sickgear.CACHE_DIR, 'cheetah')):
             os.mkdir(os.path.join(sickgear.CACHE_DIR, 'cheetah'))
@@ -214,19 +226,46 @@ class BaseStaticFileHandler(StaticFileHandler):
             del kwargs['exc_info']
         return super(BaseStaticFileHandler, self).write_error(status_code, **kwargs)
 
+    immutable = False
+    asset_path = None
+
+    def parse_url_path(self, url_path):
+        # a path with the hash of the current file is served as a file that never changes
+        url_path, self.immutable = static_assets.unversioned_path(self.root, url_path)
+        return super(BaseStaticFileHandler, self).parse_url_path(url_path)
+
     def validate_absolute_path(self, root, absolute_path):
         if '\\images\\flags\\' in absolute_path and not os.path.isfile(absolute_path):
             absolute_path = re.sub(r'\\[^\\]+\.png$', '\\\\unknown.png', absolute_path)
-        return super(BaseStaticFileHandler, self).validate_absolute_path(root, absolute_path)
+        self.asset_path = absolute_path = super(BaseStaticFileHandler, self).validate_absolute_path(
+            root, absolute_path)
+        if absolute_path:
+            compressed_path, encoding = static_assets.compressed_file(
+                absolute_path, self.request.headers.get('Accept-Encoding'))
+            if compressed_path:
+                self.set_header('Content-Encoding', encoding)
+                return compressed_path
+        return absolute_path
+
+    def get_content_type(self):
+        if self.asset_path and self.asset_path != self.absolute_path:
+            return MimeTypes().guess_type(self.asset_path)[0] or 'application/octet-stream'
+        return super(BaseStaticFileHandler, self).get_content_type()
+
+    def get_cache_time(self, path, modified, mime_type):
+        return (0, static_assets.MAX_AGE)[self.immutable]
 
     def data_received(self, *args):
         pass
 
     def set_extra_headers(self, path):
         self.set_header('X-Robots-Tag', 'noindex, nofollow, noarchive, nocache, noodp, noydir, noimageindex, nosnippet')
-        self.set_header('Cache-Control', 'no-cache, max-age=0')
-        self.set_header('Pragma', 'no-cache')
-        self.set_header('Expires', '0')
+        if self.immutable:
+            self.set_header('Cache-Control', 'public, max-age=%s, immutable' % static_assets.MAX_AGE)
+        else:
+            self.set_header('Cache-Control', 'no-cache, max-age=0')
+            self.set_header('Pragma', 'no-cache')
+            self.set_header('Expires', '0')
         if sickgear.SEND_SECURITY_HEADERS:
             self.set_header('X-Frame-Options', 'SAMEORIGIN')
 
@@ -488,10 +527,15 @@ class LogoutHandler(BaseHandler):
 
 class CalendarHandler(BaseHandler):
 
+    def set_default_headers(self):
+        super(CalendarHandler, self).set_default_headers()
+        # calendar apps that poll the feed may keep a copy and ask if it changed
+        self.set_header('Cache-Control', 'no-cache')
+
     # noinspection PyUnusedLocal
     def get(self, *args, **kwargs):
         if sickgear.CALENDAR_UNPROTECTED or self.get_current_user():
-            self.write(self.calendar())
+            self.calendar()
         else:
             self.set_status(401)
             self.write('User authentication required')
@@ -499,61 +543,42 @@ class CalendarHandler(BaseHandler):
     def calendar(self):
         """ iCalendar (iCal) - Standard RFC 5546 <https://datatracker.ietf.org/doc/html/rfc5546>
         Works with iCloud, Google Calendar and Outlook.
-        Provides a subscribeable URL for iCal subscriptions """
+        Provides a subscribeable URL for iCal subscriptions
 
-        logger.log(f'Receiving iCal request from {self.request.remote_ip}')
-
-        # Limit dates
-        past_date = (dt_date.today() + timedelta(weeks=-52)).toordinal()
-        future_date = (dt_date.today() + timedelta(weeks=52)).toordinal()
-        utc = tz.gettz('GMT', zoneinfo_priority=True)
+        Optional query args, days: number of days ahead, shows: comma separated tvid:prodid list """
 
-        # Get all the shows that are not paused and are currently on air
-        my_db = db.DBConnection()
-        show_list = my_db.select(
-            'SELECT show_name, indexer AS tv_id, indexer_id AS prod_id, network, airs, runtime'
-            ' FROM tv_shows'
-            ' WHERE (status = \'Continuing\' OR status = \'Returning Series\' ) AND paused != \'1\'')
+        logger.log(f'Receiving iCal request from {self.request.remote_ip}')
 
-        nl = '\\n\\n'
-        crlf = '\r\n'
+        days = self.get_argument('days', None)
+        shows = [TVidProdid(cur_show).tuple for cur_show in (self.get_argument('shows', None) or '').split(',')
+                 if cur_show.strip()]
+        feed = ical.CalendarFeed(days=None if None is days else helpers.try_int(days, 1),
+                                 shows=[cur_show for cur_show in shows if None not in cur_show] or None)
 
-        # Create iCal header
-        appname = 'SickGear'
-        ical = 'BEGIN:VCALENDAR%sVERSION:2.0%sX-WR-CALNAME:%s%sX-WR-CALDESC:%s%sPRODID://%s Upcoming Episodes//%s' \
-               % (crlf, crlf, appname, crlf, appname, crlf, appname, crlf)
+        self.set_header('Etag', feed.etag)
+        self.set_header('Last-Modified', datetime.fromtimestamp(feed.last_modified, timezone.utc))
+        if self.not_modified(feed.last_modified):
+            self.set_status(304)
+            return
 
-        for show in show_list:
-            # Get all episodes of this show airing between today and next month
+        self.set_header('Content-Type', 'text/calendar; charset=utf-8')
+        self.write(feed.body())
 
-            episode_list = my_db.select(
-                'SELECT name, season, episode, description, airdate'
-                ' FROM tv_episodes'
-                ' WHERE indexer = ? AND showid = ?'
-                ' AND airdate >= ? AND airdate < ? ',
-                [show['tv_id'], show['prod_id']]
-                + [past_date, future_date])
-
-            for episode in episode_list:
-                air_date_time = network_timezones.parse_date_time(episode['airdate'], show['airs'],
-                                                                  show['network']).astimezone(utc)
-                air_date_time_end = air_date_time + timedelta(minutes=helpers.try_int(show['runtime'], 60))
-
-                # Create event for episode
-                desc = '' if not episode['description'] else f'{nl}{episode["description"].splitlines()[0]}'
-                ical += (f'BEGIN:VEVENT{crlf}'
-                         f'DTSTART:{air_date_time.strftime("%Y%m%d")}T{air_date_time.strftime("%H%M%S")}Z{crlf}'
-                         f'DTEND:{air_date_time_end.strftime("%Y%m%d")}T{air_date_time_end.strftime("%H%M%S")}Z{crlf}'
-                         f'SUMMARY:{show["show_name"]} - {episode["season"]}x{episode["episode"]}'
-                            f' - {episode["name"]}{crlf}'
-                         f'UID:{appname}-{dt_date.today().isoformat()}-{show["show_name"].replace(" ", "-")}'
-                            f'-E{episode["episode"]}S{episode["season"]}{crlf}'
-                         f'DESCRIPTION:{(show["airs"] or "(Unknown airs)")} on {(show["network"] or "Unknown network")}'
-                         f'{desc}{crlf}'
-                         f'END:VEVENT{crlf}')
-
-        # Ending the iCal
-        return ical + 'END:VCALENDAR'
+    def not_modified(self, last_modified):
+        # type: (int) -> bool
+        """
+        :param last_modified: timestamp of the last change of the response
+        :return: True if the client copy is current, If-None-Match is used over If-Modified-Since when both are sent
+        """
+        if self.request.headers.get('If-None-Match'):
+            return self.check_etag_header()
+        since = self.request.headers.get('If-Modified-Since')
+        if since:
+            try:
+                return last_modified <= email.utils.parsedate_to_datetime(since).timestamp()
+            except (BaseException, Exception):
+                pass
+        return False
 
 
 class RepoHandler(BaseStaticFileHandler):
@@ -1032,6 +1057,48 @@ class LogfileHandler(BaseHandler):
             pass
 
 
+class MetricsHandler(BaseHandler):
+    """
+    app metrics in the Prometheus text format at /metrics, and as a JSON summary for the UI at /metrics/json
+
+    a scraper without the login cookie uses basic auth with the web username and password, or an API key as a bearer
+    token when the API is enabled
+    """
+
+    @staticmethod
+    def _same(value, expected):
+        # type: (AnyStr, Optional[AnyStr]) -> bool
+        return hmac.compare_digest(value.encode('utf-8'), (expected or '').encode('utf-8'))
+
+    def _authorised(self):
+        # type: (...) -> bool
+        if self.get_current_user():
+            return True
+        scheme, _, value = (self.request.headers.get('Authorization') or '').partition(' ')
+        if 'basic' == scheme.lower():
+            try:
+                username, _, password = base64.b64decode(value.strip()).decode('utf-8').partition(':')
+            except (BaseException, Exception):
+                return False
+            return self._same(username, sickgear.WEB_USERNAME) and self._same(password, sickgear.WEB_PASSWORD)
+        if 'bearer' == scheme.lower() and sickgear.USE_API:
+            return any([self._same(value.strip(), cur_key[1]) for cur_key in sickgear.API_KEYS])
+        return False
+
+    # noinspection PyUnusedLocal
+    def get(self, route, *args, **kwargs):
+        if not self._authorised():
+            self.set_status(401)
+            self.set_header('WWW-Authenticate', 'Basic realm="SickGear"')
+            return self.write('User authentication required')
+
+        if route and 'json' == route.strip('/'):
+            self.set_header('Content-Type', 'application/json; charset=UTF-8')
+            return self.write(json_dumps(metrics.summary()))
+        self.set_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.write(metrics.render())
+
+
 class WebHandler(BaseHandler):
 
     def __init__(self, *arg, **kwargs):
@@ -1717,43 +1784,7 @@ class Home(MainHandler):
         t.layout = sickgear.HOME_LAYOUT
 
         # Get all show snatched / downloaded / next air date stats
-        my_db = db.DBConnection()
-        today = dt_date.today().toordinal()
-        status_quality = ','.join([str(x) for x in Quality.SNATCHED_ANY])
-        status_download = ','.join([str(x) for x in Quality.DOWNLOADED + Quality.ARCHIVED])
-        status_total = '%s, %s, %s' % (SKIPPED, WANTED, FAILED)
-
-        sql_result = my_db.select(
-            'SELECT indexer AS tvid, showid as prodid, '
-            + '(SELECT COUNT(*) FROM tv_episodes'
-              ' WHERE indexer = tv_eps.indexer AND showid = tv_eps.showid'
-              ' AND season > 0 AND episode > 0 AND airdate > 1 AND status IN (%s)) AS ep_snatched,'
-              ' (SELECT COUNT(*) FROM tv_episodes'
-              ' WHERE indexer = tv_eps.indexer AND showid = tv_eps.showid'
-              ' AND season > 0 AND episode > 0 AND airdate > 1 AND status IN (%s)) AS ep_downloaded,'
-              ' (SELECT COUNT(*) FROM tv_episodes'
-              ' WHERE indexer = tv_eps.indexer AND showid = tv_eps.showid'
-              ' AND season > 0 AND episode > 0 AND airdate > 1'
-              ' AND ('
-              '(airdate <= %s AND (status IN (%s)))'
-              ' OR (status IN (%s)) OR (status IN (%s)))) AS ep_total,'
-              ' (SELECT airdate FROM tv_episodes'
-              ' WHERE indexer = tv_eps.indexer AND showid = tv_eps.showid'
-              ' AND airdate >= %s AND (status = %s  OR status = %s)'
-              ' ORDER BY airdate ASC LIMIT 1) AS ep_airs_next,'
-              ' (SELECT airdate FROM tv_episodes'  # get last airdate of regular episode for today
-              ' WHERE indexer = tv_eps.indexer AND showid = tv_eps.showid'
-              ' AND airdate <= %s AND season > 0'
-              ' ORDER BY airdate DESC LIMIT 1) AS ep_airs_last'
-              ' FROM tv_episodes tv_eps GROUP BY indexer, showid'
-            % (status_quality, status_download, today, status_total,
-               status_quality, status_download, today, UNAIRED, WANTED,
-               today))
-
-        t.show_stat = {}
-
-        for cur_result in sql_result:
-            t.show_stat[TVidProdid({cur_result['tvid']: cur_result['prodid']})()] = cur_result
+        t.show_stat = show_stats.get_show_stats()
 
         return t.respond()
 
@@ -2658,8 +2689,8 @@ class Home(MainHandler):
         response = {}
         for cur_show_obj in shows:
             if cur_show_obj and cur_show_obj.path:
-                loc_size = helpers.get_size(cur_show_obj.path)
-                num_files, smallest, largest, average_size = get_media_stats(cur_show_obj.path)
+                loc_size, (num_files, smallest, largest, average_size) = \
+                    media_index.get_size_and_media_stats(cur_show_obj.path)
                 response[cur_show_obj.tvid_prodid] = {'message': 'No media files'} if not num_files else \
                     {
                         'nFiles': num_files,
@@ -3037,6 +3068,7 @@ class Home(MainHandler):
                 if 0 == len(new_require_words):
                     new_r_regex = False
                 show_obj.rls_require_words, show_obj.rls_require_words_regex = new_require_words, new_r_regex
+                clear_word_list_cache()
                 if isinstance(rls_global_exclude_ignore, list):
                     show_obj.rls_global_exclude_ignore = set(r for r in rls_global_exclude_ignore if '.*' != r)
                 elif isinstance(rls_global_exclude_ignore, string_types) and '.*' != rls_global_exclude_ignore:
@@ -7327,54 +7359,50 @@ class Manage(MainHandler):
         t = PageTemplate(web_handler=self, file='manage_backlogOverview.tmpl')
         t.submenu = self.manage_menu('Backlog')
 
-        show_counts = {}
-        show_cats = {}
-        t.ep_sql_results = {}
+        t.show_counts = show_stats.get_backlog_counts()
+        t.backlog_active_providers = sickgear.search_backlog.BacklogSearcher.providers_active(scheduled=False)
 
-        my_db = db.DBConnection(row_type='dict')
-        sql_cmds = []
-        show_objects = []
-        for cur_show_obj in sickgear.showList:
-            sql_cmds.append([
-                'SELECT season, episode, status, airdate, name'
-                ' FROM tv_episodes'
-                ' WHERE indexer = ? AND showid = ?'
-                ' ORDER BY season DESC, episode DESC',
-                [cur_show_obj.tvid, cur_show_obj.prodid]])
-            show_objects.append(cur_show_obj)
+        return t.respond()
 
-        sql_results = my_db.mass_action(sql_cmds)
+    def get_backlog_episodes(self, tvid_prodid):
+        """
+        :param tvid_prodid: show to list the backlog episodes of
+        :return: json list of the backlog episodes of a show
+        """
+        show_obj = helpers.find_show_by_id(tvid_prodid)
+        if not show_obj:
+            return json_dumps([])
 
-        for i, sql_result in enumerate(sql_results):
-            ep_cats = {}
-            ep_counts = {
-                Overview.UNAIRED: 0, Overview.GOOD: 0, Overview.SKIPPED: 0,
-                Overview.WANTED: 0, Overview.QUAL: 0, Overview.SNATCHED: 0}
+        statuses = show_stats.backlog_statuses(show_obj)
+        if not statuses:
+            return json_dumps([])
 
-            for cur_result in sql_result:
-                if not sickgear.SEARCH_UNAIRED and 1 == cur_result['airdate']:
-                    continue
-                ep_cat = show_objects[i].get_overview(int(cur_result['status']), split_snatch=True)
-                if ep_cat in (Overview.WANTED, Overview.QUAL, Overview.SNATCHED_QUAL):
-                    cur_result['backlog'] = True
-                    if Overview.SNATCHED_QUAL == ep_cat:
-                        ep_cat = Overview.SNATCHED
-                else:
-                    cur_result['backlog'] = False
-                if ep_cat:
-                    ep_cats['%sx%s' % (cur_result['season'], cur_result['episode'])] = ep_cat
-                    ep_counts[ep_cat] += 1
-
-            tvid_prodid = show_objects[i].tvid_prodid
-            show_counts[tvid_prodid] = ep_counts
-            show_cats[tvid_prodid] = ep_cats
-            t.ep_sql_results[tvid_prodid] = sql_result
-
-        t.show_counts = show_counts
-        t.show_cats = show_cats
-        t.backlog_active_providers = sickgear.search_backlog.BacklogSearcher.providers_active(scheduled=False)
+        my_db = db.DBConnection()
+        sql_result = my_db.select(
+            'SELECT season, episode, status, airdate, name'
+            ' FROM tv_episodes'
+            ' WHERE indexer = ? AND showid = ? AND status IN (%s)'
+            ' ORDER BY season DESC, episode DESC' % ','.join(['?'] * len(statuses)),
+            [show_obj.tvid, show_obj.prodid] + statuses)
 
-        return t.respond()
+        result = []
+        for cur_result in sql_result:
+            if not sickgear.SEARCH_UNAIRED and 1 == cur_result['airdate']:
+                continue
+            try:
+                sxe = '%s x %02d' % (cur_result['season'], cur_result['episode'])
+            except (BaseException, Exception):
+                sxe = '%s x %s' % (cur_result['season'], cur_result['episode'])
+            if 1 == int(cur_result['airdate']):
+                airdate = 'never'
+            else:
+                airdate = SGDatetime.sbfdate(SGDatetime.convert_to_setting(network_timezones.parse_date_time(
+                    cur_result['airdate'], show_obj.airs, show_obj.network)))
+            result.append(dict(
+                sxe=sxe, name=cur_result['name'], airdate=airdate,
+                overview=Overview.overviewStrings[show_stats.backlog_category(show_obj, cur_result['status'])[0]]))
+
+        return json_dumps(result)
 
     def mass_edit(self, to_edit=None):
 
@@ -7734,6 +7762,7 @@ class Manage(MainHandler):
             my_db.action('DELETE FROM failed WHERE `release` like ?', [item])
 
         if to_remove:
+            failed_history.load_failed_names()
             return self.redirect('/manage/failed-downloads/')
 
         t = PageTemplate(web_handler=self, file='manage_failedDownloads.tmpl')
@@ -7826,6 +7855,7 @@ class ManageSearch(Manage):
         t.standard_backlog_running = sickgear.search_queue_scheduler.action.is_standard_backlog_in_progress()
         t.backlog_running_type = sickgear.search_queue_scheduler.action.type_of_backlog_in_progress()
         t.recent_search_status = sickgear.search_queue_scheduler.action.is_recentsearch_in_progress()
+        t.recent_search_providers = search_queue.recent_search_provider_stats()
         t.find_propers_status = sickgear.search_queue_scheduler.action.is_propersearch_in_progress()
         t.queue_length = sickgear.search_queue_scheduler.action.queue_length()
 
@@ -7913,6 +7943,7 @@ class ShowTasks(Manage):
             hour=sickgear.update_show_scheduler.start_time.hour)
         t.show_update_running = sickgear.show_queue_scheduler.action.is_show_update_running() \
             or sickgear.update_show_scheduler.is_running_job
+        t.parser_cache = sickgear.name_parser.parser.name_parser_cache.stats()
 
         my_db = db.DBConnection(row_type='dict')
         sql_result = my_db.select('SELECT n.indexer || ? ||  n.indexer_id AS tvid_prodid,'
@@ -8047,34 +8078,36 @@ class History(MainHandler):
 
     @private_call
     @classmethod
-    def query_history(cls, my_db, limit=100):
-        # type: (db.DBConnection, int) -> Tuple[List[dict], List[dict]]
+    def query_history(cls, my_db, limit=100, page=1):
+        # type: (db.DBConnection, Union[int, AnyStr], Union[int, AnyStr]) -> Tuple[List[dict], List[dict]]
         """Query db for historical data
         :param my_db: connection should be instantiated with row_type='dict'
-        :param limit: number of db rows to fetch
+        :param limit: number of db rows to fetch, '0' for all
+        :param page: page of limit rows to fetch
         :return: two data sets, detailed and compact
         """
-
+        limit, page = helpers.try_int(limit, 100), max(1, helpers.try_int(page, 1))
         sql = 'SELECT h.*, show_name, s.indexer || ? || s.indexer_id AS tvid_prodid' \
               ' FROM history h, tv_shows s' \
               ' WHERE h.indexer=s.indexer AND h.showid=s.indexer_id' \
               ' AND h.hide = 0' \
               ' ORDER BY date DESC' \
-              '%s' % (' LIMIT %s' % limit, '')['0' == limit]
+              '%s' % ('', ' LIMIT %s OFFSET %s' % (limit, (page - 1) * limit))[0 < limit]
         sql_result = my_db.select(sql, [TVidProdid.glue])
 
         compact = []
+        compact_index = {}
 
+        # rows are newest first, so the actions of each compact record are in newest first order
         for cur_result in sql_result:
 
             action = dict(time=cur_result['date'], action=cur_result['action'],
                           provider=cur_result['provider'], resource=cur_result['resource'])
 
-            if not any([(record['show_id'] == cur_result['showid']
-                         and record['indexer'] == cur_result['indexer']
-                         and record['season'] == cur_result['season']
-                         and record['episode'] == cur_result['episode']
-                         and record['quality'] == cur_result['quality']) for record in compact]):
+            key = (cur_result['indexer'], cur_result['showid'], cur_result['season'], cur_result['episode'],
+                   cur_result['quality'])
+            cur_res = compact_index.get(key)
+            if None is cur_res:
                 show_obj = helpers.find_show_by_id({cur_result['indexer']: cur_result['showid']}, no_mapped_ids=False,
                                                    no_exceptions=True)
                 cur_res = dict(show_id=cur_result['showid'], indexer=cur_result['indexer'],
@@ -8082,29 +8115,35 @@ class History(MainHandler):
                                show_name=(show_obj and show_obj.unique_name) or cur_result['show_name'],
                                season=cur_result['season'], episode=cur_result['episode'],
                                quality=cur_result['quality'], resource=cur_result['resource'], actions=[])
-
-                cur_res['actions'].append(action)
-                cur_res['actions'].sort(key=lambda _x: _x['time'])
-
+                compact_index[key] = cur_res
                 compact.append(cur_res)
-            else:
-                index = [i for i, record in enumerate(compact)
-                         if record['show_id'] == cur_result['showid']
-                         and record['season'] == cur_result['season']
-                         and record['episode'] == cur_result['episode']
-                         and record['quality'] == cur_result['quality']][0]
 
-                cur_res = compact[index]
+            cur_res['actions'].append(action)
 
-                cur_res['actions'].append(action)
+        for cur_res in compact:
+            if 1 < len(cur_res['actions']):
                 cur_res['actions'].sort(key=lambda _x: _x['time'], reverse=True)
 
         return sql_result, compact
 
-    def index(self, limit=100, layout=None):
+    @staticmethod
+    def count_history(my_db):
+        # type: (db.DBConnection) -> int
+        """
+        :param my_db: connection
+        :return: number of history rows that query_history pages through
+        """
+        sql_result = my_db.select('SELECT COUNT(*) AS count'
+                                  ' FROM history h, tv_shows s'
+                                  ' WHERE h.indexer=s.indexer AND h.showid=s.indexer_id'
+                                  ' AND h.hide = 0')
+        return (sql_result and sql_result[0]['count']) or 0
+
+    def index(self, limit=100, layout=None, page=1):
 
         t = PageTemplate(web_handler=self, file='history.tmpl')
         t.limit = limit
+        t.page, t.pages = 1, 1
 
         if 'provider_failures' == layout:  # layout renamed
             layout = 'connect_failures'
@@ -8116,7 +8155,11 @@ class History(MainHandler):
         result_sets = []
         if sickgear.HISTORY_LAYOUT in ('compact', 'detailed'):
 
-            sql_result, compact = self.query_history(my_db, limit)
+            limit_rows = helpers.try_int(limit, 100)
+            if 0 < limit_rows:
+                t.pages = max(1, -(-self.count_history(my_db) // limit_rows))
+                t.page = min(max(1, helpers.try_int(page, 1)), t.pages)
+            sql_result, compact = self.query_history(my_db, limit, t.page)
 
             t.compact_results = compact
             t.history_results = sql_result
@@ -9117,6 +9160,7 @@ class ConfigSearch(Config):
                                                                                       if require_words else '')
 
         clean_ignore_require_words()
+        clear_word_list_cache()
 
         config.schedule_download_propers(config.checkbox_to_value(download_propers))
         sickgear.PROPERS_WEBDL_ONEGRP = config.checkbox_to_value(propers_webdl_onegrp)
@@ -9186,7 +9230,8 @@ class ConfigMediaProcess(Config):
 
     def save_post_processing(
             self, tv_download_dir=None, process_method=None, process_automatically=None, mediaprocess_interval=None,
-            postpone_if_sync_files=None, process_positive_log=None, extra_scripts='', sg_extra_scripts='',
+            mediaprocess_watch=None, postpone_if_sync_files=None, process_positive_log=None, extra_scripts='',
+            sg_extra_scripts='',
             unpack=None, skip_removed_files=None, move_associated_files=None, nfo_rename=None,
             rename_episodes=None, rename_tba_episodes=None, rename_name_changed_episodes=None,
             airdate_episodes=None, use_failed_downloads=None, delete_failed=None,
@@ -9206,6 +9251,7 @@ class ConfigMediaProcess(Config):
 
         new_val = config.checkbox_to_value(process_automatically)
         sickgear.PROCESS_AUTOMATICALLY = new_val
+        sickgear.MEDIAPROCESS_WATCH = config.checkbox_to_value(mediaprocess_watch)
         config.schedule_mediaprocess(mediaprocess_interval)
 
         if unpack:
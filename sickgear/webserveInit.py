@@ -7,7 +7,7 @@ from tornado.routing import AnyMatches, Rule
 # noinspection PyProtectedMember
 from tornado.web import Application, _ApplicationRouter
 
-from . import logger, webapi, webserve
+from . import logger, static_assets, webapi, webserve
 from .helpers import create_https_certificates, re_valid_hostname
 import sickgear
 
@@ -90,6 +90,8 @@ class WebServer(threading.Thread):
             if update_cfg:
                 sickgear.save_config()
 
+        static_assets.build(self.options['data_root'], sickgear.CACHE_DIR)
+
         # Load the app
         self.app = MyApplication([],
                                  debug=True,
@@ -157,6 +159,11 @@ class WebServer(threading.Thread):
             (r'%s/calendar' % self.options['web_root'], webserve.CalendarHandler),
         ])
 
+        # Metrics handler (Needed because a scraper authenticates without the login cookie)
+        self.app.add_handlers(self.re_host_pattern, [
+            (r'%s/metrics(/json)?/?' % self.options['web_root'], webserve.MetricsHandler),
+        ])
+
         # Static File Handlers
         self.app.add_handlers(self.re_host_pattern, [
             # favicon
@@ -16,6 +16,8 @@
 # You should have received a copy of the GNU General Public License
 # along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
 
+import gc
+import threading
 import unittest
 import test_lib as test
 from sickgear import cache_db, mainDB, failed_db
@@ -70,6 +72,62 @@ class DBBasicTests(test.SickbeardTestDBCase):
             self.assertEqual(str(result[-1][0][f]), str(insert_para[i]),
                              msg='Field %s: %s != %s' % (f, result[-1][0][f], insert_para[i]))
 
+    def test_pooled_connection(self):
+        hits = test.db.db_stats.pool_hits
+        other_db = test.db.DBConnection()
+        self.assertIs(self.db.connection, other_db.connection)
+        self.assertLess(hits, test.db.db_stats.pool_hits)
+        self.assertIsNot(self.db.connection, test.db.DBConnection(row_type='dict').connection)
+
+        connections = []
+        thread = threading.Thread(target=lambda: connections.append(test.db.DBConnection().connection))
+        thread.start()
+        thread.join()
+        self.assertIsNot(self.db.connection, connections[0])
+
+    def test_close_shared_connection(self):
+        other_db = test.db.DBConnection()
+        self.assertIs(self.db.connection, other_db.connection)
+        other_db.close()
+        self.assertIsNone(other_db.connection)
+        self.assertTrue(self.db.select('SELECT COUNT(*) FROM tv_shows'),
+                        msg='a closed user leaves the shared connection open')
+        self.assertIs(self.db.connection, test.db.DBConnection().connection)
+
+    def test_thread_exit(self):
+        connections = []
+        thread = threading.Thread(target=lambda: connections.append(test.db.DBConnection().connection))
+        thread.start()
+        thread.join()
+        gc.collect()
+        self.assertNotIn(connections[0], [cur_item[0] for cur_item in test.db._pool.values()])
+        self.assertRaises(test.db.sqlite3.ProgrammingError, connections[0].execute, 'SELECT 1')
+
+    def test_journal_mode(self):
+        result = self.db.select('PRAGMA journal_mode')
+        self.assertEqual(test.db.db_journal_mode.lower(), result[0][0].lower())
+
+    def test_read_only(self):
+        for query, read_only in (('SELECT * FROM tv_shows', True),
+                                 (' select 1', True),
+                                 ('PRAGMA table_info([tv_shows])', True),
+                                 ('PRAGMA user_version', True),
+                                 ('PRAGMA user_version = 0', False),
+                                 ('INSERT INTO flags (flag) VALUES (?)', False),
+                                 ('UPDATE tv_shows SET paused = 1', False),
+                                 ('VACUUM', False)):
+            self.assertEqual(read_only, test.db.is_read_only(query), msg=query)
+
+    def test_select_without_write_lock(self):
+        result = []
+        with self.db.write_lock:
+            # a reader in another thread must not wait for a writer
+            thread = threading.Thread(target=lambda: result.append(
+                test.db.DBConnection().select('SELECT COUNT(*) AS cnt FROM tv_shows')))
+            thread.start()
+            thread.join(5)
+        self.assertEqual(1, len(result))
+
 
 if '__main__' == __name__:
     print('==================')
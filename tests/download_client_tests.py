@@ -0,0 +1,242 @@
+# coding=UTF-8
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import re
+import threading
+import time
+import unittest
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import test_lib as test
+
+import sickgear
+from sickgear import clients
+from sickgear.clients.qbittorrent import QbittorrentAPI
+from sickgear.clients.transmission import TransmissionAPI
+
+
+class FakeClientHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _reply(self, body, code=200, headers=None):
+        body = (body if isinstance(body, str) else json.dumps(body)).encode()
+        self.send_response(code)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _form(self):
+        data = self.rfile.read(int(self.headers.get('Content-Length') or 0)).decode()
+        return dict([(k, v[0]) for k, v in parse_qs(data).items()]), data
+
+    def do_GET(self):
+        self.server.handle_request_of(self, 'GET')
+
+    def do_POST(self):
+        self.server.handle_request_of(self, 'POST')
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeClientServer(ThreadingHTTPServer):
+    """
+    Local web server that answers like a download client WebUI and counts the requests it gets
+    """
+    def __init__(self):
+        ThreadingHTTPServer.__init__(self, ('127.0.0.1', 0), FakeClientHandler)
+        self.requests = Counter()
+        self.torrents = {}
+        self.thread = threading.Thread(target=self.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.url = 'http://127.0.0.1:%s/' % self.server_port
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def handle_request_of(self, handler, method):
+        raise NotImplementedError
+
+
+class FakeQbittorrent(FakeClientServer):
+    def __init__(self):
+        super(FakeQbittorrent, self).__init__()
+        self.sessions = set()
+
+    def handle_request_of(self, handler, method):
+        url = urlparse(handler.path)
+        cmd = url.path.replace('/api/v2/', '')
+        self.requests[cmd] += 1
+        form, _ = ('POST' == method and handler._form()) or ({}, None)
+        query = dict([(k, v[0]) for k, v in parse_qs(url.query).items()])
+        if 'auth/login' == cmd:
+            sid = 'sid%s' % self.requests[cmd]
+            self.sessions.add(sid)
+            return handler._reply('Ok.', headers={'Set-Cookie': 'SID=%s; path=/' % sid})
+        if 'app/webapiVersion' == cmd:
+            return handler._reply('2.8.3')
+        if not re.search(r'SID=(\w+)', handler.headers.get('Cookie') or '') \
+                or re.search(r'SID=(\w+)', handler.headers.get('Cookie')).group(1) not in self.sessions:
+            return handler._reply('Forbidden', 403)
+
+        if 'torrents/info' == cmd:
+            return handler._reply(list(self.torrents.values()))
+        if 'torrents/properties' == cmd:
+            task = self.torrents.get(query.get('hash'))
+            if not task:
+                return handler._reply('Not Found', 404)
+            return handler._reply(dict(addition_date=task['added_on'], seeding_time=0))
+        if 'torrents/add' == cmd:
+            t_hash = re.findall(r'urn:btih:(\w+)', form['urls'])[0].lower()
+            self.torrents[t_hash] = dict(hash=t_hash, name=t_hash, category=form.get('category', ''),
+                                         state=('downloading', 'pausedDL')['true' == form.get('paused')],
+                                         priority=5, added_on=int(time.time()) + 1)
+            return handler._reply('Ok.')
+        return handler._reply('Not Found', 404)
+
+
+class FakeTransmission(FakeClientServer):
+    def __init__(self):
+        super(FakeTransmission, self).__init__()
+        self.session_id = 'id1'
+        self.calls = []
+
+    def handle_request_of(self, handler, method):
+        _, data = handler._form()
+        if self.session_id != handler.headers.get('X-Transmission-Session-Id'):
+            self.requests['409'] += 1
+            return handler._reply('<h1>409: Conflict</h1><p><code>X-Transmission-Session-Id: %s</code></p>'
+                                  % self.session_id, 409, {'X-Transmission-Session-Id': self.session_id})
+        rpc = json.loads(data)
+        self.requests[rpc['method']] += 1
+        self.calls += [rpc]
+        arguments = {}
+        if 'session-get' == rpc['method']:
+            arguments = {'version': '3.00 (bb6b5a062e)', 'rpc-version': 16, 'download-dir': '/downloads'}
+        return handler._reply(dict(result='success', arguments=arguments))
+
+
+class FakeProvider(object):
+    seed_time = 60
+
+    @staticmethod
+    def seed_ratio():
+        return '2'
+
+
+class FakeResult(object):
+    def __init__(self, t_hash, priority=0):
+        self.url = 'magnet:?xt=urn:btih:%s&dn=Show.S01E01' % t_hash
+        self.name = 'Show.S01E01.720p.HDTV.x264-GRP'
+        self.hash = None
+        self.content = None
+        self.priority = priority
+        self.provider = FakeProvider()
+
+
+class DownloadClientTests(test.SickbeardTestDBCase):
+
+    def setUp(self):
+        super(DownloadClientTests, self).setUp()
+        self.config = dict([(k, getattr(sickgear, k)) for k in (
+            'TORRENT_LABEL', 'TORRENT_PAUSED', 'TORRENT_PATH', 'TORRENT_SEED_TIME', 'TORRENT_HIGH_BANDWIDTH',
+            'TORRENT_VERIFY_CERT')])
+        sickgear.TORRENT_LABEL, sickgear.TORRENT_PAUSED, sickgear.TORRENT_PATH = 'tv', False, ''
+        sickgear.TORRENT_SEED_TIME, sickgear.TORRENT_HIGH_BANDWIDTH, sickgear.TORRENT_VERIFY_CERT = 0, False, False
+        self.server = None
+
+    def tearDown(self):
+        for k, v in self.config.items():
+            setattr(sickgear, k, v)
+        if self.server:
+            self.server.stop()
+        super(DownloadClientTests, self).tearDown()
+
+    def test_qbittorrent_session_reuse(self):
+        self.server = FakeQbittorrent()
+        client = QbittorrentAPI(self.server.url, 'user', 'pass')
+        for t_hash in ('a' * 40, 'b' * 40):
+            self.assertEqual(t_hash, client.send_torrent(FakeResult(t_hash)))
+        self.assertEqual(1, self.server.requests['auth/login'])
+        self.assertEqual(2, self.server.requests['torrents/add'])
+        # the label check after the first add also serves the lookup before the second add
+        self.assertEqual(3, self.server.requests['torrents/info'])
+        self.assertEqual('tv', self.server.torrents['a' * 40]['category'])
+
+    def test_qbittorrent_task_state(self):
+        self.server = FakeQbittorrent()
+        client = QbittorrentAPI(self.server.url, 'user', 'pass')
+        for t_hash in ('a' * 40, 'b' * 40, 'c' * 40):
+            client.send_torrent(FakeResult(t_hash))
+        self.server.requests.clear()
+        client._expire_state()
+        tasks = client._tinf(['A' * 40, 'b' * 40, 'c' * 40, 'd' * 40], use_props=False, err=True)
+        self.assertEqual(['a' * 40, 'b' * 40, 'c' * 40, 'd' * 40], [t['hash'] for t in tasks])
+        self.assertEqual('error', tasks[-1]['state'])
+        self.assertEqual(3, len(client._tinf(use_props=False)))
+        self.assertEqual(1, self.server.requests['torrents/info'], msg='one bulk fetch serves all lookups')
+
+    def test_qbittorrent_session_expiry(self):
+        self.server = FakeQbittorrent()
+        client = QbittorrentAPI(self.server.url, 'user', 'pass')
+        client.send_torrent(FakeResult('a' * 40))
+        self.server.sessions.clear()
+        self.assertEqual('b' * 40, client.send_torrent(FakeResult('b' * 40)))
+        self.assertEqual(2, self.server.requests['auth/login'])
+
+    def test_transmission_batched_set(self):
+        self.server = FakeTransmission()
+        client = TransmissionAPI(self.server.url, 'user', 'pass')
+        self.assertTrue(client.send_torrent(FakeResult('a' * 40, priority=1)))
+        self.assertEqual(1, self.server.requests['torrent-add'])
+        self.assertEqual(1, self.server.requests['torrent-set'])
+        arguments = self.server.calls[-1]['arguments']
+        self.assertEqual(dict(ids=['a' * 40], seedRatioLimit=2.0, seedRatioMode=1, seedIdleLimit=3600, seedIdleMode=1,
+                              labels=['tv'], queuePosition=0), dict([(k, v) for k, v in arguments.items()
+                                                                      if 'priority-high' != k]))
+        self.assertIn('priority-high', arguments)
+
+        session_gets = self.server.requests['session-get']
+        self.assertTrue(client.send_torrent(FakeResult('b' * 40)))
+        self.assertEqual(session_gets, self.server.requests['session-get'], msg='session is reused')
+
+        self.server.session_id = 'id2'
+        self.assertTrue(client.send_torrent(FakeResult('c' * 40)))
+        self.assertEqual(3, self.server.requests['torrent-add'])
+
+    def test_shared_client(self):
+        sickgear.TORRENT_HOST = 'http://localhost:8080/'
+        self.assertIs(clients.get_client('qbittorrent'), clients.get_client('qbittorrent'))
+        first = clients.get_client('qbittorrent')
+        sickgear.TORRENT_HOST = 'http://localhost:8081/'
+        self.assertIsNot(first, clients.get_client('qbittorrent'), msg='a config change creates a new client')
+
+
+if '__main__' == __name__:
+    print('==================')
+    print('STARTING - DOWNLOAD CLIENT TESTS')
+    print('==================')
+    print('######################################################################')
+    suite = unittest.TestLoader().loadTestsFromTestCase(DownloadClientTests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
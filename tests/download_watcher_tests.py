@@ -0,0 +1,145 @@
+# coding=UTF-8
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import test_lib as test
+
+import sickgear
+from sickgear import auto_media_process, download_watcher, processTV
+
+
+class DownloadWatcherTests(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.downloads = os.path.join(self.path, 'downloads')
+        os.mkdir(self.downloads)
+        self.config = dict([(k, getattr(sickgear, k)) for k in (
+            'TV_DOWNLOAD_DIR', 'PROCESS_AUTOMATICALLY', 'MEDIAPROCESS_WATCH')])
+        sickgear.TV_DOWNLOAD_DIR, sickgear.PROCESS_AUTOMATICALLY, sickgear.MEDIAPROCESS_WATCH = \
+            self.downloads, True, True
+        self.watcher = self._watcher()
+
+    def tearDown(self):
+        for k, v in self.config.items():
+            setattr(sickgear, k, v)
+        shutil.rmtree(self.path)
+
+    def _watcher(self, **kwargs):
+        return download_watcher.DownloadWatcher(
+            snapshot_file=os.path.join(self.path, 'download_watcher.json'), quiet_time=10, use_inotify=False,
+            **kwargs)
+
+    def _release(self, name, size=10, mtime=1000):
+        release = os.path.join(self.downloads, name)
+        os.mkdir(release)
+        self._write(os.path.join(release, '%s.mkv' % name), size)
+        os.utime(self.downloads, (mtime, mtime))
+        return release
+
+    @staticmethod
+    def _write(file_path, size):
+        with open(file_path, 'wb') as fh:
+            fh.write(b'x' * size)
+
+    def test_quiet_time(self):
+        release = self._release('Show.S01E01')
+        self.watcher.check(100)
+        self.watcher.check(105)
+        self._write(os.path.join(release, 'Show.S01E01.mkv'), 20)
+        self.watcher.check(112)
+        self.assertEqual([], self.watcher.take(), msg='a release that is still written is not queued')
+        self.watcher.check(123)
+        self.assertEqual(['Show.S01E01'], self.watcher.take())
+        self.watcher.check(200)
+        self.assertEqual([], self.watcher.take(), msg='a queued release is only queued once')
+
+    def test_snapshot(self):
+        self._release('Show.S01E01')
+        self._release('Show.S01E02', mtime=1001)
+        for cur_now in (100, 101, 111):
+            self.watcher.check(cur_now)
+        self.assertEqual(['Show.S01E01', 'Show.S01E02'], sorted(self.watcher.take()))
+        self.watcher.processed(['Show.S01E01', 'Show.S01E02'])
+
+        watcher = self._watcher()
+        self._release('Show.S01E03', mtime=1002)
+        for cur_now in (100, 101, 111):
+            watcher.check(cur_now)
+        self.assertEqual(['Show.S01E03'], watcher.take(), msg='processed releases are kept over a restart')
+
+        shutil.rmtree(os.path.join(self.downloads, 'Show.S01E01'))
+        os.utime(self.downloads, (1003, 1003))
+        watcher.check(200)
+        self.assertNotIn('Show.S01E01', watcher._entries)
+
+    def test_max_queued(self):
+        watcher = self._watcher(max_queued=2)
+        for cur_num in range(3):
+            self._release('Show.S01E0%s' % cur_num, mtime=1000 + cur_num)
+        for cur_now in (100, 101, 111):
+            watcher.check(cur_now)
+        self.assertEqual(2, len(watcher.take()))
+        watcher.check(112)
+        self.assertEqual(1, len(watcher.take()), msg='a release held back is queued once the queue is taken')
+
+    def test_process_watched(self):
+        self._release('Show.S01E01')
+        for cur_now in (100, 101, 111):
+            self.watcher.check(cur_now)
+
+        calls = []
+        process_dir = processTV.process_dir
+        processTV.process_dir = lambda dir_name, is_basedir=True: calls.append((dir_name, is_basedir))
+        try:
+            auto_media_process.MediaProcess._process_watched(self.watcher)
+            self.assertEqual([(os.path.join(self.downloads, 'Show.S01E01'), False)], calls)
+
+            self._write(os.path.join(self.downloads, 'Show.S01E02.mkv'), 10)
+            os.utime(self.downloads, (1001, 1001))
+            for cur_now in (200, 201, 211):
+                self.watcher.check(cur_now)
+            del calls[:]
+            auto_media_process.MediaProcess._process_watched(self.watcher)
+            self.assertEqual([(self.downloads, True)], calls, msg='a file is processed by a run over the folder')
+        finally:
+            processTV.process_dir = process_dir
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), 'inotify is only used on Linux')
+    def test_inotify(self):
+        inotify = download_watcher.Inotify(self.downloads)
+        try:
+            self.assertFalse(inotify.wait(0))
+            self._release('Show.S01E01')
+            self.assertTrue(inotify.wait(1))
+            self.assertFalse(inotify.wait(0), msg='events are read')
+        finally:
+            inotify.close()
+
+
+if '__main__' == __name__:
+    print('==================')
+    print('STARTING - DOWNLOAD WATCHER TESTS')
+    print('==================')
+    print('######################################################################')
+    suite = unittest.TestLoader().loadTestsFromTestCase(DownloadWatcherTests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,84 @@
+# coding=UTF-8
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+
+import test_lib as test
+
+from sickgear import db, failed_history
+from sickgear.databases import failed_db
+
+
+class FailedHistoryTests(test.SickbeardTestDBCase):
+
+    def setUp(self):
+        super(FailedHistoryTests, self).setUp()
+        self.my_db = db.DBConnection('failed.db')
+        self.my_db.mass_action([
+            ['INSERT INTO history (date, size, `release`, provider, old_status, showid, season, episode, indexer)'
+             ' VALUES (?,?,?,?,?,?,?,?,?)',
+             [20200101000000, size, failed_history.prepare_failed_name(release), 'prov', 1, 10, 1, 1, 1]]
+            for release, size in (('Show.S01E01.720p-GRP', 1000), ('Show.S01E02.720p-GRP', 2000))])
+        self.my_db.action('INSERT INTO failed (`release`, size, provider) VALUES (?,?,?)', ['Old_Release', 10, 'prov'])
+        failed_history.load_failed_names()
+        self.queries = []
+        self.db_select = failed_history.db_select
+        failed_history.db_select = lambda sql, params: self.queries.append(sql) or self.db_select(sql, params)
+
+    def tearDown(self):
+        failed_history.db_select = self.db_select
+        super(FailedHistoryTests, self).tearDown()
+
+    def test_indexes(self):
+        self.assertEqual(failed_db.MAX_DB_VERSION, self.my_db.check_db_version())
+        for cur_table, cur_index in (('failed', 'idx_failed_release'), ('history', 'idx_history_release'),
+                                     ('history', 'idx_history_episode')):
+            self.assertTrue(self.my_db.has_index(cur_table, cur_index))
+        plan = ' '.join([str(cur_row[-1]) for cur_row in self.my_db.select(
+            'EXPLAIN QUERY PLAN SELECT * FROM failed t WHERE t.release=? AND t.size=? AND t.provider LIKE ?',
+            ['a', 1, '%'])])
+        self.assertIn('idx_failed_release', plan)
+
+    def test_has_failed(self):
+        self.assertFalse(failed_history.has_failed('Show.S01E01.720p-GRP', 1000))
+        self.assertEqual([], self.queries, msg='a release that has not failed is answered without a query')
+        self.assertTrue(failed_history.has_failed('Old.Release', 10))
+        self.assertFalse(failed_history.has_failed('Old.Release', 20))
+        self.assertFalse(failed_history.has_failed('Old.Release', 10, 'other'))
+        self.assertEqual(3, len(self.queries))
+
+    def test_add_failed(self):
+        failed_history.add_failed('Show.S01E01.720p-GRP.nzb')
+        self.assertTrue(failed_history.has_failed('Show.S01E01.720p-GRP', 1000, 'prov'))
+        self.assertFalse(failed_history.has_failed('Show.S01E02.720p-GRP', 2000))
+        self.assertEqual(1, len(self.my_db.select('SELECT * FROM failed WHERE `release` = ?',
+                                                  ['Show_S01E01_720p_GRP'])))
+
+        self.my_db.action('DELETE FROM failed WHERE `release` = ?', ['Old_Release'])
+        failed_history.load_failed_names()
+        del self.queries[:]
+        self.assertFalse(failed_history.has_failed('Old.Release', 10))
+        self.assertEqual([], self.queries)
+
+
+if '__main__' == __name__:
+    print('==================')
+    print('STARTING - FAILED HISTORY TESTS')
+    print('==================')
+    print('######################################################################')
+    suite = unittest.TestLoader().loadTestsFromTestCase(FailedHistoryTests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,183 @@
+# coding=UTF-8
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+import datetime
+import threading
+import time
+import unittest
+
+import test_lib as test
+
+from sickgear import generic_queue
+from sickgear.generic_queue import PriorityItems, QueuePriorities
+
+
+class FakeShow(object):
+    def __init__(self, tvid_prodid):
+        self.tvid_prodid = tvid_prodid
+
+
+class ShowItem(generic_queue.QueueItem):
+    def __init__(self, name, show_key=None, priority=QueuePriorities.NORMAL, release=None, log=None):
+        super(ShowItem, self).__init__(name)
+        self.show_obj = show_key and FakeShow(show_key)
+        self.priority = priority
+        self.release = release
+        self.log = log
+
+    def run(self):
+        super(ShowItem, self).run()
+        self.log.append(('start', self.name))
+        self.release.wait(5)
+        self.log.append(('end', self.name))
+        self.finish()
+
+
+class PriorityItemsTests(unittest.TestCase):
+
+    def _items(self, *specs):
+        now = datetime.datetime.now()
+        result = []
+        for n, (priority, show_key) in enumerate(specs):
+            cur_item = ShowItem('item %s' % n, show_key, priority)
+            cur_item.added = now + datetime.timedelta(seconds=n)
+            result.append(cur_item)
+        return result
+
+    def test_order(self):
+        items = self._items((QueuePriorities.NORMAL, '1:1'), (QueuePriorities.HIGH, '1:2'),
+                            (QueuePriorities.NORMAL, '1:3'), (QueuePriorities.LOW, None))
+        queue = PriorityItems()
+        for cur_item in items:
+            queue.push(cur_item)
+        self.assertEqual([items[1], items[0], items[2], items[3]], queue.ordered())
+        self.assertEqual(items[1], queue.peek())
+        self.assertEqual([items[1], items[0], items[2], items[3]], [queue.pop() for _ in range(4)])
+        self.assertIsNone(queue.pop())
+        self.assertFalse(queue)
+
+    def test_lookup(self):
+        items = self._items((QueuePriorities.NORMAL, '1:1'), (QueuePriorities.HIGH, '1:1'),
+                            (QueuePriorities.NORMAL, '1:2'))
+        queue = PriorityItems(items)
+        self.assertEqual(3, len(queue))
+        self.assertIn(items[2], queue)
+        self.assertEqual({items[0], items[1]}, set(queue.for_show('1:1')))
+
+        self.assertEqual(items[2], queue.pop(lambda i: '1:1' != i.show_obj.tvid_prodid))
+        self.assertNotIn(items[2], queue)
+        self.assertEqual([], queue.for_show('1:2'))
+        self.assertEqual([items[1], items[0]], queue.ordered())
+
+        queue.remove(items[1])
+        self.assertEqual([items[0]], queue.for_show('1:1'))
+        self.assertEqual([items[0], 'x'], queue + ['x'])
+        self.assertEqual(['x', items[0]], ['x'] + queue)
+
+    def test_show_key_change(self):
+        items = self._items((QueuePriorities.NORMAL, '1:1'), (QueuePriorities.NORMAL, '1:1'))
+        queue = PriorityItems(items)
+        items[0].show_obj.tvid_prodid = '3:1'
+        self.assertEqual(items[0], queue.pop())
+        self.assertEqual([items[1]], queue.for_show('1:1'), msg='an item is unindexed by the key it was indexed by')
+        queue.remove(items[1])
+        self.assertEqual([], queue.for_show('1:1'))
+
+
+class GenericQueueTests(test.SickbeardTestDBCase):
+
+    def setUp(self):
+        super(GenericQueueTests, self).setUp()
+        self.release = threading.Event()
+        self.log = []
+
+    def tearDown(self):
+        self.release.set()
+        super(GenericQueueTests, self).tearDown()
+
+    def _add(self, queue, name, show_key=None, priority=QueuePriorities.NORMAL):
+        return queue.add_item(ShowItem(name, show_key, priority, self.release, self.log), add_to_db=False)
+
+    @staticmethod
+    def _wait(queue, timeout=5):
+        end = time.time() + timeout
+        while (queue.running or queue.queue) and time.time() < end:
+            queue.run()
+            time.sleep(0.01)
+
+    def test_single_worker(self):
+        queue = generic_queue.GenericQueue()
+        for n, priority in enumerate((QueuePriorities.LOW, QueuePriorities.NORMAL, QueuePriorities.HIGH)):
+            self._add(queue, 'item %s' % n, '1:%s' % n, priority)
+        queue.run()
+        self.assertEqual(1, len(queue.running))
+        self.assertEqual(queue.running[0], queue.currentItem)
+        self.release.set()
+        self._wait(queue)
+        self.assertEqual(['QUEUE-ITEM-2', 'QUEUE-ITEM-1', 'QUEUE-ITEM-0'],
+                         [name for action, name in self.log if 'start' == action])
+
+    def test_workers_per_show(self):
+        queue = generic_queue.GenericQueue(workers=3)
+        self._add(queue, 'a1', '1:1')
+        self._add(queue, 'a2', '1:1', QueuePriorities.HIGH)
+        self._add(queue, 'b1', '1:2')
+        self._add(queue, 'c1', '1:3')
+        queue.run()
+        self.assertEqual(['QUEUE-A2', 'QUEUE-B1', 'QUEUE-C1'], [i.name for i in queue.running],
+                         msg='the second item of a show waits for the first')
+        self.release.set()
+        self._wait(queue)
+        self.assertEqual(0, len(queue.queue))
+        for n, (action, name) in enumerate(self.log):
+            if 'QUEUE-A1' == name and 'start' == action:
+                self.assertIn(('end', 'QUEUE-A2'), self.log[:n])
+
+    def test_no_show_runs_alone(self):
+        queue = generic_queue.GenericQueue(workers=3)
+        self._add(queue, 'a1', '1:1')
+        self._add(queue, 'add')
+        self._add(queue, 'b1', '1:2')
+        queue.run()
+        self.assertEqual(['QUEUE-A1'], [i.name for i in queue.running])
+        self.release.set()
+        self._wait(queue)
+        self.assertEqual(6, len(self.log))
+        start = self.log.index(('start', 'QUEUE-ADD'))
+        self.assertEqual(('end', 'QUEUE-ADD'), self.log[start + 1])
+
+    def test_pause(self):
+        queue = generic_queue.GenericQueue(workers=2)
+        queue.pause()
+        self._add(queue, 'a1', '1:1')
+        queue.run()
+        self.assertEqual([], queue.running)
+        queue.unpause()
+        queue.run()
+        self.assertEqual(1, len(queue.running))
+
+
+if '__main__' == __name__:
+    print('==================')
+    print('STARTING - GENERIC QUEUE TESTS')
+    print('==================')
+    print('######################################################################')
+    suite = unittest.TestLoader().loadTestsFromTestCase(PriorityItemsTests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+    print('######################################################################')
+    suite = unittest.TestLoader().loadTestsFromTestCase(GenericQueueTests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -1,11 +1,14 @@
+import threading
 import unittest
 import sys
 import os.path
+from http.server import BaseHTTPRequestHandler, HTTPServer
 
 sys.path.insert(1, os.path.abspath('..'))
 sys.path.insert(1, os.path.abspath('../lib'))
 
 from sickgear import helpers
+import sg_helpers
 from sickgear.common import ARCHIVED, SNATCHED, SNATCHED_BEST, SNATCHED_PROPER, \
     DOWNLOADED, SKIPPED, IGNORED, UNAIRED, UNKNOWN, WANTED, Quality
 
@@ -79,6 +82,79 @@ class HelpersTests(unittest.TestCase):
             self.assertEqual(t['result'], helpers.encrypt(*t['param']))
 
 
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'data for %s' % self.path.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class SessionRegistryTests(unittest.TestCase):
+    def setUp(self):
+        self.server = HTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.url = 'http://127.0.0.1:%s' % self.server.server_port
+        self.orig_sessions = sg_helpers.SESSIONS
+        sg_helpers.SESSIONS = sg_helpers.SessionRegistry()
+
+    def tearDown(self):
+        sg_helpers.SESSIONS.clear()
+        sg_helpers.SESSIONS = self.orig_sessions
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_reuse_connection(self):
+        for path in ('/one', '/two', '/three'):
+            self.assertEqual('data for %s' % path,
+                             sg_helpers.get_url(self.url + path, nocache=True, failure_monitor=False))
+        stats = sg_helpers.SESSIONS.stats()
+        self.assertEqual(1, stats['adapters'])
+        self.assertEqual(1, stats['connections_new'])
+        self.assertEqual(2, stats['connections_reused'])
+        self.assertEqual(3, stats['requests'])
+        self.assertEqual(len('data for /one') * 2 + len('data for /three'), stats['bytes_fetched'])
+
+    def test_keep_caller_retries(self):
+        from requests.adapters import HTTPAdapter, Retry
+        session = sg_helpers.requests.Session()
+        session.mount('http://', HTTPAdapter(max_retries=Retry(total=3)))
+        sg_helpers.get_url(self.url + '/one', session=session, nocache=True, failure_monitor=False)
+        adapter = session.get_adapter(self.url + '/one')
+        self.assertTrue(getattr(adapter, 'sg_pooled', False))
+        self.assertEqual(3, adapter.max_retries.total)
+
+    def test_keep_caller_adapter(self):
+        from requests.adapters import HTTPAdapter
+
+        class TimeoutHTTPAdapter(HTTPAdapter):
+            def send(self, request, **kwargs):
+                kwargs['timeout'] = kwargs.get('timeout') or 30
+                return super(TimeoutHTTPAdapter, self).send(request, **kwargs)
+
+        session = sg_helpers.requests.Session()
+        caller_adapter = TimeoutHTTPAdapter()
+        session.mount('http://', caller_adapter)
+        try:
+            self.assertEqual('data for /one', sg_helpers.get_url(
+                self.url + '/one', session=session, nocache=True, failure_monitor=False))
+        finally:
+            caller_adapter.close()
+        self.assertIs(caller_adapter, session.get_adapter(self.url + '/one'))
+        self.assertTrue(getattr(session.get_adapter('https://example.com'), 'sg_pooled', False))
+
+
 if '__main__' == __name__:
     suite = unittest.TestLoader().loadTestsFromTestCase(HelpersTests)
     unittest.TextTestRunner(verbosity=2).run(suite)
+    suite = unittest.TestLoader().loadTestsFromTestCase(SessionRegistryTests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
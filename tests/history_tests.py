@@ -0,0 +1,78 @@
+# coding=UTF-8
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+
+import test_lib as test
+
+from sickgear import db, history
+from sickgear.common import DOWNLOADED, SNATCHED, Quality
+from sickgear.webserve import History
+
+
+class HistoryTests(test.SickbeardTestDBCase):
+    insert_history = 'INSERT INTO history' \
+                     ' (action, date, showid, season, episode, quality, resource, resource_name, provider, version,' \
+                     ' indexer, hide) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)'
+
+    def setUp(self):
+        super(HistoryTests, self).setUp()
+        self.my_db = db.DBConnection(row_type='dict')
+        cl = [['INSERT INTO tv_shows (indexer, indexer_id, show_name) VALUES (?,?,?)', [1, prodid, 'show %s' % prodid]]
+              for prodid in (10, 20)]
+        for date, prodid, episode, quality, status, resource in (
+                (20200101000000, 10, 1, Quality.HDTV, SNATCHED, 'Show.S01E01.720p.HDTV.x264-GRP'),
+                (20200101010000, 20, 1, Quality.HDTV, SNATCHED, 'Other.S01E01.720p.HDTV.x264-GRP'),
+                (20200101020000, 10, 1, Quality.HDTV, DOWNLOADED, '/tv/Show/Show.S01E01.720p.HDTV.x264-GRP.mkv'),
+                (20200101030000, 10, 1, Quality.FULLHDWEBDL, SNATCHED, 'Show.S01E01.1080p.WEB-DL.H.264-GRP'),
+                (20200101040000, 10, 2, Quality.HDTV, SNATCHED, 'Show.S01E02.720p.HDTV.x264-GRP')):
+            action = Quality.composite_status(status, quality)
+            cl.append([self.insert_history, [action, date, prodid, 1, episode, quality, resource,
+                                             history.resource_name(resource), 'provider', -1, 1, 0]])
+        self.my_db.mass_action(cl)
+
+    def test_compact(self):
+        detailed, compact = History.query_history(self.my_db, '0')
+        self.assertEqual(5, len(detailed))
+        self.assertEqual([(10, 2, Quality.HDTV), (10, 1, Quality.FULLHDWEBDL), (10, 1, Quality.HDTV),
+                          (20, 1, Quality.HDTV)],
+                         [(r['show_id'], r['episode'], r['quality']) for r in compact])
+        self.assertEqual([20200101020000, 20200101000000], [a['time'] for a in compact[2]['actions']],
+                         msg='actions are newest first')
+
+    def test_pages(self):
+        self.assertEqual(5, History.count_history(self.my_db))
+        self.assertEqual([20200101040000, 20200101030000], [r['date'] for r in History.query_history(
+            self.my_db, 2, 1)[0]])
+        self.assertEqual([20200101000000], [r['date'] for r in History.query_history(self.my_db, 2, 3)[0]])
+
+    def test_resource_name(self):
+        self.assertEqual('show.s01e01.mkv', history.resource_name('C:\\tv\\Show\\Show.S01E01.mkv'))
+        self.assertEqual('show.s01e01.mkv', history.resource_name('/tv/Show/Show.S01E01.mkv'))
+        self.assertEqual('show.s01e01-grp', history.resource_name('Show.S01E01-GRP'))
+        self.assertEqual('', history.resource_name(None))
+        self.assertEqual(1, len(self.my_db.select('SELECT * FROM history WHERE resource_name = ?', [
+            history.resource_name('SHOW.S01E01.720p.HDTV.x264-GRP.mkv')])))
+
+
+if '__main__' == __name__:
+    print('==================')
+    print('STARTING - HISTORY TESTS')
+    print('==================')
+    print('######################################################################')
+    suite = unittest.TestLoader().loadTestsFromTestCase(HistoryTests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,131 @@
+# coding=UTF-8
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+import datetime
+import email.utils
+import unittest
+
+import test_lib as test
+
+import sickgear
+from sickgear import db, ical
+from sickgear.webserve import CalendarHandler
+
+from tornado.httputil import HTTPHeaders, HTTPServerRequest
+from tornado.web import Application
+
+today = datetime.date.today().toordinal()
+
+
+class ICalTests(test.SickbeardTestDBCase):
+    insert_ep = 'INSERT INTO tv_episodes (indexer, showid, season, episode, name, description, airdate, status)' \
+                ' VALUES (?,?,?,?,?,?,?,?)'
+
+    def setUp(self):
+        super(ICalTests, self).setUp()
+        ical._cache.clear()
+        self.calendar_unprotected = sickgear.CALENDAR_UNPROTECTED
+        sickgear.CALENDAR_UNPROTECTED = True
+        self.my_db = db.DBConnection()
+        cl = [['INSERT INTO tv_shows (indexer, indexer_id, show_name, status, paused, airs, network, runtime)'
+               ' VALUES (?,?,?,?,?,?,?,?)', [1, prodid, 'show %s' % prodid, status, paused, '9:00 PM', '', 30]]
+              for prodid, status, paused in ((10, 'Continuing', 0), (20, 'Returning Series', 0), (30, 'Ended', 0),
+                                             (40, 'Continuing', 1))]
+        for prodid, episode, airdate in ((10, 1, today - 7), (10, 2, today), (10, 3, today + 30), (20, 1, today + 1),
+                                         (20, 2, today - 400), (30, 1, today), (40, 1, today)):
+            cl.append([self.insert_ep, [1, prodid, 1, episode, 'ep %s' % episode, 'line 1\nline 2', airdate, 1]])
+        self.my_db.mass_action(cl)
+
+    def tearDown(self):
+        sickgear.CALENDAR_UNPROTECTED = self.calendar_unprotected
+        super(ICalTests, self).tearDown()
+
+    @staticmethod
+    def _summaries(body):
+        return [cur_line[len('SUMMARY:'):] for cur_line in body.split('\r\n') if cur_line.startswith('SUMMARY:')]
+
+    def test_feed(self):
+        body = ical.CalendarFeed().body()
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n') and body.endswith('END:VCALENDAR'))
+        self.assertEqual(['show 10 - 1x1 - ep 1', 'show 10 - 1x2 - ep 2', 'show 20 - 1x1 - ep 1',
+                          'show 10 - 1x3 - ep 3'], self._summaries(body))
+        self.assertIn('DESCRIPTION:9:00 PM on Unknown network\\n\\nline 1\r\n', body)
+        self.assertEqual(['show 10 - 1x1 - ep 1', 'show 10 - 1x2 - ep 2', 'show 20 - 1x1 - ep 1'],
+                         self._summaries(ical.CalendarFeed(days=2).body()))
+        self.assertEqual(['show 20 - 1x1 - ep 1'], self._summaries(ical.CalendarFeed(shows=[(1, 20)]).body()))
+
+    def test_data_version(self):
+        feed = ical.CalendarFeed()
+        feed.body()
+        self.assertEqual(1, len(ical._cache))
+        self.assertEqual(feed.etag, ical.CalendarFeed().etag)
+
+        # a change of a column that is not in the feed keeps the version
+        self.my_db.action('UPDATE tv_episodes SET status = ? WHERE showid = ?', [3, 10])
+        self.assertEqual(feed.etag, ical.CalendarFeed().etag)
+
+        self.my_db.action('UPDATE tv_episodes SET name = ? WHERE showid = ? AND episode = ?', ['new', 10, 2])
+        changed = ical.CalendarFeed()
+        self.assertNotEqual(feed.etag, changed.etag)
+        self.assertIn('show 10 - 1x2 - new', self._summaries(changed.body()))
+
+        self.my_db.action('UPDATE tv_shows SET paused = 1 WHERE indexer_id = ?', [20])
+        self.assertNotIn('show 20 - 1x1 - ep 1', self._summaries(ical.CalendarFeed().body()))
+
+    @staticmethod
+    def _handler(query='', headers=None):
+        class Connection(object):
+            def set_close_callback(self, callback):
+                pass
+
+        handler = CalendarHandler(Application(cookie_secret='test'), HTTPServerRequest(
+            method='GET', uri='/calendar%s' % query, headers=HTTPHeaders(dict({'Host': 'localhost'}, **(headers or {}))),
+            connection=Connection()))
+        handler.get()
+        return handler
+
+    def test_conditional_request(self):
+        handler = self._handler()
+        self.assertEqual(200, handler.get_status())
+        self.assertTrue(handler._headers['Content-Type'].startswith('text/calendar'))
+        self.assertEqual(4, len(self._summaries(b''.join(handler._write_buffer).decode('utf-8'))))
+        etag, last_modified = handler._headers['Etag'], handler._headers['Last-Modified']
+
+        self.assertEqual(304, self._handler(headers={'If-None-Match': etag}).get_status())
+        self.assertEqual(304, self._handler(headers={'If-Modified-Since': last_modified}).get_status())
+        self.assertEqual(200, self._handler(headers={'If-None-Match': '"other"',
+                                                     'If-Modified-Since': last_modified}).get_status())
+        self.assertEqual(200, self._handler('?days=2', headers={'If-None-Match': etag}).get_status())
+
+        self.my_db.action('DELETE FROM tv_episodes WHERE showid = ? AND episode = ?', [10, 3])
+        self.my_db.action('UPDATE data_version SET changed = changed + 1')
+        self.assertEqual(200, self._handler(headers={'If-None-Match': etag}).get_status())
+        self.assertEqual(200, self._handler(headers={'If-Modified-Since': last_modified}).get_status())
+
+        shows = self._handler('?shows=1:20,bad')
+        self.assertEqual(1, len(self._summaries(b''.join(shows._write_buffer).decode('utf-8'))))
+        self.assertLess(email.utils.parsedate_to_datetime(last_modified).timestamp(),
+                        email.utils.parsedate_to_datetime(shows._headers['Last-Modified']).timestamp())
+
+
+if '__main__' == __name__:
+    print('==================')
+    print('STARTING - ICAL TESTS')
+    print('==================')
+    print('######################################################################')
+    suite = unittest.TestLoader().loadTestsFromTestCase(ICalTests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -289,6 +289,24 @@ class TestCase(unittest.TestCase):
         re_extras.update(kwargs)
         return show_name_helpers.not_contains_any(name, csv_words, *args, **re_extras)
 
+    def test_word_list_matcher(self):
+        show_name_helpers.clear_word_list_cache()
+        matcher = show_name_helpers.word_list_matcher({'x265', 'Show.Name', r'(480|1080)p'}, rx=True)
+        self.assertIs(matcher, show_name_helpers.word_list_matcher({r'(480|1080)p', 'Show.Name', 'x265'}, rx=True))
+        self.assertIsNot(matcher, show_name_helpers.word_list_matcher({r'(480|1080)p', 'Show.Name', 'x265'}))
+        self.assertEqual(['x265'], list(matcher.words))
+        self.assertEqual(2, len(matcher.rx_patterns))
+        self.assertIsNotNone(matcher.combined)
+
+        self.assertIs(matcher.words['x265'], matcher.search('Show.S01E01.X265-Grp'))
+        self.assertIsNone(matcher.search('Show.S01E01.x2650-Grp'))
+        self.assertIsNotNone(matcher.search('ShowXName.S01E01.1080p-Grp'))
+        self.assertIsNone(matcher.search_missing('Show_Name.S01E01.480p.x265'))
+        self.assertIsNotNone(matcher.search_missing('Show.Name.S01E01.720p.x265'))
+
+        show_name_helpers.clear_word_list_cache()
+        self.assertIsNot(matcher, show_name_helpers.word_list_matcher({'x265', 'Show.Name', r'(480|1080)p'}, rx=True))
+
 
 if '__main__' == __name__:
     unittest.main()
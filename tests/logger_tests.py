@@ -0,0 +1,131 @@
+# coding=UTF-8
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import test_lib as test
+
+import sickgear
+from sickgear import logger
+
+
+class LoggerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.logged = []
+        self.log = logger.sb_log_instance.log
+        self.min_level = logger.sb_log_instance.min_level
+        logger.sb_log_instance.log = lambda to_log, log_level=logger.MESSAGE: self.logged.append((to_log, log_level))
+
+    def tearDown(self):
+        logger.sb_log_instance.log = self.log
+        logger.sb_log_instance.min_level = self.min_level
+
+    def test_format_args(self):
+        logger.sb_log_instance.min_level = logger.DEBUG
+        logger.debug('Parsed %s into %s', 'name', ['a', 'b'])
+        logger.debug('Found 100%')
+        logger.error(lambda: 'Failed %s' % 'job')
+        logger.log(lambda: 'Query', logger.DB)
+        self.assertEqual([("Parsed name into ['a', 'b']", logger.DEBUG), ('Found 100%', logger.DEBUG),
+                          ('Failed job', logger.ERROR)], self.logged)
+
+    def test_skip_below_level(self):
+        def message():
+            called.append(True)
+            return 'debug'
+
+        called = []
+        logger.sb_log_instance.min_level = logger.MESSAGE
+        self.assertFalse(logger.is_enabled(logger.DEBUG))
+        self.assertTrue(logger.is_enabled(logger.WARNING))
+        logger.debug(message)
+        logger.debug('%s', message)
+        logger.log(message, logger.DB)
+        logger.warning('Warned %s', 'once')
+        self.assertEqual([], called, msg='message of a skipped level is not built')
+        self.assertEqual([('Warned once', logger.WARNING)], self.logged)
+
+
+class AsyncHandlerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_write(self):
+        log_file = os.path.join(self.path, 'test.log')
+        handler = logger.AsyncHandler(logging.FileHandler(log_file))
+        handler.setLevel(logging.INFO)
+        self.assertEqual(logging.INFO, handler.target.level)
+        test_logger = logging.getLogger('sickgear.test_async')
+        test_logger.propagate = False
+        test_logger.setLevel(logger.DEBUG)
+        test_logger.addHandler(handler)
+        try:
+            for cur_num in range(100):
+                test_logger.info('line %s', cur_num)
+            test_logger.debug('dropped')
+        finally:
+            test_logger.removeHandler(handler)
+            handler.close()
+        with open(log_file) as fh:
+            lines = fh.read().splitlines()
+        self.assertEqual(['line %s' % cur_num for cur_num in range(100)], lines,
+                         msg='waiting records are written when the handler is closed')
+
+    def test_rollover(self):
+        log_dir, file_logging_async = sickgear.LOG_DIR, sickgear.FILE_LOGGING_ASYNC
+        sickgear.LOG_DIR, sickgear.FILE_LOGGING_ASYNC = self.path, True
+        log_instance = logger.SBRotatingLogHandler('test.log')
+        log_instance.log_types = ['sg.test_rollover']
+        log_instance.external_loggers, log_instance.log_types_null = [], []
+        test_logger = logging.getLogger('sg.test_rollover')
+        test_logger.propagate = False
+        try:
+            log_instance.init_logging()
+            test_logger.setLevel(logger.DEBUG)
+            h_file = log_instance.h_file
+            self.assertIsInstance(h_file, logger.AsyncHandler)
+            h_file.target.rolloverAt = int(time.time())
+            test_logger.info('before')
+            test_logger.info('after')
+            log_instance.close_log()
+        finally:
+            sickgear.LOG_DIR, sickgear.FILE_LOGGING_ASYNC = log_dir, file_logging_async
+        self.assertIs(h_file, log_instance.h_file, msg='the async handler is kept over a rollover')
+        self.assertIsNone(h_file.listener._thread)
+        self.assertEqual(1, len([cur_name for cur_name in os.listdir(self.path) if cur_name.endswith('.zip')]))
+        with open(os.path.join(self.path, 'test.log')) as fh:
+            self.assertIn('after', fh.read(), msg='records after a rollover are written')
+
+
+if '__main__' == __name__:
+    print('==================')
+    print('STARTING - LOGGER TESTS')
+    print('==================')
+    print('######################################################################')
+    for cur_case in (LoggerTests, AsyncHandlerTests):
+        suite = unittest.TestLoader().loadTestsFromTestCase(cur_case)
+        unittest.TextTestRunner(verbosity=2).run(suite)
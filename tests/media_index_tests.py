@@ -0,0 +1,129 @@
+# coding=UTF-8
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+import io
+import os.path
+import shutil
+import tempfile
+import time
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    mock = None
+
+import test_lib as test
+
+from sickgear import helpers, media_index
+
+
+class MediaIndexTests(test.SickbeardTestDBCase):
+
+    def setUp(self):
+        super(MediaIndexTests, self).setUp()
+        self.show_dir = tempfile.mkdtemp()
+        for rel_path, size in (('Season 01/Show.S01E01.mkv', 3000), ('Season 01/Show.S01E01.nfo', 100),
+                               ('Season 01/Show.S01E02.mkv', 5000), ('Season 02/Show.S02E01.avi', 2000),
+                               ('Season 02/sample/Show.S02E01.sample.mkv', 50), ('tvshow.nfo', 10)):
+            self._write(rel_path, size)
+        self._age_dirs()
+
+    def tearDown(self):
+        shutil.rmtree(self.show_dir, ignore_errors=True)
+        super(MediaIndexTests, self).tearDown()
+
+    def _write(self, rel_path, size):
+        file_path = os.path.join(self.show_dir, *rel_path.split('/'))
+        os.path.isdir(os.path.dirname(file_path)) or os.makedirs(os.path.dirname(file_path))
+        with io.open(file_path, 'wb') as fh:
+            fh.write(b'x' * size)
+        return file_path
+
+    def _age_dirs(self, age=100):
+        # set folder modify times outside the racy window, as if they were last changed a while ago
+        old = time.time() - age
+        for cur_dir, _, _ in os.walk(self.show_dir):
+            os.utime(cur_dir, (old, old))
+
+    def _assert_same(self):
+        self.assertEqual(helpers.get_media_stats(self.show_dir), media_index.get_media_stats(self.show_dir))
+        self.assertEqual(helpers.get_size(self.show_dir), media_index.get_size(self.show_dir))
+
+    def test_same_as_scan(self):
+        self.assertEqual((3, 2000, 5000, 3333), media_index.get_media_stats(self.show_dir))
+        self._assert_same()
+        self.assertEqual((0, 0, 0, 0), media_index.get_media_stats(os.path.join(self.show_dir, 'missing')))
+
+    @unittest.skipIf(None is mock, 'no mock')
+    def test_size_and_media_stats(self):
+        with mock.patch.object(media_index, 'refresh', wraps=media_index.refresh) as refresh:
+            self.assertEqual((helpers.get_size(self.show_dir), helpers.get_media_stats(self.show_dir)),
+                             media_index.get_size_and_media_stats(self.show_dir))
+            self.assertEqual(1, refresh.call_count, msg='the tree is refreshed once for both results')
+        self.assertEqual((0, (0, 0, 0, 0)),
+                         media_index.get_size_and_media_stats(os.path.join(self.show_dir, 'missing')))
+
+    @unittest.skipIf(None is mock, 'no mock')
+    def test_unchanged_folders_are_not_listed(self):
+        media_index.refresh(self.show_dir)
+        with mock.patch.object(media_index.os, 'scandir', wraps=os.scandir) as scandir:
+            media_index.refresh(self.show_dir)
+            self.assertEqual(0, scandir.call_count)
+
+            self._write('Season 01/Show.S01E03.mkv', 4000)
+            season_dir = os.path.join(self.show_dir, 'Season 01')
+            old = time.time() - 50
+            os.utime(season_dir, (old, old))
+            self._assert_same()
+            self.assertEqual([season_dir], [c[0][0] for c in scandir.call_args_list])
+
+    def test_update_path(self):
+        media_index.refresh(self.show_dir)
+        season_dir = os.path.join(self.show_dir, 'Season 01')
+        dir_stat = os.stat(season_dir)
+        file_path = self._write('Season 01/Show.S01E02.mkv', 6000)
+        os.utime(season_dir, (dir_stat.st_atime, dir_stat.st_mtime))
+        self.assertEqual(5000, media_index.get_media_stats(self.show_dir)[2],
+                         msg='a file changed in place is not seen by a refresh')
+        media_index.update_path(file_path)
+        self._assert_same()
+
+        os.remove(file_path)
+        media_index.update_path(file_path)
+        os.utime(season_dir, (dir_stat.st_atime, dir_stat.st_mtime))
+        self._assert_same()
+
+    def test_removed_folder(self):
+        media_index.refresh(self.show_dir)
+        shutil.rmtree(os.path.join(self.show_dir, 'Season 02'))
+        self._age_dirs(50)
+        self._assert_same()
+        self.assertEqual([], test.db.DBConnection('cache.db').select(
+            'SELECT * FROM media_files WHERE dir LIKE ?', ['%Season 02%']))
+
+        media_index.remove_tree(self.show_dir)
+        self.assertEqual([], test.db.DBConnection('cache.db').select('SELECT * FROM media_dirs'))
+
+
+if '__main__' == __name__:
+    print('==================')
+    print('STARTING - MEDIA INDEX TESTS')
+    print('==================')
+    print('######################################################################')
+    suite = unittest.TestLoader().loadTestsFromTestCase(MediaIndexTests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
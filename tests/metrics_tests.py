@@ -0,0 +1,153 @@
+# coding=UTF-8
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+import base64
+import datetime
+import unittest
+
+import test_lib as test
+
+import sickgear
+from sickgear import metrics, scheduler
+from sickgear.webserve import MetricsHandler
+
+from tornado.httputil import HTTPHeaders, HTTPServerRequest
+from tornado.web import Application
+
+
+class MetricsRegistryTests(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = metrics.Registry()
+
+    def test_render(self):
+        runs = self.registry.counter('test_runs_total', 'Runs "by" result', ('job', 'result'))
+        runs.inc(job='a', result='ok')
+        runs.inc(2, job='a', result='ok')
+        runs.inc(job='b\n"x"', result='error')
+        self.registry.gauge('test_depth', 'Depth').set(4)
+        self.assertEqual(3, runs.value(job='a', result='ok'))
+        self.assertEqual('\n'.join([
+            '# HELP sickgear_test_depth Depth',
+            '# TYPE sickgear_test_depth gauge',
+            'sickgear_test_depth 4',
+            '# HELP sickgear_test_runs_total Runs \\"by\\" result',
+            '# TYPE sickgear_test_runs_total counter',
+            'sickgear_test_runs_total{job="a",result="ok"} 3',
+            'sickgear_test_runs_total{job="b\\n\\"x\\"",result="error"} 1',
+        ]) + '\n', self.registry.render())
+
+    def test_histogram(self):
+        seconds = self.registry.histogram('test_seconds', 'Time', ('job',), buckets=(.1, 1))
+        for cur_value in (.05, .1, .5, 3):
+            seconds.observe(cur_value, job='a')
+        self.assertEqual([
+            'sickgear_test_seconds_bucket{job="a",le="0.1"} 2',
+            'sickgear_test_seconds_bucket{job="a",le="1"} 3',
+            'sickgear_test_seconds_bucket{job="a",le="+Inf"} 4',
+            'sickgear_test_seconds_sum{job="a"} 3.65',
+            'sickgear_test_seconds_count{job="a"} 4',
+        ], list(seconds.samples()))
+        summary = self.registry.summary()['test_seconds']['series'][0]
+        self.assertEqual((4, 3.65, 3), (summary['count'], summary['sum'], summary['max']))
+        self.assertEqual(3, summary['p95'], msg='a quantile in the +Inf bucket is the largest value')
+
+    def test_register(self):
+        self.assertIs(self.registry.counter('test_total', 'Test', ('a',)),
+                      self.registry.counter('test_total', 'Test', ('a',)))
+        self.assertRaises(ValueError, self.registry.gauge, 'test_total', 'Test', ('a',))
+        self.assertRaises(ValueError, self.registry.counter, 'test_total', 'Test', ('b',))
+
+    def test_function(self):
+        self.registry.gauge('test_size', 'Size', ('queue',)).set_function(lambda: [(('b',), 2), (('a',), 1)])
+        self.assertIn('sickgear_test_size{queue="a"} 1\nsickgear_test_size{queue="b"} 2\n', self.registry.render())
+
+
+class MetricsWiringTests(test.SickbeardTestDBCase):
+
+    def test_db_queries(self):
+        reads = metrics.REGISTRY.metrics['db_query_seconds'].value(db='sickbeard.db', kind='read')['count']
+        test.db.DBConnection().select('SELECT 1')
+        self.assertEqual(reads + 1,
+                         metrics.REGISTRY.metrics['db_query_seconds'].value(db='sickbeard.db', kind='read')['count'])
+        self.assertIn('sickgear_db_lock_wait_seconds_bucket{db="sickbeard.db",le="0.0005"}', metrics.render())
+
+    def test_scheduler_run(self):
+        class Action(object):
+            def __init__(self, fail):
+                self.fail = fail
+                self.amActive = False
+
+            def run(self):
+                job.stopit()
+                if self.fail:
+                    raise ValueError('test')
+
+        for cur_fail in (False, True):
+            job = scheduler.Scheduler(Action(cur_fail), cycle_time=datetime.timedelta(seconds=10),
+                                      thread_name='TESTJOB')
+            job.run()
+        self.assertEqual(1, scheduler.runs_total.value(job='TESTJOB', result='ok'))
+        self.assertEqual(1, scheduler.runs_total.value(job='TESTJOB', result='error'))
+        self.assertEqual(2, scheduler.run_seconds.value(job='TESTJOB')['count'])
+
+
+class MetricsHandlerTests(test.SickbeardTestDBCase):
+
+    def setUp(self):
+        super(MetricsHandlerTests, self).setUp()
+        self.config = dict([(k, getattr(sickgear, k)) for k in (
+            'WEB_USERNAME', 'WEB_PASSWORD', 'WEB_PORT', 'USE_API', 'API_KEYS')])
+        sickgear.WEB_USERNAME, sickgear.WEB_PASSWORD, sickgear.WEB_PORT = 'user', 'pässword', 8081
+        sickgear.USE_API, sickgear.API_KEYS = True, [['scraper', 'abc123']]
+
+    def tearDown(self):
+        for k, v in self.config.items():
+            setattr(sickgear, k, v)
+        super(MetricsHandlerTests, self).tearDown()
+
+    @staticmethod
+    def _handler(authorization=None):
+        class Connection(object):
+            def set_close_callback(self, callback):
+                pass
+
+        headers = HTTPHeaders({'Host': 'localhost'})
+        if authorization:
+            headers['Authorization'] = authorization
+        return MetricsHandler(Application(cookie_secret='test'), HTTPServerRequest(
+            method='GET', uri='/metrics', headers=headers, connection=Connection()))
+
+    def test_authorised(self):
+        basic = 'Basic %s' % base64.b64encode('user:pässword'.encode('utf-8')).decode('ascii')
+        self.assertTrue(self._handler(basic)._authorised())
+        self.assertTrue(self._handler('Bearer abc123')._authorised())
+        self.assertFalse(self._handler()._authorised())
+        self.assertFalse(self._handler('Bearer wrong')._authorised())
+        self.assertFalse(self._handler('Basic %s' % base64.b64encode(b'user:wrong').decode('ascii'))._authorised())
+        sickgear.USE_API = False
+        self.assertFalse(self._handler('Bearer abc123')._authorised())
+
+
+if '__main__' == __name__:
+    print('==================')
+    print('STARTING - METRICS TESTS')
+    print('==================')
+    print('######################################################################')
+    for cur_case in (MetricsRegistryTests, MetricsWiringTests, MetricsHandlerTests):
+        suite = unittest.TestLoader().loadTestsFromTestCase(cur_case)
+        unittest.TextTestRunner(verbosity=2).run(suite)
@@ -950,6 +950,85 @@ class ExtraInfoNoNameTests(test.SickbeardTestDBCase):
                 self.assertEqual(n_ep, case[3])
 
 
+class NameParserCacheTests(test.SickbeardTestDBCase):
+    def setUp(self):
+        super(NameParserCacheTests, self).setUp()
+        self.show_a, self.show_b = TVShowTest(name='Show A', prodid=10), TVShowTest(name='Show B', prodid=20)
+        sickgear.showList = [self.show_a, self.show_b]
+        sickgear.showDict = {self.show_a.sid_int: self.show_a, self.show_b.sid_int: self.show_b}
+        self.cache = parser.NameParserCache()
+
+    def tearDown(self):
+        super(NameParserCacheTests, self).tearDown()
+        sickgear.showList = []
+        sickgear.showDict = {}
+        name_cache.nameCache = {}
+        parser.name_parser_cache.clear()
+
+    def _result(self, name, show_obj, episode=1):
+        return parser.ParseResult(name, show_obj.name, 1, [episode], show_obj=show_obj, quality=4, version=-1)
+
+    def test_lru_budget(self):
+        self.cache.budget = self.cache.stripe_count * 3 * self.cache.entry_overhead
+        names = ['Show.A.S01E%02d.720p.HDTV.x264-GRP' % e for e in range(1, 200)]
+        for cur_name in names:
+            self.cache.add(cur_name, self._result(cur_name, self.show_a))
+        stats = self.cache.stats()
+        self.assertGreater(stats['evictions'], 0)
+        self.assertLessEqual(stats['used'], self.cache.budget)
+        self.assertEqual(len(names), stats['entries'] + stats['evictions'])
+        self.assertIsNotNone(self.cache.get(names[-1]))
+
+    def test_get_convert_and_flush(self):
+        name_a, name_b = 'Show.A.S01E01.720p.HDTV.x264-GRP', 'Show.B.S01E01.720p.HDTV.x264-GRP'
+        self.cache.add(name_a, self._result(name_a, self.show_a))
+        self.cache.add(name_a, self._result(name_a, self.show_a, 2), convert=True)
+        self.cache.add(name_b, self._result(name_b, self.show_b))
+        self.assertEqual([1], self.cache.get(name_a).episode_numbers)
+        self.assertEqual([2], self.cache.get(name_a, convert=True).episode_numbers)
+        self.assertIsNone(self.cache.get(name_b, convert=True))
+
+        self.cache.flush(self.show_a)
+        self.assertIsNone(self.cache.get(name_a))
+        self.assertIsNone(self.cache.get(name_a, convert=True))
+        self.assertIsNotNone(self.cache.get(name_b))
+        stats = self.cache.stats()
+        self.assertEqual((1, 3, 3), (stats['entries'], stats['hits'], stats['misses']))
+
+    def test_save_load(self):
+        names = ['Show.A.S01E01.720p.HDTV.x264-GRP', 'Show.A.S01E02.720p.HDTV.x264-GRP',
+                 'Show.B.S01E01.720p.HDTV.x264-GRP']
+        for cur_name, cur_show in zip(names, (self.show_a, self.show_a, self.show_b)):
+            self.cache.add(cur_name, self._result(cur_name, cur_show))
+        self.cache.get(names[0])
+        self.cache.get(names[2])
+        self.cache.get(names[2])
+
+        path = os.path.join(test.TESTDIR, self.cache.persist_file)
+        self.cache.persist_count = 1
+        self.assertEqual(1, self.cache.save(path))
+        self.cache.persist_count = 10
+        self.assertEqual(2, self.cache.save(path), msg='entries without hits are not saved')
+
+        sickgear.showDict = {self.show_b.sid_int: self.show_b}
+        cache = parser.NameParserCache()
+        self.assertEqual(1, cache.load(path), msg='entries of a show that no longer exists are not loaded')
+        result = cache.get(names[2])
+        self.assertEqual(self._result(names[2], self.show_b), result)
+        self.assertIs(self.show_b, result.show_obj)
+        os.remove(path)
+
+    def test_parse_uses_cache(self):
+        name_cache.nameCache = {}
+        name_cache.build_name_cache()
+        parser.name_parser_cache.clear()
+        name = 'Show.A.S01E03.720p.HDTV.x264-GRP'
+        result = parser.NameParser(testing=True).parse(name)
+        self.assertIs(self.show_a, result.show_obj)
+        self.assertIs(result, parser.NameParser(testing=True).parse(name))
+        self.assertEqual(1, parser.name_parser_cache.stats()['hits'])
+
+
 class OrderedDefaultdictTests(unittest.TestCase):
 
     def test_ordereddefaultdict(self):
@@ -971,6 +1050,9 @@ if '__main__' == __name__:
     suite = unittest.TestLoader().loadTestsFromTestCase(OrderedDefaultdictTests)
     unittest.TextTestRunner(verbosity=2).run(suite)
 
+    suite = unittest.TestLoader().loadTestsFromTestCase(NameParserCacheTests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
     if 1 < len(sys.argv):
         suite = unittest.TestLoader().loadTestsFromName('name_parser_tests.BasicTests.test_' + sys.argv[1])
     else:
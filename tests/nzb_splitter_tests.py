@@ -0,0 +1,172 @@
+# coding=UTF-8
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+import functools
+import io
+import os.path
+import shutil
+import tempfile
+import time
+import tracemalloc
+import unittest
+
+import test_lib as test  # noqa: F401
+
+from lxml_etree import etree
+
+import sickgear
+from sickgear import classes, helpers, nzbSplitter
+
+SEASON_NAME = 'Show.Name.S01.720p.HDTV.x264-GRP'
+
+
+def make_nzb(episodes=3, parts=3, segments=5, extra_files=()):
+    """
+    :return: season pack nzb data with a rar set and par2 files per episode, and an nfo for the season
+    """
+    lines = ['<?xml version="1.0" encoding="utf-8"?>',
+             '<!DOCTYPE nzb PUBLIC "-//newzBin//DTD NZB 1.1//EN" "http://www.newzbin.com/DTD/nzb/nzb-1.1.dtd">',
+             '<nzb xmlns="http://www.newzbin.com/DTD/2003/nzb">',
+             ' <head>', '  <meta type="title">%s</meta>' % SEASON_NAME, ' </head>']
+    subjects = ['%s [1/1] - "%s.nfo" yEnc (1/1)' % (SEASON_NAME, SEASON_NAME)]
+    for ep_num in range(1, 1 + episodes):
+        ep_name = 'Show.Name.S01E%02d.720p.HDTV.x264-GRP' % ep_num
+        subjects += ['%s [%s/%s] - "%s.part%02d.rar" yEnc (1/%s)' % (ep_name, n, parts, ep_name, n, segments)
+                     for n in range(1, 1 + parts)]
+        subjects += ['%s - "%s.par2" yEnc (1/1)' % (ep_name, ep_name),
+                     '%s - "%s.vol00+01.par2" yEnc (1/1)' % (ep_name, ep_name)]
+    subjects += list(extra_files)
+    for file_num, subject in enumerate(subjects):
+        lines += [' <file poster="poster &lt;p@example.com&gt;" date="1600000000" subject="%s">'
+                  % subject.replace('"', '&quot;'),
+                  '  <groups>', '   <group>alt.binaries.test</group>', '  </groups>', '  <segments>']
+        lines += ['   <segment bytes="768000" number="%s">part%s.%s$abc@example.com</segment>' % (n, n, file_num)
+                  for n in range(1, 1 + segments)]
+        lines += ['  </segments>', ' </file>']
+    lines += ['</nzb>', '']
+    return '\n'.join(lines).encode('utf-8')
+
+
+class NZBSplitterTests(unittest.TestCase):
+
+    def setUp(self):
+        self.save_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.save_dir, ignore_errors=True)
+
+    def _season_file(self, data):
+        season_file = os.path.join(self.save_dir, 'season.nzb')
+        with io.open(season_file, 'wb') as fh:
+            fh.write(data)
+        return season_file
+
+    def _split(self, data):
+        ep_files, xmlns = nzbSplitter._split_season_nzb(
+            SEASON_NAME + '.nzb', self._season_file(data), 1, self.save_dir)
+        result = {}
+        for cur_ep, cur_file in ep_files.items():
+            with io.open(cur_file, 'rb') as fh:
+                result[cur_ep] = fh.read()
+        return result, xmlns
+
+    def test_episode_files(self):
+        for episodes, parts, segments in ((1, 1, 1), (3, 3, 5), (12, 20, 10)):
+            result, xmlns = self._split(make_nzb(episodes, parts, segments))
+            self.assertEqual('http://www.newzbin.com/DTD/2003/nzb', xmlns)
+            self.assertEqual(['Show.Name.S01E%02d.720p.HDTV.x264' % n for n in range(1, 1 + episodes)], sorted(result))
+            for cur_ep, cur_data in result.items():
+                root = etree.fromstring(cur_data)
+                self.assertEqual('{%s}nzb' % xmlns, root.tag)
+                files = root.findall('{%s}file' % xmlns)
+                self.assertEqual(parts + 2, len(files), msg='episode %s' % cur_ep)
+                for cur_file in files:
+                    self.assertTrue(cur_file.get('subject').startswith(cur_ep + '-GRP '))
+                    self.assertEqual(segments, len(cur_file.findall('{%s}segments/{%s}segment' % (xmlns, xmlns))))
+
+    def test_episode_nzb(self):
+        result, xmlns = self._split(make_nzb(2, 2, 2))
+        self.assertEqual('http://www.newzbin.com/DTD/2003/nzb', xmlns)
+        ep_data = result['Show.Name.S01E02.720p.HDTV.x264']
+        self.assertEqual(4, ep_data.count(b'<file '))
+        self.assertNotIn(b'S01E01', ep_data)
+        self.assertTrue(ep_data.endswith(b'</nzb>'))
+
+    def test_not_split(self):
+        data = make_nzb(extra_files=['Show.Name.S01E02.rar - "other.bin" yEnc (1/1)'])
+        self.assertEqual(({}, ''), self._split(data))
+        self.assertEqual(['season.nzb'], os.listdir(self.save_dir), msg='partial episode files are removed')
+
+        self.assertEqual(({}, ''), self._split(b'<nzb><file subject="broken"'))
+        self.assertEqual(({}, ''), nzbSplitter._split_season_nzb(
+            'Not a season pack.nzb', self._season_file(make_nzb()), 1, self.save_dir))
+
+    def test_bounded_memory(self):
+        season_file = self._season_file(make_nzb(20, 40, 60))
+        tracemalloc.start()
+        try:
+            ep_files, xmlns = nzbSplitter._split_season_nzb(SEASON_NAME + '.nzb', season_file, 1, self.save_dir)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(20, len(ep_files))
+        self.assertLess(peak, os.path.getsize(season_file) // 4)
+
+    def test_read_keeps_data(self):
+        split_dir = os.path.join(self.save_dir, 'split')
+        os.mkdir(split_dir)
+        ep_files, xmlns = nzbSplitter._split_season_nzb(
+            SEASON_NAME + '.nzb', self._season_file(make_nzb(2)), 1, split_dir)
+        for cur_num, cur_file in enumerate(sorted(ep_files.values())):
+            nzb_result = classes.NZBDataSearchResult([])
+            nzb_result.get_data_func = functools.partial(nzbSplitter._read_nzb, nzb_result, cur_file)
+            data = nzb_result.get_data()
+            self.assertTrue(data.startswith(b'<nzb'))
+            self.assertFalse(os.path.exists(cur_file))
+            self.assertEqual(not cur_num, os.path.isdir(split_dir), msg='removed with the last episode file')
+            self.assertEqual(data, nzb_result.get_data(), msg='the data is kept for a retry')
+
+    def test_split_result_cleanup(self):
+        cache_dir, download_file = sickgear.CACHE_DIR, helpers.download_file
+        sickgear.CACHE_DIR = self.save_dir
+        data = make_nzb()
+
+        def _download_file(url, filename, **kwargs):
+            with io.open(filename, 'wb') as fh:
+                fh.write(data)
+            return True
+
+        parent_dir = os.path.join(self.save_dir, 'nzb_split')
+        old_dir = os.path.join(parent_dir, 'old')
+        os.makedirs(old_dir)
+        os.utime(old_dir, (time.time() - nzbSplitter.SPLIT_DIR_MAX_AGE - 60,) * 2)
+        helpers.download_file = _download_file
+        try:
+            result = type('Result', (object,), dict(name='Not a season pack', url='', show_obj=None))()
+            self.assertEqual([], nzbSplitter.split_result(result))
+        finally:
+            sickgear.CACHE_DIR, helpers.download_file = cache_dir, download_file
+        self.assertEqual([], os.listdir(parent_dir), msg='season nzb, split folder and old split folders are removed')
+
+
+if '__main__' == __name__:
+    print('==================')
+    print('STARTING - NZB SPLITTER TESTS')
+    print('==================')
+    print('######################################################################')
+    suite = unittest.TestLoader().loadTestsFromTestCase(NZBSplitterTests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
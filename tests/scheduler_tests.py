@@ -0,0 +1,123 @@
+# coding=UTF-8
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+import datetime
+import threading
+import time
+import unittest
+
+import test_lib as test
+
+from sickgear import generic_queue, scheduler
+
+
+class CountJob(scheduler.Job):
+    def __init__(self):
+        super(CountJob, self).__init__(self.job_run, silent=True)
+        self.runs = []
+        self.ran = threading.Event()
+
+    def job_run(self):
+        self.runs.append(time.time())
+        self.ran.set()
+
+
+class WaitItem(generic_queue.QueueItem):
+    def __init__(self, name, release):
+        super(WaitItem, self).__init__(name)
+        self.release = release
+        self.started = threading.Event()
+
+    def run(self):
+        super(WaitItem, self).run()
+        self.started.set()
+        self.release.wait(5)
+        self.finish()
+
+
+class SchedulerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.threads = []
+
+    def tearDown(self):
+        for cur_thread in self.threads:
+            cur_thread.stopit()
+            cur_thread.join(5)
+
+    def _start(self, action, **kwargs):
+        sch = scheduler.Scheduler(action, thread_name='TESTSCHEDULER', **kwargs)
+        self.threads.append(sch)
+        sch.start()
+        return sch
+
+    def test_sleep_until_deadline(self):
+        job = CountJob()
+        sch = self._start(job, cycle_time=datetime.timedelta(hours=1))
+        self.assertTrue(job.ran.wait(2), msg='a scheduler without run delay runs at start')
+        self.assertGreater(sch._sleep_time(), 60)
+
+        sch.cycle_time = datetime.timedelta(seconds=1)
+        time.sleep(1.5)
+        self.assertEqual(2, len(job.runs), msg='a shorter cycle_time applies without waiting for the old deadline')
+
+    def test_force_run(self):
+        job = CountJob()
+        sch = self._start(job, cycle_time=datetime.timedelta(hours=1), run_delay=datetime.timedelta(hours=1))
+        time.sleep(0.2)
+        self.assertEqual([], job.runs)
+
+        forced = time.time()
+        self.assertTrue(sch.force_run())
+        self.assertTrue(job.ran.wait(2))
+        self.assertLess(job.runs[0] - forced, 0.5)
+        self.assertFalse(sch.force)
+
+    def test_pause(self):
+        job = CountJob()
+        sch = self._start(job, cycle_time=datetime.timedelta(hours=1), paused=True)
+        time.sleep(0.2)
+        self.assertEqual([], job.runs)
+        sch.unpause()
+        self.assertTrue(job.ran.wait(2))
+
+    def test_queue_wakeup(self):
+        queue = generic_queue.GenericQueue()
+        self._start(queue, cycle_time=datetime.timedelta(hours=1))
+        time.sleep(0.2)
+
+        release = threading.Event()
+        items = [WaitItem('item %s' % n, release) for n in range(2)]
+        queued = time.time()
+        for cur_item in items:
+            queue.add_item(cur_item, add_to_db=False)
+        self.assertTrue(items[0].started.wait(2), msg='an added item starts without waiting for a cycle')
+        self.assertLess(time.time() - queued, 0.5)
+        self.assertFalse(items[1].started.is_set())
+
+        release.set()
+        self.assertTrue(items[1].started.wait(2), msg='the next item starts when the current item is done')
+        self.assertLess(time.time() - queued, 1)
+
+
+if '__main__' == __name__:
+    print('==================')
+    print('STARTING - SCHEDULER TESTS')
+    print('==================')
+    print('######################################################################')
+    suite = unittest.TestLoader().loadTestsFromTestCase(SchedulerTests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
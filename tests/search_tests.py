@@ -4,12 +4,16 @@ import warnings
 warnings.filterwarnings('ignore', module=r'.*fuz.*', message='.*Sequence.*')
 warnings.filterwarnings('ignore', module=r'.*connectionpool.*', message='.*certificate verification.*')
 
+import time
 import unittest
+from types import SimpleNamespace
 
 sys.path.insert(1, os.path.abspath('..'))
 sys.path.insert(1, os.path.abspath('../lib'))
 
 from sickgear import properFinder
+from sickgear import search
+from sickgear import search_queue
 
 import sickgear
 import test_lib as test
@@ -30,6 +34,125 @@ class ProperTests(test.SickbeardTestDBCase):
         ])
 
 
+class FakeEpisode(object):
+    def __init__(self, show_obj, episode):
+        self.show_obj = show_obj
+        self.episode = episode
+
+    def pretty_name(self):
+        return 'ep %s' % self.episode
+
+
+class FakeCache(object):
+    def __init__(self, delay, fail):
+        self.delay = delay
+        self.fail = fail
+        self.written = False
+
+    @staticmethod
+    def should_update():
+        return True
+
+    def update_cache(self, needed=None, can_write=None):
+        time.sleep(self.delay)
+        if self.fail:
+            raise ValueError('fail')
+        if can_write():
+            self.written = True
+
+
+class FakeRecentProvider(object):
+    enable_recentsearch = True
+
+    def __init__(self, name, results=None, delay=0):
+        self.name = name
+        self.results = results or []
+        self.cache = FakeCache(delay, isinstance(results, Exception))
+        self.fails = SimpleNamespace(save_list=lambda: None)
+
+    def get_id(self):
+        return self.name
+
+    @staticmethod
+    def is_active():
+        return True
+
+    def search_rss(self, ep_obj_list, cached_results=None):
+        if isinstance(self.results, Exception):
+            raise self.results
+        return dict([(ep_obj, [SimpleNamespace(name='%s.%s' % (self.name, quality), quality=quality,
+                                               resultType='nzb', provider=self)])
+                     for ep_obj, quality in self.results])
+
+
+class RecentSearchTests(unittest.TestCase):
+    def setUp(self):
+        self.orig = (sickgear.providers.sorted_sources, search.TVCache.find_cached_releases, search.pick_best_result,
+                     search_queue.RECENT_SEARCH_PROVIDER_TIMEOUT, search_queue.RECENT_SEARCH_MAX_WORKERS)
+        search.TVCache.find_cached_releases = staticmethod(lambda *args, **kwargs: {})
+        search.pick_best_result = lambda results, *args, **kwargs: results[0]
+        show_obj = SimpleNamespace(paused=False, unique_name='show')
+        self.ep_1, self.ep_2 = [FakeEpisode(show_obj, n) for n in (1, 2)]
+        search_queue._left_running.clear()
+
+    def tearDown(self):
+        (sickgear.providers.sorted_sources, search.TVCache.find_cached_releases, search.pick_best_result,
+         search_queue.RECENT_SEARCH_PROVIDER_TIMEOUT, search_queue.RECENT_SEARCH_MAX_WORKERS) = self.orig
+        search_queue._left_running.clear()
+
+    def _search(self, providers):
+        sickgear.providers.sorted_sources = lambda: providers
+        return sorted([r.name for r in search.search_for_needed_episodes([self.ep_1, self.ep_2])])
+
+    def _update(self, providers):
+        sickgear.providers.sorted_sources = lambda: providers
+        search_queue.RecentSearchQueueItem.update_providers()
+        return [s['state'] for s in search_queue.recent_search_provider_stats()]
+
+    def test_merge_in_provider_order(self):
+        # a better quality from a later provider wins, an equal quality does not
+        self.assertEqual(['prov_a.2', 'prov_c.3'], self._search([
+            FakeRecentProvider('prov_a', [(self.ep_1, 1), (self.ep_2, 2)]),
+            FakeRecentProvider('prov_b', ValueError('fail')),
+            FakeRecentProvider('prov_c', [(self.ep_1, 3), (self.ep_2, 2)])]))
+
+    def test_failed_and_timed_out_update(self):
+        search_queue.RECENT_SEARCH_PROVIDER_TIMEOUT = 0.5
+        providers = [FakeRecentProvider('prov_a', delay=1.5), FakeRecentProvider('prov_b', ValueError('fail')),
+                     FakeRecentProvider('prov_c')]
+        self.assertEqual(['timed out', 'failed', 'done'], self._update(providers))
+        self.assertTrue(providers[2].cache.written)
+        time.sleep(1.5)
+        self.assertEqual('timed out', search_queue.recent_search_provider_stats()[0]['state'],
+                         msg='a timed out update does not change the stats when it finishes')
+        self.assertFalse(providers[0].cache.written, msg='a timed out update does not write its data')
+
+    def test_left_running_update_is_skipped(self):
+        search_queue.RECENT_SEARCH_PROVIDER_TIMEOUT = 0.3
+        providers = [FakeRecentProvider('prov_a', delay=1), FakeRecentProvider('prov_b')]
+        self.assertEqual(['timed out', 'done'], self._update(providers))
+        self.assertEqual(['still updating', 'done'], self._update(providers))
+        time.sleep(1)
+        providers[0].cache.delay = 0
+        self.assertEqual(['done', 'done'], self._update(providers))
+        self.assertTrue(providers[0].cache.written)
+
+    def test_timeout_per_provider(self):
+        # queued providers wait for a worker, their timeout starts when they are updated
+        search_queue.RECENT_SEARCH_PROVIDER_TIMEOUT, search_queue.RECENT_SEARCH_MAX_WORKERS = 0.5, 1
+        self.assertEqual(['done', 'done', 'done'], self._update([
+            FakeRecentProvider('prov_%s' % n, delay=0.3) for n in ('a', 'b', 'c')]))
+
+    def test_cancelled_update(self):
+        search_queue.RECENT_SEARCH_PROVIDER_TIMEOUT, search_queue.RECENT_SEARCH_MAX_WORKERS = 0.5, 1
+        providers = [FakeRecentProvider('prov_a', delay=1), FakeRecentProvider('prov_b')]
+        self.assertEqual(['timed out', 'cancelled'], self._update(providers))
+        self.assertEqual(None, search_queue.recent_search_provider_stats()[1]['elapsed'])
+        self.assertFalse(providers[1].cache.written)
+
+
 if '__main__' == __name__:
     suite = unittest.TestLoader().loadTestsFromTestCase(ProperTests)
     unittest.TextTestRunner(verbosity=2).run(suite)
+    suite = unittest.TestLoader().loadTestsFromTestCase(RecentSearchTests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,188 @@
+# coding=UTF-8
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+import datetime
+import unittest
+
+import test_lib as test
+
+import sickgear
+from sickgear import db, helpers, show_stats
+from sickgear.common import DOWNLOADED, SKIPPED, SNATCHED, UNAIRED, WANTED, Overview, Quality
+
+today = datetime.date.today().toordinal()
+
+
+class ShowStatsTests(test.SickbeardTestDBCase):
+    insert_ep = 'INSERT INTO tv_episodes (indexer, showid, season, episode, airdate, status) VALUES (?,?,?,?,?,?)'
+
+    def setUp(self):
+        super(ShowStatsTests, self).setUp()
+        self.my_db = db.DBConnection()
+        cl = [['INSERT INTO tv_shows (indexer, indexer_id, show_name) VALUES (?,?,?)', [1, prodid, 'show %s' % prodid]]
+              for prodid in (10, 20, 30)]
+        for episode, airdate, status in (
+                (1, today - 10, Quality.composite_status(DOWNLOADED, Quality.HDTV)),
+                (2, today - 3, Quality.composite_status(SNATCHED, Quality.HDTV)),
+                (3, today - 1, WANTED),
+                (4, today + 7, UNAIRED),
+                (5, today + 14, UNAIRED)):
+            cl.append([self.insert_ep, [1, 10, 1, episode, airdate, status]])
+        cl.append([self.insert_ep, [1, 20, 1, 1, today - 1, SKIPPED]])
+        self.my_db.mass_action(cl)
+
+    def test_get_show_stats(self):
+        stats = show_stats.get_show_stats()
+        self.assertEqual(['1:10', '1:20', '1:30'], sorted(stats))
+        self.assertEqual((1, 1, 3, today + 7, today - 1, today + 7), tuple(stats['1:10'][c] for c in (
+            'ep_snatched', 'ep_downloaded', 'ep_total', 'ep_airs_next', 'ep_airs_last', 'ep_next_wanted')))
+        self.assertEqual((1, 3), (stats['1:10']['ep_downloaded_aired'], stats['1:10']['ep_total_aired']))
+        self.assertEqual((0, 1, None), tuple(stats['1:20'][c] for c in ('ep_snatched', 'ep_total', 'ep_airs_next')))
+        self.assertEqual((0, 0, None), tuple(stats['1:30'][c] for c in ('ep_snatched', 'ep_total', 'ep_airs_last')))
+
+    def test_episode_change_updates_stats(self):
+        show_stats.get_show_stats()
+        self.my_db.action('UPDATE tv_episodes SET status = ? WHERE showid = ? AND episode = ?',
+                          [Quality.composite_status(DOWNLOADED, Quality.HDTV), 10, 3])
+        self.assertEqual(['20', '30'], [str(r['showid']) for r in self.my_db.select(
+            'SELECT showid FROM show_stats ORDER BY showid')], msg='only the row of the changed show is dropped')
+        # an update that changes no stats column keeps the row
+        self.my_db.action('UPDATE tv_episodes SET name = ? WHERE showid = ?', ['name', 20])
+        self.assertEqual(2, len(self.my_db.select('SELECT * FROM show_stats')))
+
+        self.assertEqual(2, show_stats.get_show_stats()['1:10']['ep_downloaded'])
+
+        self.my_db.action('DELETE FROM tv_episodes WHERE showid = ? AND episode = ?', [10, 1])
+        self.assertEqual(1, show_stats.get_show_stats()['1:10']['ep_downloaded'])
+
+        self.my_db.action(self.insert_ep, [1, 30, 1, 1, today + 1, UNAIRED])
+        self.assertEqual(today + 1, show_stats.get_show_stats()['1:30']['ep_airs_next'])
+
+    def test_stale_date(self):
+        show_stats.get_show_stats()
+        stats = show_stats.get_show_stats(today + 8)
+        self.assertEqual(today + 14, stats['1:10']['ep_airs_next'])
+        self.assertEqual(3, len(self.my_db.select('SELECT * FROM show_stats WHERE stats_date = ?', [today + 8])))
+
+    def test_check_show_stats(self):
+        show_stats.get_show_stats()
+        self.assertEqual([], show_stats.check_show_stats())
+
+        self.my_db.action('UPDATE show_stats SET ep_total = 99 WHERE showid = ?', [20])
+        self.assertEqual(['1:20'], show_stats.check_show_stats(fix=False))
+        self.assertEqual(['1:20'], show_stats.check_show_stats())
+        self.assertEqual(1, show_stats.get_show_stats()['1:20']['ep_total'])
+        self.assertEqual([], show_stats.check_show_stats())
+
+
+class FakeShow(object):
+    def __init__(self, prodid, quality, upgrade_once=False):
+        self.tvid, self.prodid, self.quality, self.upgrade_once = 1, prodid, quality, upgrade_once
+        self.tvid_prodid = '1:%s' % prodid
+
+    def get_overview(self, ep_status, split_snatch=False):
+        return helpers.get_overview(ep_status, self.quality, self.upgrade_once, split_snatch=split_snatch)
+
+
+class BacklogCountsTests(test.SickbeardTestDBCase):
+    insert_ep = 'INSERT INTO tv_episodes (indexer, showid, season, episode, airdate, status) VALUES (?,?,?,?,?,?)'
+
+    def setUp(self):
+        super(BacklogCountsTests, self).setUp()
+        self.search_unaired = sickgear.SEARCH_UNAIRED
+        sickgear.SEARCH_UNAIRED = False
+        self.my_db = db.DBConnection()
+        self.show_list = [FakeShow(10, Quality.combine_qualities([Quality.SDTV], [Quality.HDTV])),
+                          FakeShow(20, Quality.combine_qualities([Quality.SDTV], [])), FakeShow(30, Quality.SDTV)]
+        cl = []
+        for episode, airdate, status in (
+                (1, today - 10, Quality.composite_status(DOWNLOADED, Quality.SDTV)),
+                (2, today - 9, Quality.composite_status(DOWNLOADED, Quality.SDTV)),
+                (3, today - 8, Quality.composite_status(DOWNLOADED, Quality.HDTV)),
+                (4, today - 3, Quality.composite_status(SNATCHED, Quality.SDTV)),
+                (5, today - 1, WANTED),
+                (6, 1, WANTED),
+                (7, today + 7, UNAIRED)):
+            for prodid in (10, 20):
+                cl.append([self.insert_ep, [1, prodid, 1, episode, airdate, status]])
+        cl.append([self.insert_ep, [1, 30, 1, 1, today - 1, SKIPPED]])
+        self.my_db.mass_action(cl)
+
+    def tearDown(self):
+        sickgear.SEARCH_UNAIRED = self.search_unaired
+        super(BacklogCountsTests, self).tearDown()
+
+    def _per_episode(self):
+        # counts made the way the backlog overview made them, one episode at a time
+        result = {}
+        for cur_show_obj in self.show_list:
+            ep_counts = dict([(cur_cat, 0) for cur_cat in show_stats.BACKLOG_CATEGORIES])
+            for cur_row in self.my_db.select('SELECT status, airdate FROM tv_episodes WHERE showid = ?',
+                                             [cur_show_obj.prodid]):
+                if not sickgear.SEARCH_UNAIRED and 1 == cur_row['airdate']:
+                    continue
+                ep_cat = cur_show_obj.get_overview(int(cur_row['status']), split_snatch=True)
+                if ep_cat:
+                    ep_counts[(ep_cat, Overview.SNATCHED)[Overview.SNATCHED_QUAL == ep_cat]] += 1
+            result[cur_show_obj.tvid_prodid] = ep_counts
+        return result
+
+    def test_counts(self):
+        counts = show_stats.get_backlog_counts(self.show_list)
+        self.assertEqual(self._per_episode(), counts)
+        self.assertEqual((1, 2, 1, 1), tuple(counts['1:10'][c] for c in (
+            Overview.WANTED, Overview.QUAL, Overview.SNATCHED, Overview.GOOD)))
+        self.assertEqual((1, 0, 4), tuple(counts['1:20'][c] for c in (
+            Overview.WANTED, Overview.QUAL, Overview.GOOD)), msg='a show without upgrades has no low quality')
+        self.assertEqual(1, counts['1:30'][Overview.SKIPPED])
+
+        sickgear.SEARCH_UNAIRED = True
+        counts = show_stats.get_backlog_counts(self.show_list)
+        self.assertEqual(self._per_episode(), counts)
+        self.assertEqual(2, counts['1:10'][Overview.WANTED])
+
+    def test_status_change(self):
+        status_counts = show_stats.get_status_counts()
+        self.assertIs(status_counts, show_stats.get_status_counts(), msg='kept while no status changes')
+        self.my_db.action('UPDATE tv_episodes SET season = 2 WHERE showid = ?', [20])
+        self.assertIs(status_counts, show_stats.get_status_counts())
+
+        self.my_db.action('UPDATE tv_episodes SET status = ? WHERE showid = ? AND episode = ?', [WANTED, 10, 1])
+        self.assertIsNot(status_counts, show_stats.get_status_counts())
+        counts = show_stats.get_backlog_counts(self.show_list)
+        self.assertEqual(self._per_episode(), counts)
+        self.assertEqual((2, 1), (counts['1:10'][Overview.WANTED], counts['1:10'][Overview.QUAL]))
+
+        self.my_db.action(self.insert_ep, [1, 30, 1, 2, today - 1, WANTED])
+        self.assertEqual(1, show_stats.get_backlog_counts(self.show_list)['1:30'][Overview.WANTED])
+
+    def test_backlog_statuses(self):
+        self.assertEqual(sorted([WANTED, Quality.composite_status(DOWNLOADED, Quality.SDTV),
+                                 Quality.composite_status(SNATCHED, Quality.SDTV)]),
+                         show_stats.backlog_statuses(self.show_list[0]))
+        self.assertEqual([WANTED], show_stats.backlog_statuses(self.show_list[1]))
+        self.assertEqual([], show_stats.backlog_statuses(self.show_list[2]))
+
+
+if '__main__' == __name__:
+    print('==================')
+    print('STARTING - SHOW STATS TESTS')
+    print('==================')
+    print('######################################################################')
+    for cur_case in (ShowStatsTests, BacklogCountsTests):
+        suite = unittest.TestLoader().loadTestsFromTestCase(cur_case)
+        unittest.TextTestRunner(verbosity=2).run(suite)
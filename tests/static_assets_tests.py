@@ -0,0 +1,101 @@
+# coding=UTF-8
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+import gzip
+import io
+import os.path
+import shutil
+import tempfile
+import unittest
+
+import test_lib as test  # noqa: F401
+
+from sickgear import static_assets
+
+STYLE = b'body { color: #fff; }\n' * 100
+
+
+class StaticAssetsTests(unittest.TestCase):
+
+    def setUp(self):
+        self.gui_root = tempfile.mkdtemp()
+        self.cache_dir = tempfile.mkdtemp()
+        for rel_path, data in (('css/style.css', STYLE), ('js/lib/small.js', b'var a = 1;'),
+                               ('images/ico/favicon.png', b'\x89PNG' * 1000)):
+            file_path = os.path.join(self.gui_root, *rel_path.split('/'))
+            os.path.isdir(os.path.dirname(file_path)) or os.makedirs(os.path.dirname(file_path))
+            with io.open(file_path, 'wb') as fh:
+                fh.write(data)
+        static_assets.build(self.gui_root, self.cache_dir)
+
+    def tearDown(self):
+        static_assets.asset_versions.clear()
+        static_assets.data_root = static_assets.compressed_root = None
+        shutil.rmtree(self.gui_root, ignore_errors=True)
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_versioned_path(self):
+        version = static_assets.asset_versions['css/style.css']
+        self.assertRegex(version, r'^[0-9a-f]{10}$')
+        self.assertEqual('css/style.%s.css' % version, static_assets.versioned_path('css/style.css'))
+        self.assertEqual('css/missing.css', static_assets.versioned_path('css/missing.css'))
+
+        css_root = os.path.join(self.gui_root, 'css')
+        self.assertEqual(('style.css', True), static_assets.unversioned_path(css_root, 'style.%s.css' % version))
+        self.assertEqual(('style.css', False), static_assets.unversioned_path(css_root, 'style.0123456789.css'),
+                         msg='an old version is served from the current file but not cached')
+        self.assertEqual(('style.css', False), static_assets.unversioned_path(css_root, 'style.css'))
+        self.assertEqual(('x.0123456789.css', False), static_assets.unversioned_path(css_root, 'x.0123456789.css'))
+
+        ico_root = os.path.join(self.gui_root, 'images', 'ico')
+        versioned = static_assets.versioned_path('images/ico/favicon.png')
+        self.assertEqual(('favicon.png', True), static_assets.unversioned_path(ico_root, versioned.split('/')[-1]))
+
+    def test_compressed_file(self):
+        style = os.path.join(self.gui_root, 'css', 'style.css')
+        file_path, encoding = static_assets.compressed_file(style, 'gzip;q=1.0, identity; q=0.5')
+        self.assertEqual('gzip', encoding)
+        with gzip.open(file_path) as fh:
+            self.assertEqual(STYLE, fh.read())
+        if static_assets.brotli:
+            self.assertEqual('br', static_assets.compressed_file(style, 'gzip, deflate, br')[1])
+
+        self.assertEqual((None, None), static_assets.compressed_file(style, 'identity'))
+        self.assertEqual((None, None), static_assets.compressed_file(style, None))
+        self.assertEqual((None, None), static_assets.compressed_file(
+            os.path.join(self.gui_root, 'js', 'lib', 'small.js'), 'gzip'), msg='too small to compress')
+        self.assertEqual((None, None), static_assets.compressed_file(
+            os.path.join(self.gui_root, 'images', 'ico', 'favicon.png'), 'gzip'), msg='not compressible')
+
+    def test_rebuild(self):
+        old_file = static_assets.compressed_file(os.path.join(self.gui_root, 'css', 'style.css'), 'gzip')[0]
+        with io.open(os.path.join(self.gui_root, 'css', 'style.css'), 'ab') as fh:
+            fh.write(b'a { color: #000; }\n')
+        static_assets.build(self.gui_root, self.cache_dir)
+        new_file = static_assets.compressed_file(os.path.join(self.gui_root, 'css', 'style.css'), 'gzip')[0]
+        self.assertNotEqual(old_file, new_file)
+        self.assertTrue(os.path.isfile(new_file))
+        self.assertFalse(os.path.isfile(old_file), msg='compressed files of old versions are removed')
+
+
+if '__main__' == __name__:
+    print('==================')
+    print('STARTING - STATIC ASSETS TESTS')
+    print('==================')
+    print('######################################################################')
+    suite = unittest.TestLoader().loadTestsFromTestCase(StaticAssetsTests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,195 @@
+# coding=UTF-8
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+import datetime
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import types
+import unittest
+
+import test_lib as test
+
+import sickgear
+from sickgear import db, helpers, subtitles
+from sickgear.common import DOWNLOADED, Quality
+
+from lib import subliminal
+from lib.subliminal.services import ServiceBase
+from lib.subliminal.tasks import ListTask
+
+now = datetime.datetime(2024, 6, 1, 12, 0, 0)
+today = now.date().toordinal()
+time_format = '%Y-%m-%d %H:%M:%S'
+
+
+class FakeSubs(ServiceBase):
+    """local subtitle service that counts its uses at once"""
+    lock = threading.Lock()
+    active = 0
+    max_active = 0
+    starts = []
+
+    def init(self):
+        pass
+
+    def list(self, video, languages):
+        with self.lock:
+            FakeSubs.active += 1
+            FakeSubs.max_active = max(FakeSubs.max_active, FakeSubs.active)
+            FakeSubs.starts.append(time.time())
+        time.sleep(.05)
+        with self.lock:
+            FakeSubs.active -= 1
+        return []
+
+
+class ServiceLimiterTests(unittest.TestCase):
+
+    def setUp(self):
+        FakeSubs.active, FakeSubs.max_active, FakeSubs.starts = 0, 0, []
+        sys.modules['lib.subliminal.services.fakesubs'] = types.SimpleNamespace(Service=FakeSubs)
+        self.service_guard = subliminal.core.service_guard
+
+    def tearDown(self):
+        subliminal.core.service_guard = self.service_guard
+        del sys.modules['lib.subliminal.services.fakesubs']
+
+    @staticmethod
+    def _list(limits, uses=4):
+        subliminal.core.service_guard = subtitles.ServiceLimiter(limits).guard
+        threads = [threading.Thread(target=subliminal.core.consume_task,
+                                    args=(ListTask(None, [], 'fakesubs', None),)) for _ in range(uses)]
+        for cur_thread in threads:
+            cur_thread.start()
+        for cur_thread in threads:
+            cur_thread.join()
+
+    def test_uses_at_once(self):
+        self._list({'fakesubs': (1, 0)})
+        self.assertEqual((1, 4), (FakeSubs.max_active, len(FakeSubs.starts)))
+        FakeSubs.max_active = 0
+        self._list({'fakesubs': (2, 0)})
+        self.assertEqual(2, FakeSubs.max_active)
+
+    def test_rate(self):
+        self._list({'fakesubs': (3, .1)}, uses=3)
+        starts = sorted(FakeSubs.starts)
+        self.assertLessEqual(.19, starts[-1] - starts[0], msg='uses start at most once every .1 seconds')
+
+
+class SubtitlesFinderTests(test.SickbeardTestDBCase):
+
+    def setUp(self):
+        super(SubtitlesFinderTests, self).setUp()
+        self.path = tempfile.mkdtemp()
+        self.config = dict([(k, getattr(sickgear, k)) for k in (
+            'SUBTITLES_LANGUAGES', 'SUBTITLES_SERVICES_LIST', 'SUBTITLES_SERVICES_ENABLED')])
+        sickgear.SUBTITLES_LANGUAGES = ['en']
+        sickgear.SUBTITLES_SERVICES_LIST, sickgear.SUBTITLES_SERVICES_ENABLED = ['opensubtitles'], [1]
+        self.find_show_by_id = helpers.find_show_by_id
+        self.my_db = db.DBConnection()
+        self.my_db.action('INSERT INTO tv_shows (indexer, indexer_id, show_name, subtitles) VALUES (?,?,?,?)',
+                          [1, 10, 'show', 1])
+
+    def tearDown(self):
+        helpers.find_show_by_id = self.find_show_by_id
+        for k, v in self.config.items():
+            setattr(sickgear, k, v)
+        shutil.rmtree(self.path)
+        super(SubtitlesFinderTests, self).tearDown()
+
+    def _add_episodes(self, episodes):
+        self.my_db.mass_action([[
+            'INSERT INTO tv_episodes (indexer, showid, season, episode, airdate, status, location, subtitles,'
+            ' subtitles_searchcount, subtitles_lastsearch) VALUES (?,?,?,?,?,?,?,?,?,?)',
+            [1, 10, 1, episode, airdate, Quality.composite_status(DOWNLOADED, Quality.HDTV), location, subs, count,
+             last]] for episode, airdate, location, subs, count, last in episodes])
+
+    @staticmethod
+    def _rule_due(row):
+        # the rule as it was applied to each row in Python
+        rules = subtitles.SubtitlesFinder._get_rules()
+        since = now - datetime.datetime.strptime(row['lastsearch'], time_format)
+        return ((row['airdate_daydiff'] > 7 and row['searchcount'] < 2
+                 and since > datetime.timedelta(hours=rules['old'][row['searchcount']]))
+                or (row['airdate_daydiff'] <= 7 and row['searchcount'] < 7
+                    and since > datetime.timedelta(hours=rules['new'][row['searchcount']])))
+
+    def test_due_episodes(self):
+        episodes, episode = [], 0
+        for cur_airdate in (today - 30, today - 8, today - 7, today):
+            for cur_count in range(9):
+                for cur_hours in (0, 3, 5, 12, 20, 30):
+                    episode += 1
+                    episodes.append((episode, cur_airdate, '/tv/file.mkv', '', cur_count,
+                                     (now - datetime.timedelta(hours=cur_hours)).strftime(time_format)))
+        episodes.append((episode + 1, today, '/tv/file.mkv', 'en', 0, str(datetime.datetime.min)))
+        episodes.append((episode + 2, today, '/tv/file.mkv', '', 0, str(datetime.datetime.min)))
+        self._add_episodes(episodes)
+
+        rows = self.my_db.select('SELECT episode, subtitles, subtitles_searchcount AS searchcount,'
+                                 ' subtitles_lastsearch AS lastsearch, (? - airdate) AS airdate_daydiff'
+                                 ' FROM tv_episodes', [today])
+        expected = sorted([r['episode'] for r in rows if 'en' != r['subtitles'] and self._rule_due(r)])
+        due = sorted([r['episode'] for r in subtitles.SubtitlesFinder()._due_episodes(now)])
+        self.assertEqual(expected, due)
+        self.assertIn(episode + 2, due)
+        self.assertLess(len(due), len(rows) // 2)
+
+    def test_episode_failure(self):
+        class FakeEpisode(object):
+            def __init__(self, number):
+                self.number = number
+
+            def download_subtitles(self):
+                threads.add(threading.current_thread().name)
+                time.sleep(.05)
+                if 2 == self.number:
+                    raise ValueError('service failed')
+                searched.append(self.number)
+
+        class FakeShow(object):
+            @staticmethod
+            def get_episode(season, episode):
+                return FakeEpisode(episode)
+
+        threads, searched = set(), []
+        location = os.path.join(self.path, 'file.mkv')
+        with open(location, 'w') as fh:
+            fh.write('x')
+        self._add_episodes([(episode, today, location, '', 0, str(datetime.datetime.min))
+                            for episode in range(1, 7)]
+                           + [(7, today, os.path.join(self.path, 'missing.mkv'), '', 0, str(datetime.datetime.min))])
+        helpers.find_show_by_id = lambda *args, **kwargs: FakeShow()
+
+        subtitles.SubtitlesFinder()._main()
+        self.assertEqual([1, 3, 4, 5, 6], sorted(searched), msg='a failed episode does not end the search of others')
+        self.assertLess(1, len(threads))
+
+
+if '__main__' == __name__:
+    print('==================')
+    print('STARTING - SUBTITLES TESTS')
+    print('==================')
+    print('######################################################################')
+    for cur_case in (ServiceLimiterTests, SubtitlesFinderTests):
+        suite = unittest.TestLoader().loadTestsFromTestCase(cur_case)
+        unittest.TextTestRunner(verbosity=2).run(suite)
@@ -218,6 +218,7 @@ def teardown_test_db():
         sickgear.tvcache.CacheDBConnection().close()
     except (BaseException, Exception):
         pass
+    sickgear.db.close_all()
 
     # force python to garbage collect all db connections, so that the file can be deleted
     try:
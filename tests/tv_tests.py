@@ -23,6 +23,9 @@ from random import randint
 import datetime
 import copy
 import sickgear
+from sickgear import db
+from sickgear.common import SKIPPED, WANTED, WantedQualities
+from sickgear.search import wanted_episodes
 from sickgear.tv import TVEpisode, TVShow, TVidProdid, prodid_bitshift
 from exceptions_helper import MultipleShowObjectsException
 from sickgear.helpers import find_show_by_id
@@ -270,6 +273,76 @@ class TVFindTests(test.SickbeardTestDBCase):
                                      (show_test.get('description'), show_test['para']))
 
 
+# noinspection PyUnusedLocal
+def _specify_ep_from_db(self, season, episode, existing_only=False, **kwargs):
+    self.load_from_db(season, episode, **kwargs)
+
+
+class TVEpisodeBatchLoadTests(test.SickbeardTestDBCase):
+    """
+    regression benchmark, loading many episodes of a synthetic large show must not run a query per episode
+    """
+    seasons, episodes = 20, 100
+
+    def setUp(self):
+        super(TVEpisodeBatchLoadTests, self).setUp()
+        self.orig_specify_ep = TVEpisode.specify_episode
+        TVEpisode.specify_episode = _specify_ep_from_db
+        sickgear.WANTEDLIST_CACHE = WantedQualities()
+        sickgear.showList = []
+        sickgear.showDict = {}
+        _ = ReleaseMap()
+        self.show_obj = TVShow(1, 1, 'en')
+        self.show_obj.name = 'large show'
+        self.show_obj.save_to_db()
+        sickgear.showList = [self.show_obj]
+        sickgear.showDict = {self.show_obj.sid_int: self.show_obj}
+        airdate = datetime.date.today().toordinal()
+        cl = []
+        for cur_season in range(1, 1 + self.seasons):
+            for cur_episode in range(1, 1 + self.episodes):
+                # the first two episodes of each season are a multi-episode file
+                location = ('', '/tv/large show/s%02de01-02.mkv' % cur_season)[3 > cur_episode]
+                cl.append([
+                    'INSERT INTO tv_episodes'
+                    ' (showid, indexer, indexerid, name, season, episode, description, airdate, status, location,'
+                    ' file_size, release_name, subtitles, subtitles_searchcount, subtitles_lastsearch, is_proper,'
+                    ' scene_season, scene_episode, absolute_number, scene_absolute_number, version, release_group)'
+                    ' VALUES (?,?,?,?,?,?,?,?,?,?,0,"","",0,"0001-01-01 00:00:00",0,0,0,?,0,-1,"")',
+                    [1, 1, cur_season * 1000 + cur_episode, 'ep %s' % cur_episode, cur_season, cur_episode, '',
+                     airdate + cur_season * 1000 + cur_episode, (SKIPPED, WANTED)[1 == cur_season], location,
+                     (cur_season - 1) * self.episodes + cur_episode]])
+        db.DBConnection().mass_action(cl)
+
+    def tearDown(self):
+        TVEpisode.specify_episode = self.orig_specify_ep
+        super(TVEpisodeBatchLoadTests, self).tearDown()
+
+    def _reads(self, func, *args, **kwargs):
+        db.db_stats.reset()
+        started = datetime.datetime.now()
+        result = func(*args, **kwargs)
+        return result, db.db_stats.as_dict()['reads'], datetime.datetime.now() - started
+
+    def test_get_all_episodes(self):
+        ep_obj_list, reads, elapsed = self._reads(self.show_obj.get_all_episodes)
+        self.assertEqual(self.seasons * self.episodes, len(ep_obj_list))
+        self.assertGreater(5, reads, msg='%s queries in %s' % (reads, elapsed))
+        self.assertEqual([(1, 2)], [(e.season, e.episode) for e in ep_obj_list[0].related_ep_obj])
+        self.assertEqual([(2, 1)], [(e.season, e.episode) for e in ep_obj_list[self.episodes + 1].related_ep_obj])
+        self.assertEqual([], ep_obj_list[2].related_ep_obj)
+
+        # episode objects exist, so no episode or scene rows are loaded
+        _, reads, _ = self._reads(self.show_obj.get_all_episodes, season=2, has_location=True)
+        self.assertEqual(1, reads)
+
+    def test_wanted_episodes(self):
+        wanted, reads, elapsed = self._reads(wanted_episodes, self.show_obj, datetime.date.today(), unaired=True)
+        self.assertEqual(self.episodes, len(wanted))
+        self.assertGreater(5, reads, msg='%s queries in %s' % (reads, elapsed))
+        self.assertEqual(['ep 1', 'ep 2'], [e.name for e in wanted[0:2]])
+
+
 if '__main__' == __name__:
     print('==================')
     print('STARTING - TV TESTS')
@@ -292,3 +365,6 @@ if '__main__' == __name__:
     print('######################################################################')
     suite = unittest.TestLoader().loadTestsFromTestCase(TVFindTests)
     unittest.TextTestRunner(verbosity=2).run(suite)
+    print('######################################################################')
+    suite = unittest.TestLoader().loadTestsFromTestCase(TVEpisodeBatchLoadTests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
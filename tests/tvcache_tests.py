@@ -0,0 +1,107 @@
+# coding=UTF-8
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+import datetime
+import unittest
+from types import SimpleNamespace
+
+import test_lib as test
+
+from sickgear import tvcache
+from sickgear.common import Quality
+
+
+def _show(tvid, prodid):
+    return SimpleNamespace(tvid=tvid, prodid=prodid)
+
+
+def _ep(show_obj, season, episode, wanted_quality=(Quality.HDTV, Quality.HDWEBDL)):
+    return SimpleNamespace(show_obj=show_obj, season=season, episode=episode, wanted_quality=list(wanted_quality))
+
+
+def _parse_result(show_obj, season, episodes, quality=Quality.HDTV):
+    return SimpleNamespace(show_obj=show_obj, season_number=season, episode_numbers=episodes, quality=quality,
+                           release_group='GRP', version=-1)
+
+
+class TVCacheTests(test.SickbeardTestDBCase):
+
+    def setUp(self):
+        super(TVCacheTests, self).setUp()
+        self.orig_get_db = tvcache.TVCache.get_db
+        tvcache.TVCache.get_db = staticmethod(lambda: test.db.DBConnection(test.TESTCACHEDBNAME))
+        self.show_a, self.show_b = _show(1, 100), _show(1, 200)
+        self.caches = {}
+        for provider_id in ('prov_a', 'prov_b'):
+            self.caches[provider_id] = tvcache.TVCache(SimpleNamespace(get_id=lambda p=provider_id: p))
+
+    def tearDown(self):
+        tvcache.TVCache.get_db = self.orig_get_db
+        super(TVCacheTests, self).tearDown()
+
+    def _add(self, provider_id, name, url, parse_result):
+        cl = self.caches[provider_id].add_cache_entry(name, url, parse_result=parse_result)
+        tvcache.TVCache.get_db().mass_action(cl)
+
+    def test_add_cache_entry_episode_rows(self):
+        self._add('prov_a', 'Show.A.S01E01E02.720p.HDTV.x264-GRP', 'http://a/1', _parse_result(self.show_a, 1, [1, 2]))
+        # a duplicate url must not add further episode rows
+        self._add('prov_a', 'Show.A.S01E01E02.720p.HDTV.x264-GRP', 'http://a/1', _parse_result(self.show_a, 1, [1, 2]))
+        my_db = tvcache.TVCache.get_db()
+        self.assertEqual(1, my_db.select('SELECT COUNT(*) AS cnt FROM provider_cache')[0]['cnt'])
+        self.assertEqual([1, 2], [r['episode'] for r in my_db.select(
+            'SELECT episode FROM provider_cache_episodes ORDER BY episode')])
+
+        my_db.action('DELETE FROM provider_cache WHERE provider = ?', ['prov_a'])
+        self.assertEqual(0, my_db.select('SELECT COUNT(*) AS cnt FROM provider_cache_episodes')[0]['cnt'])
+
+    def test_find_cached_releases(self):
+        self._add('prov_a', 'Show.A.S01E01E02.720p.HDTV.x264-GRP', 'http://a/1', _parse_result(self.show_a, 1, [1, 2]))
+        self._add('prov_b', 'Show.A.S01E02.720p.HDTV.x264-GRP', 'http://b/1', _parse_result(self.show_a, 1, [2]))
+        self._add('prov_b', 'Show.A.S01E03.SDTV.x264-GRP', 'http://b/2',
+                  _parse_result(self.show_a, 1, [3], quality=Quality.SDTV))
+        self._add('prov_b', 'Show.B.S01E02.720p.HDTV.x264-GRP', 'http://b/3', _parse_result(self.show_b, 1, [2]))
+
+        ep_list = [_ep(self.show_a, 1, 1), _ep(self.show_a, 1, 2), _ep(self.show_a, 1, 3)]
+        results = tvcache.TVCache.find_cached_releases(ep_list)
+        self.assertEqual(['http://a/1'], [r['url'] for r in results['prov_a']])
+        # unwanted quality and a different show must not match
+        self.assertEqual(['http://b/1'], [r['url'] for r in results['prov_b']])
+
+        results = tvcache.TVCache.find_cached_releases(ep_list, ['prov_b'])
+        self.assertEqual(['prov_b'], list(results))
+
+        self.assertEqual({}, tvcache.TVCache.find_cached_releases([_ep(self.show_b, 2, 1)]))
+
+    def test_list_propers(self):
+        self._add('prov_a', 'Show.A.S01E01.PROPER.720p.HDTV.x264-GRP', 'http://a/1', _parse_result(self.show_a, 1, [1]))
+        self._add('prov_a', 'Show.A.S01E02.720p.HDTV.x264-GRP', 'http://a/2', _parse_result(self.show_a, 1, [2]))
+        self._add('prov_b', 'Show.A.S01E01.REAL.720p.HDTV.x264-GRP', 'http://b/1', _parse_result(self.show_a, 1, [1]))
+
+        self.assertEqual(['http://a/1'], [r['url'] for r in self.caches['prov_a'].list_propers()])
+        self.assertEqual(['http://b/1'], [r['url'] for r in self.caches['prov_b'].list_propers(
+            datetime.date.today() - datetime.timedelta(days=1))])
+        self.assertEqual([], self.caches['prov_b'].list_propers(datetime.date.today() + datetime.timedelta(days=2)))
+
+
+if '__main__' == __name__:
+    print('==================')
+    print('STARTING - TVCACHE TESTS')
+    print('==================')
+    print('######################################################################')
+    suite = unittest.TestLoader().loadTestsFromTestCase(TVCacheTests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,109 @@
+# coding=UTF-8
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+import copy
+import os.path
+import sys
+import unittest
+
+sys.path.insert(1, os.path.abspath('..'))
+sys.path.insert(1, os.path.abspath('../lib'))
+
+from tvinfo_base import TVInfoEpisode, TVInfoSeason, TVInfoShow
+
+
+def make_show():
+    show = TVInfoShow()
+    show.id, show.seriesname, show.aliases = 10, 'Show Name', ['Alias']
+    for season_num in (1, 2):
+        show[season_num] = TVInfoSeason(show=show, number=season_num)
+        for ep_num in (1, 2, 3):
+            ep = TVInfoEpisode(season=show[season_num], show=show)
+            ep.id, ep.episodename, ep.writers = season_num * 100 + ep_num, 'Ep %s' % ep_num, ['Writer']
+            ep['episodename'] = ep.episodename
+            show[season_num][ep_num] = ep
+    show.alt_ep_numbering = {'dvd': {1: {1: show[2][3]}}}
+    return show
+
+
+class TVInfoShowCopyTests(unittest.TestCase):
+
+    def test_cow_copy_is_lazy(self):
+        show = make_show()
+        show_copy = show.cow_copy()
+        self.assertEqual({1, 2}, show_copy.cow_keys)
+        self.assertIs(dict.__getitem__(show, 1), dict.__getitem__(show_copy, 1))
+
+        season = show_copy[1]
+        self.assertIsNot(show[1], season)
+        self.assertIs(show_copy, season.show)
+        self.assertEqual({2}, show_copy.cow_keys)
+        self.assertEqual({1, 2, 3}, season.cow_keys)
+
+        ep = season[2]
+        self.assertIsNot(show[1][2], ep)
+        self.assertIs(season, ep.season)
+        self.assertIs(show_copy, ep.show)
+        self.assertEqual('Ep 2', ep.episodename)
+        self.assertEqual([1, 2, 3], sorted(season))
+        self.assertEqual(6, sum(len(s.values()) for s in show_copy.values()))
+        self.assertEqual(set(), show_copy.cow_keys)
+
+    def test_changes_do_not_reach_cache(self):
+        show = make_show()
+        show_copy = show.cow_copy()
+        ep = show_copy[1][1]
+        ep.episodename = 'Changed'
+        ep['episodename'] = 'Changed'
+        ep.writers.append('Another')
+        show_copy.aliases.append('Another')
+        show_copy.seriesname = 'Changed'
+        del show_copy[2]
+        show_copy[1][4] = TVInfoEpisode()
+
+        self.assertEqual(('Ep 1', 'Ep 1', ['Writer']), (show[1][1].episodename, show[1][1]['episodename'],
+                                                        show[1][1].writers))
+        self.assertEqual((['Alias'], 'Show Name'), (show.aliases, show.seriesname))
+        self.assertEqual([1, 2], sorted(show))
+        self.assertEqual([1, 2, 3], sorted(show[1]))
+        self.assertEqual('Ep 1', show.cow_copy()[1][1].episodename)
+
+    def test_share_season(self):
+        show = make_show()
+        show_copy = show.cow_copy()
+        show_copy.share_season(1, show_copy.alt_ep_numbering['dvd'][1])
+        ep = show_copy[1][1]
+        self.assertIsNot(show[2][3], ep)
+        self.assertEqual('Ep 3', ep.episodename)
+        ep.episodename = 'Changed'
+        self.assertEqual('Ep 3', show[2][3].episodename)
+
+    def test_deepcopy(self):
+        show = make_show()
+        show_copy = copy.deepcopy(show.cow_copy())
+        self.assertEqual(set(), show_copy.cow_keys)
+        self.assertEqual('Ep 3', show_copy[2][3].episodename)
+        self.assertIs(show_copy[2], show_copy[2][3].season)
+
+
+if '__main__' == __name__:
+    print('==================')
+    print('STARTING - TVINFO SHOW COPY TESTS')
+    print('==================')
+    print('######################################################################')
+    suite = unittest.TestLoader().loadTestsFromTestCase(TVInfoShowCopyTests)
+    unittest.TextTestRunner(verbosity=2).run(suite)